@@ -2,6 +2,7 @@ import importlib
 
 import pandas as pd
 
+from model import advanced_controls
 import solution.factory as solution_loader
 
 
@@ -10,10 +11,23 @@ def get_py_solutions():
     py_solutions = solution_loader.all_solutions_scenarios()
     for name in py_solutions:
         solution_module = importlib.import_module("solution." + name)
-        for scenario in solution_module.scenarios.values():
-            row = {"solution": name, "scenario": scenario.name}
-            row["pds_adoption_basis"] = scenario.soln_pds_adoption_basis
-            row["ref_adoption_basis"] = scenario.soln_ref_adoption_basis or "Default"
+        scenarios = solution_module.scenarios
+        for scenario_name in scenarios:
+            if isinstance(scenarios, advanced_controls.Scenarios):
+                # read the scenario JSON, without constructing the AdvancedControls.
+                js = scenarios.json(scenario_name)
+                pds = js.get("soln_pds_adoption_basis")
+                ref = js.get("soln_ref_adoption_basis")
+                translate = advanced_controls.translate_adoption_bases
+                (pds, ref) = (translate.get(pds, pds), translate.get(ref, ref))
+            else:
+                scenario = scenarios[scenario_name]
+                pds = scenario.soln_pds_adoption_basis
+                ref = scenario.soln_ref_adoption_basis
+                scenario_name = scenario.name
+            row = {"solution": name, "scenario": scenario_name}
+            row["pds_adoption_basis"] = pds
+            row["ref_adoption_basis"] = ref or "Default"
             data.append(row)
     return pd.json_normalize(data)
 
@@ -1,12 +1,12 @@
 """Adoption Data module."""
 
-from functools import lru_cache
 import pathlib
 import re
 
 from model import interpolation
 from model import dd
-from model.metaclass_cache import MetaclassCache
+from model.metaclass_cache import MetaclassCache, cached
+from model import source_cache
 import numpy as np
 import pandas as pd
 
@@ -62,8 +62,8 @@ class AdoptionData(object, metaclass=MetaclassCache):
                 else:
                     sources = value
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
-                            skip_blank_lines=True, comment='#')
+                    df = source_cache.read_csv(filename, header=0, index_col=0,
+                            skipinitialspace=True, skip_blank_lines=True, comment='#')
                     for region in dd.REGIONS:
                         df_per_region[region].loc[:, name] = df.loc[:, region]
         self._adoption_data = df_per_region
@@ -143,7 +143,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         return self.data_sources.get(key, self.data_sources)
 
 
-    @lru_cache()
+    @cached
     def adoption_data(self, region):
         """Return adoption data for the given solution in the 'World' region.
            World: SolarPVUtil 'Adoption Data'!B45:R94
@@ -160,7 +160,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         return self._adoption_data[region]
 
 
-    @lru_cache()
+    @cached
     def adoption_data_main_with_regional(self):
         """Return adoption data for the 'World' region with regional data added in.
            SolarPVUtil 'Adoption Data'!B45:R94 when B30:B31 are both 'Y' """
@@ -178,7 +178,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         return adoption
 
 
-    @lru_cache()
+    @cached
     def adoption_min_max_sd(self, region):
         """Return the min, max, and standard deviation for the adoption data in the 'World' region.
            World: SolarPVUtil 'Adoption Data'!X45:Z94
@@ -211,7 +211,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @cached
     def adoption_low_med_high(self, region):
         """Return the selected data sources as Medium, and N stddev away as Low and High.
            World: SolarPVUtil 'Adoption Data'!AB45:AD94
@@ -245,7 +245,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @cached
     def adoption_trend(self, region, trend=None):
         """Adoption prediction via one of several interpolation algorithms in the region.
 
@@ -286,18 +286,56 @@ class AdoptionData(object, metaclass=MetaclassCache):
            Degree3: SolarPVUtil 'Adoption Data'!CN619:CR665    Exponential: 'Adoption Data'!CW619:CY665
 
         """
-        main_region = dd.REGIONS[0]  # first columns, ex: 'World'
         if not trend:
             trend = self.adconfig.loc['trend', region]
-        if region == main_region:
-            growth = self.ac.soln_pds_adoption_prognostication_growth
+        growth = self._adoption_growth(region)
+        if (growth is not None and trend is not None and
+                interpolation.canonical_trend(trend) != 'single'):
+            result = self.adoption_trends(region)[interpolation.canonical_trend(trend)].copy()
         else:
-            growth = self.adconfig.loc['growth', region]
-        result = self._adoption_trend(self.adoption_low_med_high(region), growth, trend)
+            result = self._adoption_trend(self.adoption_low_med_high(region), growth, trend)
         result.name = 'adoption_trend_' + self._name_to_identifier(region) + '_' + str(trend).lower()
         return result
 
-    @lru_cache()
+    def _adoption_growth(self, region):
+        main_region = dd.REGIONS[0]  # first columns, ex: 'World'
+        if region == main_region:
+            return self.ac.soln_pds_adoption_prognostication_growth
+        return self.adconfig.loc['growth', region]
+
+    @cached
+    def adoption_trends(self, region):
+        """Adoption prediction in the region via each of the curve fitting interpolation
+           algorithms.
+
+           Returns a dict of 'linear', 'degree2', 'degree3' and 'exponential' to the
+           adoption_trend for that algorithm, taken from _adoption_fits().
+        """
+        fits = self._adoption_fits(self._fit_group(region))
+        return {trend: interpolation.series_trend(fits, trend, region) for trend in fits}
+
+    def _fit_group(self, region):
+        """Regions of the adconfig whose trends are fitted together with region: all of
+           them, unless the World adoption includes the regional trends. Then the regions
+           are fitted together first, and the World after them."""
+        regions = list(self.adconfig.columns)
+        if not self.main_includes_regional:
+            return tuple(regions)
+        main = (region == dd.REGIONS[0])
+        return tuple(r for r in regions if (r == dd.REGIONS[0]) == main)
+
+    @cached
+    def _adoption_fits(self, regions):
+        """Every trend of the adoption of each of regions with a growth, fitted together in
+           a single interpolation.fit_trends() call."""
+        data = {}
+        for region in regions:
+            growth = self._adoption_growth(region)
+            if growth is not None:
+                data[region] = self.adoption_low_med_high(region).loc[:, growth]
+        return interpolation.fit_trends(pd.DataFrame(data))
+
+    @cached
     def adoption_is_single_source(self):
         """Whether the source data selected is one source or multiple."""
         return not interpolation.is_group_name(data_sources=self.data_sources,
@@ -308,7 +346,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         first_year = result.index[0]
         result.loc[first_year, region] = adoption_low_med_high.loc[first_year, 'Medium']
 
-    @lru_cache()
+    @cached
     def adoption_data_per_region(self):
         """Return a dataframe of adoption data, one column per region."""
         growth = self.ac.soln_pds_adoption_prognostication_growth
@@ -323,7 +361,7 @@ class AdoptionData(object, metaclass=MetaclassCache):
         df.name = 'adoption_data_per_region'
         return df
 
-    @lru_cache()
+    @cached
     def adoption_trend_per_region(self):
         """Return a dataframe of adoption trends, one column per region."""
         df = pd.DataFrame(columns=dd.REGIONS)
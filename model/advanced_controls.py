@@ -2,6 +2,7 @@
    but can be overridden to fit particular needs.
 """
 
+import collections.abc
 import dataclasses
 import enum
 import glob
@@ -13,6 +14,7 @@ import pandas as pd
 import pytest
 from model import emissionsfactors as ef
 from model import excel_math
+from model import fingerprint
 from model.dd import REGIONS, MAIN_REGIONS
 
 SOLUTION_CATEGORY = enum.Enum('SOLUTION_CATEGORY', 'REPLACEMENT REDUCTION NOT_APPLICABLE LAND OCEAN')
@@ -905,24 +907,18 @@ class AdvancedControls:
             result = raw_val_from_excel
         return result
 
-    def _hash_item(self, item):
-        if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
-            item = tuple(pd.util.hash_pandas_object(item))
-        try:
-            return hash(item)
-        except TypeError:
-            pass
-        try:
-            return hash(tuple(item))
-        except TypeError as e:
-            raise e
+    def fingerprint(self):
+        """Digest of the settings, memoized. js and jsfile only record where the settings
+           were loaded from and are left out."""
+        memo = self.__dict__.get('_fingerprint')
+        if memo is None:
+            memo = fingerprint.fingerprint({field.name: getattr(self, field.name)
+                for field in dataclasses.fields(self) if field.name not in ('js', 'jsfile')})
+            object.__setattr__(self, '_fingerprint', memo)
+        return memo
 
     def __hash__(self):
-        key = 0x811c9dc5
-        key = key ^ id(self)
-        for field in dataclasses.fields(self):
-            key = key ^ self._hash_item(field)
-        return key
+        return int(self.fingerprint()[:16], 16)
 
     def write_to_json_file(self):
         jsfilenew = self.jsfile + '.new'
@@ -956,18 +952,60 @@ def fill_missing_regions_from_world(data):
         return data
 
 
+class Scenarios(collections.abc.MutableMapping):
+    """Scenarios of a solution, a dict of scenario name to AdvancedControls.
+
+       The AdvancedControls of a scenario is constructed when the scenario is first used.
+       Constructing it substitutes values from the VMAs of the solution, reading and
+       summarizing their data, which solutions enumerating scenario names do not need.
+    """
+
+    def __init__(self, vmas):
+        self.vmas = vmas
+        # scenario name to AdvancedControls, or to (filename, JSON) until constructed.
+        self._scenarios = {}
+
+    def add_json(self, filename, j):
+        self._scenarios[j.get('name')] = (str(filename), j)
+
+    def json(self, name):
+        """The JSON dict of scenario name, without constructing its AdvancedControls."""
+        value = self._scenarios[name]
+        return value[1] if isinstance(value, tuple) else value.js
+
+    def __getitem__(self, name):
+        value = self._scenarios[name]
+        if isinstance(value, tuple):
+            (filename, j) = value
+            js = j.copy()
+            js['vmas'] = self.vmas
+            js['js'] = j
+            js['jsfile'] = filename
+            value = self._scenarios[name] = AdvancedControls(**js)
+        return value
+
+    def __setitem__(self, name, value):
+        self._scenarios[name] = value
+
+    def __delitem__(self, name):
+        del self._scenarios[name]
+
+    def __iter__(self):
+        return iter(self._scenarios)
+
+    def __len__(self):
+        return len(self._scenarios)
+
+    def __repr__(self):
+        return f"Scenarios({list(self._scenarios)!r})"
+
+
 def load_scenarios_from_json(directory, vmas):
-    """Load scenarios from JSON files in directory."""
-    result = {}
+    """Load scenarios from JSON files in directory, see Scenarios."""
+    result = Scenarios(vmas=vmas)
     for filename in glob.glob(str(directory.joinpath('*.json'))):
         with open(filename, 'r') as fid:
-            j = json.loads(fid.read())
-            js = j.copy()
-            js['vmas'] = vmas
-            js['js'] = j
-            js['jsfile'] = str(filename)
-            a = AdvancedControls(**js)
-            result[a.name] = a
+            result.add_json(filename, json.loads(fid.read()))
     return result
 
 def get_vma_for_param(param):
@@ -10,17 +10,78 @@ values are fixed across all solutions but if they do need updating the xls sheet
 can be updated by running the relevant script in the 'tools' directory.
 """
 
+import functools
 import pathlib
 import re
 
 import numpy as np
 import pandas as pd
 from model import dd
+from model import source_cache
 from model.metaclass_cache import MetaclassCache
 
 LAND_CSV_PATH = pathlib.Path(__file__).parents[1].joinpath('data', 'land')
 
 
+def _to_filename(name):
+    """Removes special characters and separates words with single underscores"""
+    return re.sub(' +', '_', re.sub('[^a-zA-Z0-9' '\n]', ' ', name)).strip('_')
+
+
+class CohortLand:
+    """Land allocation data for all solutions of a cohort, loaded once.
+
+       solutions: index of solution names along the first axis of allocation and land.
+       regions: index of the regions in the 'land/world' files.
+       allocation: (solution, TMR, AEZ) array of the 'Total % allocated' in the
+         'land/allocation' files, 0 where nothing is allocated and for AEZ29.
+       world: (TMR, region, AEZ) array of world land area in km2.
+       land: (solution, TMR, region, AEZ) array of land allocated to each solution in Mha.
+       applicable: DataFrame of the AEZs applicable to each solution, by solution name.
+
+       The arrays are shared by every AEZ of the cohort and are not writeable.
+    """
+
+    def __init__(self, cohort, regimes):
+        self.cohort = cohort
+        self.regimes = list(regimes)
+        zones = [z for z in dd.AEZS if not z.startswith('AEZ29')]
+        percent = None
+        for (t, tmr) in enumerate(self.regimes):
+            tmr_path = LAND_CSV_PATH.joinpath(f'allocation{cohort}', _to_filename(tmr))
+            for (a, aez) in enumerate(zones):
+                la_df = source_cache.read_csv(tmr_path.joinpath(_to_filename(aez) + '.csv'),
+                        index_col=0)
+                if percent is None:
+                    self.solutions = la_df.index
+                    percent = np.full((len(la_df.index), len(self.regimes), len(dd.AEZS)), 0.0)
+                percent[:, t, a] = la_df['Total % allocated'].reindex(self.solutions).values
+        with np.errstate(invalid='ignore'):
+            self.allocation = np.where(percent > 0, percent, 0.0)
+
+        self.world = None
+        subdir = '2020' if len(self.regimes) == 8 else '2018'
+        for (t, tmr) in enumerate(self.regimes):
+            df = source_cache.read_csv(LAND_CSV_PATH.joinpath('world', subdir,
+                    _to_filename(tmr) + '.csv'), index_col=0)
+            if self.world is None:
+                self.regions = df.index
+                self.world = np.empty((len(self.regimes), len(df.index), len(dd.AEZS)))
+            self.world[t] = df.reindex(index=self.regions, columns=dd.AEZS).values
+        self.land = self.allocation[:, :, np.newaxis, :] * self.world / 10000
+        for array in (self.allocation, self.world, self.land):
+            array.flags.writeable = False
+
+        self.applicable = source_cache.read_csv(
+                LAND_CSV_PATH.joinpath('aez', 'solution_aez_matrix.csv'), index_col=0)
+
+
+@functools.lru_cache()
+def cohort_land(cohort, regimes):
+    """CohortLand for a cohort and a tuple of thermal moisture regimes."""
+    return CohortLand(cohort=cohort, regimes=regimes)
+
+
 class AEZ(object, metaclass=MetaclassCache):
     """AEZ Data module.
        Args:
@@ -54,7 +115,7 @@ class AEZ(object, metaclass=MetaclassCache):
 
     def _to_filename(self, name):
         """Removes special characters and separates words with single underscores"""
-        return re.sub(' +', '_', re.sub('[^a-zA-Z0-9' '\n]', ' ', name)).strip('_')
+        return _to_filename(name)
 
 
     def _populate_solution_land_allocation(self):
@@ -62,25 +123,15 @@ class AEZ(object, metaclass=MetaclassCache):
 
            'AEZ Data'!A63:AD70
         """
-        df = pd.DataFrame(np.nan, columns=dd.AEZS, index=self.regimes)
+        self._cohort_land = cohort_land(self.cohort, tuple(self.regimes))
         if self.ignore_allocation:
-            self.soln_land_alloc_df = df.fillna(1)
-            return
-        else:
-            df = df.fillna(0)
-
-        for tmr in self.regimes:
-            tmr_path = LAND_CSV_PATH.joinpath(f'allocation{self.cohort}', self._to_filename(tmr))
-            for col in df:
-                if col.startswith('AEZ29'):  # this zone is not included in land allocation
-                    continue
-                aez_path = tmr_path.joinpath(self._to_filename(col) + '.csv')
-                la_df = pd.read_csv(aez_path, index_col=0)
-                total_perc_allocated = la_df.loc[self.solution_name]['Total % allocated']
-                if total_perc_allocated > 0:
-                    df.at[tmr, col] = total_perc_allocated
+            self.soln_land_alloc_df = pd.DataFrame(1.0, columns=dd.AEZS, index=self.regimes)
+            self._soln_land = self._cohort_land.world / 10000
         else:
-            self.soln_land_alloc_df = df
+            s = self._cohort_land.solutions.get_loc(self.solution_name)
+            self.soln_land_alloc_df = pd.DataFrame(self._cohort_land.allocation[s],
+                    columns=dd.AEZS, index=self.regimes)
+            self._soln_land = self._cohort_land.land[s]
 
 
     def _get_applicable_zones(self):
@@ -90,8 +141,7 @@ class AEZ(object, metaclass=MetaclassCache):
            applicable_zones will be redundant in solutions which use DD allocation.
            'AEZ Data'!A2:AD29
         """
-        row = pd.read_csv(LAND_CSV_PATH.joinpath('aez', 'solution_aez_matrix.csv'),
-                index_col=0).loc[self.solution_name]
+        row = self._cohort_land.applicable.loc[self.solution_name]
         self.applicable_zones = row[row].index.tolist()
 
 
@@ -102,13 +152,9 @@ class AEZ(object, metaclass=MetaclassCache):
            'AEZ Data'!D353:AG610
         """
         self.world_land_alloc_dict = {}
-        subdir = '2020' if len(self.regimes) == 8 else '2018'
-        for tmr in self.regimes:
-            df = pd.read_csv(LAND_CSV_PATH.joinpath('world', subdir,
-                    self._to_filename(tmr) + '.csv'), index_col=0).drop('Total Area (km2)', 1)
-            # apply fixed world fraction to each region
-            self.world_land_alloc_dict[tmr] = df.mul(self.soln_land_alloc_df.loc[tmr],
-                    axis=1) / 10000
+        for (t, tmr) in enumerate(self.regimes):
+            self.world_land_alloc_dict[tmr] = pd.DataFrame(self._soln_land[t],
+                    index=self._cohort_land.regions, columns=dd.AEZS)
 
 
     def _populate_solution_land_distribution(self):
@@ -118,15 +164,11 @@ class AEZ(object, metaclass=MetaclassCache):
            'AEZ Data'!A53:H64 in Cohort 2019
            'AEZ Data'!A53:J64 in the 3/2020 update which split Temperate from Boreal to make 8 TMRs
         """
-        cols = self.regimes
-        soln_df = pd.DataFrame(columns=cols, index=self.regions).fillna(0.)
-        for reg in self.regions:
-            for tmr, df in self.world_land_alloc_dict.items():
-                if reg == 'Global':
-                    soln_df.at[reg, tmr] = soln_df.loc[dd.MAIN_REGIONS, tmr].sum()
-                else:
-                    soln_df.at[reg, tmr] = df.loc[reg, self.applicable_zones].sum()
-
+        applicable = np.isin(dd.AEZS, self.applicable_zones).astype(np.float64)
+        land = self._soln_land @ applicable
+        soln_df = pd.DataFrame(land.T, index=self._cohort_land.regions,
+                columns=self.regimes).reindex(self.regions)
+        soln_df.loc['Global'] = soln_df.loc[dd.MAIN_REGIONS].sum()
         soln_df['All'] = soln_df.sum(axis=1)
         soln_df.name = 'land_distribution'
         soln_df.index.name = 'Region'
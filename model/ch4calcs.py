@@ -3,9 +3,10 @@
 Computes reductions in CO2-equivalent emissions.
 """
 
-from functools import lru_cache
 import numpy as np
 import pandas as pd
+from model.deferred import Deferred
+from model.incremental import cached
 
 
 class CH4Calcs:
@@ -17,6 +18,10 @@ class CH4Calcs:
              (not used for RRS).
       """
 
+    # table arguments, which may be passed as callables computing the table on first use.
+    soln_net_annual_funits_adopted = Deferred()
+    soln_pds_direct_ch4_co2_emissions_saved = Deferred()
+
     def __init__(self, ac, soln_net_annual_funits_adopted,
                  soln_pds_direct_ch4_co2_emissions_saved=None):
         self.ac = ac
@@ -24,7 +29,7 @@ class CH4Calcs:
         self.soln_pds_direct_ch4_co2_emissions_saved = soln_pds_direct_ch4_co2_emissions_saved
 
 
-    @lru_cache()
+    @cached
     def ch4_tons_reduced(self):
         """CH4 reduced, in tons.
            replace gas_ch4_step = `gas_tons_ch4' * `e'^(-(time_from_present - `n')/12)
@@ -40,7 +45,7 @@ class CH4Calcs:
         return result
 
 
-    @lru_cache()
+    @cached
     def avoided_direct_emissions_ch4_land(self):
         """CH4 emissions avoided, in tons
            replace gas_ch4_step = `gas_tons_ch4' * `e'^(-(time_from_present - `n')/12)
@@ -53,7 +58,7 @@ class CH4Calcs:
         return result
 
 
-    @lru_cache()
+    @cached
     def ch4_ppb_calculator(self):
         """Parts Per Billion reduction calculator for CH4.
 
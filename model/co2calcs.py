@@ -3,15 +3,16 @@
 Computes reductions in CO2-equivalent emissions.
 """
 
-from functools import lru_cache
+import functools
 import math
 
-import fair
 import numpy as np
 import pandas as pd
 import model.advanced_controls
 import model.dd
 import model.fairutil
+from model.deferred import Deferred
+from model.incremental import cached
 
 
 C_TO_CO2EQ = 3.666
@@ -40,6 +41,26 @@ class CO2Calcs:
           regime_distribution: (land/ocean distribution from aez/dez data)
       """
 
+    # table arguments, which may be passed as callables computing the table on first use.
+    soln_net_annual_funits_adopted = Deferred()
+    ch4_ppb_calculator = Deferred()
+    soln_pds_net_grid_electricity_units_saved = Deferred()
+    soln_pds_net_grid_electricity_units_used = Deferred()
+    soln_pds_direct_co2eq_emissions_saved = Deferred()
+    soln_pds_direct_co2_emissions_saved = Deferred()
+    soln_pds_direct_ch4_co2_emissions_saved = Deferred()
+    soln_pds_direct_n2o_co2_emissions_saved = Deferred()
+    soln_pds_new_iunits_reqd = Deferred()
+    soln_ref_new_iunits_reqd = Deferred()
+    conv_ref_new_iunits = Deferred()
+    conv_ref_grid_CO2_per_KWh = Deferred()
+    conv_ref_grid_CO2eq_per_KWh = Deferred()
+    annual_land_area_harvested = Deferred()
+    regime_distribution = Deferred()
+    tot_red_in_deg_land = Deferred()
+    pds_protected_deg_land = Deferred()
+    ref_protected_deg_land = Deferred()
+
     def __init__(self, ac, soln_net_annual_funits_adopted=None, ch4_ppb_calculator=None,
                  soln_pds_net_grid_electricity_units_saved=None,
                  soln_pds_net_grid_electricity_units_used=None,
@@ -90,7 +111,7 @@ class CO2Calcs:
         self.baseline = model.fairutil.baseline_emissions()
 
 
-    @lru_cache()
+    @cached
     def co2_mmt_reduced(self):
         """CO2 MMT Reduced
            Annual CO2 reductions by region and year are calculated by adding reduced emissions
@@ -123,7 +144,7 @@ class CO2Calcs:
         m.name = "co2_mmt_reduced"
         return m
 
-    @lru_cache()
+    @cached
     def co2eq_mmt_reduced(self):
         """CO2-eq MMT Reduced
            Annual CO2-eq reductions by region are calculated by multiplying the estimated energy
@@ -180,7 +201,7 @@ class CO2Calcs:
         return m
 
 
-    @lru_cache()
+    @cached
     def co2_sequestered_global(self):
         """
         Total Carbon Sequestration (World section only)
@@ -251,7 +272,37 @@ class CO2Calcs:
         return df
 
 
-    @lru_cache()
+    @cached
+    def co2_ppm_emissions(self):
+        """World CO2 (or CO2-eq) MMT reduced each year, as fed into co2_ppm_calculator.
+
+           Years before report_start_year are zeroed for RRS solutions, as the RRS Excel
+           models skip them. Collecting this series from many solutions allows their PPM
+           tables to be computed in a single co2_ppm_calculators() call.
+        """
+        if self.ac.emissions_use_co2eq:
+            co2_vals = self.co2eq_mmt_reduced()['World']
+        else:
+            co2_vals = self.co2_mmt_reduced()['World']
+
+        if (self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.LAND or
+                self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.OCEAN):
+            co2_vals = self.co2_sequestered_global()['All'] + self.co2eq_mmt_reduced()['World']
+            assert self.ac.emissions_use_co2eq, 'Land/ocean models must use CO2 eq'
+
+        co2_vals = co2_vals.copy()
+        co2_vals.index = co2_vals.index.astype(int)
+        if self.ac.solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND:
+            # On RRS xls models this skips the calc but on LAND the calc is done anyway
+            # Note that this affects the values for all years and should probably NOT be
+            # skipped (i.e. LAND is the correct implementation)
+            # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
+            co2_vals.loc[co2_vals.index < self.ac.report_start_year] = 0.0
+        co2_vals.name = 'co2_ppm_emissions'
+        return co2_vals
+
+
+    @cached
     def co2_ppm_calculator(self):
         """CO2 parts per million reduction over time calculator.
 
@@ -267,49 +318,14 @@ class CO2Calcs:
            SolarPVUtil 'CO2 Calcs'!A119:AW165 (RRS)
            Conservation Agriculture 'CO2 Calcs'!A172:AW218 (Land)
         """
-
-        if self.ac.emissions_use_co2eq:
-            co2_vals = self.co2eq_mmt_reduced()['World']
-        else:
-            co2_vals = self.co2_mmt_reduced()['World']
-
-        if (self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.LAND or
-                self.ac.solution_category == model.advanced_controls.SOLUTION_CATEGORY.OCEAN):
-            co2_vals = self.co2_sequestered_global()['All'] + self.co2eq_mmt_reduced()['World']
-            assert self.ac.emissions_use_co2eq, 'Land/ocean models must use CO2 eq'
-
-        columns = ['PPM', 'Total'] + list(range(2015, 2061))
-        ppm_calculator = pd.DataFrame(0, columns=columns, index=co2_vals.index.copy(),
-                                      dtype=np.float64)
-        ppm_calculator.index = ppm_calculator.index.astype(int)
-        ppm_calculator.index.name = 'Year'
-        first_year = ppm_calculator.first_valid_index()
-        last_year = ppm_calculator.last_valid_index()
-        for year in ppm_calculator.index:
-            if (year < self.ac.report_start_year and
-                    self.ac.solution_category != model.advanced_controls.SOLUTION_CATEGORY.LAND):
-                # On RRS xls models this skips the calc but on LAND the calc is done anyway
-                # Note that this affects the values for all years and should probably NOT be
-                # skipped (i.e. LAND is the correct implementation)
-                # see: https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-                continue
-            b = co2_vals[year]
-            for delta in range(1, last_year - first_year + 2):
-                if (year + delta - 1) > last_year:
-                    break
-                val = 0.217
-                val += 0.259 * math.exp(-delta / 172.9)
-                val += 0.338 * math.exp(-delta / 18.51)
-                val += 0.186 * math.exp(-delta / 1.186)
-                ppm_calculator.loc[year + delta - 1, year] = b * val
-        ppm_calculator.loc[:, 'Total'] = ppm_calculator.sum(axis=1)
-        for year in ppm_calculator.index:
-            ppm_calculator.at[year, 'PPM'] = ppm_calculator.at[year, 'Total'] / (44.01 * 1.8 * 100)
+        co2_vals = self.co2_ppm_emissions()
+        emissions = pd.DataFrame([co2_vals.values], index=['World'], columns=co2_vals.index)
+        ppm_calculator = co2_ppm_calculators(emissions)['World']
         ppm_calculator.name = 'co2_ppm_calculator'
         return ppm_calculator
 
 
-    @lru_cache()
+    @cached
     def co2eq_ppm_calculator(self):
         """PPM calculations for CO2, CH4, and CO2-eq from other sources.
            RRS: SolarPVUtil 'CO2 Calcs'!A171:F217
@@ -329,7 +345,7 @@ class CO2Calcs:
         return ppm_calculator
 
 
-    @lru_cache()
+    @cached
     def co2_reduced_grid_emissions(self):
         """Reduced Grid Emissions = NE(t) * EF(e,t)
 
@@ -341,7 +357,7 @@ class CO2Calcs:
         return self.soln_pds_net_grid_electricity_units_saved * self.conv_ref_grid_CO2_per_KWh
 
 
-    @lru_cache()
+    @cached
     def co2_replaced_grid_emissions(self):
         """CO2 Replaced Grid Emissions = NAFU(Sol,t) * EF(e,t)  (i.e. only direct emissions)
            where
@@ -355,7 +371,7 @@ class CO2Calcs:
             return self.soln_net_annual_funits_adopted * 0
 
 
-    @lru_cache()
+    @cached
     def co2_increased_grid_usage_emissions(self):
         """Increased Grid Emissions (MMT CO2e) = NEU(t) * EF(e,t)
 
@@ -367,7 +383,7 @@ class CO2Calcs:
         return self.soln_pds_net_grid_electricity_units_used * self.conv_ref_grid_CO2_per_KWh
 
 
-    @lru_cache()
+    @cached
     def co2eq_reduced_grid_emissions(self):
         """Reduced Grid MMT CO2-eq Emissions = NEU(t) * EF(e,t)
 
@@ -383,7 +399,7 @@ class CO2Calcs:
         return self.soln_pds_net_grid_electricity_units_saved * self.conv_ref_grid_CO2eq_per_KWh
 
 
-    @lru_cache()
+    @cached
     def co2eq_replaced_grid_emissions(self):
         """CO2-equivalent replaced Grid MMT CO2-eq Emissions = NAFU(Sol,t) * EF(e,t)
 
@@ -399,7 +415,7 @@ class CO2Calcs:
             return self.soln_net_annual_funits_adopted * 0
 
 
-    @lru_cache()
+    @cached
     def co2eq_increased_grid_usage_emissions(self):
         """Increased Grid Emissions (MMT CO2e) = NEU(t) * EF(e,t)
 
@@ -415,7 +431,7 @@ class CO2Calcs:
         return self.soln_pds_net_grid_electricity_units_used * self.conv_ref_grid_CO2eq_per_KWh
 
 
-    @lru_cache()
+    @cached
     def co2eq_direct_reduced_emissions(self):
         """Direct MMT CO2-eq Emissions Reduced = [DEm(Con,t) - DEm(Sol,t)]  / 1000000
 
@@ -431,7 +447,7 @@ class CO2Calcs:
                 self.soln_pds_direct_n2o_co2_emissions_saved / 1000000)
 
 
-    @lru_cache()
+    @cached
     def co2eq_reduced_fuel_emissions(self):
         """Reduced Fuel Emissions MMT CO2-eq =
             NAFU(Con,t) * Fuel(Con,t) * [Em(cf) -  (1 - FRF) * Em(sf) * if(Fuel Units are Same,
@@ -457,7 +473,7 @@ class CO2Calcs:
         return result
 
 
-    @lru_cache()
+    @cached
     def co2eq_net_indirect_emissions(self):
         """Net Indirect Emissions MMT CO2-eq by implementation unit (t) =
               [NIU (Sol,t) * IEm (Sol,t)] - [NIU (Cont.) * IEm (Con,t)]  /  1000000
@@ -479,7 +495,7 @@ class CO2Calcs:
         return result
 
 
-    @lru_cache()
+    @cached
     def direct_emissions_from_harvesting(self):
         """Net Land Units [Mha]* (Carbon Sequestration Rate [t C/ha/yr] *
            Years of Sequestration [yr] - Carbon Stored even After Harvesting/Clearing [t C/ha]) *
@@ -490,7 +506,7 @@ class CO2Calcs:
                 self.ac.carbon_not_emitted_after_harvesting) * C_TO_CO2EQ
 
 
-    @lru_cache()
+    @cached
     def FaIR_CFT_baseline(self):
         """Return FaIR results for the baseline case.
 
@@ -502,14 +518,12 @@ class CO2Calcs:
              F: Radiative forcing in watts per square meter
              T: Change in temperature since pre-industrial time in Kelvin
         """
-        kwargs = model.fairutil.fair_scm_kwargs()
-        (C, F, T) = fair.forward.fair_scm(emissions=self.baseline.values, useMultigas=False, **kwargs)
-        result = pd.DataFrame({'C': C, 'F': F, 'T': T}, index=self.baseline.index)
+        result = model.fairutil.fair_scm(self.baseline)
         result.name = 'FaIR_CFT_baseline'
         return result
 
 
-    @lru_cache()
+    @cached
     def FaIR_CFT(self):
         """Return FaIR results for the baseline + Drawdown solution.
 
@@ -521,7 +535,14 @@ class CO2Calcs:
              F: Radiative forcing in watts per square meter
              T: Change in temperature since pre-industrial time in Kelvin
         """
-        emissions = self.baseline.copy()
+        result = model.fairutil.fair_scm(self._fair_emissions(self.baseline))
+        result.name = 'FaIR_CFT'
+        return result
+
+
+    def _fair_emissions(self, baseline):
+        """Emissions of baseline, in GtC per year, less those reduced by the solution."""
+        emissions = baseline.copy()
         co2eq_mmt_reduced = self.co2eq_mmt_reduced()
         if co2eq_mmt_reduced is not None:
             gtonsC = (co2eq_mmt_reduced['World'] / 1000.0) / C_TO_CO2EQ
@@ -530,15 +551,36 @@ class CO2Calcs:
         if co2_sequestered_global is not None:
             gtonsC = (co2_sequestered_global['All'] / 1000.0) / C_TO_CO2EQ
             emissions = emissions.subtract(other=gtonsC, fill_value=0.0)
+        return emissions
 
-        kwargs = model.fairutil.fair_scm_kwargs()
-        (C, F, T) = fair.forward.fair_scm(emissions=emissions.values, useMultigas=False, **kwargs)
-        result = pd.DataFrame({'C': C , 'F': F, 'T': T}, index=emissions.index)
-        result.name = 'FaIR_CFT'
-        return result
+
+    def FaIR_CFT_for_gwps(self, gwps, workers=None):
+        """FaIR_CFT for the baseline weighed by each of a list of GWP sets, see
+           model.fairutil.baseline_emissions_for_gwps(). Returns a dict of GWP set to its
+           DataFrame of C, F and T. The FaIR runs are spread over workers processes.
+        """
+        baselines = model.fairutil.baseline_emissions_for_gwps(gwps)
+        trajectories = {name: self._fair_emissions(baselines[name])
+                        for name in baselines.columns}
+        return model.fairutil.fair_scm_batch(trajectories, workers=workers)
+
+
+    def FaIR_CFT_ensemble(self, parameters=None, percentiles=(5, 50, 95), workers=None):
+        """Percentile bands of FaIR_CFT over an ensemble of climate sensitivity parameters.
+
+           parameters is a list of dicts of FaIR parameters, like those of
+           model.fairutil.parameter_grid(), default 100 draws of
+           model.fairutil.parameter_samples(). Returns a DataFrame with columns like
+           ('T', 95), see model.fairutil.fair_scm_ensemble(). The FaIR runs are spread
+           over workers processes.
+        """
+        if parameters is None:
+            parameters = model.fairutil.parameter_samples(n=100, seed=0)
+        return model.fairutil.fair_scm_ensemble(self._fair_emissions(self.baseline),
+                parameters=parameters, percentiles=percentiles, workers=workers)
 
 
-    @lru_cache()
+    @cached
     def FaIR_CFT_RCP45(self):
         """Return FaIR results for the RCP45 case.
 
@@ -550,15 +592,62 @@ class CO2Calcs:
              F: Radiative forcing in watts per square meter
              T: Change in temperature since pre-industrial time in Kelvin
         """
-        kwargs = model.fairutil.fair_scm_kwargs()
-        (C, F, T) = fair.forward.fair_scm(emissions=fair.RCPs.rcp45.Emissions.emissions[:, 0],
-                useMultigas=False, **kwargs)
-        result = pd.DataFrame({'C': C, 'F': F, 'T': T}, index=fair.RCPs.rcp45.Emissions.year)
+        result = model.fairutil.fair_scm(model.fairutil.rcp45_co2_emissions())
         result.name = 'FaIR_CFT_RCP45'
         return result
 
 
 
+@functools.lru_cache()
+def co2_decay_kernel(num_years):
+    """Fraction of a pulse of CO2 remaining in the atmosphere 1..num_years after emission.
+
+       Simplified atmospheric lifetime function for CO2 from Myhrvald and Caldeira (2012),
+       based on the Bern Carbon Cycle model. The kernel only depends on its length so it is
+       computed once and shared (read-only) by all solutions.
+    """
+    kernel = np.array([0.217 + 0.259 * math.exp(-delta / 172.9) +
+                       0.338 * math.exp(-delta / 18.51) + 0.186 * math.exp(-delta / 1.186)
+                       for delta in range(1, num_years + 1)], dtype=np.float64)
+    kernel.flags.writeable = False
+    return kernel
+
+
+def co2_ppm_calculators(emissions):
+    """Batched CO2 parts per million calculator, see CO2Calcs.co2_ppm_calculator.
+
+       Arguments:
+         emissions: DataFrame of CO2(-eq) MMT reduced with one row per series (for example
+           one per solution) and one column per consecutive year. Years which should not
+           contribute a pulse are expected to already be zero.
+
+       Every series is convolved with the shared decay kernel in a single broadcast
+       operation. Returns a dict of {row label: ppm calculator DataFrame} with columns
+       'PPM', 'Total' and 2015..2060 (one column per emission year) and the years of
+       emissions as the index.
+    """
+    years = emissions.columns.astype(int)
+    deltas = years.values.reshape(-1, 1) - years.values.reshape(1, -1) + 1
+    kernel = co2_decay_kernel(len(years))
+    decay = np.where(deltas >= 1, kernel[np.clip(deltas, 1, None) - 1], 0.0)
+    pulses = emissions.values.astype(np.float64)
+    vals = np.where(deltas >= 1, pulses[:, np.newaxis, :] * decay[np.newaxis, :, :], 0.0)
+
+    col_years = list(range(2015, 2061))
+    col_idx = years.get_indexer(col_years)
+    index = pd.Index(years, name='Year')
+    results = {}
+    for (label, series_vals) in zip(emissions.index, vals):
+        table = np.where(col_idx >= 0, series_vals[:, col_idx], 0.0)
+        table = np.concatenate([np.zeros((len(years), 2)), table], axis=1)
+        ppm_calculator = pd.DataFrame(table, columns=['PPM', 'Total'] + col_years,
+                                      index=index.copy(), dtype=np.float64)
+        ppm_calculator.loc[:, 'Total'] = ppm_calculator.sum(axis=1)
+        ppm_calculator.loc[:, 'PPM'] = ppm_calculator['Total'] / (44.01 * 1.8 * 100)
+        results[label] = ppm_calculator
+    return results
+
+
 # The following formulae come from the SolarPVUtil Excel implementation of 27Aug18.
 # There was no explanation of where they came from or what they really mean.
 
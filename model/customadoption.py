@@ -1,7 +1,7 @@
 """ Custom PDS/REF Adoption module """
 
-from functools import lru_cache
-from model.metaclass_cache import MetaclassCache
+from model.metaclass_cache import MetaclassCache, cached
+from model import source_cache
 import model.dd as dd
 import pandas as pd
 import numpy as np
@@ -95,8 +95,8 @@ class CustomAdoption(object, metaclass=MetaclassCache):
 
     def _read_csv(self, filename):
         """Read in a CSV file from filename."""
-        df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
-                         skip_blank_lines=True, comment='#', dtype=np.float64)
+        df = source_cache.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
+                                   skip_blank_lines=True, comment='#', dtype=np.float64).copy()
         df.index = df.index.astype(int)
         df.index.name = 'Year'
         assert list(df.columns) == dd.REGIONS, f"unknown columns: {list(df.columns)}"
@@ -235,7 +235,7 @@ class CustomAdoption(object, metaclass=MetaclassCache):
             low_df.loc[idx:, :] = low_df.loc[idx:, :].combine(self.total_adoption_limit, np.minimum)
         return avg_df, high_df, low_df
 
-    @lru_cache()
+    @cached
     def adoption_data_per_region(self):
         """ Return a dataframe of adoption data, one column per region. """
         if self.soln_adoption_custom_name.startswith('Average of All Custom'):
@@ -255,7 +255,7 @@ class CustomAdoption(object, metaclass=MetaclassCache):
         result.name = 'adoption_data_per_region'
         return result
 
-    @lru_cache()
+    @cached
     def adoption_trend_per_region(self):
         """
         Return a dataframe of adoption trends, one column per region.
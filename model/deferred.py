@@ -0,0 +1,39 @@
+"""Table arguments computed on first use.
+
+Solutions wire their modules together by passing the tables computed by one module to the
+constructor of the next, for example UnitAdoption.soln_pds_tot_iunits_reqd() to FirstCost.
+Passing the bound method instead of its result defers computing the table until the
+receiving module first uses it. A Scenario wired this way forms a dependency graph of its
+modules, and only computes the tables reachable from the results which are requested.
+"""
+
+import pandas as pd
+
+
+class Deferred:
+    """Attribute holding a table, or a callable which computes the table on first access.
+
+       Callables cached by model.incremental are called on every access instead, so that
+       the table recomputed after an update_ac() is seen.
+
+       Declared in the body of a module class for each table argument:
+           soln_pds_tot_iunits_reqd = Deferred()
+    """
+
+    def __set_name__(self, owner, name):
+        self.name = name
+
+    def __get__(self, obj, objtype=None):
+        if obj is None:
+            return self
+        value = obj.__dict__[self.name]
+        if callable(value) and not isinstance(value, (pd.DataFrame, pd.Series)):
+            if getattr(value, 'incremental', False):
+                # cached by model.incremental, which may discard and recompute the table.
+                return value()
+            value = value()
+            obj.__dict__[self.name] = value
+        return value
+
+    def __set__(self, obj, value):
+        obj.__dict__[self.name] = value
@@ -4,9 +4,9 @@ Conversions and lookups useful in converting to CO2 equivalents,
 and other factors relating to emissions and pollutants.
 """
 
-from functools import lru_cache
 import enum
 import pandas as pd
+from model.incremental import cached
 
 CO2EQ_SOURCE = enum.Enum('CO2EQ_SOURCE', 'AR5_WITH_FEEDBACK AR4 SAR')
 GRID_SOURCE = enum.Enum('GRID_SOURCE', 'META IPCC')
@@ -95,7 +95,7 @@ class ElectricityGenOnGrid:
         self.ac = ac
         self.grid_emissions_version = grid_emissions_version
 
-    @lru_cache()
+    @cached
     def conv_ref_grid_CO2eq_per_KWh(self):
         """Grid emission factors (kg CO2-eq per kwh) derived from the AMPERE 3
            MESSAGE Base model. Grid emission factors are fixed at 2015 levels
@@ -139,7 +139,7 @@ class ElectricityGenOnGrid:
         return result
 
 
-    @lru_cache()
+    @cached
     def conv_ref_grid_CO2_per_KWh(self):
         """Generation mixes from the AMPERE/MESSAGE WG3 BAU scenario, direct emission
            factors by fuel from the IPCC WG3 Annex III Table A.III.2.
@@ -0,0 +1,336 @@
+"""Evaluate a solution for many draws of its uncertain parameters at once.
+
+Exploring the uncertainty of a solution by constructing a Scenario per draw of its
+parameters repeats the whole model for every draw. An Ensemble instead carries the First
+Cost and Operating Cost calculations along an extra sample axis, computing the install
+costs, operating cost breakouts, net cash flow and NPV of every draw as one array.
+
+The adoption, implementation unit and emissions tables do not depend on the costs, so
+they are computed once for all draws, or once per distinct value of the fields they do
+depend on:
+  - the lifetimes change the replacement units of UnitAdoption only once rounded to whole
+    years, so draws are grouped by their rounded lifetimes while the operating cost
+    breakouts use each draw's own lifetime.
+  - any other field drawn is applied with model.incremental.update_ac(), once for each
+    distinct combination of values drawn.
+
+    samples = model.ensemble.draws(obj, n=5000, parameters=['pds_2014_cost',
+            'soln_lifetime_capacity', 'conv_fuel_cost_per_funit', 'npv_discount_rate'],
+            ranges={'npv_discount_rate': (0.02, 0.04, 0.06)}, seed=1)
+    results = model.ensemble.Ensemble(obj, samples).results()
+    results.quantile([0.05, 0.5, 0.95])
+"""
+
+import dataclasses
+import types
+
+import numpy as np
+import pandas as pd
+
+import model.dd
+import model.incremental
+import model.operatingcost
+from model import advanced_controls
+from model.firstcost import install_cost_per_iunit, never_increasing
+
+
+# fields of the AdvancedControls carried along the sample axis.
+COST_FIELDS = ['pds_2014_cost', 'ref_2014_cost', 'conv_2014_cost',
+        'soln_first_cost_efficiency_rate', 'conv_first_cost_efficiency_rate',
+        'soln_fixed_oper_cost_per_iunit', 'conv_fixed_oper_cost_per_iunit',
+        'soln_var_oper_cost_per_funit', 'conv_var_oper_cost_per_funit',
+        'soln_fuel_cost_per_funit', 'conv_fuel_cost_per_funit', 'npv_discount_rate']
+
+# fields setting the lifetimes, which UnitAdoption only uses rounded to whole years.
+LIFETIME_FIELDS = ['soln_lifetime_capacity', 'soln_expected_lifetime',
+        'conv_lifetime_capacity', 'conv_expected_lifetime']
+
+# samples per block of the operating cost breakouts, bounding the memory of each block.
+BLOCK_SIZE = 256
+
+
+def _vma(obj, parameter):
+    """The VMA which AdvancedControls takes the mean, high or low of for parameter."""
+    vmas = obj.ac.vmas or {}
+    for title in advanced_controls.get_vma_for_param(parameter):
+        v = vmas.get(title, None)
+        if v and not pd.isna(v.avg_high_low(key='mean')):
+            return v
+    return None
+
+
+def draws(obj, n, parameters, ranges=None, distribution='triangular', seed=None):
+    """DataFrame of n draws of parameters for Scenario obj, one row per draw.
+
+       Arguments:
+         obj: constructed Scenario of a solution.
+         n: number of draws.
+         parameters: list of names of AdvancedControls fields to draw.
+         ranges: dict of parameter name to (low, mean, high), for parameters without a VMA
+           such as learning rates and the discount rate, or to override their VMA. Other
+           parameters are drawn using the mean, high and low of their VMA.
+         distribution: 'triangular' between low and high peaking at the mean, 'normal'
+           with the mean and the standard deviation implied by high and low, or 'choice'
+           of low, mean or high with equal probability.
+         seed: seed of the numpy random Generator, for repeatable draws.
+    """
+    if distribution not in ('triangular', 'normal', 'choice'):
+        raise ValueError(f"Unknown distribution {distribution!r}")
+    rng = np.random.default_rng(seed)
+    ranges = ranges or {}
+    columns = {}
+    for parameter in parameters:
+        if parameter in ranges:
+            (low, mean, high) = ranges[parameter]
+            (low_sd, high_sd) = (1.0, 1.0)
+        else:
+            v = _vma(obj, parameter)
+            if v is None:
+                raise ValueError(f"{parameter} has no VMA with data, pass its "
+                                 f"(low, mean, high) in ranges")
+            (mean, high, low) = v.avg_high_low()
+            (low_sd, high_sd) = (v.low_sd, v.high_sd)
+        if distribution == 'triangular':
+            values = (rng.triangular(low, mean, high, size=n) if high > low else
+                    np.full(n, mean, dtype=np.float64))
+        elif distribution == 'normal':
+            sd = (high - low) / (low_sd + high_sd) if low_sd + high_sd else 0.0
+            values = rng.normal(mean, sd, size=n)
+        else:
+            values = rng.choice(np.array([low, mean, high], dtype=np.float64), size=n)
+        columns[parameter] = values
+    return pd.DataFrame(columns, index=pd.RangeIndex(n, name='Sample'))
+
+
+def _align(values, index, new_index):
+    """Columns of the (samples x index) array values for each year of new_index, NaN for
+       years not in index."""
+    positions = index.get_indexer(new_index)
+    result = values[:, positions]
+    result[:, positions < 0] = np.nan
+    return result
+
+
+def _union(a, b):
+    """Index of arithmetic between Series indexed by a and by b."""
+    return a if a.equals(b) else a.union(b)
+
+
+def _annual_breakout_total(oc, new_funits_per_year, new_annual_iunits_reqd,
+                           lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit,
+                           fixed_oper_cost_per_iunit):
+    """OperatingCost._annual_breakout(sum_only=True) for each sample, as an array of
+       (samples x years CORE_START_YEAR..2139), computed BLOCK_SIZE samples at a time. The
+       costs and lifetime_replacement are arrays with one value per sample."""
+    num_samples = len(lifetime_replacement)
+    result = np.zeros((num_samples, 2139 + 1 - model.dd.CORE_START_YEAR), dtype=np.float64)
+    for start in range(0, num_samples, BLOCK_SIZE):
+        block = slice(start, start + BLOCK_SIZE)
+        result[block] = model.operatingcost.annual_breakout(new_funits_per_year,
+                new_annual_iunits_reqd, lifetime_replacement=lifetime_replacement[block],
+                var_oper_cost_per_funit=var_oper_cost_per_funit[block],
+                fuel_cost_per_funit=fuel_cost_per_funit[block],
+                fixed_oper_cost_per_iunit=fixed_oper_cost_per_iunit[block],
+                has_var_costs=oc.ac.has_var_costs, last_year=oc.ac.report_end_year,
+                conversion_factor_vom=oc.conversion_factor_vom,
+                conversion_factor_fom=oc.conversion_factor_fom).sum(axis=2)
+    return result
+
+
+class Ensemble:
+    """Scenario obj evaluated for each row of samples.
+
+       Arguments:
+         obj: constructed Scenario of a solution, supplying the adoption and every field
+           of the AdvancedControls which is not drawn. Fields other than COST_FIELDS and
+           LIFETIME_FIELDS are applied to obj with model.incremental.update_ac() while the
+           ensemble is computed, and reverted afterwards.
+         samples: DataFrame with one row per draw and one column per AdvancedControls
+           field drawn, as returned by draws().
+    """
+
+    def __init__(self, obj, samples):
+        self.obj = obj
+        self.samples = samples
+        self._computed = None
+
+    def _groups(self):
+        """List of (changes, positions, lifetime) for the samples which share the
+           AdvancedControls they are evaluated with: changes are the fields to apply to
+           obj, positions the rows of samples and lifetime their soln_lifetime_replacement,
+           None if it is not drawn."""
+        grouped = [c for c in self.samples.columns if c not in COST_FIELDS]
+        lifetimes = [c for c in grouped if c in LIFETIME_FIELDS]
+        rounded = []
+        if any(c.startswith('soln_') for c in lifetimes):
+            rounded.append('soln_lifetime_replacement_rounded')
+        if any(c.startswith('conv_') for c in lifetimes):
+            rounded.append('conv_lifetime_replacement_rounded')
+
+        # the lifetime properties of the AdvancedControls, evaluated for each sample without
+        # constructing its AdvancedControls.
+        fields = {f.name: getattr(self.obj.ac, f.name)
+                  for f in dataclasses.fields(self.obj.ac)}
+        properties = {name: getattr(advanced_controls.AdvancedControls, name).fget
+                      for name in rounded + ['soln_lifetime_replacement']}
+        groups = {}
+        lifetime = np.full(len(self.samples), np.nan)
+        for (i, row) in enumerate(self.samples[grouped].to_numpy(dtype=object)):
+            changes = dict(zip(grouped, row))
+            key = tuple(v for (c, v) in changes.items() if c not in LIFETIME_FIELDS)
+            if lifetimes:
+                ac = types.SimpleNamespace(**dict(fields, **changes))
+                key += tuple(properties[name](ac) for name in rounded)
+                lifetime[i] = properties['soln_lifetime_replacement'](ac)
+            groups.setdefault(key, (changes, []))[1].append(i)
+        return [(changes, np.array(positions), lifetime[positions] if lifetimes else None)
+                for (changes, positions) in groups.values()]
+
+    def _evaluate(self, obj, positions, lifetime):
+        """(net cash flow, NPV, emissions reduced) of samples[positions] evaluated with
+           Scenario obj, the first two as DataFrames of (samples x years)."""
+        ac = obj.ac
+        fc = obj.fc
+        oc = obj.oc
+        samples = self.samples.iloc[positions]
+
+        def values(name):
+            if name in samples.columns:
+                return samples[name].to_numpy(dtype=np.float64)
+            value = getattr(ac, name)
+            return np.full(len(samples), np.nan if value is None else value, dtype=np.float64)
+
+        if lifetime is None:
+            lifetime = np.full(len(samples), ac.soln_lifetime_replacement, dtype=np.float64)
+        main_region = model.dd.REGIONS[0]
+        factor = fc.fc_convert_iunit_factor
+
+        conv_tot = fc.conv_ref_tot_iunits.loc[:, main_region]
+        conv = never_increasing(install_cost_per_iunit(tot_iunits=conv_tot, base_year=2014,
+                cost_2014=values('conv_2014_cost'),
+                learning_rate=1.0 - values('conv_first_cost_efficiency_rate'),
+                learning_mult=fc.conv_learning_increase_mult, factor=factor,
+                flat_without_learning=True))
+        soln_learning_rate = 1.0 - values('soln_first_cost_efficiency_rate')
+        pds_tot = fc.soln_pds_tot_iunits_reqd.loc[:, main_region]
+        pds = install_cost_per_iunit(tot_iunits=pds_tot, base_year=2015,
+                cost_2014=values('pds_2014_cost'), learning_rate=soln_learning_rate,
+                learning_mult=fc.pds_learning_increase_mult, factor=factor,
+                flat_without_learning=False)
+        ref_tot = fc.soln_ref_tot_iunits_reqd.loc[:, main_region]
+        ref = install_cost_per_iunit(tot_iunits=ref_tot, base_year=2015,
+                cost_2014=values('ref_2014_cost'), learning_rate=soln_learning_rate,
+                learning_mult=fc.ref_learning_increase_mult, factor=factor,
+                flat_without_learning=True)
+        (pds_index, ref_index) = (pds_tot.index, ref_tot.index)
+        if not ac.soln_first_cost_below_conv:
+            pds_index = _union(pds_tot.index, conv_tot.index)
+            pds = np.maximum(_align(pds, pds_tot.index, pds_index),
+                             _align(conv, conv_tot.index, pds_index))
+            ref_index = _union(ref_tot.index, conv_tot.index)
+            ref = np.maximum(_align(ref, ref_tot.index, ref_index),
+                             _align(conv, conv_tot.index, ref_index))
+
+        # Annual World First Cost of each, then soln_marginal_first_cost.
+        def annual_world_first_cost(new_iunits, cost, cost_index):
+            index = _union(new_iunits.index, cost_index)
+            return (_align(new_iunits.values.astype(np.float64).reshape(1, -1),
+                           new_iunits.index, index) * _align(cost, cost_index, index), index)
+
+        if fc.conv_ref_first_cost_uses_tot_units:
+            conv_iunits = fc.conv_ref_tot_iunits.diff()[main_region]
+        else:
+            conv_iunits = fc.conv_ref_new_iunits[main_region]
+        (pds_cost, pds_index) = annual_world_first_cost(
+                fc.soln_pds_new_iunits_reqd[main_region], pds, pds_index)
+        (ref_cost, ref_index) = annual_world_first_cost(
+                fc.soln_ref_new_iunits_reqd[main_region], ref, ref_index)
+        (conv_cost, conv_index) = annual_world_first_cost(conv_iunits, conv, conv_tot.index)
+        index = _union(ref_index, conv_index)
+        first_cost = _align(ref_cost, ref_index, index) + _align(conv_cost, conv_index, index)
+        first_cost_index = _union(index, pds_index)
+        first_cost = (_align(first_cost, index, first_cost_index) -
+                      _align(pds_cost, pds_index, first_cost_index))
+
+        # every table from here on spans the years from the first with a value to 2139.
+        years = pd.RangeIndex(min(first_cost_index.min(), model.dd.CORE_START_YEAR), 2139 + 1)
+        first_cost = _align(first_cost, first_cost_index, years)
+        started = np.logical_or.accumulate(~np.isnan(first_cost), axis=1)
+        # Excel returns 0.0 for years after report_end_year
+        first_cost[started & (years.values > ac.report_end_year)] = 0.0
+
+        pds_args = oc._soln_pds_breakout_args()
+        conv_args = oc._conv_ref_breakout_args()
+        soln_total = _annual_breakout_total(oc, pds_args['new_funits_per_year'],
+                pds_args['new_annual_iunits_reqd'], lifetime,
+                values('soln_var_oper_cost_per_funit'), values('soln_fuel_cost_per_funit'),
+                values('soln_fixed_oper_cost_per_iunit'))
+        conv_total = _annual_breakout_total(oc, conv_args['new_funits_per_year'],
+                conv_args['new_annual_iunits_reqd'], lifetime,
+                values('conv_var_oper_cost_per_funit'), values('conv_fuel_cost_per_funit'),
+                values('conv_fixed_oper_cost_per_iunit'))
+        breakout_years = pd.RangeIndex(model.dd.CORE_START_YEAR, 2139 + 1)
+        savings = _align(conv_total - soln_total, breakout_years, years)
+        cash_flow = first_cost + savings
+
+        # soln_net_present_value, discounting from the first year with a cash flow.
+        valid = ~np.isnan(cash_flow)
+        first = np.where(valid.any(axis=1), valid.argmax(axis=1), len(years))
+        periods = np.arange(len(years)) - first.reshape(-1, 1) + 1
+        rate = values('npv_discount_rate').reshape(-1, 1)
+        npv = np.where(periods > 0, cash_flow / (1 + rate) ** np.maximum(periods, 0), np.nan)
+
+        reduced = obj.c2.co2eq_mmt_reduced().loc[ac.report_start_year:ac.report_end_year,
+                                                 'World'].sum()
+        return (pd.DataFrame(cash_flow, index=samples.index, columns=years),
+                pd.DataFrame(npv, index=samples.index, columns=years),
+                pd.Series(reduced, index=samples.index))
+
+    def _compute(self):
+        if self._computed is not None:
+            return self._computed
+        original = self.obj.ac
+        changed = set()
+        parts = []
+        try:
+            for (changes, positions, lifetime) in self._groups():
+                obj = self.obj
+                if changes:
+                    obj = model.incremental.update_ac(self.obj, **changes)
+                    changed.update(changes)
+                parts.append(self._evaluate(obj, positions, lifetime))
+        finally:
+            if self.obj.ac is not original:
+                model.incremental.update_ac(self.obj,
+                        **{name: getattr(original, name) for name in changed})
+        (cash_flow, npv, reduced) = [pd.concat(p).reindex(self.samples.index)
+                                     for p in zip(*parts)]
+        self._computed = (cash_flow, npv, reduced)
+        return self._computed
+
+    def soln_net_cash_flow(self):
+        """OperatingCost.soln_net_cash_flow() of each sample, one row per sample."""
+        return self._compute()[0]
+
+    def soln_net_present_value(self):
+        """OperatingCost.soln_net_present_value() of each sample, one row per sample."""
+        return self._compute()[1]
+
+    def results(self):
+        """DataFrame of the outcome of each sample, indexed like samples:
+             NPV: sum of soln_net_present_value over the report years.
+             Emissions Reduced: sum of the World co2eq_mmt_reduced over the report years.
+             Payback Year: first year in which the cumulative net cash flow is
+               non-negative, NaN if it never is.
+        """
+        (cash_flow, npv, reduced) = self._compute()
+        ac = self.obj.ac
+        report = (npv.columns >= ac.report_start_year) & (npv.columns <= ac.report_end_year)
+        values = cash_flow.to_numpy()
+        with np.errstate(invalid='ignore'):
+            paid = (np.nancumsum(values, axis=1) >= 0) & ~np.isnan(values)
+        payback = np.where(paid.any(axis=1), cash_flow.columns.values[paid.argmax(axis=1)],
+                           np.nan)
+        return pd.DataFrame({'NPV': npv.loc[:, report].sum(axis=1),
+                             'Emissions Reduced': reduced,
+                             'Payback Year': payback}, index=self.samples.index)
@@ -1,5 +1,19 @@
-"""Utilities and definitions for https://github.com/OMS-NetZero/FAIR"""
+"""Utilities and definitions for https://github.com/OMS-NetZero/FAIR
 
+fair_scm() runs FaIR for a trajectory of CO2 emissions, memoizing the result process-wide by
+the content of the emissions and the parameters. The baseline and RCP4.5 runs, which are the
+same for every solution, are computed once per process, as is any trajectory run again.
+fair_scm_batch() runs many trajectories, such as those of a set of solutions or of the
+cumulative stacks of sectors, across a pool of worker processes.
+fair_scm_ensemble() runs one trajectory over a grid or sample of climate sensitivity
+parameters, returning percentile bands of the results.
+"""
+
+import collections
+import concurrent.futures
+import functools
+import itertools
+import os
 import pathlib
 
 import fair
@@ -10,6 +24,8 @@ import fair.RCPs.rcp85
 import numpy as np
 import pandas as pd
 
+from model.fingerprint import fingerprint
+
 
 topdir = pathlib.Path(__file__).parents[1]
 baselineCO2_path = topdir.joinpath('data', 'baselineCO2.csv')
@@ -65,65 +81,302 @@ ghg = {
 }
 
 
-def baseline_emissions():
-    """Return emissions to use as a baseline for Drawdown solutions."""
-    rcp = pd.DataFrame(fair.RCPs.rcp45.Emissions.emissions.copy(), columns=ghg.keys(),
-            index=fair.RCPs.rcp45.Emissions.year)
-    baseline = (rcp['FossilCO2']  + rcp['OtherCO2'] +
-             # Global Warming Potential of individual GHGs in CO2 equivalence
-             # CH4 and N2O values from Project Drawdown, noted as "AR5 with feedback"
-            ((rcp['CH4']       * 34      / 1000.0) +
-             (rcp['N2O']       * 298     / 1000.0) +
-             # GHGs after this point are from IPCC AR5
-             # https://www.ghgprotocol.org/sites/default/files/ghgp/Global-Warming-Potential-Values%20%28Feb%2016%202016%29_1.pdf
-             (rcp['CF4']       * 6630    / 1000000.0) +
-             (rcp['C2F6']      * 11100   / 1000000.0) +
-             (rcp['C6F14']     * 7910    / 1000000.0) +
-             (rcp['HFC23']     * 12400   / 1000000.0) +
-             (rcp['HFC32']     * 677     / 1000000.0) +
-             (rcp['HFC43_10']  * 1650    / 1000000.0) +
-             (rcp['HFC125']    * 3170    / 1000000.0) +
-             (rcp['HFC134a']   * 1300    / 1000000.0) +
-             (rcp['HFC143a']   * 4800    / 1000000.0) +
-             (rcp['HFC227ea']  * 3350    / 1000000.0) +
-             (rcp['HFC245fa']  * 858     / 1000000.0) +
-             (rcp['SF6']       * 23500   / 1000000.0) +
-             (rcp['CFC11']     * 4660    / 1000000.0) +
-             (rcp['CFC12']     * 10200   / 1000000.0) +
-             (rcp['CFC113']    * 5820    / 1000000.0) +
-             (rcp['CFC114']    * 8590    / 1000000.0) +
-             (rcp['CFC115']    * 7670    / 1000000.0) +
-             (rcp['CARB_TET']  * 1730    / 1000000.0) +
-             (rcp['HCFC22']    * 1760    / 1000000.0) +
-             (rcp['HCFC141B']  * 782     / 1000000.0) +
-             (rcp['HCFC142B']  * 1980    / 1000000.0) +
-             (rcp['HALON1211'] * 1750    / 1000000.0) +
-             (rcp['HALON1301'] * 6290    / 1000000.0) +
-             (rcp['HALON2402'] * 1470    / 1000000.0) +
-             (rcp['CH3BR']     * 2       / 1000000.0) +
-             (rcp['CH3CL']     * 12      / 1000000.0) +
-             # Halon 1202 from https://en.wikipedia.org/wiki/Dibromodifluoromethane
-             (rcp['HALON1202'] * 231     / 1000000.0) +
-             # NOx https://www.ncbi.nlm.nih.gov/pubmed/24234471
-             (rcp['NOx']       * 7       / 1000.0) +
-             # gasses with a GWP of close to zero or with very short atmospheric lifetimes.
-             (rcp['CO']        * 0) +
-             (rcp['BC']        * 0) +
-             (rcp['NH3']       * 0) +
-             (rcp['NMVOC']     * 0) +
-             (rcp['OC']        * 0) +
-             (rcp['MCF']       * 0) +
-             (rcp['SOx']       * 0) +
-             0
-            ) / CO2_MULT)
-    baseline.index = baseline.index.astype(int)
-    baseline.index.name = 'Year'
+# Global Warming Potentials in CO2 equivalence of the gases of the RCP emissions, weighed
+# into baseline_emissions(). Gases not listed are given a GWP of zero, as are those with a
+# GWP close to zero or with very short atmospheric lifetimes: CO, BC, NH3, NMVOC, OC, MCF, SOx.
+GWP_SETS = {
+    'Drawdown': {
+        # CH4 and N2O values from Project Drawdown, noted as "AR5 with feedback"
+        'CH4': 34, 'N2O': 298,
+        # GHGs after this point are from IPCC AR5
+        # https://www.ghgprotocol.org/sites/default/files/ghgp/Global-Warming-Potential-Values%20%28Feb%2016%202016%29_1.pdf
+        'CF4': 6630, 'C2F6': 11100, 'C6F14': 7910, 'HFC23': 12400, 'HFC32': 677,
+        'HFC43_10': 1650, 'HFC125': 3170, 'HFC134a': 1300, 'HFC143a': 4800,
+        'HFC227ea': 3350, 'HFC245fa': 858, 'SF6': 23500, 'CFC11': 4660, 'CFC12': 10200,
+        'CFC113': 5820, 'CFC114': 8590, 'CFC115': 7670, 'CARB_TET': 1730, 'HCFC22': 1760,
+        'HCFC141B': 782, 'HCFC142B': 1980, 'HALON1211': 1750, 'HALON1301': 6290,
+        'HALON2402': 1470, 'CH3BR': 2, 'CH3CL': 12,
+        # Halon 1202 from https://en.wikipedia.org/wiki/Dibromodifluoromethane
+        'HALON1202': 231,
+        # NOx https://www.ncbi.nlm.nih.gov/pubmed/24234471
+        'NOx': 7,
+    },
+}
+# IPCC AR5 100 year, without climate-carbon feedback.
+GWP_SETS['AR5'] = dict(GWP_SETS['Drawdown'], CH4=CH4_MULT, N2O=N2O_MULT)
+# IPCC AR4 100 year, Table 2.14.
+GWP_SETS['AR4'] = dict(GWP_SETS['Drawdown'], CH4=25, N2O=298, CF4=7390, C2F6=12200,
+        C6F14=9300, HFC23=14800, HFC32=675, HFC43_10=1640, HFC125=3500, HFC134a=1430,
+        HFC143a=4470, HFC227ea=3220, HFC245fa=1030, SF6=22800, CFC11=4750, CFC12=10900,
+        CFC113=6130, CFC114=10000, CFC115=7370, CARB_TET=1400, HCFC22=1810, HCFC141B=725,
+        HCFC142B=2310, HALON1211=1890, HALON1301=7140, HALON2402=1640, CH3BR=5, CH3CL=13)
+
+# RCP emissions of these gases are in Mt, those of the other non-CO2 gases in kt.
+MEGATONNE_GASES = ['CH4', 'N2O', 'NOx']
+
+
+@functools.lru_cache()
+def _rcp45_emissions():
+    """RCP4.5 emissions of every gas, years x gases in the order of ghg, not writeable."""
+    emissions = fair.RCPs.rcp45.Emissions.emissions.copy()
+    emissions.flags.writeable = False
+    return emissions
+
+
+@functools.lru_cache()
+def _drawdown_co2():
+    """Project Drawdown CO2-eq emissions in Gtons per year, from data/baselineCO2.csv."""
     ddCO2 = pd.read_csv(str(baselineCO2_path), header=0, index_col=0, skipinitialspace=True,
-            skip_blank_lines=True, comment='#', squeeze=True)
+            skip_blank_lines=True, comment='#').squeeze('columns')
     ddCO2.index = ddCO2.index.astype(int)
-    baseline.update(ddCO2 / CO2_MULT)
-    return baseline
+    return ddCO2
+
+
+def gwp_vector(gwp):
+    """Weight of each gas of ghg converting its RCP emissions to Gtons CO2-eq.
+
+       gwp is the name of a set in GWP_SETS, or a dict of gas name to its GWP.
+    """
+    gwps = GWP_SETS[gwp] if isinstance(gwp, str) else gwp
+    unknown = set(gwps) - set(ghg)
+    if unknown:
+        raise ValueError(f"Unknown gases {sorted(unknown)}")
+    weights = np.zeros(len(ghg), dtype=np.float64)
+    for (gas, value) in gwps.items():
+        weights[ghg[gas]] = value / (1000.0 if gas in MEGATONNE_GASES else 1000000.0)
+    return weights
+
+
+def baseline_emissions_for_gwps(gwps):
+    """baseline_emissions() for each of gwps, as a DataFrame with one column per GWP set.
+
+       gwps is a list of names of sets in GWP_SETS, or a dict of column name to the name of
+       a set or a dict of gas name to its GWP. All are computed together, as one product of
+       the RCP4.5 emissions with the matrix of their gwp_vector().
+    """
+    if not isinstance(gwps, dict):
+        gwps = {name: name for name in gwps}
+    weights = np.stack([gwp_vector(g) for g in gwps.values()], axis=1)
+    rcp = _rcp45_emissions()
+    co2 = rcp[:, ghg['FossilCO2']] + rcp[:, ghg['OtherCO2']]
+    values = co2.reshape(-1, 1) + (rcp @ weights) / CO2_MULT
+    index = pd.Index(fair.RCPs.rcp45.Emissions.year.astype(int), name='Year')
+
+    # Project Drawdown's own figures replace the RCP4.5 emissions for the years they cover.
+    ddCO2 = _drawdown_co2().dropna()
+    positions = index.get_indexer(ddCO2.index)
+    found = positions >= 0
+    values[positions[found], :] = (ddCO2.values[found] / CO2_MULT).reshape(-1, 1)
+    return pd.DataFrame(values, index=index, columns=list(gwps.keys()))
+
+
+@functools.lru_cache()
+def _baseline_emissions(gwp):
+    return baseline_emissions_for_gwps([gwp])[gwp]
+
+
+def baseline_emissions(gwp='Drawdown'):
+    """Return emissions to use as a baseline for Drawdown solutions, in GtC per year.
+
+       The CO2 emissions of RCP4.5 plus its other gases weighed by the GWP set gwp, a name
+       in GWP_SETS or a dict of gas name to GWP. Named sets are computed once per process.
+    """
+    if isinstance(gwp, str):
+        result = _baseline_emissions(gwp).copy()
+    else:
+        result = baseline_emissions_for_gwps({'gwp': gwp})['gwp']
+    result.name = None
+    return result
 
 
 def fair_scm_kwargs():
     return {"r0": r0, "tcrecs": tcrecs}
+
+
+class FairCache:
+    """Least recently used cache of FaIR results, keyed by fingerprint of the emissions
+       and parameters.
+
+       Arguments:
+         max_entries: number of results to keep, None for no limit.
+    """
+
+    def __init__(self, max_entries=1024):
+        self.max_entries = max_entries
+        self._entries = collections.OrderedDict()
+        self.hits = 0
+        self.misses = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, key):
+        """Cached result for key, or None."""
+        result = self._entries.get(key)
+        if result is None:
+            self.misses += 1
+            return None
+        self._entries.move_to_end(key)
+        self.hits += 1
+        return result
+
+    def put(self, key, result):
+        self._entries[key] = result
+        self._entries.move_to_end(key)
+        while self.max_entries is not None and len(self._entries) > self.max_entries:
+            self._entries.popitem(last=False)
+
+    def clear(self):
+        self._entries.clear()
+        self.hits = self.misses = 0
+
+
+cache = FairCache()
+
+
+def _key(emissions, kwargs):
+    return fingerprint([emissions, sorted(kwargs.items())])
+
+
+def _fair_scm(values, kwargs):
+    """(C, F, T) of FaIR for the array of CO2 emissions values, in a worker process."""
+    return fair.forward.fair_scm(emissions=values, useMultigas=False, **kwargs)
+
+
+def _frame(CFT, index):
+    (C, F, T) = CFT
+    return pd.DataFrame({'C': C, 'F': F, 'T': T}, index=index.copy())
+
+
+def fair_scm(emissions, **kwargs):
+    """FaIR results for emissions, a Series of CO2 emissions in GtC per year.
+
+       Runs FaIR with fair_scm_kwargs() updated by kwargs. Returns a DataFrame indexed
+       like emissions with columns C (CO2 concentration in ppm), F (radiative forcing in
+       watts per square meter) and T (change in temperature since pre-industrial time).
+    """
+    return fair_scm_batch({None: emissions}, workers=1, **kwargs)[None]
+
+
+def _compute(runs, workers):
+    """(C, F, T) for each of runs, a dict of cache key to the (array of emissions, kwargs)
+       to run FaIR with. Runs not already in the cache are spread across a pool of workers
+       processes, default os.cpu_count(), and cached."""
+    computed = {}
+    pending = {}
+    for (key, run) in runs.items():
+        CFT = cache.get(key)
+        if CFT is None:
+            pending[key] = run
+        else:
+            computed[key] = CFT
+
+    workers = min(workers or os.cpu_count() or 1, len(pending))
+    if workers > 1:
+        # large ensembles send their runs in chunks, to limit the cost of pickling each.
+        chunksize = max(1, len(pending) // (workers * 4))
+        with concurrent.futures.ProcessPoolExecutor(max_workers=workers) as executor:
+            results = dict(zip(pending.keys(), executor.map(_fair_scm,
+                [values for (values, _) in pending.values()],
+                [kwargs for (_, kwargs) in pending.values()], chunksize=chunksize)))
+    else:
+        results = {key: _fair_scm(values, kwargs)
+                   for (key, (values, kwargs)) in pending.items()}
+    for (key, CFT) in results.items():
+        cache.put(key, CFT)
+        computed[key] = CFT
+    return computed
+
+
+def fair_scm_batch(trajectories, workers=None, **kwargs):
+    """fair_scm() of each Series of emissions in the dict trajectories, with the same keys.
+
+       Trajectories not already in the cache are run across a pool of worker processes,
+       default os.cpu_count(). With 1, or a single trajectory to run, they are run in this
+       process.
+    """
+    kwargs = dict(fair_scm_kwargs(), **kwargs)
+    keys = {}
+    runs = {}
+    for (name, emissions) in trajectories.items():
+        keys[name] = _key(emissions, kwargs)
+        runs.setdefault(keys[name], (emissions.values, kwargs))
+    computed = _compute(runs, workers)
+    return {name: _frame(computed[key], trajectories[name].index)
+            for (name, key) in keys.items()}
+
+
+def parameter_grid(**values):
+    """List of FaIR parameters, one dict for each combination of values.
+
+       parameter_grid(r0=[30, 35, 40], tcrecs=[np.array([1.4, 2.6]), tcrecs])
+    """
+    names = list(values.keys())
+    return [dict(zip(names, combination))
+            for combination in itertools.product(*values.values())]
+
+
+# (low, mode, high) of the transient climate response and equilibrium climate sensitivity
+# in Kelvin, the likely ranges of IPCC AR5 around the values of tcrecs.
+TCR_RANGE = (1.0, tcrecs[0], 2.5)
+ECS_RANGE = (1.5, tcrecs[1], 4.5)
+
+
+def parameter_samples(n, tcr=TCR_RANGE, ecs=ECS_RANGE, r0_range=None, seed=None):
+    """List of n FaIR parameter dicts drawn from triangular distributions.
+
+       Arguments:
+         n: number of parameter sets.
+         tcr, ecs: (low, mode, high) of the transient climate response and equilibrium
+           climate sensitivity, combined into tcrecs. Draws with a TCR not below the ECS
+           are drawn again, so the low of tcr must be below the high of ecs.
+         r0_range: (low, mode, high) of r0, None to keep r0 fixed.
+         seed: seed of the random number generator.
+    """
+    if tcr[0] >= ecs[2]:
+        raise ValueError(f"TCR range {tcr} must start below the top of the ECS range {ecs}")
+    rng = np.random.default_rng(seed)
+    pairs = np.empty((0, 2))
+    while len(pairs) < n:
+        drawn = np.column_stack([rng.triangular(*tcr, size=n), rng.triangular(*ecs, size=n)])
+        pairs = np.concatenate([pairs, drawn[drawn[:, 0] < drawn[:, 1]]])
+    result = [{'tcrecs': pair} for pair in pairs[:n]]
+    if r0_range is not None:
+        for (parameters, value) in zip(result, rng.triangular(*r0_range, size=n)):
+            parameters['r0'] = value
+    return result
+
+
+def fair_scm_ensemble(emissions, parameters, percentiles=(5, 50, 95), workers=None):
+    """Percentiles of fair_scm() of emissions over an ensemble of FaIR parameters.
+
+       Arguments:
+         emissions: Series of CO2 emissions in GtC per year.
+         parameters: list of dicts of FaIR parameters, each updating fair_scm_kwargs(),
+           like those of parameter_grid() or parameter_samples().
+         percentiles: percentiles to return, between 0 and 100.
+         workers: number of worker processes to run the ensemble over, as in
+           fair_scm_batch().
+
+       Returns a DataFrame indexed like emissions with a column for each of C, F and T
+       and each percentile, like ('T', 95). Each run is cached by the emissions and its
+       parameters, so only parameter sets not run before for emissions are computed.
+    """
+    keys = []
+    runs = {}
+    for p in parameters:
+        kwargs = dict(fair_scm_kwargs(), **p)
+        keys.append(_key(emissions, kwargs))
+        runs.setdefault(keys[-1], (emissions.values, kwargs))
+    computed = _compute(runs, workers)
+    # runs x (C, F, T) x years, reduced to percentiles x (C, F, T) x years.
+    bands = np.percentile(np.stack([computed[key] for key in keys]), percentiles, axis=0)
+    columns = pd.MultiIndex.from_product([['C', 'F', 'T'], list(percentiles)])
+    return pd.DataFrame(bands.transpose(2, 1, 0).reshape(len(emissions), -1),
+            index=emissions.index.copy(), columns=columns)
+
+
+def rcp45_co2_emissions():
+    """Fossil CO2 emissions of RCP4.5 in GtC per year, as a Series indexed by year."""
+    return pd.Series(fair.RCPs.rcp45.Emissions.emissions[:, 0],
+                     index=fair.RCPs.rcp45.Emissions.year)
@@ -0,0 +1,104 @@
+"""Stable fingerprints of the content of model inputs.
+
+fingerprint() digests the content of an input (AdvancedControls, data source dicts,
+tamconfig and adconfig DataFrames, VMAs, and the numbers, strings and containers they
+hold) into a hex string. Inputs with the same content have the same fingerprint, whichever
+instance holds the content and in whichever process it is computed. Objects which are
+not changed once constructed provide a fingerprint() method memoizing their digest.
+"""
+
+import enum
+import hashlib
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+
+def fingerprint(item):
+    """Hex digest of the content of item.
+
+       Raises TypeError if item holds an object whose content cannot be digested.
+    """
+    h = hashlib.blake2b(digest_size=16)
+    _update(h, item)
+    return h.hexdigest()
+
+
+def _tag(h, name):
+    h.update(name.encode() + b'\0')
+
+
+def _update(h, item):
+    if isinstance(item, np.generic):
+        _update(h, item.item())
+    elif item is None or isinstance(item, (bool, int, float, str)):
+        _tag(h, type(item).__name__)
+        h.update(repr(item).encode() + b'\0')
+    elif isinstance(item, bytes):
+        _tag(h, 'bytes')
+        h.update(len(item).to_bytes(8, 'little') + item)
+    elif isinstance(item, enum.Enum):
+        _tag(h, f'{type(item).__qualname__}.{item.name}')
+    elif isinstance(item, pathlib.PurePath):
+        _tag(h, 'path')
+        _update(h, item.as_posix())
+    elif isinstance(item, (pd.DataFrame, pd.Series, pd.Index)):
+        _tag(h, 'pandas')
+        h.update(pandas_digest(item))
+    elif isinstance(item, np.ndarray):
+        _tag(h, f'ndarray {item.dtype} {item.shape}')
+        if item.dtype == object:
+            _update(h, item.ravel().tolist())
+        else:
+            h.update(np.ascontiguousarray(item).tobytes())
+    elif isinstance(item, (list, tuple)):
+        _tag(h, f'{type(item).__name__} {len(item)}')
+        for value in item:
+            _update(h, value)
+    elif isinstance(item, dict):
+        _tag(h, f'dict {len(item)}')
+        for (key, value) in sorted((fingerprint(k), v) for (k, v) in item.items()):
+            _tag(h, key)
+            _update(h, value)
+    elif isinstance(item, (set, frozenset)):
+        _tag(h, f'set {len(item)}')
+        for key in sorted(fingerprint(v) for v in item):
+            _tag(h, key)
+    elif isinstance(item, type):
+        _tag(h, f'type {item.__module__}.{item.__qualname__}')
+    elif callable(getattr(item, 'fingerprint', None)):
+        _tag(h, f'{type(item).__module__}.{type(item).__qualname__}')
+        _tag(h, item.fingerprint())
+    else:
+        raise TypeError(f'cannot fingerprint {type(item).__name__} object')
+
+
+def _update_values(h, values):
+    if isinstance(values, np.ndarray) and values.dtype != object:
+        _update(h, values)
+    else:
+        _update(h, list(values))
+
+
+def pandas_digest(item):
+    """Digest of the values, labels and dtypes of a DataFrame, Series or Index."""
+    h = hashlib.blake2b(digest_size=16)
+    _tag(h, type(item).__name__)
+    if isinstance(item, pd.Index):
+        _update(h, [item.names, str(item.dtype)])
+        _update_values(h, item.values)
+        return h.digest()
+    if isinstance(item, pd.DataFrame):
+        dtypes = [str(dtype) for dtype in item.dtypes]
+        _update(h, [item.columns.names, dtypes, item.columns.tolist()])
+        if len(set(dtypes)) == 1:
+            _update_values(h, item.to_numpy())
+        else:
+            _update(h, item.to_numpy(dtype=object).tolist())
+    else:
+        _update(h, [item.name, str(item.dtype)])
+        _update_values(h, item.to_numpy())
+    _update(h, item.index.names)
+    _update_values(h, item.index.values)
+    return h.digest()
@@ -1,10 +1,61 @@
 """First Cost module calculations."""
 
-from functools import lru_cache
 import math
 import numpy as np
+import pandas as pd
 
 import model.dd
+from model.deferred import Deferred
+from model.incremental import cached
+
+
+def install_cost_per_iunit(tot_iunits, base_year, cost_2014, learning_rate, learning_mult,
+                           factor=1.0, flat_without_learning=False):
+    """Install cost per implementation unit in each year of the Series tot_iunits, as an
+       array of (samples x years) for arrays of cost_2014 and learning_rate with a value per
+       sample, or of (1 x years) for single values.
+
+       flat_without_learning: whether the cost does not change with the iunits installed
+         when the learning rate is 1, as for the Solution-REF and Conventional costs.
+    """
+    log_learning_mult = math.log10(learning_mult)
+    parameter_b = np.array([math.log10(r) / log_learning_mult
+                            for r in np.atleast_1d(learning_rate)])
+    cost_2014 = np.atleast_1d(np.asarray(cost_2014, dtype=np.float64))
+    base_year_iunits_reqd = tot_iunits.loc[base_year]
+    if base_year_iunits_reqd == 0:
+        first_unit_cost = cost_2014
+    else:
+        p = np.array([(1 / base_year_iunits_reqd) ** b for b in parameter_b])
+        first_unit_cost = cost_2014 * p
+
+    iunits = np.broadcast_to(tot_iunits.values.astype(np.float64),
+                             (len(parameter_b), len(tot_iunits)))
+    if flat_without_learning:  # required to pass integration tests
+        iunits = np.where(parameter_b.reshape(-1, 1) == 0, 1.0, iunits)
+    result = first_unit_cost.reshape(-1, 1) * iunits ** parameter_b.reshape(-1, 1)
+
+    # In Excel, NaN^0 == NaN. In Python, NaN^0 == 1.
+    # We want to match the Excel behavior.  See First Cost Handling of NaN data in:
+    # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
+    result[np.isnan(iunits)] = np.nan
+    return result * factor
+
+
+def never_increasing(step1):
+    """Each year of the (samples x years) array step1 the lower of its cost and the cost of
+       the year before.
+
+       The model postulates that conventional technologies decrease in cost only slowly,
+       and never increase in cost.
+    """
+    step2 = np.full_like(step1, np.nan)
+    step2[:, 1:] = np.minimum(step1[:, :-1], step1[:, 1:])
+    valid = ~np.isnan(step1)
+    rows = np.flatnonzero(valid.any(axis=1))
+    first = valid.argmax(axis=1)[rows]
+    step2[rows, first] = step1[rows, first]  # no min() for first item
+    return step2
 
 
 class FirstCost:
@@ -37,6 +88,14 @@ class FirstCost:
         conv_ref_tot_iunits year over year (which are land units, not iunits, in this case).
     """
 
+    # table arguments, which may be passed as callables computing the table on first use.
+    soln_pds_tot_iunits_reqd = Deferred()
+    soln_ref_tot_iunits_reqd = Deferred()
+    conv_ref_tot_iunits = Deferred()
+    soln_pds_new_iunits_reqd = Deferred()
+    soln_ref_new_iunits_reqd = Deferred()
+    conv_ref_new_iunits = Deferred()
+
     def __init__(self, ac, pds_learning_increase_mult,
                  ref_learning_increase_mult, conv_learning_increase_mult,
                  soln_pds_tot_iunits_reqd, soln_ref_tot_iunits_reqd, conv_ref_tot_iunits,
@@ -55,31 +114,25 @@ class FirstCost:
         self.fc_convert_iunit_factor = fc_convert_iunit_factor
         self.conv_ref_first_cost_uses_tot_units = conv_ref_first_cost_uses_tot_units
 
-    @lru_cache()
+    def _install_cost_per_iunit(self, tot_iunits, base_year, cost_2014, learning_rate,
+                                learning_mult, flat_without_learning):
+        """install_cost_per_iunit() of the main region of tot_iunits, as a Series."""
+        iunits = tot_iunits.loc[:, model.dd.REGIONS[0]]
+        result = install_cost_per_iunit(tot_iunits=iunits, base_year=base_year,
+                cost_2014=cost_2014, learning_rate=learning_rate, learning_mult=learning_mult,
+                factor=self.fc_convert_iunit_factor,
+                flat_without_learning=flat_without_learning)
+        return pd.Series(result[0], index=iunits.index.copy())
+
+    @cached
     def soln_pds_install_cost_per_iunit(self):
         """Install cost per implementation unit in Solution-PDS
            'First Cost'!C37:C82
         """
-        log_learning_rate = math.log10(self.ac.soln_first_cost_learning_rate)
-        log_learning_mult = math.log10(self.pds_learning_increase_mult)
-        parameter_b = log_learning_rate / log_learning_mult
-
-        main_region = model.dd.REGIONS[0]
-        base_year_iunits_reqd = self.soln_pds_tot_iunits_reqd.loc[2015, main_region]
-        if base_year_iunits_reqd == 0:
-            first_unit_cost = self.ac.pds_2014_cost
-        else:
-            p = (1 / base_year_iunits_reqd) ** parameter_b
-            first_unit_cost = self.ac.pds_2014_cost * p
-
-        iunits = self.soln_pds_tot_iunits_reqd.loc[:, main_region]
-        result_per_iunit = first_unit_cost * iunits ** parameter_b
-
-        # In Excel, NaN^0 == NaN. In Python, NaN^0 == 1.
-        # We want to match the Excel behavior.  See First Cost Handling of NaN data in:
-        # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-        result_per_iunit.mask(iunits.isna(), other=np.nan, inplace=True)
-        result_display = result_per_iunit * self.fc_convert_iunit_factor
+        result_display = self._install_cost_per_iunit(self.soln_pds_tot_iunits_reqd,
+                base_year=2015, cost_2014=self.ac.pds_2014_cost,
+                learning_rate=self.ac.soln_first_cost_learning_rate,
+                learning_mult=self.pds_learning_increase_mult, flat_without_learning=False)
 
         if self.ac.soln_first_cost_below_conv:
             result = result_display
@@ -90,75 +143,30 @@ class FirstCost:
         result.name = "soln_pds_install_cost_per_iunit"
         return result
 
-    @lru_cache()
+    @cached
     def conv_ref_install_cost_per_iunit(self):
         """Install cost per implementation unit in Conventional-REF
            'First Cost'!O37:O82
         """
-        log_learning_rate = math.log10(self.ac.conv_first_cost_learning_rate)
-        log_learning_mult = math.log10(self.conv_learning_increase_mult)
-        parameter_b = log_learning_rate / log_learning_mult
-        main_region = model.dd.REGIONS[0]
-
         # Excel implementation referenced the cell for 2014, not 2015, so we
         # do the same here. Normally, we base calculations from 2015.
-        base_year_iunits_reqd = self.conv_ref_tot_iunits.loc[2014, main_region]
-        if base_year_iunits_reqd == 0:
-            first_unit_cost = self.ac.conv_2014_cost
-        else:
-            p = (1 / base_year_iunits_reqd) ** parameter_b
-            first_unit_cost = self.ac.conv_2014_cost * p
-
-        iunits = self.conv_ref_tot_iunits.loc[:, main_region].copy()
-        if parameter_b == 0:  # required to pass integration tests
-            iunits.loc[:] = 1
-        result_per_iunit = first_unit_cost * iunits ** parameter_b
-
-        # In Excel, NaN^0 == NaN. In Python, NaN^0 == 1.
-        # We want to match the Excel behavior.
-        # See First Cost Handling of NaN data in:
-        # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-        result_per_iunit.mask(iunits.isna(), other=np.nan, inplace=True)
-        step1 = result_per_iunit * self.fc_convert_iunit_factor
-
-        # The model postulates that conventional technologies decrease
-        # in cost only slowly, and never increase in cost. We walk back
-        # through the array comparing each year to the previous year.
-        step2 = step1.rolling(2).apply(lambda x: min(x[0], x[1]), raw=True)
-        first = step1.first_valid_index()
-        step2.loc[first] = step1.loc[first]  # no min() for first item
-
+        step1 = self._install_cost_per_iunit(self.conv_ref_tot_iunits, base_year=2014,
+                cost_2014=self.ac.conv_2014_cost,
+                learning_rate=self.ac.conv_first_cost_learning_rate,
+                learning_mult=self.conv_learning_increase_mult, flat_without_learning=True)
+        step2 = pd.Series(never_increasing(step1.values.reshape(1, -1))[0], index=step1.index)
         step2.name = "conv_ref_install_cost_per_iunit"
         return step2
 
-    @lru_cache()
+    @cached
     def soln_ref_install_cost_per_iunit(self):
         """Install cost per implementation unit in Solution-REF
            'First Cost'!L37:L82
         """
-        log_learning_rate = math.log10(self.ac.soln_first_cost_learning_rate)
-        log_learning_mult = math.log10(self.ref_learning_increase_mult)
-        parameter_b = log_learning_rate / log_learning_mult
-
-        main_region = model.dd.REGIONS[0]
-        base_year_iunits_reqd = self.soln_ref_tot_iunits_reqd.loc[2015, main_region]
-        if base_year_iunits_reqd == 0:
-            first_unit_cost = self.ac.ref_2014_cost
-        else:
-            p = (1 / base_year_iunits_reqd) ** parameter_b
-            first_unit_cost = self.ac.ref_2014_cost * p
-
-        iunits = self.soln_ref_tot_iunits_reqd.loc[:, main_region].copy()
-        if parameter_b == 0:  # required to pass integration tests
-            iunits.loc[:] = 1
-        result_per_iunit = first_unit_cost * iunits ** parameter_b
-
-        # In Excel, NaN^0 == NaN. In Python, NaN^0 == 1.
-        # We want to match the Excel behavior.
-        # See First Cost Handling of NaN data in:
-        # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#
-        result_per_iunit.mask(iunits.isna(), other=np.nan, inplace=True)
-        step1 = result_per_iunit * self.fc_convert_iunit_factor
+        step1 = self._install_cost_per_iunit(self.soln_ref_tot_iunits_reqd, base_year=2015,
+                cost_2014=self.ac.ref_2014_cost,
+                learning_rate=self.ac.soln_first_cost_learning_rate,
+                learning_mult=self.ref_learning_increase_mult, flat_without_learning=True)
 
         if self.ac.soln_first_cost_below_conv:
             result = step1
@@ -169,7 +177,7 @@ class FirstCost:
         result.name = "soln_ref_install_cost_per_iunit"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_annual_world_first_cost(self):
         """Annual World First Cost (SOLUTION-PDS)
            'First Cost'!E37:E82
@@ -179,7 +187,7 @@ class FirstCost:
         result.name = "soln_pds_annual_world_first_cost"
         return result
 
-    @lru_cache()
+    @cached
     def soln_ref_annual_world_first_cost(self):
         """Annual World First Cost (SOLUTION-REF)
            'First Cost'!N37:N82
@@ -189,7 +197,7 @@ class FirstCost:
         result.name = "soln_ref_annual_world_first_cost"
         return result
 
-    @lru_cache()
+    @cached
     def conv_ref_annual_world_first_cost(self):
         """Annual World First Cost (CONVENTIONAL-REF)
            'First Cost'!Q37:Q82
@@ -204,7 +212,7 @@ class FirstCost:
         result.name = "conv_ref_annual_world_first_cost"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_cumulative_install(self):
         """Cumulative Install/Implementation (SOLUTION-PDS)
            'First Cost'!F37:F82
@@ -213,7 +221,7 @@ class FirstCost:
         result.name = "soln_pds_cumulative_install"
         return result
 
-    @lru_cache()
+    @cached
     def ref_cumulative_install(self):
         """Cumulative Install / Implementation (CONVENTIONAL-REF + SOLUTION-REF)
            'First Cost'!R37:R82
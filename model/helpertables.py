@@ -5,14 +5,21 @@ data is selectable according to the solution. Helper Tables can pull in one of
 the Linear/2nd order poly/3rd order poly/etc curve fitting implementations
 from interpolation.py, or use a simple linear fit implemented here.
 """
-from functools import lru_cache
 import pandas as pd
 import numpy as np
 import model.dd as dd
+from model.deferred import Deferred
+from model.incremental import cached
 
 
 class HelperTables:
     """ Implementation for the Helper Tables module. """
+
+    # table arguments, which may be passed as callables computing the table on first use.
+    pds_adoption_data_per_region = Deferred()
+    pds_adoption_trend_per_region = Deferred()
+    ref_adoption_data_per_region = Deferred()
+
     def __init__(self, ac, pds_adoption_data_per_region, ref_datapoints, pds_datapoints,
                  ref_adoption_limits=None, pds_adoption_limits=None,
                  pds_adoption_trend_per_region=None, pds_adoption_is_single_source=False,
@@ -65,7 +72,7 @@ class HelperTables:
         self.copy_pds_to_ref = copy_pds_to_ref
         self.copy_ref_datapoint = copy_ref_datapoint
 
-    @lru_cache()
+    @cached
     def soln_ref_funits_adopted(self, suppress_override=False):
         """Cumulative Adoption in funits, interpolated between two ref_datapoints.
 
@@ -154,7 +161,7 @@ class HelperTables:
                                 dtype="float")
         return adoption
 
-    @lru_cache()
+    @cached
     def soln_pds_funits_adopted(self, suppress_override=False):
         """Cumulative Adoption in funits in the PDS.
 
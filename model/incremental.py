@@ -0,0 +1,262 @@
+"""Incremental recomputation of a Scenario when fields of its AdvancedControls change.
+
+The per-scenario model modules (HelperTables, UnitAdoption, FirstCost, OperatingCost,
+CH4Calcs, CO2Calcs and ElectricityGenOnGrid) cache their tables with cached() of this
+module rather than functools.lru_cache(). Alongside each cached table it records:
+  - the AdvancedControls fields read while computing the table, when the module reads its
+    AdvancedControls through a TrackedControls installed by track(), and
+  - the cached tables computed using the table, which are discarded along with it.
+The classes whose instances are shared between Scenarios, such as TAM and AdoptionData,
+cache their tables with model.metaclass_cache.cached, which records neither.
+
+update_ac() changes fields of the AdvancedControls of a constructed Scenario, discarding
+only the tables which read a changed field directly or through the tables they used.
+Changing npv_discount_rate discards the OperatingCost NPV tables, changing conv_2014_cost
+discards the FirstCost tables and those computed from them, everything else is kept.
+Fields outside of TABLE_FIELDS, and fields the Scenario reads while it is constructed, are
+applied by constructing a new Scenario instead.
+"""
+
+import ast
+import dataclasses
+import functools
+import inspect
+import sys
+import textwrap
+
+
+# fields of the AdvancedControls which the model modules only read while computing their
+# cached tables, which update_ac() can apply in place.
+TABLE_FIELDS = frozenset([
+    'pds_2014_cost', 'ref_2014_cost', 'conv_2014_cost', 'soln_first_cost_efficiency_rate',
+    'conv_first_cost_efficiency_rate', 'soln_first_cost_below_conv',
+    'soln_fixed_oper_cost_per_iunit', 'conv_fixed_oper_cost_per_iunit',
+    'soln_var_oper_cost_per_funit', 'conv_var_oper_cost_per_funit',
+    'soln_fuel_cost_per_funit', 'conv_fuel_cost_per_funit', 'npv_discount_rate',
+    'soln_lifetime_capacity', 'soln_expected_lifetime', 'conv_lifetime_capacity',
+    'conv_expected_lifetime', 'soln_avg_annual_use', 'conv_avg_annual_use',
+    'soln_annual_energy_used', 'conv_annual_energy_used', 'soln_energy_efficiency_factor',
+    'conv_fuel_consumed_per_funit', 'soln_fuel_efficiency_factor',
+    'conv_fuel_emissions_factor', 'soln_fuel_emissions_factor', 'conv_emissions_per_funit',
+    'soln_emissions_per_funit', 'soln_indirect_co2_per_iunit', 'conv_indirect_co2_per_unit',
+    'ch4_co2_per_funit', 'n2o_co2_per_funit', 'seq_rate_global',
+])
+
+
+# entries of the cached tables being computed, innermost last.
+_computing = []
+
+
+class _Entry:
+    """A cached table, with the fields read and the entries computed using it."""
+    __slots__ = ('cache', 'key', 'value', 'fields', 'dependents', 'replaced')
+
+    def __init__(self, cache, key, replaced=False):
+        self.cache = cache
+        self.key = key
+        self.fields = set()
+        self.dependents = set()
+        self.replaced = replaced
+
+    def discard(self):
+        if self.cache.get(self.key) is self:
+            del self.cache[self.key]
+        (dependents, self.dependents) = (self.dependents, set())
+        for entry in dependents:
+            entry.discard()
+
+
+def cached(func=None, *, tracked=True, on_store=None):
+    """Cache the results of a method on its instance, together with what each was computed
+       from, in place of functools.lru_cache(). Used as @cached, or with arguments as
+       @cached(tracked=False).
+
+       One result is kept for each distinct set of arguments, for as long as the instance.
+       The undecorated method remains available as __wrapped__.
+
+       Arguments:
+         tracked: record the AdvancedControls fields and cached tables each result is
+           computed from, for update_ac() and replace_table(). False for the methods of
+           instances shared between Scenarios, whose results are never discarded.
+         on_store: optional callable(instance, result) called with each result computed.
+    """
+    if func is None:
+        return functools.partial(cached, tracked=tracked, on_store=on_store)
+    name = func.__name__
+
+    @functools.wraps(func)
+    def wrapper(self, *args, **kwargs):
+        cache = self.__dict__.setdefault('_incremental_cache', {})
+        key = (name, args, tuple(sorted(kwargs.items())))
+        entry = cache.get(key)
+        if entry is None:
+            entry = _Entry(cache=cache, key=key)
+            if tracked:
+                _computing.append(entry)
+            try:
+                entry.value = func(self, *args, **kwargs)
+            finally:
+                if tracked:
+                    _computing.pop()
+            cache[key] = entry
+            if on_store is not None:
+                on_store(self, entry.value)
+        if tracked and _computing:
+            entry.dependents.add(_computing[-1])
+        return entry.value
+
+    wrapper.incremental = tracked
+    return wrapper
+
+
+def results(obj):
+    """List of the results cached on obj by cached()."""
+    return [entry.value for entry in obj.__dict__.get('_incremental_cache', {}).values()]
+
+
+class TrackedControls:
+    """An AdvancedControls as read by a model module, recording the fields read by the
+       cached table being computed. Properties are evaluated against the TrackedControls,
+       so the fields they use are recorded too.
+    """
+    __slots__ = ('_ac',)
+
+    def __init__(self, ac):
+        self._ac = ac
+
+    def __getattr__(self, name):
+        if _computing:
+            _computing[-1].fields.add(name)
+        prop = getattr(type(self._ac), name, None)
+        if isinstance(prop, property):
+            return prop.fget(self)
+        return getattr(self._ac, name)
+
+    def __repr__(self):
+        return f"TrackedControls({self._ac!r})"
+
+
+def replace_table(method, value, *args, **kwargs):
+    """Cache value as the result of method(*args, **kwargs), in place of the table it
+       computes. method is a method decorated with cached(), bound to its module.
+
+       The table cached before is discarded along with the tables computed using it, which
+       are recomputed from value when next used. value is kept until replaced again, and
+       is not discarded by track() or update_ac().
+    """
+    cache = method.__self__.__dict__.setdefault('_incremental_cache', {})
+    key = (method.__name__, args, tuple(sorted(kwargs.items())))
+    entry = cache.get(key)
+    if entry is not None:
+        entry.discard()
+    entry = _Entry(cache=cache, key=key, replaced=True)
+    entry.value = value
+    cache[key] = entry
+
+
+def _is_incremental(cls):
+    return any(getattr(v, 'incremental', False) for v in vars(cls).values())
+
+
+def _held_ac(m):
+    """The AdvancedControls held by model module m, None if it holds none."""
+    ac = getattr(m, '__dict__', {}).get('ac')
+    return ac._ac if isinstance(ac, TrackedControls) else ac
+
+
+def _holders(obj):
+    """The model modules of Scenario obj holding its AdvancedControls."""
+    return [m for m in vars(obj).values() if _held_ac(m) is obj.ac]
+
+
+@functools.lru_cache()
+def _fields_read_by(obj):
+    """Names read as ac.<name> or <...>.ac.<name> in the source of obj, including the
+       fields behind properties of the AdvancedControls."""
+    def is_ac(node):
+        return ((isinstance(node, ast.Name) and node.id == 'ac') or
+                (isinstance(node, ast.Attribute) and node.attr == 'ac'))
+
+    def is_self(node):
+        return isinstance(node, ast.Name) and node.id == 'self'
+
+    def attributes(source, of):
+        tree = ast.parse(textwrap.dedent(inspect.getsource(source)))
+        return {node.attr for node in ast.walk(tree)
+                if isinstance(node, ast.Attribute) and of(node.value)}
+
+    ac_type = sys.modules['model.advanced_controls'].AdvancedControls
+    names = attributes(obj, of=is_ac)
+    pending = list(names)
+    while pending:
+        prop = getattr(ac_type, pending.pop(), None)
+        if isinstance(prop, property):
+            for name in attributes(prop.fget, of=is_self) - names:
+                names.add(name)
+                pending.append(name)
+    return frozenset(names)
+
+
+def _structural_fields(obj, holders):
+    """Fields of the AdvancedControls of Scenario obj which its source shows are read
+       outside of cached tables: by the Scenario, by the constructors of its model modules
+       and by modules holding the AdvancedControls which do not track their tables."""
+    fields = set(_fields_read_by(type(obj)))
+    for m in holders:
+        if _is_incremental(type(m)):
+            fields.update(_fields_read_by(type(m).__init__))
+        else:
+            fields.update(_fields_read_by(type(m)))
+    return fields
+
+
+def _construct(obj, ac):
+    """New Scenario of the same solution as obj, constructed with AdvancedControls ac."""
+    return type(obj)(scenario=obj.scenario, ac=ac)
+
+
+def track(obj):
+    """Have the model modules of Scenario obj which cache their tables read its
+       AdvancedControls through a TrackedControls, so that update_ac() knows the fields
+       each table read. Tables cached before obj was tracked are discarded, and obj is
+       returned.
+
+       update_ac() tracks obj itself, discarding the tables cached so far. Tracking obj
+       before computing its tables keeps them across the first update_ac() too.
+    """
+    tracked = None
+    for m in _holders(obj):
+        if _is_incremental(type(m)) and not isinstance(m.ac, TrackedControls):
+            tracked = tracked or TrackedControls(obj.ac)
+            m.ac = tracked
+            for entry in list(m.__dict__.get('_incremental_cache', {}).values()):
+                if not entry.replaced:
+                    entry.discard()
+    return obj
+
+
+def update_ac(obj, **changes):
+    """Change fields of the AdvancedControls of Scenario obj, as in dataclasses.replace().
+
+       Cached tables which read a changed field are discarded, along with the tables
+       computed using them, and are recomputed when next used. obj is tracked by track()
+       if it was not, then updated in place and returned, unless a changed field is not
+       in TABLE_FIELDS or is read outside of the cached tables, for example by the
+       solution to choose the adoption data sources. Then a new Scenario constructed with
+       the changed fields is returned, and obj is left as it was.
+    """
+    changed = set(changes)
+    ac = dataclasses.replace(obj.ac, **changes)
+    holders = _holders(obj)
+    if (changed - TABLE_FIELDS) or (changed & _structural_fields(obj, holders)):
+        return _construct(obj, ac)
+
+    track(obj)
+    obj.ac = ac
+    tracked = TrackedControls(ac)
+    for m in [m for m in holders if _is_incremental(type(m))]:
+        m.ac = tracked
+        for entry in list(m.__dict__.get('_incremental_cache', {}).values()):
+            if entry.fields & changed:
+                entry.discard()
+    return obj
@@ -9,109 +9,183 @@
   interpolation methods used in the Adoption Data and TAM Data modules.
 """
 
+import warnings
+
 import numpy as np
 import pandas as pd
 
 
-def linear_trend(data):
-    """Linear trend model.
-       Provides implementation for 'Adoption Data'!BY50:CA96 & 'TAM Data' columns BX:BZ
-       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
-    """
-
-    years = np.arange(2014, 2061)
-    years_idx = pd.Index(years, name="Year")
-    columns = ["x", "constant", "adoption"]
-    data_clean = data.dropna()
+TREND_DEGREES = {'linear': 1, 'degree2': 2, 'degree3': 3, 'exponential': 1}
 
-    if data_clean.empty: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+TREND_COLUMNS = {
+    'linear': ['x', 'constant', 'adoption'],
+    'degree2': ['x^2', 'x', 'constant', 'adoption'],
+    'degree3': ['x^3', 'x^2', 'x', 'constant', 'adoption'],
+    'exponential': ['coeff', 'e^x', 'adoption'],
+}
 
-    y = data_clean.values
-    x = data_clean.index - 2014
 
-    if x.size == 0 or y.size == 0: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+def _lstsq_columns(lhs, rhs):
+    """np.polyfit for each column of rhs against the Vandermonde matrix lhs.
 
-    (slope, intercept) = np.polyfit(x, y, 1)
-
-    n_years = len(years)
-    offsets = np.arange(n_years)
+       Follows the steps of np.polyfit (scaled columns, the same rcond) so that a single
+       column gives exactly the np.polyfit result. Columns which are not finite (the log of
+       a zero, for example) are solved on their own so they cannot spoil the others.
+    """
+    lhs = lhs.copy()
+    scale = np.sqrt((lhs * lhs).sum(axis=0))
+    lhs /= scale
+    rcond = len(lhs) * np.finfo(lhs.dtype).eps
+    coefficients = np.empty((lhs.shape[1], rhs.shape[1]), dtype=np.float64)
+    finite = np.isfinite(rhs).all(axis=0)
+    batches = [np.flatnonzero(finite)] + [[col] for col in np.flatnonzero(~finite)]
+    for cols in batches:
+        if len(cols) == 0:
+            continue
+        (c, _, rank, _) = np.linalg.lstsq(lhs, rhs[:, cols], rcond)
+        if rank != lhs.shape[1]:
+            warnings.warn('Polyfit may be poorly conditioned', np.RankWarning, stacklevel=4)
+        coefficients[:, cols] = (c.T / scale).T
+    return coefficients
+
+
+def trend_coefficients(data, trends=tuple(TREND_DEGREES.keys())):
+    """Least squares coefficients of several trends for every column of data at once.
 
-    x = offsets * slope
-    constant = np.full(n_years, intercept)
-    adoption = x + constant
+       Arguments:
+         data: DataFrame indexed by year with one column per series. NaN years are left out
+           of the fit of that series, as with dropna().
+         trends: names from TREND_DEGREES.
 
-    return pd.DataFrame(np.column_stack([x,constant, adoption]), columns=columns,
-                                  dtype=np.float64, index=years_idx)
+       Returns a dict of trend name to a (degree + 1, series) array of coefficients, highest
+       power first. The exponential trend is a linear fit to log(data). Series with no data
+       have NaN coefficients.
 
-def poly_degree2_trend(data):
-    """2nd degree polynomial trend model.
-       Provides implementation for 'Adoption Data'!CF50:CI96 & 'TAM Data' columns CE:CH
-       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
+       A Vandermonde matrix is built once for all years. Series which have data for the same
+       years share its rows and are solved together in one least squares problem per trend.
     """
+    return _trend_coefficients(years=data.index, values=data.values, trends=trends)
+
+
+def _trend_coefficients(years, values, trends):
+    x = np.asarray(years - 2014, dtype=np.float64)
+    values = np.asarray(values, dtype=np.float64)
+    max_degree = max(TREND_DEGREES[trend] for trend in trends)
+    vander = np.vander(x, max_degree + 1)
+    result = {trend: np.full((TREND_DEGREES[trend] + 1, values.shape[1]), np.nan)
+              for trend in trends}
+    valid = ~np.isnan(values)
+    groups = {}
+    for col in range(values.shape[1]):
+        if valid[:, col].any():
+            groups.setdefault(valid[:, col].tobytes(), []).append(col)
+    for cols in groups.values():
+        rows = valid[:, cols[0]]
+        y = values[rows][:, cols]
+        for trend in trends:
+            degree = TREND_DEGREES[trend]
+            lhs = np.ascontiguousarray(vander[rows, max_degree - degree:])
+            rhs = np.log(y) if trend == 'exponential' else y
+            result[trend][:, cols] = _lstsq_columns(lhs, rhs)
+    return result
 
-    years = np.arange(2014, 2061)
-    years_idx = pd.Index(years, name="Year")
-    columns = ['x^2', 'x', 'constant', 'adoption']
-    data_clean = data.dropna()
 
-    if data_clean.empty: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+def _trend_curves(trend, coefficients):
+    """Columns of the trend table for each year 2014-2060, as (years, series) arrays."""
+    offsets = np.arange(2061 - 2014)[:, np.newaxis]
+    if trend == 'linear':
+        (slope, intercept) = coefficients
+        x = offsets * slope
+        constant = np.broadcast_to(intercept, x.shape)
+        return [x, constant, x + constant]
+    if trend == 'degree2':
+        (c2, c1, intercept) = coefficients
+        x2 = (offsets ** 2) * c2
+        x = offsets * c1
+        constant = np.broadcast_to(intercept, x.shape)
+        return [x2, x, constant, x + x2 + constant]
+    if trend == 'degree3':
+        (c3, c2, c1, intercept) = coefficients
+        x3 = (offsets ** 3) * c3
+        x2 = (offsets ** 2) * c2
+        x = offsets * c1
+        constant = np.broadcast_to(intercept, x.shape)
+        return [x3, x2, x, constant, x + x2 + x3 + constant]
+    if trend == 'exponential':
+        (ce, coeff) = coefficients
+        ex = np.exp(offsets * ce)
+        coeff = np.broadcast_to(np.exp(coeff), ex.shape)
+        return [coeff, ex, ex * coeff]
+    raise ValueError('invalid trend algorithm: ' + str(trend))
 
-    y = data_clean.values
-    x = data_clean.index - 2014
 
-    if x.size == 0 or y.size == 0: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+def fit_trends(data, trends=tuple(TREND_DEGREES.keys())):
+    """Fit several trend models to every column of data at once.
 
-    (c2, c1, intercept) = np.polyfit(x, y, 2)
-    n_years = len(years)
-    offsets = np.arange(n_years)
+       Arguments:
+         data: DataFrame indexed by year with one column per series, NaN where there is no data.
+         trends: names from TREND_DEGREES.
 
-    x2 = (offsets ** 2) * c2
-    x = offsets * c1
-    constant = np.full(n_years, intercept)
-    adoption = x + x2 + constant
+       Returns a dict of trend name to a DataFrame for the years 2014-2060 whose columns are
+       (trend column, series), so fit_trends(data)['linear']['adoption'] has the fitted linear
+       curve of every series. series_trend() extracts the table of one series.
+    """
+    coefficients = trend_coefficients(data=data, trends=trends)
+    series = [k if isinstance(k, tuple) else (k,) for k in data.columns]
+    names = [None] + list(data.columns.names)
+    result = {}
+    for trend in trends:
+        curves = _trend_curves(trend, coefficients[trend])
+        columns = pd.MultiIndex.from_tuples(
+                [(c,) + k for c in TREND_COLUMNS[trend] for k in series], names=names)
+        result[trend] = pd.DataFrame(np.hstack(curves), columns=columns, dtype=np.float64,
+                                     index=pd.Index(np.arange(2014, 2061), name="Year"))
+    return result
 
-    return pd.DataFrame(np.column_stack([x2, x, constant, adoption]), columns=columns,
-                                  dtype=np.float64, index=years_idx)
 
+def series_trend(fits, trend, name):
+    """The trend table of series name from the result of fit_trends(), as returned by
+       linear_trend(), poly_degree2_trend(), poly_degree3_trend() or exponential_trend()."""
+    return pd.DataFrame({c: fits[trend][c][name] for c in TREND_COLUMNS[trend]},
+                        columns=TREND_COLUMNS[trend], dtype=np.float64)
 
 
-def poly_degree3_trend(data):
-    """3rd degree polynomial trend model.
-       Provides implementation for 'Adoption Data'!CN50:CR96 & 'TAM Data' columns CM:CQ
-       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
-    """
+def _trend_frame(trend, curves, col):
+    """DataFrame of the trend table for series col of curves."""
+    return pd.DataFrame(np.column_stack([c[:, col] for c in curves]),
+                        columns=TREND_COLUMNS[trend], dtype=np.float64,
+                        index=pd.Index(np.arange(2014, 2061), name="Year"))
 
-    years = np.arange(2014, 2061)
-    years_idx = pd.Index(years, name="Year")
-    columns = ['x^3', 'x^2', 'x', 'constant', 'adoption']
-    data_clean = data.dropna()
 
-    if data_clean.empty: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+def _fit_one_trend(data, trend):
+    """Fit trend to a single pd.Series, the one column case of fit_trends."""
+    coefficients = _trend_coefficients(years=data.index, values=data.values[:, np.newaxis],
+                                       trends=[trend])
+    return _trend_frame(trend, _trend_curves(trend, coefficients[trend]), 0)
 
-    y = data_clean.values
-    x = data_clean.index - 2014
 
-    if x.size == 0 or y.size == 0: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+def linear_trend(data):
+    """Linear trend model.
+       Provides implementation for 'Adoption Data'!BY50:CA96 & 'TAM Data' columns BX:BZ
+       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
+    """
+    return _fit_one_trend(data=data, trend='linear')
 
-    (c3, c2, c1, intercept) = np.polyfit(x, y, 3)
-    n_years = len(years)
-    offsets = np.arange(n_years)
 
-    x3 = (offsets ** 3) * c3
-    x2 = (offsets ** 2) * c2
-    x = offsets * c1
-    constant = np.full(n_years, intercept)
-    adoption = x + x2 + x3 + constant
+def poly_degree2_trend(data):
+    """2nd degree polynomial trend model.
+       Provides implementation for 'Adoption Data'!CF50:CI96 & 'TAM Data' columns CE:CH
+       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
+    """
+    return _fit_one_trend(data=data, trend='degree2')
 
-    return pd.DataFrame(np.column_stack([x3, x2, x, constant, adoption]), columns=columns,
-                                  dtype=np.float64, index=years_idx)
 
+def poly_degree3_trend(data):
+    """3rd degree polynomial trend model.
+       Provides implementation for 'Adoption Data'!CN50:CR96 & 'TAM Data' columns CM:CQ
+       Arguments: data is a pd.Series used to provide the x+y for curve fitting.
+    """
+    return _fit_one_trend(data=data, trend='degree3')
 
 
 def exponential_trend(data):
@@ -119,31 +193,7 @@ def exponential_trend(data):
        Provides implementation for 'Adoption Data'!CW50:CY96 & 'TAM Data' columns CV:CX
        Arguments: data is a pd.Series used to provide the x+y for curve fitting.
     """
-    years = np.arange(2014, 2061)
-    years_idx = pd.Index(years, name="Year")
-    columns = ['coeff', 'e^x', 'adoption']
-    data_clean = data.dropna()
-
-    if data_clean.empty: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
-
-    y = np.log(data_clean.values)
-    x = data_clean.index - 2014
-
-    if x.size == 0 or y.size == 0: 
-        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
-
-    (ce, coeff) = np.polyfit(x, y, 1)
-    n_years = len(years)
-    offsets = np.arange(n_years)
-
-    ex = np.exp(offsets * ce)
-    coeff = np.full(n_years, np.exp(coeff))
-    adoption = ex * coeff
-
-    return pd.DataFrame(np.column_stack([coeff, ex, adoption]), columns=columns,
-                                  dtype=np.float64, index=years_idx)
-
+    return _fit_one_trend(data=data, trend='exponential')
 
 
 def single_trend(data):
@@ -159,19 +209,23 @@ def single_trend(data):
     return result
 
 
+def canonical_trend(trend):
+    """Name of a trend as used in TREND_DEGREES, or 'single', for any of its spellings."""
+    t = trend.lower()
+    if t == "linear": return 'linear'
+    if t == "2nd poly" or t == "2nd_poly" or t == "degree2": return 'degree2'
+    if t == "3rd poly" or t == "3rd_poly" or t == "degree3": return 'degree3'
+    if t == "exponential" or t == "exp": return 'exponential'
+    if t == "single" or t == "single source": return 'single'
+    raise ValueError('invalid trend algorithm: ' + str(trend))
+
+
 def trend_algorithm(data, trend):
     """Fit of data via one of several trend interpolation algorithms."""
-    t = trend.lower()
-    if t == "linear": return linear_trend(data=data)
-    if t == "2nd poly" or t == "2nd_poly" or t == "degree2":
-        return poly_degree2_trend(data=data)
-    if t == "3rd poly" or t == "3rd_poly" or t == "degree3":
-        return poly_degree3_trend(data=data)
-    if t == "exponential" or t == "exp":
-        return exponential_trend(data=data)
-    if t == "single" or t == "single source":
+    t = canonical_trend(trend)
+    if t == 'single':
         return single_trend(data)
-    raise ValueError('invalid trend algorithm: ' + str(trend))
+    return _fit_one_trend(data=data, trend=t)
 
 
 def matching_data_sources(data_sources, name, groups_only, region_key=None):
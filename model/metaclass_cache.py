@@ -3,54 +3,186 @@ Python metaclass which checks arguments passed to constructor and maintains a ca
 Passing in the same arguments will return the same object, shared by all callers.
 
 This is especially useful for objects with expensive methods which are decorated
-@lru_cache, like TAM.py. Sharing a single object means when any of them have warmed
+@cached, like TAM.py. Sharing a single object means when any of them have warmed
 the cache, all solutions benefit.
+
+The cache is bounded, so that long running processes constructing many scenarios do not
+grow without bound. The least recently used instances are evicted once a class holds more
+instances than its limit, or once the DataFrames held by all cached instances, including
+the results of their cached methods, are estimated to exceed max_bytes. Evicted instances
+keep working for the callers holding them, they are no longer shared with new callers.
+
+    MetaclassCache.cache.stats()
+    MetaclassCache.cache.set_limit(tam.TAM, max_entries=50)
+    with MetaclassCache.cache.scope():
+        ...  # instances constructed here are dropped from the cache on leaving the block
 """
 
+import collections
+import contextlib
+
+import numpy as np
 import pandas as pd
-import json
 
-# pylint is confused by the __call__ syntax
-# pylint: disable=no-value-for-parameter
+from model import incremental
+from model.fingerprint import fingerprint
 
-class MetaclassCache(type):
 
-    cache = {}
+DEFAULT_MAX_BYTES = 512 * 1024 * 1024
 
-    def hash_item(self, item):
-        if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
-            item = tuple(pd.util.hash_pandas_object(item))
-        try:
-            return hash(item)
-        except TypeError:
-            pass
 
-        try:
-            return hash(json.dumps(item, separators=(',', ':')))
-        except TypeError:
-            pass
+def estimated_bytes(value):
+    """Estimated size of the DataFrames, Series and arrays in value, including those held
+       in lists, tuples and dicts."""
+    if isinstance(value, pd.DataFrame):
+        return int(value.memory_usage(index=True).sum())
+    if isinstance(value, pd.Series):
+        return int(value.memory_usage(index=True))
+    if isinstance(value, np.ndarray):
+        return value.nbytes
+    if isinstance(value, (list, tuple)):
+        return sum(estimated_bytes(v) for v in value)
+    if isinstance(value, dict):
+        return sum(estimated_bytes(v) for v in value.values())
+    return 0
 
-        try:
-            return(hash(str(item)))
-        except TypeError:
-            pass
 
+class InstanceCache:
+    """Least recently used cache of the instances of MetaclassCache classes.
+
+       Arguments:
+         max_bytes: evict instances once the estimated bytes of all cached instances
+           exceed this, None for no limit.
+         max_entries: default limit on the number of cached instances of each class,
+           None for no limit. set_limit() sets the limit of a single class.
+    """
+
+    def __init__(self, max_bytes=DEFAULT_MAX_BYTES, max_entries=None):
+        self.max_bytes = max_bytes
+        self.max_entries = max_entries
+        self._limits = {}
+        self._entries = collections.OrderedDict()  # key: (class, instance), oldest first
+        self._class_keys = collections.defaultdict(collections.OrderedDict)  # class: keys
+        self._bytes = {}
+        self._keys = {}  # id(instance): key
+        self._counts = collections.defaultdict(collections.Counter)
+        self.bytes = 0
+
+    def __len__(self):
+        return len(self._entries)
+
+    def get(self, cls, key):
+        """Cached instance of cls for key, or None."""
+        entry = self._entries.get(key)
+        if entry is None:
+            self._counts[cls]['misses'] += 1
+            return None
+        self._entries.move_to_end(key)
+        self._class_keys[cls].move_to_end(key)
+        self._counts[cls]['hits'] += 1
+        return entry[1]
+
+    def put(self, cls, key, instance):
+        """Cache instance of cls for key, evicting other instances if over the limits."""
+        self._entries[key] = (cls, instance)
+        self._class_keys[cls][key] = None
+        self._keys[id(instance)] = key
+        self._bytes[key] = 0
+        self._enforce_entries(cls)
+        self.add_bytes(instance, estimated_bytes(vars(instance)) +
+                estimated_bytes(incremental.results(instance)))
+
+    def add_bytes(self, instance, nbytes):
+        """Account for nbytes more held by instance, such as a cached method result."""
+        key = self._keys.get(id(instance))
+        if key is None:
+            return
+        self._bytes[key] += nbytes
+        self.bytes += nbytes
+        self._enforce_bytes()
+
+    def set_limit(self, cls, max_entries):
+        """Limit the number of cached instances of cls, None for no limit."""
+        self._limits[cls] = max_entries
+        self._enforce_entries(cls)
+
+    def _enforce_entries(self, cls):
+        limit = self._limits.get(cls, self.max_entries)
+        keys = self._class_keys[cls]
+        while limit is not None and len(keys) > limit:
+            self._evict(next(iter(keys)))
+
+    def _enforce_bytes(self):
+        # the most recently used instance is kept even if larger than max_bytes.
+        while self.max_bytes is not None and self.bytes > self.max_bytes and len(self) > 1:
+            self._evict(next(iter(self._entries)))
+
+    def _evict(self, key, count=True):
+        (cls, instance) = self._entries.pop(key)
+        del self._class_keys[cls][key]
+        del self._keys[id(instance)]
+        self.bytes -= self._bytes.pop(key)
+        if count:
+            self._counts[cls]['evictions'] += 1
+
+    def stats(self):
+        """Dict of class name to a dict of cached entries, estimated bytes, and the hits,
+           misses and evictions counted since the last clear()."""
+        result = {}
+        for (cls, counts) in self._counts.items():
+            keys = self._class_keys[cls]
+            result[cls.__name__] = {'entries': len(keys),
+                    'bytes': sum(self._bytes[k] for k in keys), 'hits': counts['hits'],
+                    'misses': counts['misses'], 'evictions': counts['evictions']}
+        return result
+
+    def clear(self):
+        """Drop all cached instances and reset the counts."""
+        self._entries.clear()
+        self._class_keys.clear()
+        self._bytes.clear()
+        self._keys.clear()
+        self._counts.clear()
+        self.bytes = 0
+
+    @contextlib.contextmanager
+    def scope(self):
+        """Context in which the instances newly cached are dropped again on exit."""
+        before = set(self._entries)
         try:
-            return hash(tuple(item))
-        except TypeError as e:
-            raise e
+            yield self
+        finally:
+            for key in [k for k in self._entries if k not in before]:
+                self._evict(key, count=False)
+
+
+def _count_bytes(instance, result):
+    type(instance).cache.add_bytes(instance, estimated_bytes(result))
 
 
+# Replacement for functools.lru_cache() on methods of MetaclassCache classes: results are
+# held by the instance rather than by the method, so they are released along with an
+# evicted instance, and count towards its estimated bytes.
+cached = incremental.cached(tracked=False, on_store=_count_bytes)
+
+
+# pylint is confused by the __call__ syntax
+# pylint: disable=no-value-for-parameter
+
+class MetaclassCache(type):
+
+    cache = InstanceCache()
+
     def __call__(self, *args, **kwargs):
-        key = self.hash_item(self)
-        for arg in args:
-            key = (key << 64) ^ self.hash_item(arg)
-        for arg in sorted(kwargs.keys()):
-            key = (key << 64) ^ self.hash_item(arg)
-            key = (key << 64) ^ self.hash_item(kwargs[arg])
+        """Instance for the arguments, keyed by a fingerprint of their content (see
+           model/fingerprint.py). Arguments which cannot be fingerprinted get an instance of
+           their own."""
         try:
-            return self.cache[key]
-        except KeyError:
+            key = fingerprint([self, list(args), kwargs])
+        except TypeError:
+            return type.__call__(self, *args, **kwargs)
+        instance = self.cache.get(self, key)
+        if instance is None:
             instance = type.__call__(self, *args, **kwargs)
-            self.cache[key] = instance
-            return instance
+            self.cache.put(self, key, instance)
+        return instance
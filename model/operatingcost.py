@@ -1,13 +1,109 @@
 """Operating Cost module calculations."""
 
-from functools import lru_cache
-import math
+import functools
 
 import model.dd as dd
 from model.advanced_controls import SOLUTION_CATEGORY
 import numpy as np
-import numpy_financial
 import pandas as pd
+from model.deferred import Deferred
+from model.incremental import cached
+
+
+@functools.lru_cache()
+def discount_factors(rate, num_periods):
+    """(1 + rate) ** n for n in 0..num_periods-1, shared by all NPV calculations at that rate."""
+    factors = (1 + rate) ** np.arange(0, num_periods)
+    factors.flags.writeable = False
+    return factors
+
+
+def npv_by_period(cashflow, rate, offset=1):
+    """Net Present Value of each year of a cashflow, discounted by its distance from the start.
+
+       Equivalent to numpy_financial.npv(rate, [0] * (n + offset) + [cashflow.iloc[n]]) for
+       each n, computed as one division by a cached vector of discount factors.
+
+       Arguments:
+         cashflow: Series of cash flows, one per year.
+         rate: discount rate, or a list of discount rates for sensitivity analysis.
+         offset: number of periods by which the first cash flow is discounted.
+
+       Returns a Series, or for a list of rates a DataFrame with one column per rate.
+    """
+    periods = np.maximum(np.arange(len(cashflow)) + offset, 0)
+    num_periods = int(periods.max()) + 1 if len(periods) else 0
+    values = cashflow.values.astype(np.float64)
+    if np.ndim(rate) == 0:
+        return pd.Series(values / discount_factors(rate, num_periods)[periods],
+                         index=cashflow.index.copy())
+    factors = np.stack([discount_factors(r, num_periods) for r in rate], axis=1)
+    return pd.DataFrame(values.reshape(-1, 1) / factors[periods, :],
+                        index=cashflow.index.copy(), columns=list(rate))
+
+
+def payback(cashflow):
+    """1 for each year in which the cumulative cashflow is non-negative, otherwise 0."""
+    with np.errstate(invalid='ignore'):
+        paid = cashflow.cumsum().values >= 0
+    return pd.Series(paid.astype(np.int64), index=cashflow.index.copy())
+
+
+def annual_breakout(new_funits_per_year, new_annual_iunits_reqd, lifetime_replacement,
+                    var_oper_cost_per_funit, fuel_cost_per_funit, fixed_oper_cost_per_iunit,
+                    has_var_costs, last_year, conversion_factor_vom=1.0,
+                    conversion_factor_fom=1.0):
+    """Breakout of operating cost per year and vintage, including replacements, for each
+       sample of the costs and lifetime_replacement, which are arrays with one value per
+       sample. Returns an array of (samples x years CORE_START_YEAR..2139 x vintages
+       CORE_START_YEAR..CORE_END_YEAR).
+
+       Each vintage is the units installed in that year. Within the years of interest worn
+       out equipment is assumed to be replaced, so each vintage operates for the smallest
+       multiple of lifetime_replacement which reaches last_year, with a partial final year.
+       The whole (year x vintage) band is computed at once from each vintage's age and
+       lifetime; values below one cent are zeroed.
+    """
+    first_year = dd.CORE_START_YEAR
+    rows = np.arange(first_year, 2139 + 1)
+    columns = np.arange(first_year, dd.CORE_END_YEAR + 1)
+    vintages = np.arange(first_year, last_year + 1)
+    breakout = np.zeros((len(lifetime_replacement), len(rows), len(columns)), dtype=np.float64)
+
+    # samples without operating costs have a table of 0s
+    active = np.flatnonzero(np.logical_or(has_var_costs, fixed_oper_cost_per_iunit != 0))
+    if not len(active):
+        return breakout
+    lifetime_replacement = lifetime_replacement[active]
+    assert (lifetime_replacement != 0).all(), \
+            'Cannot have a lifetime replacement of 0 and non-zero operating costs'
+
+    # within the years of interest, assume replacement of worn out equipment.
+    # Multiples are accumulated one lifetime at a time, as successive replacements are.
+    remaining_years = last_year + 1 - vintages
+    num_multiples = (remaining_years.max() / lifetime_replacement).astype(np.int64) + 2
+    multiples = np.cumsum(np.broadcast_to(lifetime_replacement.reshape(-1, 1),
+                                          (len(active), num_multiples.max())), axis=1)
+    found = (np.ceil(multiples)[:, :, np.newaxis] < remaining_years).sum(axis=1)
+    lifetime = np.take_along_axis(multiples, found, axis=1)
+
+    if has_var_costs:
+        cost = (var_oper_cost_per_funit[active] + fuel_cost_per_funit[active]).reshape(-1, 1)
+    else:
+        cost = 0
+    total = new_funits_per_year.loc[vintages].values * cost * conversion_factor_vom
+    cost = fixed_oper_cost_per_iunit[active].reshape(-1, 1)
+    total = total + new_annual_iunits_reqd.loc[vintages].values * cost * conversion_factor_fom
+
+    # operating costs for equipment purchased in each vintage year through the year
+    # where it wears out, with a partial year at the end of its lifetime.
+    age = rows.reshape(-1, 1) - vintages.reshape(1, -1)
+    remaining_lifetime = np.where(age >= 0,
+            np.clip(lifetime[:, np.newaxis, :] - age, 0, 1), 0.0)
+    with np.errstate(invalid='ignore'):
+        val = total[:, np.newaxis, :] * remaining_lifetime
+        breakout[active, :, :len(vintages)] = np.where(np.fabs(val) > 0.01, val, 0.0)
+    return breakout
 
 
 class OperatingCost:
@@ -34,6 +130,17 @@ class OperatingCost:
         there is only one solution which does this (heatpumps).
     """
 
+    # table arguments, which may be passed as callables computing the table on first use.
+    soln_net_annual_funits_adopted = Deferred()
+    soln_pds_tot_iunits_reqd = Deferred()
+    soln_ref_tot_iunits_reqd = Deferred()
+    conv_ref_annual_tot_iunits = Deferred()
+    soln_pds_annual_world_first_cost = Deferred()
+    soln_ref_annual_world_first_cost = Deferred()
+    conv_ref_annual_world_first_cost = Deferred()
+    soln_pds_install_cost_per_iunit = Deferred()
+    conv_ref_install_cost_per_iunit = Deferred()
+
     def __init__(self, ac, soln_net_annual_funits_adopted,
                  soln_pds_tot_iunits_reqd,
                  soln_ref_tot_iunits_reqd,
@@ -64,17 +171,17 @@ class OperatingCost:
             self.conversion_factor_vom = conversion_factor
 
 
-    @lru_cache()
+    @cached
     def soln_pds_annual_operating_cost(self):
         """Total operating cost per year.
            SolarPVUtil 'Operating Cost'!D19:D64
         """
-        result = self.soln_pds_annual_breakout().sum(axis=1)
+        result = self.soln_pds_annual_breakout_total().copy()
         result.name = 'soln_pds_annual_operating_cost'
         return result
 
 
-    @lru_cache()
+    @cached
     def soln_pds_cumulative_operating_cost(self):
         """Cumulative operating cost.
            SolarPVUtil 'Operating Cost'!E19:E64
@@ -84,17 +191,18 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def conv_ref_annual_operating_cost(self):
         """Total operating cost per year.
            SolarPVUtil 'Operating Cost'!K19:K64
         """
-        result = self.conv_ref_annual_breakout_core().sum(axis=1)
+        total = self.conv_ref_annual_breakout_total()
+        result = total.loc[dd.CORE_START_YEAR:dd.CORE_END_YEAR].copy()
         result.name = 'conv_ref_annual_operating_cost'
         return result
 
 
-    @lru_cache()
+    @cached
     def conv_ref_cumulative_operating_cost(self):
         """Cumulative operating cost.
            SolarPVUtil 'Operating Cost'!L19:L64
@@ -104,7 +212,7 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def marginal_annual_operating_cost(self):
         """Marginal operating cost, difference between soln_pds and conv_ref.
            SolarPVUtil 'Operating Cost'!D69:D114
@@ -114,7 +222,7 @@ class OperatingCost:
         return result.dropna()
 
 
-    @lru_cache()
+    @cached
     def soln_pds_new_funits_per_year(self):
         """New functional units required each year.
            SolarPVUtil 'Operating Cost'!F19:F64
@@ -125,7 +233,7 @@ class OperatingCost:
         return growth.sort_index()
 
 
-    @lru_cache()
+    @cached
     def soln_pds_net_annual_iunits_reqd(self):
         """Total implementation units required each year.
            SolarPVUtil 'Operating Cost'!I531:I576
@@ -135,7 +243,7 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def soln_pds_new_annual_iunits_reqd(self):
         """New implementation units required each year.
            SolarPVUtil 'Operating Cost'!K531:K576
@@ -146,7 +254,7 @@ class OperatingCost:
         return delta
 
 
-    @lru_cache()
+    @cached
     def soln_pds_annual_breakout(self):
         """Operating costs broken out per year for Solution-PDS
            This table calculates the contribution of each new set of SOLUTION
@@ -155,6 +263,23 @@ class OperatingCost:
            Fixed and Variable costs that are constant or changing over time are included.
            SolarPVUtil 'Operating Cost'!B262:AV386
         """
+        result = self._annual_breakout(**self._soln_pds_breakout_args())
+        result.name = 'soln_pds_annual_breakout'
+        return result
+
+
+    @cached
+    def soln_pds_annual_breakout_total(self):
+        """Total of soln_pds_annual_breakout for each year, without building the table.
+           SolarPVUtil 'Operating Cost'!B262:AV386 summed across each row
+        """
+        result = self._annual_breakout(**self._soln_pds_breakout_args(), sum_only=True)
+        result.name = 'soln_pds_annual_breakout_total'
+        return result
+
+
+    def _soln_pds_breakout_args(self):
+        """Arguments to _annual_breakout for Solution-PDS."""
         if (self.ac.solution_category == SOLUTION_CATEGORY.LAND or
                 self.ac.solution_category == SOLUTION_CATEGORY.OCEAN):
             new_land_units_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
@@ -164,24 +289,21 @@ class OperatingCost:
             new_funits_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
             new_annual_iunits_reqd = self.soln_pds_new_annual_iunits_reqd().loc[:, 'World']
 
-        result = self._annual_breakout(
-            new_funits_per_year=new_funits_per_year,
-            new_annual_iunits_reqd=new_annual_iunits_reqd,
-            lifetime_replacement=self.ac.soln_lifetime_replacement,
-            var_oper_cost_per_funit=self.ac.soln_var_oper_cost_per_funit,
-            fuel_cost_per_funit=self.ac.soln_fuel_cost_per_funit,
-            fixed_oper_cost_per_iunit=self.ac.soln_fixed_oper_cost_per_iunit)
-        result.name = 'soln_pds_annual_breakout'
-        return result
+        return dict(new_funits_per_year=new_funits_per_year,
+                    new_annual_iunits_reqd=new_annual_iunits_reqd,
+                    lifetime_replacement=self.ac.soln_lifetime_replacement,
+                    var_oper_cost_per_funit=self.ac.soln_var_oper_cost_per_funit,
+                    fuel_cost_per_funit=self.ac.soln_fuel_cost_per_funit,
+                    fixed_oper_cost_per_iunit=self.ac.soln_fixed_oper_cost_per_iunit)
 
 
-    @lru_cache()
+    @cached
     def soln_pds_annual_breakout_core(self):
         """Returns soln_pds_annual_breakout for CORE_START_YEAR:CORE_END_YEAR"""
         return self.soln_pds_annual_breakout().loc[dd.CORE_START_YEAR:dd.CORE_END_YEAR]
 
 
-    @lru_cache()
+    @cached
     def conv_ref_new_annual_iunits_reqd(self):
         """New implementation units required each year.
            SolarPVUtil 'Operating Cost'!L531:L576
@@ -192,7 +314,7 @@ class OperatingCost:
         return delta
 
 
-    @lru_cache()
+    @cached
     def conv_ref_annual_breakout(self):
         """Operating costs broken out per year for Conventional-REF
            This table calculates the contribution of each new set of CONVENTIONAL
@@ -201,6 +323,23 @@ class OperatingCost:
            Fixed and Variable costs that are constant or changing over time are included.
            SolarPVUtil 'Operating Cost'!B399:AV523
         """
+        result = self._annual_breakout(**self._conv_ref_breakout_args())
+        result.name = 'conv_ref_annual_breakout'
+        return result
+
+
+    @cached
+    def conv_ref_annual_breakout_total(self):
+        """Total of conv_ref_annual_breakout for each year, without building the table.
+           SolarPVUtil 'Operating Cost'!B399:AV523 summed across each row
+        """
+        result = self._annual_breakout(**self._conv_ref_breakout_args(), sum_only=True)
+        result.name = 'conv_ref_annual_breakout_total'
+        return result
+
+
+    def _conv_ref_breakout_args(self):
+        """Arguments to _annual_breakout for Conventional-REF."""
         if (self.ac.solution_category == SOLUTION_CATEGORY.LAND or
                 self.ac.solution_category == SOLUTION_CATEGORY.OCEAN):
             new_land_units_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
@@ -210,18 +349,15 @@ class OperatingCost:
             new_funits_per_year = self.soln_pds_new_funits_per_year().loc[:, 'World']
             new_annual_iunits_reqd = self.conv_ref_new_annual_iunits_reqd().loc[:, 'World']
 
-        result = self._annual_breakout(
-            new_funits_per_year=new_funits_per_year,
-            new_annual_iunits_reqd=new_annual_iunits_reqd,
-            lifetime_replacement=self.ac.soln_lifetime_replacement,
-            var_oper_cost_per_funit=self.ac.conv_var_oper_cost_per_funit,
-            fuel_cost_per_funit=self.ac.conv_fuel_cost_per_funit,
-            fixed_oper_cost_per_iunit=self.ac.conv_fixed_oper_cost_per_iunit)
-        result.name = 'conv_ref_annual_breakout'
-        return result
+        return dict(new_funits_per_year=new_funits_per_year,
+                    new_annual_iunits_reqd=new_annual_iunits_reqd,
+                    lifetime_replacement=self.ac.soln_lifetime_replacement,
+                    var_oper_cost_per_funit=self.ac.conv_var_oper_cost_per_funit,
+                    fuel_cost_per_funit=self.ac.conv_fuel_cost_per_funit,
+                    fixed_oper_cost_per_iunit=self.ac.conv_fixed_oper_cost_per_iunit)
 
 
-    @lru_cache()
+    @cached
     def conv_ref_annual_breakout_core(self):
         """Returns conv_ref_annual_breakout for CORE_START_YEAR:CORE_END_YEAR"""
         return self.conv_ref_annual_breakout().loc[dd.CORE_START_YEAR:dd.CORE_END_YEAR]
@@ -229,50 +365,38 @@ class OperatingCost:
 
     def _annual_breakout(self, new_funits_per_year, new_annual_iunits_reqd,
                          lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit,
-                         fixed_oper_cost_per_iunit):
+                         fixed_oper_cost_per_iunit, sum_only=False):
         """Breakout of operating cost per year, including replacements.
            Supplies calculations for:
            SolarPVUtil 'Operating Cost'!B262:AV386 for soln_pds
            SolarPVUtil 'Operating Cost'!B399:AV523 for conv_ref
+
+           Computed by annual_breakout() for the single set of costs of the
+           AdvancedControls. If sum_only is True, returns only the total per year (the row
+           sums) as a Series.
         """
-        first_year = dd.CORE_START_YEAR
-        last_year = self.ac.report_end_year
-        last_column = dd.CORE_END_YEAR
-        last_row = 2139
-        breakout = pd.DataFrame(0, index=np.arange(first_year, last_row + 1),
-                                columns=np.arange(first_year, last_column + 1), dtype='float')
+        def values(cost):
+            return np.array([np.nan if cost is None else cost], dtype=np.float64)
+
+        breakout = annual_breakout(new_funits_per_year, new_annual_iunits_reqd,
+                lifetime_replacement=values(lifetime_replacement),
+                var_oper_cost_per_funit=values(var_oper_cost_per_funit),
+                fuel_cost_per_funit=values(fuel_cost_per_funit),
+                fixed_oper_cost_per_iunit=values(fixed_oper_cost_per_iunit or 0.0),
+                has_var_costs=self.ac.has_var_costs, last_year=self.ac.report_end_year,
+                conversion_factor_vom=self.conversion_factor_vom,
+                conversion_factor_fom=self.conversion_factor_fom)[0]
+        rows = np.arange(dd.CORE_START_YEAR, 2139 + 1)
+        if sum_only:
+            return pd.Series(breakout.sum(axis=1), index=pd.Index(rows, name='Year'))
+        breakout = pd.DataFrame(breakout, index=rows,
+                columns=np.arange(dd.CORE_START_YEAR, dd.CORE_END_YEAR + 1), dtype='float')
         breakout.index.name = 'Year'
         breakout.index = breakout.index.astype(int)
-
-        # if there are no operating costs we return a table of 0s
-        if not self.ac.has_var_costs and not fixed_oper_cost_per_iunit:
-            return breakout
-
-        for year in range(first_year, last_year + 1):
-            # within the years of interest, assume replacement of worn out equipment.
-            lifetime = lifetime_replacement
-            assert lifetime_replacement != 0, 'Cannot have a lifetime replacement of 0 and non-zero operating costs'
-            while math.ceil(lifetime) < (last_year + 1 - year):
-                lifetime += lifetime_replacement
-
-            cost = var_oper_cost_per_funit + fuel_cost_per_funit if self.ac.has_var_costs else 0
-            total = new_funits_per_year.loc[year] * cost * self.conversion_factor_vom
-            cost = fixed_oper_cost_per_iunit
-            total += new_annual_iunits_reqd.loc[year] * cost * self.conversion_factor_fom
-
-            # for each year, add in operating costs for equipment purchased in that
-            # starting year through the year where it wears out.
-            for row in range(year, last_row + 1):
-                remaining_lifetime = np.clip(lifetime, 0, 1)
-                val = total * remaining_lifetime
-                breakout.loc[row, year] = val if math.fabs(val) > 0.01 else 0.0
-                lifetime -= 1
-                if lifetime <= 0:
-                    break
         return breakout
 
 
-    @lru_cache()
+    @cached
     def soln_marginal_first_cost(self):
         """Marginal First Cost.
            SolarPVUtil 'Operating Cost'!B126:B250
@@ -287,13 +411,13 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def soln_marginal_operating_cost_savings(self):
         """Marginal First Cost.
            SolarPVUtil 'Operating Cost'!C126:C250
         """
-        conv_ref_lifetime_cost = self.conv_ref_annual_breakout().sum(axis=1)
-        soln_pds_lifetime_cost = self.soln_pds_annual_breakout().sum(axis=1)
+        conv_ref_lifetime_cost = self.conv_ref_annual_breakout_total()
+        soln_pds_lifetime_cost = self.soln_pds_annual_breakout_total()
         result = conv_ref_lifetime_cost - soln_pds_lifetime_cost
         index = pd.RangeIndex(result.first_valid_index(), 2140)
         result = result.reindex(index)
@@ -301,7 +425,7 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def soln_net_cash_flow(self):
         """Marginal First Cost.
            SolarPVUtil 'Operating Cost'!D126:D250
@@ -313,22 +437,61 @@ class OperatingCost:
         return result
 
 
-    @lru_cache()
+    @cached
     def soln_net_present_value(self):
         """Marginal First Cost.
            SolarPVUtil 'Operating Cost'!E126:E250
         """
-        npv = []
-        net_cash_flow = self.soln_net_cash_flow()
-        for n in range(len(net_cash_flow.index)):
-            l = [0] * (n + 1) + [net_cash_flow.iloc[n]]
-            npv.append(numpy_financial.npv(rate=self.ac.npv_discount_rate, values=l))
-        result = pd.Series(npv, index=net_cash_flow.index)
+        result = npv_by_period(self.soln_net_cash_flow(), rate=self.ac.npv_discount_rate)
         result.name = 'soln_net_present_value'
         return result
 
 
-    @lru_cache()
+    def soln_net_present_value_for_rates(self, rates):
+        """soln_net_present_value for each of a list of discount rates, one column per rate."""
+        return npv_by_period(self.soln_net_cash_flow(), rate=rates)
+
+
+    def _single_iunit_lifetime(self):
+        """Years covered by the single iunit cashflows, with the solution lifetime remaining.
+
+           Returns (years, lifetime, active): lifetime is the solution iunit lifetime
+           remaining at the start of each year, active marks the years in which the unit is
+           still operating (up to the later of CORE_END_YEAR and the end of its lifetime).
+        """
+        first_year = dd.CORE_START_YEAR
+        last_year = max(dd.CORE_END_YEAR,
+                dd.CORE_START_YEAR + self.ac.soln_lifetime_replacement_rounded)
+        last_row = 2139
+        years = np.arange(first_year, last_row + 1)
+        lifetime = self.ac.soln_lifetime_replacement - (years - first_year)
+        active = np.logical_and.accumulate(~(lifetime <= 0)) & (years <= last_year)
+        return (years, lifetime, active)
+
+
+    def _single_iunit_operating_cost_delta(self, conv_usage_mult):
+        """Annual difference in fixed + variable operating cost, conventional versus solution."""
+        # Difference in fixed operating cost of conventional versus that of solution
+        cost = (self.ac.conv_fixed_oper_cost_per_iunit * conv_usage_mult -
+                self.ac.soln_fixed_oper_cost_per_iunit) * self.conversion_factor_fom
+        # Difference in variable operating cost of conventional versus that of solution
+        if self.ac.has_var_costs:
+            conv_var_cost = self.ac.conv_var_oper_cost_per_funit + self.ac.conv_fuel_cost_per_funit
+            soln_var_cost = self.ac.soln_var_oper_cost_per_funit + self.ac.soln_fuel_cost_per_funit
+            variable = (self.ac.soln_avg_annual_use * conv_var_cost -
+                        self.ac.soln_avg_annual_use * soln_var_cost) * self.conversion_factor_vom
+        else:
+            variable = 0.0
+        return (cost, variable)
+
+
+    def _conv_usage_mult(self):
+        if self.ac.soln_avg_annual_use is not None and self.ac.conv_avg_annual_use is not None:
+            return self.ac.soln_avg_annual_use / self.ac.conv_avg_annual_use  # RRS
+        return 1  # LAND
+
+
+    @cached
     def soln_vs_conv_single_iunit_cashflow(self):
         """Estimate the cash flows for a single solution implementation unit while matching
            the output of that unit (in functional units) with the equivalent output of a
@@ -339,190 +502,154 @@ class OperatingCost:
                appropriately in each case).
            SolarPVUtil 'Operating Cost'!I126:I250
         """
-        first_year = dd.CORE_START_YEAR
-        last_year = max(dd.CORE_END_YEAR,
-                dd.CORE_START_YEAR + self.ac.soln_lifetime_replacement_rounded)
-        last_row = 2139
-        result = pd.Series(0, index=np.arange(first_year, last_row + 1), dtype='float')
-        result.index.name = 'Year'
-        result.index = result.index.astype(int)
-        result.name = 'soln_vs_conv_single_iunit_cashflow'
-
-        soln_lifetime = self.ac.soln_lifetime_replacement
-        if self.ac.soln_avg_annual_use is not None and self.ac.conv_avg_annual_use is not None:
-            conv_usage_mult = self.ac.soln_avg_annual_use / self.ac.conv_avg_annual_use  # RRS
+        (years, lifetime, active) = self._single_iunit_lifetime()
+        first_year = years[0]
+        conv_usage_mult = self._conv_usage_mult()
+        conv_lifetime = self.ac.conv_lifetime_replacement
+        no_conv_lifetime = conv_lifetime is None or conv_lifetime == 0
+
+        cost = np.zeros(len(years), dtype=np.float64)
+        if not no_conv_lifetime:
+            # A new conventional iunit is costed as many times as needed to cover the
+            # lifetime and output of a solution iunit.
+            remainder = np.mod(years - (first_year - 1), conv_lifetime)
+            replacement = active & (remainder <= 1) & (remainder > 0)
+            soln_first_cost = (self.ac.soln_lifetime_replacement - (years - first_year) + 0)
+            soln_first_cost = soln_first_cost / conv_lifetime
+            cost_year = np.minimum(dd.CORE_END_YEAR,
+                                   years + (self.single_iunit_purchase_year - dd.CORE_START_YEAR))
+            install_cost = self.conv_ref_install_cost_per_iunit
+            idx = install_cost.index.get_indexer(cost_year)
+            conv_install = np.where(idx >= 0, install_cost.values[idx], np.nan)
+            conv_cost = (conv_install * conv_usage_mult *
+                         np.where(soln_first_cost < 1, soln_first_cost, 1))
+            cost = cost + np.where(replacement, conv_cost, 0.0)
+
+        # account for the cost of the solution iunit in the first year.
+        cost[0] -= self.soln_pds_install_cost_per_iunit.loc[self.single_iunit_purchase_year]
+
+        (fixed, variable) = self._single_iunit_operating_cost_delta(conv_usage_mult)
+        cost = cost + fixed
+        if self.ac.has_var_costs:
+            cost = cost + variable
+
+        # account for a partial year at the end of the lifetime.
+        cost = cost * np.where(lifetime < 1, lifetime, 1)
+        if no_conv_lifetime:
+            values = np.where(active, np.nan, 0.0)
         else:
-            conv_usage_mult = 1  # LAND
-
-        for year in range(first_year, last_year + 1):
-            cost = 0
-            if soln_lifetime <= 0:
-                break
-            if self.ac.conv_lifetime_replacement is None or self.ac.conv_lifetime_replacement == 0:
-                remainder = 0
-            else:
-                remainder = (year - (first_year - 1)) % self.ac.conv_lifetime_replacement
-            if remainder <= 1 and remainder > 0:
-                # A new conventional iunit is costed as many times as needed to cover the
-                # lifetime and output of a solution iunit.
-                soln_first_cost = (self.ac.soln_lifetime_replacement - (year - first_year) + 0)
-                soln_first_cost /= self.ac.conv_lifetime_replacement
-                cost_year = min(dd.CORE_END_YEAR,
-                                year + (self.single_iunit_purchase_year - dd.CORE_START_YEAR))
-                cost += (self.conv_ref_install_cost_per_iunit[cost_year] * conv_usage_mult *
-                         min(1, soln_first_cost))
-
-            if year == first_year:
-                # account for the cost of the solution iunit in the first year.
-                cost -= self.soln_pds_install_cost_per_iunit.loc[self.single_iunit_purchase_year]
-
-            # Difference in fixed operating cost of conventional versus that of solution
-            cost += (self.ac.conv_fixed_oper_cost_per_iunit * conv_usage_mult -
-                     self.ac.soln_fixed_oper_cost_per_iunit) * self.conversion_factor_fom
-
-            # Difference in variable operating cost of conventional versus that of solution
-            if self.ac.has_var_costs:
-                conv_var_cost = self.ac.conv_var_oper_cost_per_funit + self.ac.conv_fuel_cost_per_funit
-                soln_var_cost = self.ac.soln_var_oper_cost_per_funit + self.ac.soln_fuel_cost_per_funit
-                cost += (self.ac.soln_avg_annual_use * conv_var_cost - self.ac.soln_avg_annual_use *
-                        soln_var_cost) * self.conversion_factor_vom
-
-            # account for a partial year at the end of the lifetime.
-            cost *= min(1, soln_lifetime)
-            if self.ac.conv_lifetime_replacement is None or self.ac.conv_lifetime_replacement == 0:
-                result[year] = np.nan
-            elif math.fabs(cost) < 0.01:
-                result[year] = 0.0
-            else:
-                result[year] = cost
-
-            soln_lifetime -= 1
-
+            with np.errstate(invalid='ignore'):
+                values = np.where(active & ~(np.fabs(cost) < 0.01), cost, 0.0)
+        result = pd.Series(values, index=pd.Index(years, name='Year'), dtype='float')
+        result.name = 'soln_vs_conv_single_iunit_cashflow'
         return result
 
 
 
-    @lru_cache()
+    @cached
     def soln_vs_conv_single_iunit_npv(self):
         """Net Present Value of single iunit cashflow.
            SolarPVUtil 'Operating Cost'!J126:J250
         """
-        npv = []
         svcsic = self.soln_vs_conv_single_iunit_cashflow()
         offset = self.single_iunit_purchase_year - svcsic.first_valid_index() + 1
-        for n in range(len(svcsic.index)):
-            l = [0] * (n + offset) + [svcsic.iloc[n]]
-            npv.append(numpy_financial.npv(rate=self.ac.npv_discount_rate, values=l))
-        result = pd.Series(npv, index=svcsic.index.copy())
+        result = npv_by_period(svcsic, rate=self.ac.npv_discount_rate, offset=offset)
         result.name = 'soln_vs_conv_single_iunit_npv'
         return result
 
 
+    def soln_vs_conv_single_iunit_npv_for_rates(self, rates):
+        """soln_vs_conv_single_iunit_npv for each of a list of discount rates."""
+        svcsic = self.soln_vs_conv_single_iunit_cashflow()
+        offset = self.single_iunit_purchase_year - svcsic.first_valid_index() + 1
+        return npv_by_period(svcsic, rate=rates, offset=offset)
 
-    @lru_cache()
+
+
+    @cached
     def soln_vs_conv_single_iunit_payback(self):
         """Whether the solution has paid off versus the conventional, for each year.
            SolarPVUtil 'Operating Cost'!K126:K250
         """
-        result = self.soln_vs_conv_single_iunit_cashflow().cumsum().apply(lambda x: 1 if x >= 0 else 0)
+        result = payback(self.soln_vs_conv_single_iunit_cashflow())
         result.name = 'soln_vs_conv_single_iunit_payback'
         return result
 
 
 
-    @lru_cache()
+    @cached
     def soln_vs_conv_single_iunit_payback_discounted(self):
         """Whether the solution NPV has paid off versus the conventional, for each year.
            SolarPVUtil 'Operating Cost'!L126:L250
         """
-        result = self.soln_vs_conv_single_iunit_npv().cumsum().apply(lambda x: 1 if x >= 0 else 0)
+        result = payback(self.soln_vs_conv_single_iunit_npv())
         result.name = 'soln_vs_conv_single_iunit_payback_discounted'
         return result
 
 
 
-    @lru_cache()
+    @cached
     def soln_only_single_iunit_cashflow(self):
         """
            SolarPVUtil 'Operating Cost'!M126:M250
         """
-        first_year = dd.CORE_START_YEAR
-        last_year = max(dd.CORE_END_YEAR,
-                dd.CORE_START_YEAR + self.ac.soln_lifetime_replacement_rounded)
-        last_row = 2139
-        result = pd.Series(0, index=np.arange(first_year, last_row + 1), dtype='float')
-        result.index.name = 'Year'
-        result.index = result.index.astype(int)
+        (years, lifetime, active) = self._single_iunit_lifetime()
+        cost = np.zeros(len(years), dtype=np.float64)
+
+        # account for the cost of the solution iunit in the first year.
+        cost[0] -= self.soln_pds_install_cost_per_iunit.loc[self.single_iunit_purchase_year]
+
+        (fixed, variable) = self._single_iunit_operating_cost_delta(self._conv_usage_mult())
+        cost = cost + fixed
+        if self.ac.has_var_costs:
+            cost = cost + variable
+
+        # account for a partial year at the end of the lifetime.
+        cost = cost * np.where(lifetime < 1, lifetime, 1)
+        with np.errstate(invalid='ignore'):
+            values = np.where(active & (np.fabs(cost) > 0.01), cost, 0.0)
+        result = pd.Series(values, index=pd.Index(years, name='Year'), dtype='float')
         result.name = 'soln_only_single_iunit_cashflow'
-
-        soln_lifetime = self.ac.soln_lifetime_replacement
-        if self.ac.soln_avg_annual_use is not None and self.ac.conv_avg_annual_use is not None:
-            conv_usage_mult = self.ac.soln_avg_annual_use / self.ac.conv_avg_annual_use  # RRS
-        else:
-            conv_usage_mult = 1  # LAND
-
-        for year in range(first_year, last_year + 1):
-            cost = 0
-            if soln_lifetime <= 0:
-                break
-
-            if year == first_year:
-                # account for the cost of the solution iunit in the first year.
-                cost -= self.soln_pds_install_cost_per_iunit.loc[self.single_iunit_purchase_year]
-
-            # Difference in fixed operating cost of conventional versus that of solution
-            cost += (self.ac.conv_fixed_oper_cost_per_iunit * conv_usage_mult -
-                     self.ac.soln_fixed_oper_cost_per_iunit) * self.conversion_factor_fom
-
-            # Difference in variable operating cost of conventional versus that of solution
-            if self.ac.has_var_costs:
-                conv_var_cost = self.ac.conv_var_oper_cost_per_funit + self.ac.conv_fuel_cost_per_funit
-                soln_var_cost = self.ac.soln_var_oper_cost_per_funit + self.ac.soln_fuel_cost_per_funit
-                cost += (self.ac.soln_avg_annual_use * conv_var_cost -
-                         self.ac.soln_avg_annual_use * soln_var_cost) * self.conversion_factor_vom
-
-            # account for a partial year at the end of the lifetime.
-            cost *= min(1, soln_lifetime)
-            result[year] = cost if math.fabs(cost) > 0.01 else 0.0
-
-            soln_lifetime -= 1
         return result
 
 
 
-    @lru_cache()
+    @cached
     def soln_only_single_iunit_npv(self):
         """Net Present Value of single iunit cashflow, looking only at costs of the Solution.
            SolarPVUtil 'Operating Cost'!N126:N250
         """
-        npv = []
         sosic = self.soln_only_single_iunit_cashflow()
         offset = self.single_iunit_purchase_year - sosic.first_valid_index() + 1
-        for n in range(len(sosic.index)):
-            l = [0] * (n + offset) + [sosic.iloc[n]]
-            npv.append(numpy_financial.npv(rate=self.ac.npv_discount_rate, values=l))
-        result = pd.Series(npv, index=sosic.index.copy())
+        result = npv_by_period(sosic, rate=self.ac.npv_discount_rate, offset=offset)
         result.name = 'soln_only_single_iunit_npv'
         return result
 
 
+    def soln_only_single_iunit_npv_for_rates(self, rates):
+        """soln_only_single_iunit_npv for each of a list of discount rates."""
+        sosic = self.soln_only_single_iunit_cashflow()
+        offset = self.single_iunit_purchase_year - sosic.first_valid_index() + 1
+        return npv_by_period(sosic, rate=rates, offset=offset)
+
+
 
-    @lru_cache()
+    @cached
     def soln_only_single_iunit_payback(self):
         """Whether the solution has paid off, for each year.
            SolarPVUtil 'Operating Cost'!O126:O250
         """
-        result = self.soln_only_single_iunit_cashflow().cumsum().apply(lambda x: 1 if x >= 0 else 0)
+        result = payback(self.soln_only_single_iunit_cashflow())
         result.name = 'soln_only_single_iunit_payback'
         return result
 
 
 
-    @lru_cache()
+    @cached
     def soln_only_single_iunit_payback_discounted(self):
         """Whether the solution NPV has paid off, for each year.
            SolarPVUtil 'Operating Cost'!P126:P250
         """
-        result = self.soln_only_single_iunit_npv().cumsum().apply(lambda x: 1 if x >= 0 else 0)
+        result = payback(self.soln_only_single_iunit_npv())
         result.name = 'soln_only_single_iunit_payback_discounted'
         return result
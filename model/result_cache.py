@@ -0,0 +1,340 @@
+"""Persistent cache of the key result tables of solution scenarios.
+
+Computing the results of a Scenario takes the same time in every new process, even when
+neither the scenario nor its inputs have changed. ResultCache stores the tables listed in
+RESULTS for each scenario computed through it, one compressed .npz file per scenario,
+keyed by a fingerprint of:
+  - the AdvancedControls of the scenario (which covers the scenario JSON and VMA data),
+  - the content of the files under data/ and under the directory of the solution,
+  - the model code version: the content of model/*.py and solution/*.py and of every
+    project module they import, such as tools/vma_xls_extract.py, and the versions of
+    pandas, numpy and fair.
+A change to any of these changes the key, so stale results are never used. Entries left
+behind by such changes can be listed and pruned with tools/result_cache.py.
+
+The cache is opt-in, results are only stored and looked up through ResultCache.results():
+
+    cache = model.result_cache.ResultCache()
+    tables = cache.results(solution.solarpvutil.Scenario, scenario_name)
+    tables['c2.co2eq_mmt_reduced']
+"""
+
+import ast
+import functools
+import json
+import os
+import pathlib
+import sys
+import tempfile
+import time
+
+import fair
+import numpy as np
+import pandas as pd
+
+from model import source_store
+from model.fingerprint import fingerprint
+
+
+ROOT_PATH = pathlib.Path(__file__).parents[1]
+CACHE_PATH = ROOT_PATH.joinpath('.result_cache')
+CACHE_VERSION = 1
+
+# (module attribute of the Scenario, method) of each table stored.
+RESULTS = [
+    ('ua', 'soln_net_annual_funits_adopted'),
+    ('ua', 'soln_pds_tot_iunits_reqd'),
+    ('ua', 'soln_pds_new_iunits_reqd'),
+    ('ua', 'conv_ref_tot_iunits'),
+    ('fc', 'soln_pds_annual_world_first_cost'),
+    ('fc', 'soln_ref_annual_world_first_cost'),
+    ('fc', 'conv_ref_annual_world_first_cost'),
+    ('oc', 'soln_marginal_first_cost'),
+    ('oc', 'soln_marginal_operating_cost_savings'),
+    ('oc', 'soln_net_cash_flow'),
+    ('oc', 'soln_net_present_value'),
+    ('c2', 'co2_mmt_reduced'),
+    ('c2', 'co2eq_mmt_reduced'),
+    ('c2', 'co2_ppm_calculator'),
+    ('c2', 'FaIR_CFT'),
+]
+
+_digests = {}
+
+
+def _files_digest(paths):
+    """Fingerprint of the relative path and content of each file under paths.
+
+       Files are only read again when their size or modification time has changed, so
+       this is cheap enough to call for every lookup.
+    """
+    root = str(ROOT_PATH) + os.sep
+    files = []
+    for path in paths:
+        path = str(path)
+        if os.path.isdir(path):
+            candidates = []
+            for (dirpath, dirnames, filenames) in os.walk(path):
+                dirnames[:] = [d for d in dirnames if d not in ('__pycache__', 'tests')]
+                candidates.extend(os.path.join(dirpath, f) for f in filenames)
+        else:
+            candidates = [path]
+        for filename in candidates:
+            stat = os.stat(filename)
+            memo = _digests.get(filename)
+            if memo is None or memo[:2] != (stat.st_size, stat.st_mtime_ns):
+                memo = (stat.st_size, stat.st_mtime_ns, source_store.file_digest(filename))
+                _digests[filename] = memo
+            files.append((filename[len(root):].replace(os.sep, '/'), memo[2]))
+    return fingerprint(sorted(files))
+
+
+def _module_file(name):
+    """File of the project module name, or None if it is not part of the project."""
+    path = ROOT_PATH.joinpath(*name.split('.'))
+    for filename in (path.with_suffix('.py'), path.joinpath('__init__.py')):
+        if filename.is_file():
+            return filename
+    return None
+
+
+@functools.lru_cache()
+def _project_modules():
+    """model/*.py and solution/*.py, and the project modules they import directly or
+       indirectly. The solution directories are left out, data_version() covers them."""
+    pending = sorted(ROOT_PATH.joinpath('model').glob('*.py')) + sorted(
+            ROOT_PATH.joinpath('solution').glob('*.py'))
+    solution_path = ROOT_PATH.joinpath('solution')
+    found = set()
+    while pending:
+        filename = pending.pop()
+        if filename in found:
+            continue
+        found.add(filename)
+        for node in ast.walk(ast.parse(filename.read_bytes())):
+            if isinstance(node, ast.Import):
+                names = [alias.name for alias in node.names]
+            elif isinstance(node, ast.ImportFrom) and node.module and not node.level:
+                names = [node.module] + [f'{node.module}.{alias.name}' for alias in node.names]
+            else:
+                continue
+            for name in names:
+                module = _module_file(name)
+                if module is not None and module.parent.parent != solution_path:
+                    pending.append(module)
+    return sorted(found)
+
+
+def code_version():
+    """Fingerprint of the model code and of the libraries computing the results."""
+    return fingerprint([_files_digest(_project_modules()), pd.__version__, np.__version__,
+        fair.__version__])
+
+
+def data_version(name):
+    """Fingerprint of the files under data/ and of the directory of solution name."""
+    return _files_digest([ROOT_PATH.joinpath('data'), ROOT_PATH.joinpath('solution', name)])
+
+
+def compute(obj, tables=None):
+    """Dict of 'module.method' to table for Scenario obj, of tables or of all RESULTS.
+
+       Tables the solution does not have, because its Scenario has no such module or the
+       module no such method, are left out. Errors computing a table are raised.
+    """
+    if tables is None:
+        tables = [f'{module}.{method}' for (module, method) in RESULTS]
+    result = {}
+    for table in tables:
+        (module, method) = table.split('.')
+        method = getattr(getattr(obj, module, None), method, None)
+        if method is not None:
+            result[table] = method()
+    return result
+
+
+def _encode(table):
+    """(meta, arrays) for a float table with flat labels, or None if unsupported."""
+    if isinstance(table, pd.Series):
+        meta = {'kind': 'Series', 'name': table.name}
+    elif isinstance(table, pd.DataFrame) and not isinstance(table.columns, pd.MultiIndex):
+        meta = {'kind': 'DataFrame', 'columns': table.columns.tolist(),
+                'columns_name': table.columns.name}
+    else:
+        return None
+    index = table.index
+    if isinstance(index, pd.MultiIndex) or not all(str(d) == 'float64' for d in
+            (table.dtypes if meta['kind'] == 'DataFrame' else [table.dtype])):
+        return None
+    meta['index_name'] = index.name
+    arrays = {'values': table.to_numpy()}
+    if isinstance(index, pd.RangeIndex):
+        meta['range'] = [index.start, index.stop, index.step]
+    elif index.dtype != object:
+        arrays['index'] = index.to_numpy()
+    else:
+        return None
+    try:
+        json.dumps(meta)
+    except TypeError:
+        return None
+    return (meta, arrays)
+
+
+def _decode(meta, arrays):
+    if 'range' in meta:
+        index = pd.RangeIndex(*meta['range'], name=meta['index_name'])
+    else:
+        index = pd.Index(arrays['index'], name=meta['index_name'])
+    if meta['kind'] == 'Series':
+        return pd.Series(arrays['values'], index=index, name=meta['name'])
+    columns = pd.Index(meta['columns'], name=meta['columns_name'])
+    return pd.DataFrame(arrays['values'], index=index, columns=columns)
+
+
+def _identical(a, b):
+    try:
+        if isinstance(a, pd.Series):
+            pd.testing.assert_series_equal(a, b, check_exact=True, check_index_type=True)
+        else:
+            pd.testing.assert_frame_equal(a, b, check_exact=True, check_index_type=True,
+                    check_column_type=True)
+    except AssertionError:
+        return False
+    return True
+
+
+class ResultCache:
+    """Directory of stored scenario results.
+
+       Arguments:
+         path: directory holding the cache, created when first storing results.
+    """
+
+    def __init__(self, path=CACHE_PATH):
+        self.path = pathlib.Path(path)
+        self.hits = 0
+        self.misses = 0
+
+    def key(self, name, scenario, ac):
+        """Cache key of the results of scenario of solution name, with AdvancedControls ac."""
+        return fingerprint([name, scenario, ac.fingerprint(), code_version(),
+            data_version(name)])
+
+    def results(self, constructor, scenario=None):
+        """Dict of 'module.method' to table for the RESULTS of scenario, loaded from the
+           cache, or computed by constructing the Scenario and then stored.
+        """
+        name = constructor.__module__.split('.')[-1]
+        scenarios = sys.modules[constructor.__module__].scenarios
+        if scenario is None:
+            scenario = list(scenarios.keys())[0]
+        key = self.key(name=name, scenario=scenario, ac=scenarios[scenario])
+        tables = self.load(key)
+        if tables is not None:
+            self.hits += 1
+            return tables
+        self.misses += 1
+        tables = compute(constructor(scenario=scenario))
+        self.store(key, tables, meta={'solution': name, 'scenario': scenario,
+            'code_version': code_version(), 'data_version': data_version(name)})
+        return tables
+
+    def load(self, key):
+        """Dict of stored tables for key, or None."""
+        filename = self.path.joinpath(key + '.npz')
+        try:
+            with np.load(filename, allow_pickle=False) as npz:
+                meta = json.loads(str(npz['meta']))
+                tables = {table: _decode(tmeta, {'values': npz[f'{i}.values'],
+                    'index': npz[f'{i}.index'] if f'{i}.index' in npz.files else None})
+                    for (i, (table, tmeta)) in enumerate(meta['tables'])}
+        except (OSError, KeyError, ValueError):
+            return None
+        if meta.get('version') != CACHE_VERSION:
+            return None
+        os.utime(filename)  # last used, for prune(max_bytes=...)
+        return tables
+
+    def store(self, key, tables, meta):
+        """Store the tables which round trip exactly under key, with meta describing them.
+
+           Entries of the same solution and scenario computed by other versions of the code
+           or data can never be used again, and are removed.
+        """
+        arrays = {}
+        stored = []
+        for (table, value) in tables.items():
+            encoded = _encode(value)
+            if encoded is None or not _identical(_decode(*encoded), value):
+                continue
+            (tmeta, tarrays) = encoded
+            i = len(stored)
+            stored.append([table, tmeta])
+            arrays.update({f'{i}.{k}': v for (k, v) in tarrays.items()})
+        meta = dict(meta, version=CACHE_VERSION, created=time.time(), tables=stored)
+        arrays['meta'] = np.array(json.dumps(meta))
+        self.path.mkdir(parents=True, exist_ok=True)
+        (fd, tmpname) = tempfile.mkstemp(prefix=key + '.', suffix='.npz', dir=self.path)
+        with os.fdopen(fd, 'wb') as f:
+            np.savez_compressed(f, **arrays)
+        os.replace(tmpname, self.path.joinpath(key + '.npz'))
+        for entry in self.entries():
+            if (entry['key'] != key and entry['solution'] == meta['solution'] and
+                    entry['scenario'] == meta['scenario'] and
+                    (entry['code_version'], entry['data_version']) !=
+                    (meta['code_version'], meta['data_version'])):
+                self.remove(entry['key'])
+
+    def entries(self):
+        """List of dicts describing each stored entry."""
+        result = []
+        for filename in sorted(self.path.glob('*.npz')):
+            try:
+                with np.load(filename, allow_pickle=False) as npz:
+                    meta = json.loads(str(npz['meta']))
+            except (OSError, KeyError, ValueError):
+                meta = {}
+            stat = filename.stat()
+            result.append({'key': filename.stem, 'solution': meta.get('solution'),
+                'scenario': meta.get('scenario'), 'tables': len(meta.get('tables', [])),
+                'bytes': stat.st_size, 'created': meta.get('created'),
+                'used': stat.st_mtime, 'code_version': meta.get('code_version'),
+                'data_version': meta.get('data_version')})
+        return result
+
+    def is_stale(self, entry):
+        """True if entry was computed by other versions of the code or data."""
+        return (entry['solution'] is None or entry['code_version'] != code_version() or
+                entry['data_version'] != data_version(entry['solution']))
+
+    def remove(self, key):
+        try:
+            self.path.joinpath(key + '.npz').unlink()
+        except FileNotFoundError:
+            pass
+
+    def prune(self, stale=False, older_than=None, max_bytes=None):
+        """Remove entries, returning the keys removed.
+
+           Arguments:
+             stale: remove entries computed by other versions of the code or data.
+             older_than: remove entries last used more than this many seconds ago.
+             max_bytes: then remove the least recently used entries until the cache
+               holds at most this many bytes.
+        """
+        entries = self.entries()
+        now = time.time()
+        removed = [e for e in entries if (stale and self.is_stale(e)) or
+                (older_than is not None and now - e['used'] > older_than)]
+        if max_bytes is not None:
+            kept = sorted((e for e in entries if e not in removed), key=lambda e: e['used'])
+            total = sum(e['bytes'] for e in kept)
+            for entry in kept:
+                if total <= max_bytes:
+                    break
+                removed.append(entry)
+                total -= entry['bytes']
+        for entry in removed:
+            self.remove(entry['key'])
+        return [e['key'] for e in removed]
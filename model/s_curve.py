@@ -1,11 +1,162 @@
 """Sigmoid Curve adoption implementation."""
-import math
 import numpy as np
 import pandas as pd
 
 import model.dd as dd
 
 
+# In Excel models last_percent is set to 0.999999999999999 to mean 100% adoption
+# (which Excel helpfully displays as 100%).
+# LN(1/AH$21-1) = LN(1/1-1) = LN(0) (which doesn't exist), so being asymptotically
+# close to 100% ends up being approximately LN(0.0000000000000009) instead of LN(0).
+# We pull in the value which Excel comes up with, -34.65735902799730.
+MAGIC_LN_ZERO = -34.65735902799730
+
+
+def _sconfig_column(sconfig, name):
+    return sconfig[name].to_numpy(dtype=np.float64)
+
+
+def sigmoid_logistic(years, base_year, last_year, base_percent, last_percent,
+                     base_adoption, pds_tam_2050):
+    """Logistic sigmoid for market growth estimation, for many parameter sets at once.
+
+    This is the array form of SCurve._sigmoid_logistic: each parameter is a scalar or a
+    1-D array with one entry per parameter set, and the result is a pair of
+    (len(years), num_sets) arrays holding the first and second halves. Parameter sets
+    for which Excel would raise a #DIV/0! (base_percent or last_percent of zero,
+    last_year equal to base_year, or no change over time) are NaN throughout, as are
+    years before the base_year of each set.
+    """
+    year = np.asarray(years, dtype=np.float64)[:, np.newaxis]
+    (base_year, last_year, base_percent, last_percent, base_adoption, pds_tam_2050) = [
+            np.atleast_1d(np.asarray(x, dtype=np.float64)) for x in
+            (base_year, last_year, base_percent, last_percent, base_adoption, pds_tam_2050)]
+    # LN(1/base_percent-1) and LN(1/last_percent-1) are undefined, as math.log raised for.
+    if np.any((base_percent < 0.0) | (base_percent >= 1.0)):
+        raise ValueError(f"base_percent must be at least 0 and below 1: {base_percent}")
+    if np.any(last_percent < 0.0):
+        raise ValueError(f"last_percent must not be negative: {last_percent}")
+    # the First Half function from Building Automation Systems "S Curve"!AH24:
+    # =(((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
+    #     *($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))))
+    #     *'Unit Adoption Calculations'!B$105)+AH$21*AH$18*'Unit Adoption Calculations'!B$105)
+    #  *
+    # ((($AG$60-$AG$24)-($AG$60-$AG24))/($AG$60-$AG$24))
+    #  +
+    # ((($AG$60-$AG24)/($AG$60-base_year))*AH$19)
+    # where:
+    #   $AG24 = year
+    #   AH$17 = $AG$24 = 2014 = base_year
+    #   AH$18 = base_percent
+    #   AH$19 = base_adoption
+    #   AH$20 = $AG$60 = 2050 = last_year
+    #   AH$21 = last_percent
+    #   'Unit Adoption Calculations'!B$105 = pds_tam_2050
+    with np.errstate(all='ignore'):
+        # lcot == log change over time
+        # =((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
+        base_percent_log_term = np.log(1.0 / base_percent - 1.0)
+        last_percent_log_term = np.where(last_percent >= 0.999999, MAGIC_LN_ZERO,
+                np.log(1.0 / last_percent - 1.0))
+        lcot = (base_percent_log_term - last_percent_log_term) / (last_year - base_year)
+
+        # term1a = ((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))*
+        #     ($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))
+        #     ))*'Unit Adoption Calculations'!B$105)
+        term1a = ((1.0 - base_percent) / (1.0 + np.exp(-lcot * (year - (
+            base_percent_log_term / lcot + base_year)))) * pds_tam_2050)
+
+        # term1b = AH$21*AH$18*'Unit Adoption Calculations'!B$105
+        term1b = last_percent * base_percent * pds_tam_2050
+
+        # term2 = ((($AG$60-$AG$24)-($AG$60-$AG24))/($AG$60-$AG$24))
+        term2 = ((last_year - base_year) - (last_year - year)) / (last_year - base_year)
+
+        # term3 = ((($AG$60-$AG24)/($AG$60-base_year))*AH$19)
+        term3 = ((last_year - year) / (last_year - base_year)) * base_adoption
+
+        first_half = (term1a + term1b) * term2 + term3
+
+        # The Second Half function from Building Automation Systems "S Curve"!AI24:
+        # =((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
+        #    *($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))))
+        #    *'Unit Adoption Calculations'!B$105+AH$19/AH$21)
+        # This is the same as term1a plus (AH$19/AH$21)
+        second_half = term1a + (base_adoption / last_percent)
+
+    undefined = ((base_percent == 0.0) | (last_percent == 0.0) | (last_year == base_year) |
+            (lcot == 0.0)) | (year < base_year)
+    first_half[undefined] = np.nan
+    second_half[undefined] = np.nan
+    return (first_half, second_half)
+
+
+def logistic_curves(sconfig, transition_period):
+    """Logistic S-Curve adoption for every row of sconfig.
+
+    sconfig has one row per region, as for SCurve, or may stack many parameter sets
+    with a MultiIndex such as (scenario, region) to evaluate them all at once. The
+    result has one column per row of sconfig and one row per year.
+    """
+    last_year = _sconfig_column(sconfig, 'last_year')
+    last_percent = _sconfig_column(sconfig, 'last_percent')
+    base_year = _sconfig_column(sconfig, 'base_year')
+    years = np.arange(int(base_year.min()) if len(base_year) else dd.CORE_END_YEAR + 1,
+            dd.CORE_END_YEAR + 1)
+    (first_half, second_half) = sigmoid_logistic(years=years, base_year=base_year,
+            last_year=last_year, base_percent=_sconfig_column(sconfig, 'base_percent'),
+            last_percent=last_percent,
+            base_adoption=_sconfig_column(sconfig, 'base_adoption'),
+            pds_tam_2050=_sconfig_column(sconfig, 'pds_tam_2050'))
+
+    # blend from the first half to the second half over the transition period
+    # centered on last_year.
+    year = years.astype(np.float64)[:, np.newaxis]
+    half_period = transition_period / 2
+    a = ((last_year + half_period - year) / transition_period) * first_half
+    b = ((year - (last_year - half_period)) / transition_period) * second_half
+    adoption = np.where(year <= (last_year - half_period), first_half,
+            np.where(year < (last_year + half_period), a + b, second_half))
+    adoption[:, last_percent == 0.0] = np.nan
+
+    result = pd.DataFrame(adoption, index=pd.Index(years, name='Year'),
+            columns=sconfig.index.copy())
+    result.columns.name = None
+    result.name = 'logistic_adoption'
+    return result
+
+
+def bass_diffusion_curves(sconfig):
+    """Bass Diffusion S-Curve adoption for every row of sconfig.
+
+    As for logistic_curves, sconfig may stack many parameter sets. The Bass model is
+    a recurrence from one year to the next, so years are stepped through in order
+    while all rows of sconfig are computed together. A pds_tam_2050 of zero gives NaN
+    for a row with no base_adoption and -inf after the base year otherwise, as before.
+    """
+    M = _sconfig_column(sconfig, 'pds_tam_2050')
+    P = _sconfig_column(sconfig, 'innovation')
+    Q = _sconfig_column(sconfig, 'imitation')
+    base_year = _sconfig_column(sconfig, 'base_year')
+    base_adoption = _sconfig_column(sconfig, 'base_adoption')
+    years = np.arange(int(base_year.min()) if len(base_year) else dd.CORE_END_YEAR + 1,
+            dd.CORE_END_YEAR + 1)
+    adoption = np.full((len(years), len(M)), np.nan)
+    prev = np.full(len(M), np.nan)
+    with np.errstate(all='ignore'):
+        for (i, year) in enumerate(years):
+            b = prev + (P + (Q * prev / M)) * (M - prev)
+            prev = np.where(year == base_year, base_adoption,
+                    np.where(year > base_year, b, np.nan))
+            adoption[i] = prev
+    result = pd.DataFrame(adoption, index=pd.Index(years, name='Year'),
+            columns=sconfig.index.copy())
+    result.columns.name = None
+    result.name = 'bass_diffusion_adoption'
+    return result
+
+
 class SCurve:
     def __init__(self, transition_period, sconfig):
         """S-Curve (sigmoid adoption forecast) implementation.
@@ -41,121 +192,20 @@ class SCurve:
           base_adoption (float): number of funits adopted at base_year.
           pds_tam_2050 (float): total addressible market in 2050.
         """
-        result = pd.DataFrame(dtype=np.float64)
-        for year in range(base_year, dd.CORE_END_YEAR + 1):
-            # the First Half function from Building Automation Systems "S Curve"!AH24:
-            # =(((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
-            #     *($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))))
-            #     *'Unit Adoption Calculations'!B$105)+AH$21*AH$18*'Unit Adoption Calculations'!B$105)
-            #  *
-            # ((($AG$60-$AG$24)-($AG$60-$AG24))/($AG$60-$AG$24))
-            #  +
-            # ((($AG$60-$AG24)/($AG$60-base_year))*AH$19)
-            # where:
-            #   $AG24 = year
-            #   AH$17 = $AG$24 = 2014 = base_year
-            #   AH$18 = base_percent
-            #   AH$19 = base_adoption
-            #   AH$20 = $AG$60 = 2050 = last_year
-            #   AH$21 = last_percent
-            #   'Unit Adoption Calculations'!B$105 = pds_tam_2050
-
-            #
-            # In Excel models last_percent is set to 0.999999999999999 to mean 100% adoption
-            # (which Excel helpfully displays as 100%).
-            # LN(1/AH$21-1) = LN(1/1-1) = LN(0) (which doesn't exist), so being asymptotically
-            # close to 100% ends up being approximately LN(0.0000000000000009) instead of LN(0).
-            # We pull in the value which Excel comes up with, -34.65735902799730.
-            magic = -34.65735902799730
-            np_err_settings = np.seterr(divide='raise')
-            try:
-                # lcot == log change over time
-                # =((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
-                last_percent_log_term = magic if last_percent >= 0.999999 else math.log(
-                    1.0 / last_percent - 1.0)
-                lcot = ((math.log(1.0 / base_percent - 1.0) - last_percent_log_term) /
-                    (last_year - base_year))
-
-                # term1a = ((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))*
-                #     ($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))
-                #     ))*'Unit Adoption Calculations'!B$105)
-                term1a = ((1.0 - base_percent) / (1.0 + math.exp(-lcot * (year - (math.log(
-                    1.0 / base_percent - 1.0) / lcot + base_year)))) * pds_tam_2050)
-
-                # term1b = AH$21*AH$18*'Unit Adoption Calculations'!B$105
-                term1b = last_percent * base_percent * pds_tam_2050
-
-                # term2 = ((($AG$60-$AG$24)-($AG$60-$AG24))/($AG$60-$AG$24))
-                term2 = ((last_year - base_year) - (last_year - year)) / (last_year - base_year)
-
-                # term3 = ((($AG$60-$AG24)/($AG$60-base_year))*AH$19)
-                term3 = ((last_year - year) / (last_year - base_year)) * base_adoption
-
-                firstHalf = (term1a + term1b) * term2 + term3
-
-                # The Second Half function from Building Automation Systems "S Curve"!AI24:
-                # =((1-AH$18)/(1+EXP(-((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))
-                #    *($AG24-(LN(1/AH$18-1)/((LN(1/AH$18-1)-LN(1/AH$21-1))/(AH$20-AH$17))+AH$17))))
-                #    *'Unit Adoption Calculations'!B$105+AH$19/AH$21)
-                #
-                # using the same definitions for the cells as in the First Half function above.
-                # This is the same as term1a plus (AH$19/AH$21)
-                secondHalf = term1a + (base_adoption / last_percent)
-            except (ZeroDivisionError, FloatingPointError):
-                firstHalf = np.nan
-                secondHalf = np.nan
-            np.seterr(**np_err_settings)
-            result.loc[year, 'first_half'] = firstHalf
-            result.loc[year, 'second_half'] = secondHalf
-
-        result.index.name = 'Year'
+        years = np.arange(base_year, dd.CORE_END_YEAR + 1)
+        (first_half, second_half) = sigmoid_logistic(years=years, base_year=base_year,
+                last_year=last_year, base_percent=base_percent, last_percent=last_percent,
+                base_adoption=base_adoption, pds_tam_2050=pds_tam_2050)
+        result = pd.DataFrame({'first_half': first_half[:, 0], 'second_half': second_half[:, 0]},
+                index=pd.Index(years, name='Year'))
         return result
 
 
     def logistic_adoption(self):
         """Calculate Logistic S-Curve for a solution."""
-        result = pd.DataFrame()
-        for region in self.sconfig.index:
-            last_year = self.sconfig.loc[region, 'last_year']
-            last_percent = self.sconfig.loc[region, 'last_percent']
-            df = self._sigmoid_logistic(
-                base_year=self.sconfig.loc[region, 'base_year'],
-                last_year=last_year,
-                base_percent=self.sconfig.loc[region, 'base_percent'],
-                last_percent=last_percent,
-                base_adoption=self.sconfig.loc[region, 'base_adoption'],
-                pds_tam_2050=self.sconfig.loc[region, 'pds_tam_2050'])
-            for year, row in df.iterrows():
-                if last_percent == 0.0:
-                    result.loc[year, region] = np.nan
-                elif (year <= (last_year - (self.transition_period / 2))):
-                    result.loc[year, region] = row['first_half']
-                elif (year < (last_year + (self.transition_period / 2))):
-                    a = ((last_year + self.transition_period / 2 - year) /
-                         self.transition_period) * row['first_half']
-                    b = ((year - (last_year - self.transition_period / 2)) /
-                         self.transition_period) * row['second_half']
-                    result.loc[year, region] = a + b
-                else:
-                    result.loc[year, region] = row['second_half']
-        result.name = 'logistic_adoption'
-        result.index.name = 'Year'
-        return result
+        return logistic_curves(sconfig=self.sconfig, transition_period=self.transition_period)
 
 
     def bass_diffusion_adoption(self):
         """Calculate Bass Diffusion S-Curve for a solution."""
-        result = pd.DataFrame()
-        for region in self.sconfig.index:
-            M = self.sconfig.loc[region, 'pds_tam_2050']
-            P = self.sconfig.loc[region, 'innovation']
-            Q = self.sconfig.loc[region, 'imitation']
-            base_year = self.sconfig.loc[region, 'base_year']
-            result.loc[base_year, region] = prev = self.sconfig.loc[region, 'base_adoption']
-            for year in range(base_year + 1, dd.CORE_END_YEAR + 1):
-                b = prev + (P + (Q * prev / M)) * (M - prev)
-                result.loc[year, region] = b
-                prev = b
-        result.name = 'bass_diffusion_adoption'
-        result.index.name = 'Year'
-        return result
+        return bass_diffusion_curves(sconfig=self.sconfig)
@@ -0,0 +1,108 @@
+"""Process-wide cache of parsed data source files.
+
+Many solutions share the same data source CSV files: every electricity solution reads the
+energy TAM files listed in solution/rrs.py, for example. Each file is parsed once per
+version of the file (keyed on its resolved path and modification time) and every caller
+is handed a shallow copy sharing the parsed data. The shared data is held in read-only
+arrays so that one caller cannot change the data seen by the others.
+
+Files compiled into the binary store of model.source_store are loaded from it rather
+than parsed, for as long as they are unchanged.
+"""
+
+import pathlib
+
+import numpy as np
+import pandas as pd
+
+from model import source_store
+
+
+def _freeze(value):
+    """Hashable form of a read_csv keyword argument."""
+    if isinstance(value, (list, tuple)):
+        return tuple(_freeze(v) for v in value)
+    if isinstance(value, dict):
+        return tuple(sorted((k, _freeze(v)) for (k, v) in value.items()))
+    return value
+
+
+def _read_only(array):
+    array = np.asarray(array)
+    array.flags.writeable = False
+    return array
+
+
+def _freeze_frame(frame):
+    """DataFrame with the index, columns and values of frame, held in read-only arrays.
+
+       The values are shared with frame where they are already held in a numpy array, as
+       they are for the memory-mapped arrays of the source store.
+    """
+    dtypes = set(frame.dtypes)
+    if len(dtypes) == 1 and not isinstance(next(iter(dtypes)), pd.api.extensions.ExtensionDtype):
+        frozen = pd.DataFrame(_read_only(frame.to_numpy()), index=frame.index, copy=False)
+    else:
+        frozen = pd.DataFrame({i: _read_only(frame.iloc[:, i].to_numpy())
+                for i in range(frame.shape[1])}, index=frame.index, copy=False)
+    frozen.columns = frame.columns
+    return frozen
+
+
+class SourceCache:
+    """Cache of DataFrames parsed from files, with hit and miss counts.
+
+       Arguments:
+         store: optional source_store.SourceStore to load compiled files from.
+    """
+
+    def __init__(self, store=None):
+        self.store = store
+        self._frames = {}
+        self.hits = 0
+        self.misses = 0
+
+    def read_csv(self, filename, **kwargs):
+        """Equivalent to pd.read_csv(filename, **kwargs), parsing each file at most once.
+
+           The returned DataFrame shares its data with the cache, which is read-only. Columns
+           may be added to or removed from the returned DataFrame, but to modify values take
+           a copy() first.
+        """
+        path = pathlib.Path(filename).resolve()
+        key = (str(path), path.stat().st_mtime_ns, _freeze(kwargs))
+        frame = self._frames.get(key)
+        if frame is None:
+            self.misses += 1
+            for stale in [k for k in self._frames if k[0] == key[0] and k[1] != key[1]]:
+                del self._frames[stale]
+            frame = self.store.load(path, key[2]) if self.store is not None else None
+            if frame is None:
+                frame = pd.read_csv(path, **kwargs)
+            frame = _freeze_frame(frame)
+            self._frames[key] = frame
+        else:
+            self.hits += 1
+        return frame.copy(deep=False)
+
+    def parsed(self):
+        """List of (path, frozen read_csv kwargs, DataFrame) for every file held."""
+        return [(pathlib.Path(k[0]), k[2], frame) for (k, frame) in self._frames.items()]
+
+    def stats(self):
+        """Dict of hits, misses and the number of parsed files held."""
+        return {'hits': self.hits, 'misses': self.misses, 'entries': len(self._frames)}
+
+    def clear(self):
+        """Drop all parsed files and reset the counts."""
+        self._frames.clear()
+        self.hits = 0
+        self.misses = 0
+
+
+sources = SourceCache(store=source_store.SourceStore())
+
+
+def read_csv(filename, **kwargs):
+    """pd.read_csv(filename, **kwargs) via the process-wide source cache."""
+    return sources.read_csv(filename, **kwargs)
@@ -0,0 +1,250 @@
+"""Precompiled binary store of parsed data source files.
+
+Parsing the CSV files under data/ and solution/*/ dominates the cold start of a run over
+many solutions. tools/compile_sources.py records every file parsed while constructing the
+solutions and compiles the parsed tables into a columnar store:
+
+    manifest.json   one entry per (file, read_csv arguments), with the SHA-256 of the file
+    float64.npy     the numeric columns of every table, concatenated
+    int64.npy
+    bool.npy
+
+The .npy files are memory mapped. Tables with a single numeric dtype are handed out as
+views of the mapped data; string columns and labels are held in the manifest.
+
+model.source_cache consults the store before parsing a file. An entry is only used while
+the file still has the content it was compiled from, otherwise the CSV file is parsed.
+"""
+
+import hashlib
+import json
+import os
+import pathlib
+import shutil
+import tempfile
+
+import numpy as np
+import pandas as pd
+
+
+ROOT_PATH = pathlib.Path(__file__).parents[1]
+STORE_PATH = ROOT_PATH.joinpath('.source_store')
+STORE_VERSION = 1
+STORE_DTYPES = ['float64', 'int64', 'bool']
+
+
+def file_digest(path):
+    """SHA-256 hex digest of the content of path."""
+    return hashlib.sha256(pathlib.Path(path).read_bytes()).hexdigest()
+
+
+def _entry_key(relpath, kwargs):
+    return relpath.as_posix() + '|' + repr(kwargs)
+
+
+def _json_values(values):
+    """values as a JSON-compatible list, or None if they do not survive a round trip."""
+    values = list(values)
+    for v in values:
+        if v is not None and type(v) not in (str, float, int, bool):
+            return None
+    return values
+
+
+def _identical(a, b):
+    try:
+        pd.testing.assert_frame_equal(a, b, check_exact=True, check_index_type=True,
+                check_column_type=True, check_flags=False)
+    except AssertionError:
+        return False
+    return True
+
+
+class SourceStore:
+    """Reader and writer of a compiled store of parsed data source files.
+
+       Arguments:
+         path: directory holding the store.
+         root: files are recorded relative to root, so the store stays valid if the
+           checkout is moved. Files outside of root are not compiled.
+    """
+
+    def __init__(self, path=STORE_PATH, root=ROOT_PATH):
+        self.path = pathlib.Path(path)
+        self.root = pathlib.Path(root).resolve()
+        self._entries = None
+        self._arrays = {}
+        self.hits = 0
+        self.stale = 0
+
+    def _manifest(self):
+        if self._entries is None:
+            self._entries = {}
+            try:
+                with open(self.path.joinpath('manifest.json')) as f:
+                    manifest = json.load(f)
+            except (OSError, ValueError):
+                return self._entries
+            if manifest.get('version') == STORE_VERSION:
+                self._entries = manifest['entries']
+        return self._entries
+
+    def _array(self, dtype):
+        if dtype not in self._arrays:
+            self._arrays[dtype] = np.load(self.path.joinpath(dtype + '.npy'), mmap_mode='r')
+        return self._arrays[dtype]
+
+    def _relpath(self, path):
+        try:
+            return pathlib.Path(path).resolve().relative_to(self.root)
+        except ValueError:
+            return None
+
+    def load(self, path, kwargs):
+        """DataFrame compiled from path with the frozen read_csv kwargs, or None.
+
+           None is returned if there is no entry for the file, or if the file has been
+           modified since it was compiled.
+        """
+        entries = self._manifest()
+        relpath = self._relpath(path) if entries else None
+        if relpath is None:
+            return None
+        entry = entries.get(_entry_key(relpath, kwargs))
+        if entry is None:
+            return None
+        stat = os.stat(path)
+        if stat.st_size != entry['size'] or (stat.st_mtime_ns != entry['mtime_ns'] and
+                file_digest(path) != entry['sha256']):
+            self.stale += 1
+            return None
+        self.hits += 1
+        return self._frame(entry)
+
+    def _values(self, spec, nrows):
+        if 'values' in spec:
+            return np.array(spec['values'], dtype=object)
+        return self._array(spec['dtype'])[spec['offset']:spec['offset'] + nrows]
+
+    def _frame(self, entry):
+        nrows = entry['nrows']
+        ispec = entry['index']
+        if 'range' in ispec:
+            index = pd.RangeIndex(*ispec['range'], name=ispec['name'])
+        else:
+            index = pd.Index(self._values(ispec, nrows), name=ispec['name'])
+        columns = pd.Index(entry['columns'], dtype=object, name=entry['columns_name'])
+        block = entry.get('block')
+        if block is not None:
+            data = self._array(block['dtype'])[block['offset']:block['offset'] + nrows * len(columns)]
+            return pd.DataFrame(data.reshape(len(columns), nrows).T, index=index,
+                    columns=columns, copy=False)
+        frame = pd.DataFrame({i: self._values(spec, nrows) for (i, spec) in
+                enumerate(entry['data'])}, index=index)
+        frame.columns = columns
+        return frame
+
+    def stats(self):
+        """Dict of compiled tables used, stale entries found and entries held."""
+        return {'hits': self.hits, 'stale': self.stale, 'entries': len(self._manifest())}
+
+    def write(self, tables):
+        """Compile tables, an iterable of (path, frozen read_csv kwargs, DataFrame).
+
+           Replaces the content of the store. Returns the list of paths which could not be
+           compiled, those are parsed from CSV as before.
+        """
+        arrays = {dtype: [] for dtype in STORE_DTYPES}
+        offsets = {dtype: 0 for dtype in STORE_DTYPES}
+
+        def put(values):
+            dtype = str(values.dtype)
+            if dtype not in arrays:
+                return None
+            spec = {'dtype': dtype, 'offset': offsets[dtype]}
+            arrays[dtype].append(np.ascontiguousarray(values).ravel())
+            offsets[dtype] += values.size
+            return spec
+
+        def column(values):
+            if values.dtype == object:
+                values = _json_values(values.tolist())
+                return None if values is None else {'values': values}
+            return put(values)
+
+        entries = {}
+        frames = {}
+        skipped = []
+        for (path, kwargs, frame) in tables:
+            relpath = self._relpath(path)
+            if relpath is None or not self._compilable(frame):
+                skipped.append(path)
+                continue
+            entry = self._entry(frame, column, put)
+            if entry is None:
+                skipped.append(path)
+                continue
+            stat = os.stat(path)
+            entry.update({'path': relpath.as_posix(), 'sha256': file_digest(path),
+                'size': stat.st_size, 'mtime_ns': stat.st_mtime_ns})
+            entries[_entry_key(relpath, kwargs)] = entry
+            frames[_entry_key(relpath, kwargs)] = (path, frame)
+
+        self.path.parent.mkdir(parents=True, exist_ok=True)
+        tmpdir = pathlib.Path(tempfile.mkdtemp(prefix=self.path.name + '.',
+            dir=self.path.parent))
+        os.chmod(tmpdir, 0o755)
+        for dtype in STORE_DTYPES:
+            values = np.concatenate(arrays[dtype]) if arrays[dtype] else np.empty(0, dtype=dtype)
+            np.save(tmpdir.joinpath(dtype + '.npy'), values.astype(dtype, copy=False))
+        self._write_manifest(tmpdir, entries)
+        if self.path.exists():
+            shutil.rmtree(self.path)
+        os.replace(tmpdir, self.path)
+        self._entries = None
+        self._arrays = {}
+
+        # leave out any table which does not read back exactly as parsed.
+        mismatched = [key for (key, (path, frame)) in frames.items()
+                if not _identical(self._frame(entries[key]), frame)]
+        if mismatched:
+            for key in mismatched:
+                skipped.append(frames[key][0])
+                del entries[key]
+            self._write_manifest(self.path, entries)
+            self._entries = None
+        return skipped
+
+    @staticmethod
+    def _write_manifest(path, entries):
+        with open(path.joinpath('manifest.json'), 'w') as f:
+            json.dump({'version': STORE_VERSION, 'entries': entries}, f)
+
+    @staticmethod
+    def _compilable(frame):
+        return (not isinstance(frame.index, pd.MultiIndex) and
+                not isinstance(frame.columns, pd.MultiIndex) and
+                all(isinstance(c, str) for c in frame.columns) and
+                frame.columns.is_unique)
+
+    @staticmethod
+    def _entry(frame, column, put):
+        """Manifest entry for frame, or None if frame cannot be compiled."""
+        entry = {'nrows': len(frame.index), 'columns': list(frame.columns),
+                 'columns_name': frame.columns.name}
+        index = frame.index
+        if isinstance(index, pd.RangeIndex):
+            entry['index'] = {'range': [index.start, index.stop, index.step]}
+        else:
+            entry['index'] = column(index.values)
+            if entry['index'] is None:
+                return None
+        entry['index']['name'] = index.name
+        dtypes = set(str(d) for d in frame.dtypes)
+        if len(dtypes) == 1 and dtypes <= set(STORE_DTYPES) and len(frame.columns):
+            entry['block'] = put(frame.values.T)
+            return entry
+        entry['data'] = [column(frame.iloc[:, i].values) for i in range(len(frame.columns))]
+        if any(spec is None for spec in entry['data']):
+            return None
+        return entry
@@ -1,12 +1,12 @@
 """Total Addressable Market module."""
 
-from functools import lru_cache
 import pathlib
 import re
 
 from model import dd
-from model.metaclass_cache import MetaclassCache
+from model.metaclass_cache import MetaclassCache, cached
 from model import interpolation
+from model import source_cache
 import numpy as np
 import pandas as pd
 
@@ -51,6 +51,11 @@ class TAM(object, metaclass=MetaclassCache):
         return (isinstance(value, str) or isinstance(value, pathlib.Path) or
                 isinstance(value, pathlib.PurePath))
 
+    def _read_source(self, filename):
+        """Parsed data source, shared by every TAM which uses the same file."""
+        return source_cache.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                skip_blank_lines=True, comment='#')
+
     def _populate_forecast_data(self):
         """Read data files in self.tam_*_data_sources to populate forecast data."""
         df_per_region = {}
@@ -67,8 +72,7 @@ class TAM(object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
-                            skip_blank_lines=True, comment='#', usecols=["Year"] + regions)
+                    df = self._read_source(filename)
                     for region in regions:
                         df_per_region[region][name] = df[region]
 
@@ -77,8 +81,7 @@ class TAM(object, metaclass=MetaclassCache):
                 sources = {name: value} if self._is_path(value) else value
 
                 for name, filename in sources.items():
-                    df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
-                            skip_blank_lines=True, comment='#', usecols=["Year", main_region])
+                    df = self._read_source(filename)
                     df_per_region[main_region_pds][name] = df[main_region]
 
         self._forecast_data = df_per_region
@@ -224,7 +227,7 @@ class TAM(object, metaclass=MetaclassCache):
         return regional_sum
 
 
-    @lru_cache()
+    @cached
     def forecast_data(self, region):
         """
           World: SolarPVUtil 'TAM Data'!B45:Q94
@@ -241,7 +244,7 @@ class TAM(object, metaclass=MetaclassCache):
         return self._forecast_data[region]
 
 
-    @lru_cache()
+    @cached
     def forecast_min_max_sd(self, region):
         """
           World: SolarPVUtil 'TAM Data'!V45:Y94
@@ -309,7 +312,7 @@ class TAM(object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @cached
     def forecast_low_med_high(self, region):
         """
           OECD90: SolarPVUtil 'TAM Data'!AA163:AC212
@@ -348,7 +351,7 @@ class TAM(object, metaclass=MetaclassCache):
         return result
 
 
-    @lru_cache()
+    @cached
     def forecast_trend(self, region, trend=None):
         """Forecast for a region via one of several interpolation algorithms.
 
@@ -402,12 +405,46 @@ class TAM(object, metaclass=MetaclassCache):
         growth = self.tamconfig.loc['growth', region]
         trend = self._get_trend(trend=trend, tamconfig=self.tamconfig[region],
                 data_sources=data_sources)
-        data = self.forecast_low_med_high(region).loc[:, growth]
-        result = interpolation.trend_algorithm(data=data, trend=trend)
+        if interpolation.canonical_trend(trend) != 'single':
+            result = self.forecast_trends(region)[interpolation.canonical_trend(trend)].copy()
+        else:
+            data = self.forecast_low_med_high(region).loc[:, growth]
+            result = interpolation.trend_algorithm(data=data, trend=trend)
         result.name = 'forecast_trend_' + self._name_to_identifier(region) + '_' + str(trend).lower()
         return result
 
 
+    @cached
+    def forecast_trends(self, region):
+        """Forecast for a region via each of the curve fitting interpolation algorithms.
+
+           Returns a dict of 'linear', 'degree2', 'degree3' and 'exponential' to the
+           forecast_trend for that algorithm, taken from _forecast_fits().
+        """
+        fits = self._forecast_fits(self._fit_group(region))
+        return {trend: interpolation.series_trend(fits, trend, region) for trend in fits}
+
+
+    def _fit_group(self, region):
+        """Regions of the tamconfig whose trends are fitted together with region: all of
+           them, unless the World forecast includes the regional trends. Then the regions
+           are fitted together first, and the World and PDS World after them."""
+        regions = list(self.tamconfig.columns)
+        if not self.main_includes_regional:
+            return tuple(regions)
+        main = dd.REGIONS[0] in region
+        return tuple(r for r in regions if (dd.REGIONS[0] in r) == main)
+
+
+    @cached
+    def _forecast_fits(self, regions):
+        """Every trend of the forecast of each of regions, fitted together in a single
+           interpolation.fit_trends() call."""
+        data = pd.DataFrame({region: self.forecast_low_med_high(region).loc[:,
+                self.tamconfig.loc['growth', region]] for region in regions})
+        return interpolation.fit_trends(data)
+
+
     def _set_tam_one_region(self, result, region, forecast_trend, forecast_low_med_high):
         """Set a single column in ref_tam_per_region."""
         result[region] = forecast_trend.loc[:, 'adoption']
@@ -415,7 +452,7 @@ class TAM(object, metaclass=MetaclassCache):
         result.loc[first_year, region] = forecast_low_med_high.loc[first_year, 'Medium']
 
 
-    @lru_cache()
+    @cached
     def ref_tam_per_region(self):
         """Compiles the TAM for each of the major regions into a single dataframe.
 
@@ -431,7 +468,7 @@ class TAM(object, metaclass=MetaclassCache):
         result.name = "ref_tam_per_region"
         return result
 
-    @lru_cache()
+    @cached
     def pds_tam_per_region(self):
         """Compiles the PDS TAM for each of the major regions into a single dataframe.
 
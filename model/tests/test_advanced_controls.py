@@ -321,6 +321,20 @@ def test_from_json():
     assert ac.conv_first_cost_efficiency_rate == pytest.approx(5.0)
 
 
+def test_from_json_deferred():
+    l = advanced_controls.load_scenarios_from_json(directory=datadir.joinpath('ac'), vmas=None)
+    assert list(l) == ['ac_dataclass']
+    assert l.json('ac_dataclass')['pds_2014_cost'] == pytest.approx(1.0)
+    assert isinstance(l._scenarios['ac_dataclass'], tuple)
+    ac = l['ac_dataclass']
+    assert l['ac_dataclass'] is ac
+    assert ac.jsfile.endswith('.json')
+    assert l.json('ac_dataclass') is ac.js
+    replaced = advanced_controls.AdvancedControls(name='ac_dataclass', pds_2014_cost=2.0)
+    l['ac_dataclass'] = replaced
+    assert dict(l) == {'ac_dataclass': replaced}
+
+
 def test_to_json():
     (f, jsfile) = tempfile.mkstemp()
     ac = advanced_controls.AdvancedControls(
@@ -1,5 +1,6 @@
 import pytest
 from model import aez
+from model import dd
 
 
 @pytest.mark.slow
@@ -50,3 +51,18 @@ def test_tropical_tree_staples():
     ae = aez.AEZ('Tropical Tree Staples')
     result = ae.soln_land_dist_df
     assert result is not None
+
+
+def test_cohort_land():
+    land = aez.cohort_land(2020, tuple(dd.THERMAL_MOISTURE_REGIMES8))
+    assert land.land.shape == (len(land.solutions), 8, len(land.regions), len(dd.AEZS))
+    ae = aez.AEZ('Afforestation', cohort=2020, regimes=dd.THERMAL_MOISTURE_REGIMES8)
+    s = land.solutions.get_loc('Afforestation')
+    t = dd.THERMAL_MOISTURE_REGIMES8.index('Tropical-Humid')
+    assert (ae.world_land_alloc_dict['Tropical-Humid'].values == land.land[s, t]).all()
+    assert land.allocation[:, :, dd.AEZS.index('AEZ29: All Barren Land')].sum() == 0
+    assert aez.cohort_land(2020, tuple(dd.THERMAL_MOISTURE_REGIMES8)) is land
+    with pytest.raises(ValueError):
+        ae.world_land_alloc_dict['Tropical-Humid'].iloc[0, 0] = 1.0
+    with pytest.raises(ValueError):
+        ae.soln_land_alloc_df.iloc[t, 0] = 1.0
@@ -207,6 +207,27 @@ def test_co2_ppm_calculator_land_with_avoided_emissions():
             pd.testing.assert_frame_equal(c2.co2_ppm_calculator(), expected, check_dtype=False)
 
 
+def test_co2_ppm_calculators_batch():
+    years = list(range(2015, 2061))
+    emissions = pd.DataFrame([np.linspace(10.0, 100.0, len(years)), np.full(len(years), 5.0)],
+            index=['A', 'B'], columns=years)
+    result = co2calcs.co2_ppm_calculators(emissions)
+    assert list(result.keys()) == ['A', 'B']
+    single = co2calcs.co2_ppm_calculators(emissions.loc[['B']])['B']
+    pd.testing.assert_frame_equal(result['B'], single, check_exact=True)
+    # a pulse of 5 MMT in 2015 has decayed by 2016, and adds to the 2016 pulse.
+    kernel = co2calcs.co2_decay_kernel(len(years))
+    assert result['B'].at[2015, 2015] == pytest.approx(5.0 * kernel[0])
+    assert result['B'].at[2016, 2015] == pytest.approx(5.0 * kernel[1])
+    assert result['B'].at[2015, 2016] == 0.0
+    assert result['B'].at[2016, 'Total'] == pytest.approx(5.0 * (kernel[0] + kernel[1]))
+    assert result['B'].at[2016, 'PPM'] == pytest.approx(
+            5.0 * (kernel[0] + kernel[1]) / (44.01 * 1.8 * 100))
+    assert kernel[0] == pytest.approx(0.217 + 0.259 * np.exp(-1 / 172.9) +
+            0.338 * np.exp(-1 / 18.51) + 0.186 * np.exp(-1 / 1.186))
+    assert not kernel.flags.writeable
+
+
 def test_co2eq_ppm_calculator():
     soln_pds_net_grid_electricity_units_saved = pd.DataFrame([[1.0, 1.0], [1.0, 1.0], [1.0, 1.0]],
             columns=["World", "B"], index=[2020, 2021, 2022])
@@ -702,6 +723,22 @@ def test_fair_co2_sequestered_global():
     assert_frame_not_equal(CFT, CFT1)
 
 
+def test_fair_for_gwps():
+    c2 = _get_c2_for_FaIR()
+    results = c2.FaIR_CFT_for_gwps(['Drawdown', 'AR4'], workers=1)
+    pd.testing.assert_frame_equal(results['Drawdown'], c2.FaIR_CFT(), check_names=False)
+    assert results['AR4'].loc[2100, 'T'] < results['Drawdown'].loc[2100, 'T']
+
+
+def test_fair_ensemble():
+    c2 = _get_c2_for_FaIR()
+    parameters = [{'tcrecs': np.array([1.2, 2.4])}, {'tcrecs': np.array([2.2, 4.2])}]
+    bands = c2.FaIR_CFT_ensemble(parameters, percentiles=(0, 100), workers=1)
+    CFT = c2.FaIR_CFT()
+    assert (bands[('T', 0)] <= CFT['T'] + 1e-9).all()
+    assert (CFT['T'] <= bands[('T', 100)] + 1e-9).all()
+
+
 def test_fair_baseline():
     c2 = co2calcs.CO2Calcs(ac=None)
     CFT = c2.FaIR_CFT_baseline()
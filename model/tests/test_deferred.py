@@ -0,0 +1,36 @@
+"""Tests for deferred.py."""
+
+import pandas as pd
+
+from model.deferred import Deferred
+
+
+class Module:
+    table = Deferred()
+
+    def __init__(self, table):
+        self.table = table
+
+
+def test_deferred_table():
+    calls = []
+    df = pd.DataFrame({'World': [1.0, 2.0]})
+
+    def compute():
+        calls.append(1)
+        return df
+
+    m = Module(table=compute)
+    assert calls == []
+    assert m.table is df
+    assert m.table is df
+    assert calls == [1]
+
+
+def test_deferred_value():
+    df = pd.DataFrame({'World': [1.0, 2.0]})
+    assert Module(table=df).table is df
+    assert Module(table=None).table is None
+    m = Module(table=df)
+    m.table = df['World']
+    assert m.table is not df
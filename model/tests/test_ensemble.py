@@ -0,0 +1,63 @@
+"""Tests for ensemble.py."""
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import ensemble
+from model import incremental
+from model.operatingcost import payback
+import solution.afforestation
+import solution.solarpvutil
+
+
+def test_draws():
+    obj = solution.solarpvutil.Scenario()
+    (_, high, low) = obj.ac.vmas['SOLUTION First Cost per Implementation Unit'].avg_high_low()
+    ranges = {'npv_discount_rate': (0.02, 0.04, 0.06)}
+    samples = ensemble.draws(obj, n=500, parameters=['pds_2014_cost', 'npv_discount_rate'],
+            ranges=ranges, seed=1)
+    assert list(samples.columns) == ['pds_2014_cost', 'npv_discount_rate']
+    assert len(samples) == 500
+    assert samples['pds_2014_cost'].between(low, high).all()
+    assert samples['npv_discount_rate'].between(0.02, 0.06).all()
+    again = ensemble.draws(obj, n=500, parameters=['pds_2014_cost', 'npv_discount_rate'],
+            ranges=ranges, seed=1)
+    pd.testing.assert_frame_equal(samples, again)
+    choices = ensemble.draws(obj, n=50, parameters=['npv_discount_rate'], ranges=ranges,
+            distribution='choice', seed=1)
+    assert set(choices['npv_discount_rate']) <= {0.02, 0.04, 0.06}
+    with pytest.raises(ValueError):
+        ensemble.draws(obj, n=5, parameters=['npv_discount_rate'])
+
+
+@pytest.mark.parametrize('module,parameters', [
+    (solution.solarpvutil, ['pds_2014_cost', 'conv_2014_cost', 'soln_first_cost_efficiency_rate',
+        'conv_fuel_cost_per_funit', 'soln_fixed_oper_cost_per_iunit',
+        'soln_lifetime_capacity', 'npv_discount_rate', 'soln_avg_annual_use']),
+    (solution.afforestation, ['pds_2014_cost', 'conv_2014_cost',
+        'soln_fixed_oper_cost_per_iunit', 'soln_expected_lifetime', 'npv_discount_rate']),
+])
+def test_matches_scenario(module, parameters):
+    obj = module.Scenario()
+    ac = obj.ac
+    ranges = {p: (getattr(ac, p) * 0.8, getattr(ac, p), getattr(ac, p) * 1.2)
+              for p in parameters}
+    samples = ensemble.draws(obj, n=4, parameters=parameters, ranges=ranges, seed=3)
+    ens = ensemble.Ensemble(obj, samples)
+    results = ens.results()
+    assert obj.ac.fingerprint() == ac.fingerprint()
+    for (i, row) in samples.iterrows():
+        expected = incremental.update_ac(module.Scenario(), **row.to_dict())
+        cash_flow = expected.oc.soln_net_cash_flow()
+        pd.testing.assert_series_equal(ens.soln_net_cash_flow().loc[i].dropna(),
+                cash_flow.dropna(), check_names=False, check_index_type=False)
+        npv = expected.oc.soln_net_present_value()
+        pd.testing.assert_series_equal(ens.soln_net_present_value().loc[i].dropna(),
+                npv.dropna(), check_names=False, check_index_type=False)
+        assert results.loc[i, 'NPV'] == pytest.approx(npv.loc[2020:2050].sum())
+        reduced = expected.c2.co2eq_mmt_reduced().loc[2020:2050, 'World'].sum()
+        assert results.loc[i, 'Emissions Reduced'] == pytest.approx(reduced)
+        paid = payback(cash_flow)
+        assert results.loc[i, 'Payback Year'] == pytest.approx(
+                paid.idxmax() if paid.any() else np.nan, nan_ok=True)
@@ -2,6 +2,7 @@
 
 import fair
 import pandas as pd
+import pytest
 
 from model import fairutil
 
@@ -17,3 +18,72 @@ def test_baseline_emissions():
 def test_fair_scm_kwargs():
     k = fairutil.fair_scm_kwargs()
     assert 'r0' in k
+
+
+def test_fair_scm():
+    b = fairutil.baseline_emissions()
+    (C, F, T) = fair.forward.fair_scm(emissions=b.values, useMultigas=False,
+            **fairutil.fair_scm_kwargs())
+    fairutil.cache.clear()
+    result = fairutil.fair_scm(b)
+    assert (result['C'].values == C).all()
+    assert (result['F'].values == F).all()
+    assert (result['T'].values == T).all()
+    assert result.index.equals(b.index)
+    result.loc[:, 'T'] = 0.0
+    again = fairutil.fair_scm(b)
+    assert (fairutil.cache.hits, fairutil.cache.misses) == (1, 1)
+    assert (again['T'].values == T).all()
+    other = fairutil.fair_scm(b, r0=40)
+    assert fairutil.cache.misses == 2
+    assert not (other['T'].values == T).all()
+
+
+def test_fair_scm_batch():
+    b = fairutil.baseline_emissions()
+    trajectories = {'baseline': b, 'lower': b - 0.5, 'same': b.copy()}
+    fairutil.cache.clear()
+    results = fairutil.fair_scm_batch(trajectories, workers=2)
+    assert fairutil.cache.misses == 2
+    assert set(results.keys()) == set(trajectories.keys())
+    pd.testing.assert_frame_equal(results['baseline'], results['same'])
+    pd.testing.assert_frame_equal(results['lower'], fairutil.fair_scm(b - 0.5))
+    assert (results['lower']['T'] < results['baseline']['T']).any()
+
+
+def test_baseline_emissions_for_gwps():
+    b = fairutil.baseline_emissions_for_gwps(['Drawdown', 'AR4', 'AR5'])
+    assert list(b.columns) == ['Drawdown', 'AR4', 'AR5']
+    pd.testing.assert_series_equal(b['Drawdown'], fairutil.baseline_emissions(),
+            check_names=False)
+    assert (b.loc[1900, 'AR4'] < b.loc[1900, 'AR5'] < b.loc[1900, 'Drawdown'])
+    assert b.loc[2020, 'AR4'] == b.loc[2020, 'Drawdown']  # Project Drawdown's own figures
+    gwp = dict(fairutil.GWP_SETS['Drawdown'], CH4=84)
+    custom = fairutil.baseline_emissions(gwp=gwp)
+    assert custom.loc[1900] > b.loc[1900, 'Drawdown']
+    with pytest.raises(ValueError):
+        fairutil.gwp_vector({'H2O': 1})
+
+
+def test_fair_scm_ensemble():
+    b = fairutil.baseline_emissions()
+    samples = fairutil.parameter_samples(n=6, seed=1)
+    assert len(samples) == 6
+    assert all(p['tcrecs'][0] < p['tcrecs'][1] for p in samples)
+    with pytest.raises(ValueError):
+        fairutil.parameter_samples(3, tcr=(3, 3.5, 4), ecs=(1.5, 2, 2.5))
+    fairutil.cache.clear()
+    bands = fairutil.fair_scm_ensemble(b, samples, percentiles=(5, 50, 95), workers=2)
+    assert fairutil.cache.misses == 6
+    assert list(bands.columns) == [(v, p) for v in ['C', 'F', 'T'] for p in [5, 50, 95]]
+    assert (bands[('T', 5)] <= bands[('T', 50)]).all()
+    assert (bands[('T', 50)] <= bands[('T', 95)]).all()
+    assert bands.loc[2100, ('T', 5)] < bands.loc[2100, ('T', 95)]
+    fairutil.fair_scm_ensemble(b, samples, workers=2)
+    assert fairutil.cache.misses == 6
+
+    grid = fairutil.parameter_grid(r0=[fairutil.r0], tcrecs=[fairutil.tcrecs])
+    assert len(grid) == 1
+    single = fairutil.fair_scm_ensemble(b, grid, percentiles=[50])
+    pd.testing.assert_series_equal(single[('T', 50)], fairutil.fair_scm(b)['T'],
+            check_names=False)
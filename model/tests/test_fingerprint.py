@@ -0,0 +1,72 @@
+"""Tests for fingerprint.py."""
+
+import os
+import pathlib
+import subprocess
+import sys
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import advanced_controls
+from model import fingerprint
+from model import vma
+
+thisdir = pathlib.Path(__file__).parents[0]
+datadir = thisdir.joinpath('data')
+
+
+def test_content():
+    df = pd.DataFrame({'A': [1.0, 2.0], 'B': ['x', 'y']}, index=[2014, 2015])
+    sources = {'Region': {'source': pathlib.Path('a.csv')}, 'World': {'b': 'b.csv'}}
+    assert fingerprint.fingerprint(df) == fingerprint.fingerprint(df.copy())
+    assert fingerprint.fingerprint(sources) == fingerprint.fingerprint(
+            {'World': {'b': 'b.csv'}, 'Region': {'source': pathlib.Path('a.csv')}})
+    changed = df.copy()
+    changed.loc[2015, 'A'] = 2.5
+    assert fingerprint.fingerprint(df) != fingerprint.fingerprint(changed)
+    assert fingerprint.fingerprint(df) != fingerprint.fingerprint(df.rename(columns={'A': 'C'}))
+    assert fingerprint.fingerprint(df['A']) != fingerprint.fingerprint(df['A'].values)
+    assert fingerprint.fingerprint(1) != fingerprint.fingerprint(1.0)
+    assert fingerprint.fingerprint([1, 2]) != fingerprint.fingerprint([[1], 2])
+    assert fingerprint.fingerprint(np.float64(0.5)) == fingerprint.fingerprint(0.5)
+    assert fingerprint.fingerprint([dict()]) == fingerprint.fingerprint([dict()])
+    with pytest.raises(TypeError):
+        fingerprint.fingerprint(object())
+
+
+def test_advanced_controls():
+    a = advanced_controls.AdvancedControls(name='a', pds_2014_cost=1.0, jsfile='a.json')
+    b = advanced_controls.AdvancedControls(name='a', pds_2014_cost=1.0, jsfile='b.json')
+    c = advanced_controls.AdvancedControls(name='a', pds_2014_cost=2.0)
+    assert a.fingerprint() == b.fingerprint()
+    assert hash(a) == hash(b)
+    assert a.fingerprint() != c.fingerprint()
+
+
+def test_across_processes():
+    script = ("from model import advanced_controls, fingerprint; import pandas as pd; "
+              "ac = advanced_controls.AdvancedControls(name='a', pds_2014_cost=1.0); "
+              "print(fingerprint.fingerprint([ac, pd.Series([1.0, 2.0], name='s')]))")
+    ac = advanced_controls.AdvancedControls(name='a', pds_2014_cost=1.0)
+    expected = fingerprint.fingerprint([ac, pd.Series([1.0, 2.0], name='s')])
+    for seed in ['1', '2']:
+        result = subprocess.run([sys.executable, '-c', script], capture_output=True, text=True,
+                cwd=str(thisdir.parents[1]), env=dict(os.environ, PYTHONHASHSEED=seed), check=True)
+        assert result.stdout.strip() == expected
+
+
+def test_vma_reload(tmp_path):
+    filename = tmp_path.joinpath('vma.csv')
+    pd.read_csv(datadir.joinpath('vma1_silvopasture.csv')).to_csv(filename, index=False)
+    v = vma.VMA(filename=filename)
+    before = v.fingerprint()
+    assert vma.VMA(filename=filename).fingerprint() == before
+    v.high_sd = 2.0
+    assert v.fingerprint() != before
+    v.high_sd = 1.0
+    df = v.source_data.copy()
+    df.loc[0, 'Raw Data Input'] = 123.0
+    v.write_to_file(df)
+    assert v.fingerprint() != before
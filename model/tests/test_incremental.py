@@ -0,0 +1,156 @@
+"""Tests for incremental.py."""
+
+import pandas as pd
+
+from model import advanced_controls
+from model import incremental
+from model.deferred import Deferred
+import solution.solarpvutil
+
+
+class Costs:
+    def __init__(self, ac):
+        self.ac = ac
+        self.calls = []
+
+    @incremental.cached
+    def first_cost(self):
+        self.calls.append('first_cost')
+        return self.ac.pds_2014_cost * 2
+
+    @incremental.cached
+    def npv(self):
+        self.calls.append('npv')
+        return self.first_cost() / (1 + self.ac.npv_discount_rate)
+
+    @incremental.cached
+    def lifetime(self):
+        self.calls.append('lifetime')
+        return self.ac.soln_lifetime_replacement
+
+    @incremental.cached
+    def conv_cost(self):
+        self.calls.append('conv_cost')
+        return getattr(self.ac, 'conv_2014_cost')
+
+
+class Totals:
+    npv = Deferred()
+
+    def __init__(self, npv):
+        self.npv = npv
+
+    @incremental.cached
+    def total(self):
+        return self.npv * 10
+
+
+class Scenario:
+    def __init__(self, ac):
+        self.scenario = ac.name
+        self.ac = ac
+        self.costs = Costs(ac=ac)
+        self.totals = Totals(npv=self.costs.npv)
+
+
+def test_update_ac_discards_readers():
+    ac = advanced_controls.AdvancedControls(name='test', pds_2014_cost=100.0,
+            npv_discount_rate=0.25, soln_lifetime_capacity=60.0, soln_avg_annual_use=20.0,
+            conv_2014_cost=10.0)
+    obj = incremental.track(Scenario(ac=ac))
+    assert obj.totals.total() == 1600.0
+    assert obj.costs.lifetime() == 3.0
+    assert obj.costs.conv_cost() == 10.0
+    obj.costs.calls.clear()
+
+    assert incremental.update_ac(obj, npv_discount_rate=1.0) is obj
+    assert obj.ac.npv_discount_rate == 1.0
+    assert ac.npv_discount_rate == 0.25
+    assert obj.totals.total() == 1000.0
+    assert obj.costs.lifetime() == 3.0
+    assert obj.costs.calls == ['npv']
+
+    obj.costs.calls.clear()
+    incremental.update_ac(obj, soln_avg_annual_use=30.0)
+    assert obj.costs.lifetime() == 2.0
+    assert obj.totals.total() == 1000.0
+    assert obj.costs.calls == ['lifetime']
+
+    obj.costs.calls.clear()
+    incremental.update_ac(obj, conv_2014_cost=5.0)
+    assert obj.costs.conv_cost() == 5.0
+    assert obj.totals.total() == 1000.0
+    assert obj.costs.calls == ['conv_cost']
+
+
+def test_update_ac_tracks_untracked():
+    ac = advanced_controls.AdvancedControls(name='test', pds_2014_cost=100.0,
+            npv_discount_rate=0.25, soln_lifetime_capacity=60.0, soln_avg_annual_use=20.0)
+    obj = Scenario(ac=ac)
+    assert obj.totals.total() == 1600.0
+    assert obj.costs.ac is ac
+    obj.costs.calls.clear()
+
+    assert incremental.update_ac(obj, npv_discount_rate=1.0) is obj
+    assert isinstance(obj.costs.ac, incremental.TrackedControls)
+    assert obj.totals.total() == 1000.0
+    assert obj.costs.calls == ['npv', 'first_cost']
+
+
+def test_replace_table():
+    ac = advanced_controls.AdvancedControls(name='test', pds_2014_cost=100.0,
+            npv_discount_rate=0.25, soln_lifetime_capacity=60.0, soln_avg_annual_use=20.0)
+    obj = incremental.track(Scenario(ac=ac))
+    assert obj.totals.total() == 1600.0
+    assert obj.costs.lifetime() == 3.0
+    obj.costs.calls.clear()
+
+    incremental.replace_table(obj.costs.first_cost, 400.0)
+    assert obj.totals.total() == 3200.0
+    assert obj.costs.lifetime() == 3.0
+    assert obj.costs.calls == ['npv']
+    incremental.update_ac(obj, pds_2014_cost=50.0)
+    assert obj.costs.first_cost() == 400.0
+
+
+def test_update_ac_structural_field():
+    obj = solution.solarpvutil.Scenario()
+    ac = obj.ac
+    updated = incremental.update_ac(obj, soln_avg_annual_use=obj.ac.soln_avg_annual_use * 2)
+    assert updated is not obj
+    assert updated.ac.soln_avg_annual_use == obj.ac.soln_avg_annual_use * 2
+    assert updated.r2s is not obj.r2s
+    assert obj.ac is ac
+    assert solution.solarpvutil.scenarios[obj.scenario] is ac
+
+
+def test_update_ac_untracked_field():
+    obj = solution.solarpvutil.Scenario()
+    obj.scenario = 'not a scenario of solarpvutil'
+    assert 'report_end_year' not in incremental.TABLE_FIELDS
+    updated = incremental.update_ac(obj, report_end_year=2060)
+    assert updated is not obj
+    assert updated.ac.report_end_year == 2060
+    assert updated.scenario == obj.scenario
+
+
+def test_update_ac_matches_new_scenario():
+    obj = incremental.track(solution.solarpvutil.Scenario())
+    obj.c2.co2eq_mmt_reduced()
+    obj.oc.soln_vs_conv_single_iunit_npv()
+    first_cost = obj.fc.soln_pds_annual_world_first_cost()
+    tot_iunits = obj.ua.soln_pds_tot_iunits_reqd()
+
+    assert incremental.update_ac(obj, npv_discount_rate=0.05) is obj
+    assert obj.fc.soln_pds_annual_world_first_cost() is first_cost
+    assert incremental.update_ac(obj, conv_2014_cost=obj.ac.conv_2014_cost * 1.1) is obj
+    assert obj.ua.soln_pds_tot_iunits_reqd() is tot_iunits
+
+    expected = solution.solarpvutil.Scenario(scenario=obj.scenario, ac=obj.ac)
+    pd.testing.assert_series_equal(obj.oc.soln_vs_conv_single_iunit_npv(),
+            expected.oc.soln_vs_conv_single_iunit_npv())
+    pd.testing.assert_frame_equal(obj.fc.soln_pds_annual_world_first_cost().to_frame(),
+            expected.fc.soln_pds_annual_world_first_cost().to_frame())
+    pd.testing.assert_frame_equal(obj.oc.soln_marginal_first_cost().to_frame(),
+            expected.oc.soln_marginal_first_cost().to_frame())
+    pd.testing.assert_frame_equal(obj.c2.co2eq_mmt_reduced(), expected.c2.co2eq_mmt_reduced())
@@ -160,6 +160,26 @@ def test_empty_data():
     assert result.isna().all(axis=None, skipna=False)
 
 
+def test_fit_trends():
+    adoption_low_med_high = pd.DataFrame(adoption_low_med_high_list[1:],
+                                         columns=adoption_low_med_high_list[0], dtype=np.float64).set_index(
+        'Year')
+    adoption_low_med_high.loc[2012:2016, 'High'] = np.nan
+    adoption_low_med_high.loc[:, 'Empty'] = np.nan
+    fits = itrp.fit_trends(adoption_low_med_high)
+    single = {'linear': itrp.linear_trend, 'degree2': itrp.poly_degree2_trend,
+              'degree3': itrp.poly_degree3_trend, 'exponential': itrp.exponential_trend}
+    for (trend, func) in single.items():
+        assert list(fits[trend]['adoption'].columns) == ['Low', 'Medium', 'High', 'Empty']
+        for name in ['Low', 'Medium', 'High', 'Empty']:
+            expected = func(adoption_low_med_high.loc[:, name])
+            result = itrp.series_trend(fits, trend, name)
+            pd.testing.assert_frame_equal(result, expected, check_exact=False, rtol=1e-9)
+    coefficients = itrp.trend_coefficients(adoption_low_med_high, trends=['degree3'])
+    assert coefficients['degree3'].shape == (4, 4)
+    assert np.isnan(coefficients['degree3'][:, 3]).all()
+
+
 g_data_sources = {
     'Ambitious Cases': {
         'Ambitious 1': 'filename1',
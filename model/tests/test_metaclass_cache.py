@@ -1,7 +1,8 @@
 """Tests for metaclass_cache.py"""
 
 import pandas as pd
-from model.metaclass_cache import MetaclassCache
+import pytest
+from model.metaclass_cache import InstanceCache, MetaclassCache, cached
 
 # test_tam.py also exercises metaclass_cache.
 
@@ -32,3 +33,61 @@ def test_cache():
     a = MemoizedClass(df=df, number=6, number2=6)
     b = MemoizedClass(df=df, number=7, number2=7)
     assert a is not b
+
+
+class TableClass(object, metaclass=MetaclassCache):
+    def __init__(self, number):
+        self.number = number
+
+    @cached
+    def table(self, rows):
+        return pd.DataFrame(float(self.number), index=range(rows), columns=['A', 'B'])
+
+
+@pytest.fixture
+def cache(monkeypatch):
+    cache = InstanceCache(max_bytes=None)
+    monkeypatch.setattr(MetaclassCache, 'cache', cache)
+    return cache
+
+
+def test_entry_limit(cache):
+    cache.set_limit(TableClass, max_entries=2)
+    a = TableClass(number=1)
+    b = TableClass(number=2)
+    assert TableClass(number=1) is a
+    c = TableClass(number=3)
+    assert len(cache) == 2
+    assert TableClass(number=1) is a
+    assert TableClass(number=2) is not b
+    assert cache.stats()['TableClass'] == {'entries': 2, 'bytes': 0, 'hits': 2, 'misses': 4,
+            'evictions': 2}
+    assert c.number == 3
+
+
+def test_byte_limit(cache):
+    a = TableClass(number=1)
+    nbytes = a.table(rows=1000).memory_usage(index=True).sum()
+    assert a.table(rows=1000) is a.table(rows=1000)
+    assert cache.bytes == nbytes
+    cache.max_bytes = int(nbytes * 1.5)
+    b = TableClass(number=2)
+    b.table(rows=1000)
+    assert len(cache) == 1
+    assert cache.bytes == nbytes
+    assert TableClass(number=2) is b
+    assert TableClass(number=1) is not a
+    assert cache.stats()['TableClass']['evictions'] == 1
+
+
+def test_scope_and_clear(cache):
+    a = TableClass(number=1)
+    with cache.scope():
+        b = TableClass(number=2)
+        assert TableClass(number=2) is b
+    assert TableClass(number=1) is a
+    assert TableClass(number=2) is not b
+    assert cache.stats()['TableClass']['evictions'] == 0
+    cache.clear()
+    assert len(cache) == 0 and cache.bytes == 0 and cache.stats() == {}
+    assert TableClass(number=1) is not a
@@ -3,6 +3,7 @@
 from model import advanced_controls
 from model import operatingcost
 import numpy as np
+import numpy_financial
 import pandas as pd
 import pytest
 import pathlib
@@ -105,6 +106,14 @@ def test_conv_ref_annual_breakout_core():
     assert 2061 not in result.index
 
 
+def test_annual_breakout_total():
+    oc = _defaultOperatingCost()
+    pd.testing.assert_series_equal(oc.soln_pds_annual_breakout_total(),
+            oc.soln_pds_annual_breakout().sum(axis=1), check_names=False)
+    pd.testing.assert_series_equal(oc.conv_ref_annual_breakout_total(),
+            oc.conv_ref_annual_breakout().sum(axis=1), check_names=False)
+
+
 def test_soln_pds_annual_operating_cost():
     oc = _defaultOperatingCost()
     result = oc.soln_pds_annual_operating_cost()
@@ -413,6 +422,30 @@ def test_soln_vs_conv_single_iunit_npv_purchase_year_discount_rate():
     pd.testing.assert_series_equal(result, expected, check_exact=False)
 
 
+def test_soln_vs_conv_single_iunit_npv_for_rates():
+    oc = _defaultOperatingCost(npv_discount_rate=0.071, single_iunit_purchase_year=2025)
+    result = oc.soln_vs_conv_single_iunit_npv_for_rates([0.03, 0.071, 0.1])
+    assert list(result.columns) == [0.03, 0.071, 0.1]
+    pd.testing.assert_series_equal(result[0.071], oc.soln_vs_conv_single_iunit_npv(),
+            check_names=False, check_exact=True)
+    assert (result.loc[2020:2040, 0.03].abs() > result.loc[2020:2040, 0.1].abs()).all()
+
+
+def test_npv_by_period():
+    cashflow = pd.Series([-100.0, 20.0, 30.0, np.nan, 40.0], index=range(2015, 2020))
+    result = operatingcost.npv_by_period(cashflow, rate=0.05, offset=2)
+    for n, year in enumerate(cashflow.index):
+        l = [0] * (n + 2) + [cashflow.iloc[n]]
+        expected = numpy_financial.npv(rate=0.05, values=l)
+        if np.isnan(expected):
+            assert np.isnan(result[year])
+        else:
+            assert result[year] == expected
+    result = operatingcost.npv_by_period(cashflow, rate=[0.05, 0.1], offset=2)
+    assert result.shape == (5, 2)
+    assert result.loc[2016, 0.1] == pytest.approx(20.0 / 1.1 ** 3)
+
+
 def test_soln_vs_conv_single_iunit_payback():
     oc = _defaultOperatingCost()
     result = oc.soln_vs_conv_single_iunit_payback()
@@ -481,6 +514,13 @@ def test_soln_only_single_iunit_payback_discounted():
     pd.testing.assert_series_equal(result, expected, check_exact=False)
 
 
+def test_payback():
+    cashflow = pd.Series([-10.0, 3.0, 3.0, 4.0, 1.0], index=range(2015, 2020))
+    result = operatingcost.payback(cashflow)
+    expected = pd.Series([0, 0, 0, 1, 1], index=range(2015, 2020), dtype=np.int64)
+    pd.testing.assert_series_equal(result, expected)
+
+
 def test_annual_breakout_no_fractional_years():
     # soln_lifetime_years == 24.000000000000058. The infitesimally small remainder
     # should be less than one cent, and be rounded down to zero.
@@ -0,0 +1,89 @@
+"""Tests for result_cache.py."""
+
+import os
+import time
+
+import pandas as pd
+import pytest
+
+from model import result_cache
+from solution import solarpvutil
+
+
+def test_round_trip(tmp_path):
+    cache = result_cache.ResultCache(path=tmp_path)
+    scenario = list(solarpvutil.scenarios.keys())[0]
+    computed = cache.results(solarpvutil.Scenario, scenario)
+    assert (cache.hits, cache.misses) == (0, 1)
+    assert 'c2.co2eq_mmt_reduced' in computed
+    loaded = cache.results(solarpvutil.Scenario, scenario)
+    assert (cache.hits, cache.misses) == (1, 1)
+    assert loaded.keys() == computed.keys()
+    for (name, table) in computed.items():
+        if isinstance(table, pd.Series):
+            pd.testing.assert_series_equal(loaded[name], table, check_exact=True)
+        else:
+            pd.testing.assert_frame_equal(loaded[name], table, check_exact=True)
+
+
+def test_compute():
+    obj = solarpvutil.Scenario()
+    tables = result_cache.compute(obj, ['ua.soln_pds_tot_iunits_reqd', 'ua.no_such_table',
+        'no_such_module.table'])
+    assert list(tables.keys()) == ['ua.soln_pds_tot_iunits_reqd']
+    obj.fc.soln_pds_annual_world_first_cost = lambda: 1 / 0
+    with pytest.raises(ZeroDivisionError):
+        result_cache.compute(obj, ['fc.soln_pds_annual_world_first_cost'])
+
+
+def test_code_version_imports():
+    modules = result_cache._project_modules()
+    assert result_cache.ROOT_PATH.joinpath('tools', 'vma_xls_extract.py') in modules
+    assert result_cache.ROOT_PATH.joinpath('model', 'tam.py') in modules
+    assert not any('solarpvutil' in m.parts for m in modules)
+
+
+def test_data_version_modified(tmp_path, monkeypatch):
+    monkeypatch.setattr(result_cache, 'ROOT_PATH', tmp_path)
+    tmp_path.joinpath('data').mkdir()
+    tmp_path.joinpath('solution', 'example', 'tests').mkdir(parents=True)
+    tam = tmp_path.joinpath('data', 'tam.csv')
+    tam.write_text("Year,World\n2014,1.0\n")
+    version = result_cache.data_version('example')
+    tmp_path.joinpath('solution', 'example', 'tests', 'expected.zip').write_bytes(b'')
+    assert result_cache.data_version('example') == version
+    tam.write_text("Year,World\n2014,2.0\n")
+    stat = os.stat(tam)
+    os.utime(tam, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert result_cache.data_version('example') != version
+
+
+def test_stale(tmp_path, monkeypatch):
+    cache = result_cache.ResultCache(path=tmp_path)
+    table = pd.DataFrame({'World': [1.0, 2.0]}, index=pd.Index([2014, 2015], name='Year'))
+    meta = {'solution': 'solarpvutil', 'scenario': 's',
+            'code_version': result_cache.code_version(),
+            'data_version': result_cache.data_version('solarpvutil')}
+    cache.store('current', {'ua.table': table}, meta=meta)
+    pd.testing.assert_frame_equal(cache.load('current')['ua.table'], table)
+    [entry] = cache.entries()
+    assert not cache.is_stale(entry)
+    monkeypatch.setattr(result_cache, 'code_version', lambda: 'changed')
+    assert cache.is_stale(entry)
+    cache.store('changed', {'ua.table': table}, meta=dict(meta, code_version='changed'))
+    assert [e['key'] for e in cache.entries()] == ['changed']
+
+
+def test_prune(tmp_path):
+    cache = result_cache.ResultCache(path=tmp_path)
+    table = pd.Series([1.0, 2.0, 3.0], name='World')
+    for (i, key) in enumerate(['a', 'b', 'c']):
+        cache.store(key, {'ua.table': table}, meta={'solution': None, 'scenario': key,
+            'code_version': None, 'data_version': None})
+        used = time.time() - (3 - i) * 86400
+        os.utime(tmp_path.joinpath(key + '.npz'), (used, used))
+    assert cache.prune(older_than=2.5 * 86400) == ['a']
+    size = tmp_path.joinpath('c.npz').stat().st_size
+    assert cache.prune(max_bytes=size) == ['b']
+    assert cache.prune(stale=True) == ['c']
+    assert cache.entries() == []
@@ -79,6 +79,45 @@ def test_logistic_adoption():
 
 
 
+def test_logistic_curves_batch():
+    sconfig = pd.DataFrame([
+        ['World', 2014, 2050, 0.346959145052, 0.95, 16577.8259167003, 77969.4257883872],
+        ['OECD90', 2014, 2050, 0.677494504097, 1.0, 14915.99, 30578.7612542884],
+        ['Eastern Europe', 2014, 2050, 0.0, 0.212709603444, 325.933926458798, 1532.2953039347],
+        ['China', 2014, 2050, 0.0848, 0.0, 1087.77094452167, 18965.135056084]],
+        columns=['region', 'base_year', 'last_year', 'base_percent', 'last_percent',
+                 'base_adoption', 'pds_tam_2050']).set_index('region')
+    slower = sconfig.copy()
+    slower['last_year'] = 2055
+    batch = pd.concat({'fast': sconfig, 'slow': slower})
+    result = s_curve.logistic_curves(sconfig=batch, transition_period=16)
+    assert list(result.columns) == list(batch.index)
+    for (name, config) in [('fast', sconfig), ('slow', slower)]:
+        expected = s_curve.SCurve(transition_period=16, sconfig=config).logistic_adoption()
+        pd.testing.assert_frame_equal(result[name], expected, check_names=False)
+    assert result[('fast', 'Eastern Europe')].isna().all()
+    assert result[('fast', 'China')].isna().all()
+    assert result.loc[2050, ('slow', 'World')] < result.loc[2050, ('fast', 'World')]
+
+
+def test_invalid_sconfig():
+    sconfig = pd.DataFrame([['World', 2014, 2050, 1.2, 0.95, 100.0, 1000.0]],
+        columns=['region', 'base_year', 'last_year', 'base_percent', 'last_percent',
+                 'base_adoption', 'pds_tam_2050']).set_index('region')
+    with pytest.raises(ValueError):
+        s_curve.logistic_curves(sconfig=sconfig, transition_period=16)
+    sconfig['base_percent'] = 0.1
+    sconfig['last_percent'] = -0.5
+    with pytest.raises(ValueError):
+        s_curve.logistic_curves(sconfig=sconfig, transition_period=16)
+    sconfig = pd.DataFrame([['World', 2014, 2050, 0.5, 100.0, 0.0, 0.001, 0.1]],
+        columns=['region', 'base_year', 'last_year', 'base_percent', 'base_adoption',
+                 'pds_tam_2050', 'innovation', 'imitation']).set_index('region')
+    result = s_curve.bass_diffusion_curves(sconfig=sconfig)
+    assert result.loc[2014, 'World'] == 100.0
+    assert (result.loc[2015:, 'World'] == -np.inf).all()
+
+
 def test_bass_diffusion():
     # From Water Efficiency Measures "S Curve Adoption"!B119:K128
     sconfig = pd.DataFrame([
@@ -0,0 +1,60 @@
+"""Tests for source_cache.py."""
+
+import os
+
+import numpy as np
+import pandas as pd
+import pytest
+
+from model import source_cache
+
+
+def _write(path, rows):
+    path.write_text("Year, World, OECD90\n" + "".join(f"{r[0]}, {r[1]}, {r[2]}\n" for r in rows))
+
+
+def test_read_csv_once(tmp_path):
+    filename = tmp_path.joinpath('tam.csv')
+    _write(filename, [(2014, 1.0, 2.0), (2015, 3.0, 4.0)])
+    cache = source_cache.SourceCache()
+    first = cache.read_csv(filename, index_col="Year", skipinitialspace=True)
+    second = cache.read_csv(str(filename), index_col="Year", skipinitialspace=True)
+    expected = pd.read_csv(filename, index_col="Year", skipinitialspace=True)
+    pd.testing.assert_frame_equal(first, expected)
+    pd.testing.assert_frame_equal(second, expected)
+    assert cache.stats() == {'hits': 1, 'misses': 1, 'entries': 1}
+    assert np.shares_memory(first['World'].values, second['World'].values)
+    with pytest.raises(ValueError):
+        first.loc[2014, 'World'] = 10.0
+    second['Sum'] = second['World'] + second['OECD90']
+    assert 'Sum' not in cache.read_csv(filename, index_col="Year", skipinitialspace=True)
+    cache.read_csv(filename, index_col=0, skipinitialspace=True)
+    assert cache.stats()['misses'] == 2
+
+
+def test_read_csv_modified(tmp_path):
+    filename = tmp_path.joinpath('tam.csv')
+    _write(filename, [(2014, 1.0, 2.0)])
+    cache = source_cache.SourceCache()
+    assert cache.read_csv(filename, index_col=0).iloc[0, 0] == 1.0
+    _write(filename, [(2014, 5.0, 2.0)])
+    stat = os.stat(filename)
+    os.utime(filename, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert cache.read_csv(filename, index_col=0).iloc[0, 0] == 5.0
+    assert cache.stats() == {'hits': 0, 'misses': 2, 'entries': 1}
+    cache.clear()
+    assert cache.stats() == {'hits': 0, 'misses': 0, 'entries': 0}
+
+
+def test_read_csv_mixed_dtypes(tmp_path):
+    filename = tmp_path.joinpath('vma.csv')
+    filename.write_text("Source ID,Raw Data Input,Exclude Data?\nStudy A,0.5,False\nStudy B,7,True\n")
+    cache = source_cache.SourceCache()
+    first = cache.read_csv(filename, index_col=False)
+    pd.testing.assert_frame_equal(first, pd.read_csv(filename, index_col=False))
+    second = cache.read_csv(filename, index_col=False)
+    assert np.shares_memory(first['Raw Data Input'].values, second['Raw Data Input'].values)
+    with pytest.raises(ValueError):
+        first.loc[0, 'Source ID'] = 'Study C'
+    first['Source ID'] = first['Source ID'].str.upper()
+    assert second.loc[0, 'Source ID'] == 'Study A'
@@ -0,0 +1,69 @@
+"""Tests for source_store.py."""
+
+import os
+
+import numpy as np
+import pandas as pd
+
+from model import source_cache
+from model import source_store
+
+
+def _compile(tmp_path, files):
+    cache = source_cache.SourceCache()
+    for (filename, kwargs) in files:
+        cache.read_csv(filename, **kwargs)
+    store = source_store.SourceStore(path=tmp_path.joinpath('store'), root=tmp_path)
+    skipped = store.write(cache.parsed())
+    return (store, skipped)
+
+
+def test_round_trip(tmp_path):
+    tam = tmp_path.joinpath('tam.csv')
+    tam.write_text("Year, World, OECD90\n2014, 1.5, 2.0\n2015, 3.0, \n")
+    vma = tmp_path.joinpath('vma.csv')
+    vma.write_text("Source ID,Raw Data Input,Weight,Exclude Data?\n"
+                   "Study A,0.5,,False\nStudy B,7,10%,True\n")
+    files = [(tam, {'index_col': 'Year', 'skipinitialspace': True}),
+             (vma, {'index_col': False, 'skipinitialspace': True})]
+    (store, skipped) = _compile(tmp_path, files)
+    assert skipped == []
+    assert store.stats()['entries'] == 2
+    for (filename, kwargs) in files:
+        frame = store.load(filename, source_cache._freeze(kwargs))
+        pd.testing.assert_frame_equal(frame, pd.read_csv(filename, **kwargs), check_exact=True)
+    assert store.load(tam, source_cache._freeze({'index_col': 0})) is None
+    assert store.stats()['hits'] == 2
+
+
+def test_modified_file_is_stale(tmp_path):
+    tam = tmp_path.joinpath('tam.csv')
+    tam.write_text("Year,World\n2014,1.0\n")
+    (store, _) = _compile(tmp_path, [(tam, {'index_col': 0})])
+    kwargs = source_cache._freeze({'index_col': 0})
+    stat = os.stat(tam)
+    os.utime(tam, ns=(stat.st_atime_ns, stat.st_mtime_ns + 1000000000))
+    assert store.load(tam, kwargs).iloc[0, 0] == 1.0
+    tam.write_text("Year,World\n2014,2.0\n")
+    assert store.load(tam, kwargs) is None
+    assert store.stats()['stale'] == 1
+    cache = source_cache.SourceCache(store=store)
+    assert cache.read_csv(tam, index_col=0).iloc[0, 0] == 2.0
+
+
+def test_missing_store(tmp_path):
+    store = source_store.SourceStore(path=tmp_path.joinpath('none'), root=tmp_path)
+    tam = tmp_path.joinpath('tam.csv')
+    tam.write_text("Year,World\n2014,1.0\n")
+    assert store.load(tam, ()) is None
+    assert store.stats() == {'hits': 0, 'stale': 0, 'entries': 0}
+
+
+def test_cache_shares_store(tmp_path):
+    tam = tmp_path.joinpath('tam.csv')
+    tam.write_text("Year,World,OECD90\n2014,1.0,2.0\n2015,3.0,4.0\n")
+    (store, _) = _compile(tmp_path, [(tam, {'index_col': 0})])
+    cache = source_cache.SourceCache(store=store)
+    frame = cache.read_csv(tam, index_col=0)
+    assert store.stats()['hits'] == 1
+    assert np.shares_memory(frame.values, store._array(str(frame.values.dtype)))
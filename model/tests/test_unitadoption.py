@@ -197,6 +197,24 @@ def test_ref_cumulative_degraded_land_protected():
     pd.testing.assert_series_equal(result['World'], expected_world)
 
 
+def test_degraded_land_recurrence_scenarios():
+    datadir = this_dir.parents[0].joinpath('data')
+    tla_per_reg = pd.read_csv(datadir.joinpath('fp_tla_per_reg.csv'), index_col=0)
+    units_adopted = pd.read_csv(datadir.joinpath('fp_units_adopted.csv'), index_col=0)
+    units = units_adopted.loc[2014:2060].values
+    tla = tla_per_reg.loc[2014:2060, units_adopted.columns].values
+    rates = np.array([0.003074, 0.01])
+    stacked = unitadoption.degraded_land_recurrence(np.stack([units, units]),
+            rate=rates[:, np.newaxis], delay=1, total_area=np.stack([tla, tla]))
+    for (i, rate) in enumerate(rates):
+        ac = advanced_controls.AdvancedControls(degradation_rate=rate,
+                delay_protection_1yr=True, disturbance_rate=1)
+        ua = unitadoption.UnitAdoption(ac=ac, soln_ref_funits_adopted=None,
+                soln_pds_funits_adopted=units_adopted, pds_total_adoption_units=tla_per_reg)
+        expected = ua.pds_cumulative_degraded_land_unprotected()
+        np.testing.assert_array_equal(stacked[i], expected.values)
+    assert stacked[1, -1, 0] > stacked[0, -1, 0]  # World degrades faster at the higher rate
+
 def test_pds_total_undegraded_land():
     ac = advanced_controls.AdvancedControls(degradation_rate=0.003074,
             disturbance_rate=0.0000157962432447763, delay_protection_1yr=True)
@@ -957,6 +975,24 @@ def test_soln_ref_new_iunits_reqd_multiple_replacements():
     assert result.loc[2060, 'World'] == pytest.approx(0.00887672581)
 
 
+def test_soln_ref_new_iunits_reqd_replacement_chain():
+    funits = pd.DataFrame({'World': [0.0, 1.0, 3.0, 2.0, 5.0, 5.0, 9.0],
+                           'OECD90': [0.0, 2.0, 2.0, 1.0, 1.0, 3.0, 0.0]},
+                          index=pd.Index(range(2014, 2021), name='Year'))
+    ac = advanced_controls.AdvancedControls(solution_category=SOLUTION_CATEGORY.LAND,
+            conv_expected_lifetime=1.0)
+    ua = unitadoption.UnitAdoption(ac=ac,
+            ref_total_adoption_units=None, pds_total_adoption_units=None,
+            soln_pds_funits_adopted=None, soln_ref_funits_adopted=funits)
+    result = ua.soln_ref_new_iunits_reqd()
+    # replacements of replacements are carried forward, and no replacement is
+    # added in a year where adoption has fallen since the original installation.
+    expected = pd.DataFrame({'World': [1.0, 2.0, 1.0, 5.0, 1.0, 9.0],
+                             'OECD90': [2.0, 0.0, 0.0, 0.0, 2.0, 0.0]},
+                            index=pd.Index(range(2015, 2021), name='Year'))
+    pd.testing.assert_frame_equal(result, expected, check_exact=True)
+
+
 def test_soln_ref_new_iunits_reqd_repeated_cost_for_iunits():
     soln_ref_funits_adopted = pd.DataFrame(soln_funits_adopted_altcement_list[1:],
             columns=soln_funits_adopted_altcement_list[0]).set_index('Year')
@@ -1093,6 +1129,20 @@ def test_soln_pds_annual_land_area_harvested():
                 expected.loc[:, ['World']])
 
 
+def test_soln_pds_annual_land_area_harvested_every_year():
+    new_land_units_reqd = pd.DataFrame(1.0, index=range(2015, 2061), columns=['World', 'OECD90'])
+    ac = advanced_controls.AdvancedControls(harvest_frequency=1)
+    with mock.patch.object(unitadoption.UnitAdoption, 'soln_pds_new_iunits_reqd',
+                           new=lambda x: new_land_units_reqd):
+        ua = unitadoption.UnitAdoption(ac=ac, soln_ref_funits_adopted=None,
+                soln_pds_funits_adopted=None)
+        result = ua.soln_pds_annual_land_area_harvested()
+    # every earlier year except the most recent has been harvested, with no cap on the count.
+    assert result.loc[2015, 'World'] == 0.0
+    assert result.loc[2016, 'World'] == 0.0
+    assert result.loc[2017, 'World'] == 1.0
+    assert result.loc[2060, 'OECD90'] == 44.0
+
 def test_soln_pds_annual_land_area_harvested_perennial_biomass():
     soln_pds_funits_adopted = pd.DataFrame(net_annual_land_units_adopted_perbiomass_list[1:],
             columns=net_annual_land_units_adopted_perbiomass_list[0]).set_index('Year')
@@ -305,6 +305,47 @@ def test_avg_high_low_by_region_with_special_countries():
     assert result[0] == pytest.approx(0.5)
 
 
+def test_summary_table():
+    f = io.StringIO("""Source ID, Raw Data Input, Original Units, Conversion calculation, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
+      A, 0.4, Mha,, 1.0, False, Temperate/Boreal-Humid, OECD90
+      B, 0.5, Mha,, 2.0, False, Temperate/Boreal-Humid, USA
+      C, 0.6, Mha,, 1.0, False, Tropical-Humid, Latin America
+      D, 0.9, Mha,, 1.0, True, Tropical-Humid, Latin America
+      """)
+    v = vma.VMA(filename=f, use_weight=True)
+    table = v.summary_table()
+    assert ('', '') in table.index
+    assert ('Temperate/Boreal-Humid', 'OECD90') in table.index
+    assert ('Tropical-Humid', 'USA') not in table.index
+    for (regime, region) in table.index:
+        expected = v._filtered_mean_sd(regime=regime or None, region=region or None)
+        assert v._mean_sd(regime=regime or None, region=region or None) == pytest.approx(expected)
+        assert v.avg_high_low(regime=regime, region=region) == pytest.approx(
+                tuple(table.loc[(regime, region)]))
+    for region in ['China', 'World', None]:
+        for regime in ['Tropical-Humid', 'Arctic', None]:
+            result = v.avg_high_low(regime=regime, region=region)
+            (mean, sd) = v._filtered_mean_sd(regime=regime, region=region)
+            assert result == pytest.approx((mean, mean + sd, mean - sd), nan_ok=True)
+    v.use_weight = False
+    assert v.avg_high_low(key='mean') == pytest.approx(0.5)
+    v.high_sd = 2.0
+    assert v.avg_high_low(key='high') == pytest.approx(0.5 + 2 * v.df['Value'].iloc[:3].std(ddof=0))
+
+
+def test_summary_table_reload(tmp_path):
+    filename = tmp_path.joinpath('vma.csv')
+    pd.read_csv(datadir.joinpath('vma1_silvopasture.csv')).to_csv(filename, index=False)
+    v = vma.VMA(filename=filename)
+    assert v.avg_high_low() == pytest.approx((314.15, 450.0, 178.3))
+    df = v.source_data.copy()
+    df['Raw Data Input'] = 100.0
+    df['Conversion calculation'] = 100.0
+    v.write_to_file(df)
+    assert v.avg_high_low() == pytest.approx((100.0, 100.0, 100.0))
+    assert v.summary_table().loc[('', ''), 'Mean'] == pytest.approx(100.0)
+
+
 def test_no_warnings_in_avg_high_low():
     f = io.StringIO("""Source ID, Raw Data Input, Original Units, Conversion calculation, Weight, Exclude Data?, Thermal-Moisture Regime, World / Drawdown Region
       A, 1.0, Mha,, 0.0, False
@@ -388,3 +429,28 @@ def test_bad_filetype():
         vma.VMA(filename='file.bad')
     assert 'file.bad' in error.exconly()
     assert 'not a recognized filetype for vma.VMA' in error.exconly()
+
+def test_deferred_read(tmp_path):
+    filename = tmp_path.joinpath('vma.csv')
+    v = vma.VMA(filename=filename)
+    assert v._pending == filename
+    pd.read_csv(datadir.joinpath('vma1_silvopasture.csv')).to_csv(filename, index=False)
+    assert v.avg_high_low() == pytest.approx((314.15, 450.0, 178.3))
+    assert v._pending is None
+    missing = vma.VMA(filename=tmp_path.joinpath('missing.csv'))
+    for _ in range(2):
+        with pytest.raises(FileNotFoundError):
+            missing.avg_high_low()
+
+def test_deferred_fixed_summaries():
+    VMAs = {
+      'Testing Fixed Summary': vma.VMA(
+          filename=datadir.joinpath("vma1_silvopasture.csv"),
+          use_weight=False),
+      'Other': vma.VMA(filename=None),
+      }
+    vma.populate_fixed_summaries(vma_dict=VMAs, filename=datadir.joinpath('VMA_info_w_summary.csv'))
+    VMAs['Other'].fixed_summary = (5.0, 6.0, 4.0)
+    assert VMAs['Testing Fixed Summary'].avg_high_low() == (2.0, 3.0, 1.0)
+    assert VMAs['Other'].avg_high_low() == (5.0, 6.0, 4.0)
+    assert VMAs['Testing Fixed Summary']._pending is not None
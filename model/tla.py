@@ -6,10 +6,9 @@ Drawdown. The only real function of the TLA tab is to provide a place to input c
 which can be used instead of Drawdown's allocations. Thus, this class is named CustomTLA.
 """
 
-from functools import lru_cache
 import pandas as pd
 from model import dd
-from model.metaclass_cache import MetaclassCache
+from model.metaclass_cache import MetaclassCache, cached
 
 
 def tla_per_region(land_dist, custom_world_values=None):
@@ -61,6 +60,6 @@ class CustomTLA(object, metaclass=MetaclassCache):
         # statistical calcs if a solution calls for it.
         return self.df
 
-    @lru_cache()
+    @cached
     def get_world_values(self):
         return self._avg_high_low()
@@ -1,12 +1,107 @@
 """Unit Adoption module."""
 
-from functools import lru_cache
 import os.path
 import pathlib
 import pandas as pd
 import numpy as np
 from model import emissionsfactors
 from model.advanced_controls import SOLUTION_CATEGORY
+from model.deferred import Deferred
+from model.incremental import cached
+
+
+def _add_replacement_units(new_units, funits_adopted, lifetime):
+    """Add lifetime replacements to a table of newly installed units.
+
+       Units installed (lifetime + 1) years ago need replacing this year, provided adoption
+       has not fallen since then. Replacements themselves wear out and are replaced in turn,
+       so each year adds the already-updated value from (lifetime + 1) years earlier.
+
+       Rows only depend on rows exactly one lag earlier, so the table is processed one
+       lag-sized block of years at a time with each block computed as a whole-array
+       operation. Results are identical to adding the replacements year by year.
+
+       Arguments:
+         new_units: DataFrame of new units per year (consecutive years) and region.
+         funits_adopted: DataFrame of functional units adopted, covering at least the
+           years and regions of new_units.
+         lifetime: lifetime of an implementation unit in whole years.
+    """
+    lag = int(lifetime) + 1
+    units = new_units.values.astype(np.float64, copy=True)
+    adopted = funits_adopted.loc[new_units.index, new_units.columns].values
+    with np.errstate(invalid='ignore'):
+        still_adopted = adopted[:-lag] <= adopted[lag:]
+    for start in range(lag, units.shape[0], lag):
+        stop = min(start + lag, units.shape[0])
+        block = units[start:stop]
+        units[start:stop] = np.where(still_adopted[start - lag:stop - lag],
+                                     block + units[start - lag:stop - lag], block)
+    return pd.DataFrame(units, index=new_units.index.copy(), columns=new_units.columns.copy())
+
+
+def _lagged_sum(values, lag, stride=None, start=None):
+    """Sum of earlier rows of a (years, regions) array of consecutive years.
+
+       Row i of the result is values[i - lag] + values[i - lag - stride] + ... over every
+       such row which exists, accumulated most recent first. With stride None only
+       values[i - lag] is taken. Rows before start (default: lag) are zero.
+    """
+    values = np.asarray(values, dtype=np.float64)
+    num_rows = values.shape[0]
+    result = np.zeros(values.shape, dtype=np.float64)
+    while lag < num_rows:
+        result[lag:] += values[:num_rows - lag]
+        if stride is None:
+            break
+        lag += stride
+    if start is not None:
+        result[:start] = 0.0
+    return result
+
+
+def degraded_land_recurrence(units_adopted, rate, delay, total_area=None):
+    """Cumulative degraded land, one year after another, for all regions at once.
+
+       Protected land (total_area is None):
+         degraded[y] = min(degraded[y-1] + (protected[y] - degraded[y-1]) * rate, protected[y])
+         starting from degraded[0] = units_adopted[0] * rate.
+       Unprotected land:
+         degraded[y] = min(degraded[y-1] +
+                           (total_area[y] - protected[y] - degraded[y-1]) * rate, total_area[y])
+         starting from degraded[0] = 0.
+       where protected[y] = units_adopted[y - delay]. As with DataFrame.min(), a NaN is
+       ignored in favor of the other value.
+
+       Arguments:
+         units_adopted: array of (..., years, regions) land protected by the solution.
+           Leading dimensions, if any, are independent scenarios computed together.
+         rate: disturbance rate (protected) or degradation rate (unprotected), a scalar or
+           an array broadcastable to (..., regions), e.g. shape (scenarios, 1).
+         delay: 1 if protection takes effect a year after adoption, otherwise 0.
+         total_area: None for the protected table, otherwise an array shaped like
+           units_adopted of the total land area.
+    """
+    units = np.asarray(units_adopted, dtype=np.float64)
+    rate = np.asarray(rate, dtype=np.float64)
+    result = np.empty(units.shape, dtype=np.float64)
+    if total_area is None:
+        result[..., 0, :] = units[..., 0, :] * rate
+    else:
+        total_area = np.asarray(total_area, dtype=np.float64)
+        result[..., 0, :] = 0.0
+    for y in range(1, units.shape[-2]):
+        protected_land = units[..., y - delay, :]
+        degraded_land = result[..., y - 1, :]
+        if total_area is None:
+            row = degraded_land + (protected_land - degraded_land) * rate
+            result[..., y, :] = np.fmin(row, protected_land)
+        else:
+            tot_area = total_area[..., y, :]
+            row = degraded_land + (tot_area - protected_land - degraded_land) * rate
+            result[..., y, :] = np.fmin(row, tot_area)
+    return result
+
 
 class UnitAdoption:
     """Implementation for the Unit Adoption module.
@@ -27,6 +122,10 @@ class UnitAdoption:
            is calculated per hectare.
     """
 
+    # table arguments, which may be passed as callables computing the table on first use.
+    soln_ref_funits_adopted = Deferred()
+    soln_pds_funits_adopted = Deferred()
+
     def __init__(self, ac, soln_ref_funits_adopted, soln_pds_funits_adopted,
                  ref_total_adoption_units=None, pds_total_adoption_units=None,
                  bug_cfunits_double_count=False, repeated_cost_for_iunits=False, electricity_unit_factor=1.0):
@@ -41,7 +140,7 @@ class UnitAdoption:
         self.repeated_cost_for_iunits = repeated_cost_for_iunits
         self.electricity_unit_factor = electricity_unit_factor
 
-    @lru_cache()
+    @cached
     def ref_population(self):
         """Population by region for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!P16:Z63
@@ -53,7 +152,7 @@ class UnitAdoption:
         result.name = "ref_population"
         return result
 
-    @lru_cache()
+    @cached
     def ref_gdp(self):
         """GDP by region for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!AB16:AL63
@@ -65,7 +164,7 @@ class UnitAdoption:
         result.name = "ref_gdp"
         return result
 
-    @lru_cache()
+    @cached
     def ref_gdp_per_capita(self):
         """GDP per capita for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!AN16:AX63
@@ -74,7 +173,7 @@ class UnitAdoption:
         result.name = "ref_gdp_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def ref_tam_per_capita(self):
         """Total Addressable Market per capita for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!BA16:BK63
@@ -83,7 +182,7 @@ class UnitAdoption:
         result.name = "ref_tam_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def ref_tam_per_gdp_per_capita(self):
         """Total Addressable Market per unit of GDP per capita for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!BM16:BW63
@@ -92,7 +191,7 @@ class UnitAdoption:
         result.name = "ref_tam_per_gdp_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def ref_tam_growth(self):
         """Growth in Total Addressable Market for the reference case.
            SolarPVUtil 'Unit Adoption Calculations'!BY16:CI63
@@ -102,7 +201,7 @@ class UnitAdoption:
         calc.name = "ref_tam_growth"
         return calc
 
-    @lru_cache()
+    @cached
     def pds_population(self):
         """Population by region for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!P68:Z115
@@ -114,7 +213,7 @@ class UnitAdoption:
         result.name = "pds_population"
         return result
 
-    @lru_cache()
+    @cached
     def pds_gdp(self):
         """GDP by region for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!AB68:AL115
@@ -126,7 +225,7 @@ class UnitAdoption:
         result.name = "pds_gdp"
         return result
 
-    @lru_cache()
+    @cached
     def pds_gdp_per_capita(self):
         """GDP per capita for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!AN68:AX115
@@ -135,7 +234,7 @@ class UnitAdoption:
         result.name = "pds_gdp_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def pds_tam_per_capita(self):
         """Total Addressable Market per capita for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!BA68:BK115
@@ -144,7 +243,7 @@ class UnitAdoption:
         result.name = "pds_tam_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def pds_tam_per_gdp_per_capita(self):
         """Total Addressable Market per unit of GDP per capita for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!BM68:BW115
@@ -153,7 +252,7 @@ class UnitAdoption:
         result.name = "pds_tam_per_gdp_per_capita"
         return result
 
-    @lru_cache()
+    @cached
     def pds_tam_growth(self):
         """Growth in Total Addressable Market for the Project Drawdown Solution case.
            SolarPVUtil 'Unit Adoption Calculations'!BY68:CI115
@@ -163,7 +262,7 @@ class UnitAdoption:
         calc.name = "pds_tam_growth"
         return calc
 
-    @lru_cache()
+    @cached
     def cumulative_reduction_in_total_degraded_land(self):
         """This is the increase in undegraded land in the PDS versus the REF (cumulatively in
            any year), and can be traced to the direct action of increasing SOLUTION adoption.
@@ -175,7 +274,7 @@ class UnitAdoption:
         result.name = 'cumulative_reduction_in_total_degraded_land'
         return result
 
-    @lru_cache()
+    @cached
     def annual_reduction_in_total_degraded_land(self):
         """This is the decrease in  total degraded land in the PDS versus the REF in each year.
            Units: Millions ha.
@@ -189,7 +288,7 @@ class UnitAdoption:
         result.name = 'annual_reduction_in_total_degraded_land'
         return result
 
-    @lru_cache()
+    @cached
     def pds_cumulative_degraded_land_unprotected(self):
         """This represents the total land degraded that was never protected in the PDS
            assuming the rate entered on the Advanced Controls sheet. This rate is applied
@@ -203,7 +302,7 @@ class UnitAdoption:
         result.name = 'pds_cumulative_degraded_land_unprotected'
         return result
 
-    @lru_cache()
+    @cached
     def pds_cumulative_degraded_land_protected(self):
         """Even Protected Land suffers from Degradation via Disturbances (perhaps due to
         natural or anthropogenic means such as logging, storms, fires or human settlement).
@@ -216,7 +315,7 @@ class UnitAdoption:
         result.name = 'pds_cumulative_degraded_land_protected'
         return result
 
-    @lru_cache()
+    @cached
     def pds_total_undegraded_land(self):
         """This represents the total land that is not degraded in any particular
            year of the PDS. It takes the TLA and removes the degraded land, which
@@ -233,7 +332,7 @@ class UnitAdoption:
         result.name = 'pds_total_undegraded_land'
         return result
 
-    @lru_cache()
+    @cached
     def ref_cumulative_degraded_land_unprotected(self):
         """This represents the total land degraded that was never protected in the REF
            assuming the rate entered on the Advanced Controls sheet. This rate is applied
@@ -247,7 +346,7 @@ class UnitAdoption:
         result.name = 'ref_cumulative_degraded_land_unprotected'
         return result
 
-    @lru_cache()
+    @cached
     def ref_cumulative_degraded_land_protected(self):
         """Even Protected Land suffers from Degradation via Disturbances (perhaps due to
            natural or anthropogenic means such as logging, storms, fires or human settlement).
@@ -261,7 +360,7 @@ class UnitAdoption:
         result.name = 'ref_cumulative_degraded_land_protected'
         return result
 
-    @lru_cache()
+    @cached
     def ref_total_undegraded_land(self):
         """This represents the total land that is not degraded in any particular year
            of the REF. It takes the TLA and removes the degraded land, which is the
@@ -307,24 +406,20 @@ class UnitAdoption:
             return df  # passthru a DataFrame of zeros for non protection solutions
 
         delay = 1 if self.ac.delay_protection_1yr else 0
+        units = units_adopted.loc[df.index, df.columns].values
         if protected_or_unprotected == 'protected':
             # protected table starts with nonzero value
-            df.loc[2014, :] = units_adopted.loc[2014, :] * self.ac.disturbance_rate
-
-        for y in list(df.index)[1:]:
-            protected_land = units_adopted.loc[y - delay, :]
-            degraded_land = df.loc[y - 1, :]
-            if protected_or_unprotected == 'protected':
-                row = degraded_land + (protected_land - degraded_land) * self.ac.disturbance_rate
-                row = pd.DataFrame([row, protected_land]).min()
-            elif protected_or_unprotected == 'unprotected':
-                tot_area = self.total_area_per_region.loc[y, :]
-                row = degraded_land + (tot_area - protected_land - degraded_land) * self.ac.degradation_rate
-                row = pd.DataFrame([row, tot_area]).min()
-            df.loc[y, :] = row
-        return df
-
-    @lru_cache()
+            degraded = degraded_land_recurrence(units, rate=self.ac.disturbance_rate,
+                    delay=delay)
+        elif protected_or_unprotected == 'unprotected':
+            tot_area = self.total_area_per_region.reindex(index=df.index, columns=df.columns)
+            degraded = degraded_land_recurrence(units, rate=self.ac.degradation_rate,
+                    delay=delay, total_area=tot_area.values)
+        else:
+            return df
+        return pd.DataFrame(degraded, index=df.index, columns=df.columns)
+
+    @cached
     def soln_pds_cumulative_funits(self):
         """Cumulative Functional Units Utilized.
            SolarPVUtil 'Unit Adoption Calculations'!Q134:AA181
@@ -342,7 +437,7 @@ class UnitAdoption:
         result.name = "soln_pds_cumulative_funits"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_tot_iunits_reqd(self):
         """Total iunits required each year.
            SolarPVUtil 'Unit Adoption Calculations'!AX134:BH181
@@ -353,7 +448,7 @@ class UnitAdoption:
         result.name = "soln_pds_tot_iunits_reqd"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_new_iunits_reqd(self):
         """New implementation units required (includes replacement units)
 
@@ -369,20 +464,12 @@ class UnitAdoption:
         if self.repeated_cost_for_iunits:
             return self.soln_pds_tot_iunits_reqd().iloc[1:].copy(deep=True).clip(lower=0.0)
         result = self.soln_pds_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]  # [0] nan w/ diff
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * soln_lifetime_replacement ago, that now need replacement.
-                replacement_year = int(year - (self.ac.soln_lifetime_replacement_rounded + 1))
-                if replacement_year in result.index:
-                    fa = self.soln_pds_funits_adopted
-                    prior_year = year - self.ac.soln_lifetime_replacement_rounded - 1
-                    if fa.loc[prior_year, region] <= fa.loc[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
+        result = _add_replacement_units(new_units=result, funits_adopted=self.soln_pds_funits_adopted,
+                lifetime=self.ac.soln_lifetime_replacement_rounded)
         result.name = "soln_pds_new_iunits_reqd"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_big4_iunits_reqd(self):
         """Implementation units required in USA/EU/China/India vs Rest of World.
            SolarPVUtil 'Unit Adoption Calculations'!BN136:BS182
@@ -403,7 +490,7 @@ class UnitAdoption:
         result.name = "soln_pds_big4_iunits_reqd"
         return result
 
-    @lru_cache()
+    @cached
     def soln_ref_cumulative_funits(self):
         """Cumulative functional units.
            SolarPVUtil 'Unit Adoption Calculations'!Q197:AA244
@@ -412,7 +499,7 @@ class UnitAdoption:
         result.name = "soln_ref_cumulative_funits"
         return result
 
-    @lru_cache()
+    @cached
     def soln_ref_tot_iunits_reqd(self):
         """Total implementation units required.
            SolarPVUtil 'Unit Adoption Calculations'!AX197:BH244"""
@@ -429,35 +516,18 @@ class UnitAdoption:
         if self.repeated_cost_for_iunits:
             return self.soln_ref_tot_iunits_reqd().iloc[1:].copy(deep=True).clip(lower=0.0)
         result = self.soln_ref_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]  # [0] NaN w/ diff
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * soln_lifetime_replacement ago, that now need replacement.
-                replacement_year = int(year - (self.ac.soln_lifetime_replacement_rounded + 1))
-                if replacement_year in result.index:
-                    fa = self.soln_ref_funits_adopted
-                    prior_year = year - self.ac.soln_lifetime_replacement_rounded - 1
-                    if fa.loc[prior_year, region] <= fa.loc[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
-        return result
+        return _add_replacement_units(new_units=result, funits_adopted=self.soln_ref_funits_adopted,
+                lifetime=self.ac.soln_lifetime_replacement_rounded)
 
     def soln_ref_new_iunits_reqd_LAND(self):
         """New implementation units required (includes replacement units), LAND version
            Afforestation 'Unit Adoption Calculations'!AG197:AQ244
         """
         result = self.soln_ref_funits_adopted.diff().clip(lower=0).iloc[1:]  # [0] NaN w/ diff
-        for region, column in result.iteritems():
-            for year, value in column.iteritems():
-                # Add replacement units, if needed by adding the number of units
-                # added N * conv_lifetime_replacement ago, that now need replacement.
-                replacement_year = int(year - (self.ac.conv_lifetime_replacement_rounded + 1))
-                if replacement_year in result.index:
-                    fa = self.soln_ref_funits_adopted
-                    if fa.at[replacement_year, region] <= fa.at[year, region]:
-                        result.at[year, region] += result.at[replacement_year, region]
-        return result
-
-    @lru_cache()
+        return _add_replacement_units(new_units=result, funits_adopted=self.soln_ref_funits_adopted,
+                lifetime=self.ac.conv_lifetime_replacement_rounded)
+
+    @cached
     def soln_ref_new_iunits_reqd(self):
         """New implementation units required (includes replacement units)
 
@@ -475,7 +545,7 @@ class UnitAdoption:
         result.name = "soln_ref_new_iunits_reqd"
         return result
 
-    @lru_cache()
+    @cached
     def soln_net_annual_funits_adopted(self):
         """Net annual functional units adopted.
 
@@ -496,7 +566,7 @@ class UnitAdoption:
         result.name = "soln_net_annual_funits_adopted"
         return result
 
-    @lru_cache()
+    @cached
     def net_annual_land_units_adopted(self):
         """Similar to soln_net_annual_funits_adopted, for Land models.
            Conservation Agriculture 'Unit Adoption Calculations'!B251:L298
@@ -505,7 +575,7 @@ class UnitAdoption:
         result.name = 'net_annual_land_units_adopted'
         return result
 
-    @lru_cache()
+    @cached
     def conv_ref_tot_iunits(self):
         """
         Note that iunits = land units for LAND models.
@@ -531,7 +601,7 @@ class UnitAdoption:
         result.name = "conv_ref_tot_iunits"
         return result
 
-    @lru_cache()
+    @cached
     def conv_ref_annual_tot_iunits(self):
         """Number of Implementation Units of the Conventional practice/technology that would
            be needed in the REF Scenario to meet the Functional Unit Demand met by the PDS
@@ -549,7 +619,7 @@ class UnitAdoption:
         result.name = "conv_ref_annual_tot_iunits"
         return result
 
-    @lru_cache()
+    @cached
     def conv_ref_new_iunits(self):
         """New implementation units required (includes replacement units)
 
@@ -579,7 +649,7 @@ class UnitAdoption:
             
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_net_grid_electricity_units_saved(self):
         """Energy Units (e.g. TWh, tonnes oil equivalent, million therms, etc.) are
            calculated by multiplying the net annual functional units adopted by the
@@ -596,7 +666,7 @@ class UnitAdoption:
         result.name = "soln_pds_net_grid_electricity_units_saved"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_net_grid_electricity_units_used(self):
         """Energy Units Used (TWh) are calculated by multiplying the net annual functional
            units adopted by the average annual electricity used by the solution per functional
@@ -621,7 +691,7 @@ class UnitAdoption:
         result.name = "soln_pds_net_grid_electricity_units_used"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_fuel_units_avoided(self):
         """Fuel consumption avoided annually.
            Fuel avoided = CONVENTIONAL stock avoided * Volume consumed by CONVENTIONAL
@@ -634,7 +704,7 @@ class UnitAdoption:
         result.name = "soln_pds_fuel_units_avoided"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_direct_co2_emissions_saved(self):
         """Direct emissions of CO2 avoided, in tons.
            SolarPVUtil 'Unit Adoption Calculations'!AT307:BD354
@@ -647,7 +717,7 @@ class UnitAdoption:
         result.name = "soln_pds_direct_co2_emissions_saved"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_direct_ch4_co2_emissions_saved(self):
         """Direct emissions of CH4 avoided, in tons of equivalent CO2.
 
@@ -661,7 +731,7 @@ class UnitAdoption:
         result.name = "soln_pds_direct_ch4_co2_emissions_saved"
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_direct_n2o_co2_emissions_saved(self):
         """Direct emissions of N2O avoided, in tons of CO2 equivalents.
 
@@ -675,7 +745,7 @@ class UnitAdoption:
         result.name = "soln_pds_direct_n2o_co2_emissions_saved"
         return result
 
-    @lru_cache()
+    @cached
     def net_land_units_after_emissions_lifetime(self):
         """Emissions after the calculated lifetime (which is often very long, ex: 100 years)
 
@@ -690,14 +760,15 @@ class UnitAdoption:
         else:
             funits = self.net_annual_land_units_adopted()
         result = pd.DataFrame(0, index=funits.index.copy(), columns=funits.columns.copy())
-        first_year = result.first_valid_index() + 1
-        for year, row in result.iterrows():
-            if (year - first_year) > self.ac.land_annual_emissons_lifetime:
-                result.loc[year] = funits.loc[year - self.ac.land_annual_emissons_lifetime - 1]
+        # rows start two years after the first year, one year later than the lag alone implies.
+        lag = int(self.ac.land_annual_emissons_lifetime) + 1
+        if lag + 1 < len(result.index):
+            result = pd.DataFrame(_lagged_sum(funits.values, lag=lag, start=lag + 1),
+                    index=funits.index.copy(), columns=funits.columns.copy())
         result.name = 'net_land_units_after_emissions_lifetime'
         return result
 
-    @lru_cache()
+    @cached
     def soln_pds_annual_land_area_harvested(self):
         """Land Area Harvested is used to estimate the impact of harvesting the product of the land on
            Carbon Sequestration (CO2 Calcs) and on Emissions (CO2 Calcs):
@@ -713,20 +784,14 @@ class UnitAdoption:
         result = pd.DataFrame(0, index=funits.index.copy(), columns=funits.columns.copy())
         if self.ac.harvest_frequency is None:
             return result
-        first_year = result.first_valid_index()
-        for year, row in result.iterrows():
-            if (year - first_year) >= self.ac.harvest_frequency:
-                year_last_harvested = year - 1
-                total_amount_harvested = 0
-                for _ in range(100):  # arbitrary finite range
-                    year_last_harvested -= self.ac.harvest_frequency
-                    if year_last_harvested < first_year:
-                        break
-                    total_amount_harvested += funits.loc[year_last_harvested]
-                else:
-                    raise ValueError(
-                        'Check value for harvest frequency: {}'.format(self.ac.harvest_frequency))
-                result.loc[year] = total_amount_harvested
+        frequency = int(self.ac.harvest_frequency)
+        if frequency <= 0:
+            raise ValueError(
+                'Check value for harvest frequency: {}'.format(self.ac.harvest_frequency))
+        # land is harvested in the year after each multiple of frequency years since planting.
+        if frequency + 1 < len(result.index):
+            result = pd.DataFrame(_lagged_sum(funits.values, lag=frequency + 1, stride=frequency),
+                    index=funits.index.copy(), columns=funits.columns.copy())
         result.name = 'soln_pds_annual_land_area_harvested'
         return result
 
@@ -775,26 +840,26 @@ class UnitAdoption:
         result.name = 'direct_{}_emissions_saved_land'.format(ghg)
         return result
 
-    @lru_cache()
+    @cached
     def direct_co2eq_emissions_saved_land(self):
         """ForestProtection 'Unit Adoption Calculations'!AT307:AU354"""
         return self._direct_emissions_saved_land(ghg='CO2-eq', ghg_rplu=self.ac.tco2eq_reduced_per_land_unit,
                                                  ghg_rplu_rate=self.ac.tco2eq_rplu_rate,
                                                  delta_pds_ref_factor=self.ac.avoided_deforest_with_intensification)
 
-    @lru_cache()
+    @cached
     def direct_co2_emissions_saved_land(self):
         """ForestProtection 'Unit Adoption Calculations'!BF307:BG354"""
         return self._direct_emissions_saved_land(ghg='CO2', ghg_rplu=self.ac.tco2_reduced_per_land_unit,
                                                  ghg_rplu_rate=self.ac.tco2_rplu_rate)
 
-    @lru_cache()
+    @cached
     def direct_n2o_co2_emissions_saved_land(self):
         """ForestProtection 'Unit Adoption Calculations'!BR307:BS354"""
         return self._direct_emissions_saved_land(ghg='N2O-CO2-eq', ghg_rplu=self.ac.tn2o_co2_reduced_per_land_unit,
                                                  ghg_rplu_rate=self.ac.tn2o_co2_rplu_rate)
 
-    @lru_cache()
+    @cached
     def direct_ch4_co2_emissions_saved_land(self):
         """ForestProtection 'Unit Adoption Calculations'!CD307:CE354"""
         return self._direct_emissions_saved_land(ghg='CH4-CO2-eq', ghg_rplu=self.ac.tch4_co2_reduced_per_land_unit,
@@ -9,6 +9,8 @@ import pandas as pd
 import xlrd
 
 import model.dd
+from model import fingerprint
+from model import source_cache
 from tools.vma_xls_extract import VMAReader
 
 
@@ -23,15 +25,28 @@ def populate_fixed_summaries(vma_dict, filename):
         filename: VMA_info CSV file with fixed summary data for Mean, High, Low
     Modifies the given vma_dict according to the title in the 'Title on xls'
     row of the 'filename' CSV, populating the vma.fixed_summary field.
+    The CSV file is read when the fixed_summary of one of the VMAs is first used.
     """
-    vma_info_df = pd.read_csv(filename, index_col=0)
+    pending = (vma_dict, filename)
+    for v in vma_dict.values():
+        v._pending_summaries = pending
+
+
+def _read_fixed_summaries(pending):
+    """Populate the fixed_summary of the VMAs still waiting for pending, from
+    populate_fixed_summaries."""
+    (vma_dict, filename) = pending
+    vma_info_df = source_cache.read_csv(filename, index_col=0)
+    waiting = {id(v): v for v in vma_dict.values() if v._pending_summaries is pending}
+    for v in waiting.values():
+        v._pending_summaries = None
     for _, row in vma_info_df.iterrows():
         title = row['Title on xls']
         fixed_mean = row.get('Fixed Mean', np.nan)
         fixed_high = row.get('Fixed High', np.nan)
         fixed_low = row.get('Fixed Low', np.nan)
         fixed_summary = check_fixed_summary(fixed_mean, fixed_high, fixed_low)
-        if fixed_summary is not None:
+        if fixed_summary is not None and id(vma_dict[title]) in waiting:
             vma_dict[title].fixed_summary = fixed_summary
 
 
@@ -93,7 +108,13 @@ class VMA:
         else:
             self.stat_correction = stat_correction
         self.fixed_summary = fixed_summary
-        self.df = pd.DataFrame(columns=VMA_columns)
+        self._df = None
+        self._source_data = None
+        self._df_digest = None
+        # (settings, {(regime, region): (mean, sd)}, empty), see _mean_sd.
+        self._statistics = None
+        # CSV file not read yet, see df.
+        self._pending = None
 
         if filename:
             # Turn strings into pathlib
@@ -101,16 +122,59 @@ class VMA:
                 filename = pathlib.Path(filename)
 
             # Instantiate VMA with various file types
-            if isinstance(filename, io.StringIO) or filename.suffix == '.csv':
+            if isinstance(filename, io.StringIO):
                 self._read_csv(filename=filename)
+            elif filename.suffix == '.csv':
+                self._pending = filename
             elif filename.suffix == '.xlsx' or filename.suffix == '.xlsm':
                 self._read_xls(filename=filename, title=title)
             else:
                 raise ValueError(
                     f'{filename!r} is not a recognized filetype for vma.VMA'
                 )
-        else:
-            self.source_data = pd.DataFrame()
+
+    @property
+    def fixed_summary(self):
+        if self._pending_summaries is not None:
+            _read_fixed_summaries(self._pending_summaries)
+        return self._fixed_summary
+
+    @fixed_summary.setter
+    def fixed_summary(self, value):
+        self._pending_summaries = None
+        self._fixed_summary = value
+
+    @property
+    def df(self):
+        """Data sources with standardized columns.
+
+           A CSV file is only read when its data is first used, solutions construct
+           all of their VMAs when imported but use few of them.
+        """
+        if self._pending is not None:
+            self._read_csv(filename=self._pending)
+        if self._df is None:
+            self._df = pd.DataFrame(columns=VMA_columns)
+        return self._df
+
+    @df.setter
+    def df(self, value):
+        self._df = value
+        self._df_digest = None
+        self._statistics = None
+
+    @property
+    def source_data(self):
+        """Data sources as read, with the long-form column names."""
+        if self._pending is not None:
+            self._read_csv(filename=self._pending)
+        if self._source_data is None:
+            self._source_data = pd.DataFrame()
+        return self._source_data
+
+    @source_data.setter
+    def source_data(self, value):
+        self._source_data = value
 
     def _read_csv(self, filename):
         """
@@ -122,8 +186,19 @@ class VMA:
 
         Populates self.source_data and self.df
         """
-        csv_df = pd.read_csv(filename, index_col=False, skipinitialspace=True, skip_blank_lines=True)
-        self._convert_from_human_readable(csv_df, filename)
+        (pending, self._pending) = (self._pending, None)
+        try:
+            if isinstance(filename, io.StringIO):
+                csv_df = pd.read_csv(filename, index_col=False, skipinitialspace=True,
+                        skip_blank_lines=True)
+            else:
+                csv_df = source_cache.read_csv(filename, index_col=False,
+                        skipinitialspace=True, skip_blank_lines=True)
+            self._convert_from_human_readable(csv_df, filename)
+        except Exception:
+            # report the error again on the next use of the data.
+            self._pending = pending
+            raise
 
     def _read_xls(self, filename, title):
         """
@@ -180,6 +255,8 @@ class VMA:
         with a series of renamed columns, along with a few data cleanup steps.
         """
         self._validate_readable_df(readable_df)
+        self._df_digest = None
+        self._statistics = None
         self.source_data = readable_df
         if self.use_weight:
             err = f"'Use weight' selected but no weights to use in {filename}"
@@ -226,6 +303,152 @@ class VMA:
         df = df[valid]
         return df
 
+    def _weight_totals(self):
+        """(total_weights, M) of all sources, for the weighted mean and stddev."""
+        # Sum the weights before discarding outliers, to match Excel.
+        # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#heading=h.qkdzs364y2t2
+        # Once reproducing Excel results is no longer essential, total_weight computation
+        # can be moved down to the second use_weight conditional below. That way the sum
+        # of the weights will only include sources which are being included in the mean.
+        total_weights = self.df['Weight'].fillna(1.0).sum()
+        total_weights = total_weights if total_weights != 0.0 else 1.0
+        all_weights = self.df['Weight'].fillna(1.0)
+        M = (all_weights != 0).sum()
+        return (total_weights, M)
+
+    def _included(self):
+        """Sources included in the statistics, after discarding outliers and exclusions."""
+        df = self._discard_outliers() if self.stat_correction else self.df
+        return df.loc[df['Exclude?'] == False]
+
+    def _filtered_mean_sd(self, regime, region):
+        """(mean, sd) of the sources for regime and region."""
+        df = self._included()
+        if regime:
+            df = df.loc[df['TMR'] == regime]
+        if region in model.dd.SPECIAL_COUNTRIES:
+            df = df.loc[df['Region'] == region]
+        elif region in model.dd.MAIN_REGIONS:
+            # include values for special countries in corresponding main regions' statistics
+            df = df.loc[df['Main Region'] == region]
+
+        if self.use_weight:
+            (total_weights, M) = self._weight_totals()
+            weights = df['Weight'].fillna(1.0)
+            mean = (df['Value'] * weights).sum() / total_weights
+            if M == 0.0:
+                sd = 0.0
+            else:
+                # A weighted standard deviation is not the same as stddev()
+                numerator = (weights * ((df['Value'] - mean) ** 2)).sum()
+                # when Excel is deprecated, remove all_weights and use: M = (weights != 0).sum()
+                denominator = ((M - 1) / M) * total_weights
+                sd = math.sqrt(numerator / denominator)
+        else:
+            mean = df['Value'].mean()
+            # whole population stddev, ddof=0
+            sd = df['Value'].std(ddof=0)
+        return (mean, sd)
+
+    def _grouped_mean_sd(self):
+        """Statistics of every regime and region, computed in one pass over the sources.
+
+           Returns (statistics, empty). statistics is a dict of (regime, region) to
+           (mean, sd) for all sources, each regime, each region and each regime within a
+           region present in the sources, with '' standing for all regimes or all regions.
+           empty is the (mean, sd) of a regime and region without sources. The sums of
+           each group are accumulated with np.bincount rather than by filtering the
+           sources for each group, the statistics are those of _filtered_mean_sd.
+        """
+        df = self._included()
+        try:
+            values = df['Value'].to_numpy(dtype=np.float64)
+        except (TypeError, ValueError):
+            # non-numeric sources, each lookup filters the sources and reports the error.
+            return ({}, None)
+        if self.use_weight:
+            (total_weights, M) = self._weight_totals()
+            weights = df['Weight'].fillna(1.0).to_numpy(dtype=np.float64)
+        else:
+            weights = np.ones(len(values))
+        valid = ~np.isnan(values)
+
+        def mean_sd(sums, counts, squares):
+            with np.errstate(divide='ignore', invalid='ignore'):
+                if self.use_weight:
+                    mean = sums / total_weights
+                    if M == 0.0:
+                        sd = np.zeros(len(sums))
+                    else:
+                        # A weighted standard deviation is not the same as stddev()
+                        sd = np.sqrt(squares / (((M - 1) / M) * total_weights))
+                else:
+                    mean = sums / counts
+                    # whole population stddev, ddof=0
+                    sd = np.sqrt(squares / counts)
+            return (mean, sd)
+
+        regime = df['TMR'].astype(object).replace('', np.nan).to_numpy()
+        special = df['Region'].astype(object).where(
+                df['Region'].isin(model.dd.SPECIAL_COUNTRIES)).to_numpy()
+        main = df['Main Region'].astype(object).where(
+                df['Main Region'].isin(model.dd.MAIN_REGIONS)).to_numpy()
+        everything = np.full(len(values), '', dtype=object)
+
+        statistics = {('', ''): self._filtered_mean_sd(regime=None, region=None)}
+        for (tmr, reg) in [(regime, everything), (everything, main), (everything, special),
+                           (regime, main), (regime, special)]:
+            rows = pd.notna(tmr) & pd.notna(reg)
+            if not rows.any():
+                continue
+            (tmr_codes, tmr_labels) = pd.factorize(tmr[rows])
+            (reg_codes, reg_labels) = pd.factorize(reg[rows])
+            (groups, group) = np.unique(tmr_codes * len(reg_labels) + reg_codes,
+                    return_inverse=True)
+            (v, w, ok) = (values[rows], weights[rows], valid[rows])
+            sums = np.bincount(group, weights=np.where(ok, v * w, 0.0), minlength=len(groups))
+            counts = np.bincount(group, weights=ok.astype(np.float64), minlength=len(groups))
+            (mean, _) = mean_sd(sums, counts, np.zeros(len(groups)))
+            deviations = np.where(ok, w * ((v - mean[group]) ** 2), 0.0)
+            squares = np.bincount(group, weights=deviations, minlength=len(groups))
+            (mean, sd) = mean_sd(sums, counts, squares)
+            for (i, code) in enumerate(groups):
+                (t, r) = divmod(code, len(reg_labels))
+                statistics[(tmr_labels[t], reg_labels[r])] = (mean[i], sd[i])
+        (mean, sd) = mean_sd(np.zeros(1), np.zeros(1), np.zeros(1))
+        return (statistics, (mean[0], sd[0]))
+
+    def _mean_sd(self, regime, region):
+        """(mean, sd) for regime and region, looked up in the statistics of every regime
+           and region computed together on first use, see _grouped_mean_sd."""
+        settings = (self.use_weight, self.stat_correction, self.discard_multiplier)
+        if self._statistics is None or self._statistics[0] != settings:
+            self._statistics = (settings,) + self._grouped_mean_sd()
+        (_, statistics, empty) = self._statistics
+        if region not in model.dd.SPECIAL_COUNTRIES and region not in model.dd.MAIN_REGIONS:
+            region = None
+        key = (regime or '', region or '')
+        if key not in statistics:
+            if empty is not None:
+                return empty
+            statistics[key] = self._filtered_mean_sd(regime=regime, region=region)
+        return statistics[key]
+
+    def summary_table(self):
+        """DataFrame of the Mean, High and Low computed from the sources for all sources,
+           each regime, each region and each regime within a region present in the sources,
+           indexed by (Regime, Region) with '' standing for all. fixed_summary is not
+           applied."""
+        if self.df.empty:
+            return pd.DataFrame(columns=['Mean', 'High', 'Low'], index=pd.MultiIndex.from_tuples(
+                [], names=['Regime', 'Region']))
+        self._mean_sd(regime=None, region=None)
+        rows = {key: (mean, mean + self.high_sd * sd, mean - self.low_sd * sd)
+                for (key, (mean, sd)) in self._statistics[1].items()}
+        index = pd.MultiIndex.from_tuples(list(rows.keys()), names=['Regime', 'Region'])
+        return pd.DataFrame(list(rows.values()), index=index,
+                columns=['Mean', 'High', 'Low']).sort_index()
+
     def avg_high_low(self, key=None, regime=None, region=None):
         """
         Args:
@@ -237,48 +460,12 @@ class VMA:
           By default returns (mean, high, low) using low_sd/high_sd.
           If key is specified will return associated value only
         """
-        if self.use_weight:
-            # Sum the weights before discarding outliers, to match Excel.
-            # https://docs.google.com/document/d/19sq88J_PXY-y_EnqbSJDl0v9CdJArOdFLatNNUFhjEA/edit#heading=h.qkdzs364y2t2
-            # Once reproducing Excel results is no longer essential, total_weight computation
-            # can be moved down to the second use_weight conditional below. That way the sum
-            # of the weights will only include sources which are being included in the mean.
-            total_weights = self.df['Weight'].fillna(1.0).sum()
-            total_weights = total_weights if total_weights != 0.0 else 1.0
-            all_weights = self.df['Weight'].fillna(1.0)
-            M = (all_weights != 0).sum()
-
         if self.fixed_summary is not None:
             (mean, high, low) = self.fixed_summary
         elif self.df.empty:
             mean = high = low = np.nan
         else:
-            df = self._discard_outliers() if self.stat_correction else self.df
-            df = df.loc[df['Exclude?'] == False]
-            if regime:
-                df = df.loc[df['TMR'] == regime]
-            if region in model.dd.SPECIAL_COUNTRIES:
-                df = df.loc[df['Region'] == region]
-            elif region in model.dd.MAIN_REGIONS:
-                # include values for special countries in corresponding main regions' statistics
-                df = df.loc[df['Main Region'] == region]
-
-            if self.use_weight:
-                weights = df['Weight'].fillna(1.0)
-                mean = (df['Value'] * weights).sum() / total_weights
-                if M == 0.0:
-                    sd = 0.0
-                else:
-                    # A weighted standard deviation is not the same as stddev()
-                    numerator = (weights * ((df['Value'] - mean) ** 2)).sum()
-                    # when Excel is deprecated, remove all_weights and use: M = (weights != 0).sum()
-                    denominator = ((M - 1) / M) * total_weights
-                    sd = math.sqrt(numerator / denominator)
-            else:
-                mean = df['Value'].mean()
-                # whole population stddev, ddof=0
-                sd = df['Value'].std(ddof=0)
-
+            (mean, sd) = self._mean_sd(regime=regime, region=region)
             high = mean + (self.high_sd * sd)
             low = mean - (self.low_sd * sd)
 
@@ -293,6 +480,13 @@ class VMA:
         else:
             raise ValueError(f"invalid key: {key}. key must be 'mean', 'high', 'low' or None")
 
+    def fingerprint(self):
+        """Digest of the data and the settings used to summarize it."""
+        if self._df_digest is None:
+            self._df_digest = fingerprint.pandas_digest(self.df)
+        return fingerprint.fingerprint([self._df_digest, self.title, self.low_sd, self.high_sd,
+            self.discard_multiplier, self.stat_correction, self.use_weight, self.fixed_summary])
+
     def write_to_file(self, new_df):
         new_df.to_csv(path_or_buf=self.filename, index=False)
         self._read_csv(filename=self.filename)
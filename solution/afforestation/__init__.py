@@ -121,11 +121,11 @@ class Scenario:
     vmas = VMAs
     solution_category = solution_category
 
-    def __init__(self, scenario=None):
+    def __init__(self, scenario=None, ac=None):
         if scenario is None:
             scenario = list(scenarios.keys())[0]
         self.scenario = scenario
-        self.ac = scenarios[scenario]
+        self.ac = ac if ac is not None else scenarios[scenario]
 
         # TLA
         self.ae = aez.AEZ(solution_name=self.name, cohort=2020,
@@ -367,22 +367,22 @@ class Scenario:
             ref_total_adoption_units=self.tla_per_region,
             pds_total_adoption_units=self.tla_per_region,
             electricity_unit_factor=1000000.0,
-            soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted(),
-            soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted(),
+            soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted,
+            soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted,
             bug_cfunits_double_count=True)
-        soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd()
-        soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd()
-        conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits()
-        soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted()
+        soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd
+        soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd
+        conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits
+        soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted
 
         self.fc = firstcost.FirstCost(ac=self.ac, pds_learning_increase_mult=2,
             ref_learning_increase_mult=2, conv_learning_increase_mult=2,
             soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,
             soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,
             conv_ref_tot_iunits=conv_ref_tot_iunits,
-            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),
-            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),
-            conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),
+            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,
+            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,
+            conv_ref_new_iunits=self.ua.conv_ref_new_iunits,
             conv_ref_first_cost_uses_tot_units=True,
             fc_convert_iunit_factor=land.MHA_TO_HA)
 
@@ -390,34 +390,34 @@ class Scenario:
             soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,
             soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,
             soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,
-            conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits(),
-            soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost(),
-            soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost(),
-            conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost(),
+            conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits,
+            soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost,
+            soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost,
+            conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost,
             single_iunit_purchase_year=2017,
-            soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit(),
-            conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit(),
+            soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit,
+            conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit,
             conversion_factor=land.MHA_TO_HA)
 
         self.c4 = ch4calcs.CH4Calcs(ac=self.ac,
-            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land(),
+            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land,
             soln_net_annual_funits_adopted=soln_net_annual_funits_adopted)
 
         self.c2 = co2calcs.CO2Calcs(ac=self.ac,
-            ch4_ppb_calculator=self.c4.ch4_ppb_calculator(),
-            soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved(),
-            soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used(),
-            soln_pds_direct_co2eq_emissions_saved=self.ua.direct_co2eq_emissions_saved_land(),
-            soln_pds_direct_co2_emissions_saved=self.ua.direct_co2_emissions_saved_land(),
-            soln_pds_direct_n2o_co2_emissions_saved=self.ua.direct_n2o_co2_emissions_saved_land(),
-            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land(),
-            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),
-            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),
-            conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),
-            conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh(),
-            conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh(),
+            ch4_ppb_calculator=self.c4.ch4_ppb_calculator,
+            soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved,
+            soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used,
+            soln_pds_direct_co2eq_emissions_saved=self.ua.direct_co2eq_emissions_saved_land,
+            soln_pds_direct_co2_emissions_saved=self.ua.direct_co2_emissions_saved_land,
+            soln_pds_direct_n2o_co2_emissions_saved=self.ua.direct_n2o_co2_emissions_saved_land,
+            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land,
+            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,
+            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,
+            conv_ref_new_iunits=self.ua.conv_ref_new_iunits,
+            conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh,
+            conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh,
             soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,
-            annual_land_area_harvested=self.ua.soln_pds_annual_land_area_harvested(),
-            regime_distribution=self.ae.get_land_distribution(),
+            annual_land_area_harvested=self.ua.soln_pds_annual_land_area_harvested,
+            regime_distribution=self.ae.get_land_distribution,
             regimes=dd.THERMAL_MOISTURE_REGIMES8)
 
@@ -113,11 +113,11 @@ class Scenario:
   vmas = VMAs
   solution_category = solution_category
 
-  def __init__(self, scenario=None):
+  def __init__(self, scenario=None, ac=None):
     if scenario is None:
       scenario = list(scenarios.keys())[0]
     self.scenario = scenario
-    self.ac = scenarios[scenario]
+    self.ac = ac if ac is not None else scenarios[scenario]
 
     # TAM
     tamconfig_list = [
@@ -180,15 +180,15 @@ class Scenario:
         high_sd_mult=1.0, low_sd_mult=1.0,
         total_adoption_limit=ref_tam_per_region)
 
-    ref_adoption_data_per_region = self.ref_ca.adoption_data_per_region()
+    ref_adoption_data_per_region = self.ref_ca.adoption_data_per_region
 
     if False:
       # One may wonder why this is here. This file was code generated.
       # This 'if False' allows subsequent conditions to all be elif.
       pass
     elif self.ac.soln_pds_adoption_basis == 'Fully Customized PDS':
-      pds_adoption_data_per_region = self.pds_ca.adoption_data_per_region()
-      pds_adoption_trend_per_region = self.pds_ca.adoption_trend_per_region()
+      pds_adoption_data_per_region = self.pds_ca.adoption_data_per_region
+      pds_adoption_trend_per_region = self.pds_ca.adoption_trend_per_region
       pds_adoption_is_single_source = None
 
     ht_ref_adoption_initial = pd.Series(
@@ -218,53 +218,53 @@ class Scenario:
 
     self.ua = unitadoption.UnitAdoption(ac=self.ac,
         ref_total_adoption_units=ref_tam_per_region, pds_total_adoption_units=pds_tam_per_region,
-        soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted(),
-        soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted(),
+        soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted,
+        soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted,
         repeated_cost_for_iunits=False,
         bug_cfunits_double_count=False)
-    soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd()
-    soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd()
-    conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits()
-    soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted()
+    soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd
+    soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd
+    conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits
+    soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted
 
     self.fc = firstcost.FirstCost(ac=self.ac, pds_learning_increase_mult=2,
         ref_learning_increase_mult=2, conv_learning_increase_mult=2,
         soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,
         soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,
         conv_ref_tot_iunits=conv_ref_tot_iunits,
-        soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),
-        soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),
-        conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),
+        soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,
+        soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,
+        conv_ref_new_iunits=self.ua.conv_ref_new_iunits,
         fc_convert_iunit_factor=1.0)
 
     self.oc = operatingcost.OperatingCost(ac=self.ac,
         soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,
         soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,
         soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,
-        conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits(),
-        soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost(),
-        soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost(),
-        conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost(),
+        conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits,
+        soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost,
+        soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost,
+        conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost,
         single_iunit_purchase_year=2017,
-        soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit(),
-        conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit(),
+        soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit,
+        conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit,
         conversion_factor=1.0)
 
     self.c4 = ch4calcs.CH4Calcs(ac=self.ac,
         soln_net_annual_funits_adopted=soln_net_annual_funits_adopted)
 
     self.c2 = co2calcs.CO2Calcs(ac=self.ac,
-        ch4_ppb_calculator=self.c4.ch4_ppb_calculator(),
-        soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved(),
-        soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used(),
-        soln_pds_direct_co2_emissions_saved=self.ua.soln_pds_direct_co2_emissions_saved(),
-        soln_pds_direct_ch4_co2_emissions_saved=self.ua.soln_pds_direct_ch4_co2_emissions_saved(),
-        soln_pds_direct_n2o_co2_emissions_saved=self.ua.soln_pds_direct_n2o_co2_emissions_saved(),
-        soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),
-        soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),
-        conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),
-        conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh(),
-        conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh(),
+        ch4_ppb_calculator=self.c4.ch4_ppb_calculator,
+        soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved,
+        soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used,
+        soln_pds_direct_co2_emissions_saved=self.ua.soln_pds_direct_co2_emissions_saved,
+        soln_pds_direct_ch4_co2_emissions_saved=self.ua.soln_pds_direct_ch4_co2_emissions_saved,
+        soln_pds_direct_n2o_co2_emissions_saved=self.ua.soln_pds_direct_n2o_co2_emissions_saved,
+        soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,
+        soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,
+        conv_ref_new_iunits=self.ua.conv_ref_new_iunits,
+        conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh,
+        conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh,
         soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,
         fuel_in_liters=False)
 
@@ -0,0 +1,127 @@
+"""Integrate the electricity generation solutions, so that together they fit world demand.
+
+The RRS solutions which generate electricity take their TAM from the same data sources,
+solution.rrs.energy_tam_2_*, but each computes its PDS adoption without regard to the
+others, so together they can adopt more generation than there is demand for. integrate()
+constructs each of them once and finds the years and regions in which the sum of their
+HelperTables.soln_pds_funits_adopted() exceeds the demand. The adoption of every solution
+is scaled down there in proportion to its share, and passes repeat until no year and region
+is over-subscribed.
+
+The scaled adoption of each solution is put in place of its cached
+soln_pds_funits_adopted() with model.incremental.replace_table(), which discards only the
+tables computed from the adoption. The tables which do not depend on it, such as the TAM,
+adoption data and VMAs, are kept between passes, and the downstream tables are recomputed
+when next used.
+
+    result = solution.integration.integrate()
+    result.scenarios['solarpvutil'].c2.co2eq_mmt_reduced()
+"""
+
+import dataclasses
+import functools
+import pathlib
+import typing
+
+import numpy as np
+import pandas as pd
+
+import model.incremental
+import solution.factory
+
+
+def electricity_solutions():
+    """Names of the solutions whose TAM is built from solution.rrs.energy_tam_2_* sources."""
+    solution_dir = pathlib.Path(__file__).parent
+    return [name for name in solution.factory.all_solutions()
+            if 'rrs.energy_tam_2_pds_data_sources' in
+            solution_dir.joinpath(name, '__init__.py').read_text()]
+
+
+@dataclasses.dataclass
+class Integration:
+    """Outcome of integrate().
+
+       scenarios: dict of solution name to its Scenario, with the integrated PDS adoption.
+       demand: DataFrame of the electricity demand per year and region the adoption fits.
+       adoption: dict of solution name to its soln_pds_funits_adopted() before integration.
+       oversubscription: total adoption in excess of demand found by each pass, summed over
+         years and regions. The last is zero when converged.
+       converged: whether the last pass found no year and region over-subscribed.
+    """
+    scenarios: dict
+    demand: pd.DataFrame
+    adoption: dict
+    oversubscription: typing.List[float] = dataclasses.field(default_factory=list)
+    converged: bool = False
+
+    @property
+    def passes(self):
+        return len(self.oversubscription)
+
+    def factors(self):
+        """DataFrame per year and region of the integrated adoption over the adoption
+           before integration, 1.0 where the solutions were not scaled."""
+        before = total_adoption(self.adoption)
+        after = total_adoption({name: obj.ht.soln_pds_funits_adopted()
+                                for (name, obj) in self.scenarios.items()})
+        return (after / before).fillna(1.0)
+
+
+def total_adoption(adoption):
+    """Sum of the DataFrames of funits adopted in the dict adoption, missing values as 0."""
+    return functools.reduce(lambda a, b: a.add(b, fill_value=0.0),
+            [df.fillna(0.0) for df in adoption.values()])
+
+
+def default_demand(scenarios):
+    """The smallest pds_tam_per_region() of scenarios in each year and region, which the
+       adoption of every one of the solutions is expected to fit within."""
+    tams = [obj.tm.pds_tam_per_region() for obj in scenarios.values()]
+    return functools.reduce(lambda a, b: a.combine(b, np.fmin), tams)
+
+
+def integrate(solutions=None, demand=None, max_passes=10, rtol=1e-9):
+    """Scale the PDS adoption of solutions so that together they do not exceed demand.
+
+       Arguments:
+         solutions: dict of solution name to a constructed Scenario, which is updated in
+           place, or a list of solution names to construct the default scenario of.
+           Default all of electricity_solutions().
+         demand: DataFrame of demand per year and region, in the functional units of the
+           solutions (TWh), default default_demand() of the solutions.
+         max_passes: number of passes to make before giving up on converging.
+         rtol: adoption exceeding demand by less than this fraction of it is not scaled.
+
+       Returns an Integration.
+    """
+    if solutions is None:
+        solutions = electricity_solutions()
+    if isinstance(solutions, dict):
+        scenarios = dict(solutions)
+    else:
+        scenarios = {}
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            scenarios[name] = constructor(scenario=None)
+    if demand is None:
+        demand = default_demand(scenarios)
+
+    adoption = {name: obj.ht.soln_pds_funits_adopted() for (name, obj) in scenarios.items()}
+    result = Integration(scenarios=scenarios, demand=demand, adoption=adoption)
+    current = adoption
+    for _ in range(max_passes):
+        total = total_adoption(current)
+        limit = demand.reindex(index=total.index, columns=total.columns)
+        excess = (total - limit).where(total > limit * (1.0 + rtol), 0.0).fillna(0.0)
+        result.oversubscription.append(float(excess.values.sum()))
+        if result.oversubscription[-1] == 0.0:
+            result.converged = True
+            break
+        factor = (limit / total).where(excess > 0.0, 1.0)
+        for (name, obj) in scenarios.items():
+            scaled = current[name] * factor.reindex_like(current[name]).fillna(1.0)
+            scaled.name = 'soln_pds_funits_adopted'
+            model.incremental.replace_table(obj.ht.soln_pds_funits_adopted, scaled)
+        current = {name: obj.ht.soln_pds_funits_adopted() for (name, obj) in scenarios.items()}
+    return result
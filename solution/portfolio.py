@@ -0,0 +1,248 @@
+"""Run the scenarios of many solutions in parallel.
+
+run() fans (solution, scenario) jobs out over a pool of worker processes and yields each
+JobResult as soon as its job completes. Each worker imports a solution the first time one
+of its jobs needs it and keeps it, along with the model tables shared between scenarios
+(TAM, adoption data, VMAs), for the jobs which follow. Jobs of the solutions with the most
+scenarios are started first, so a run over every solution takes about as long as the
+slowest solution once there are enough workers.
+
+    results = list(solution.portfolio.run(solution.portfolio.jobs(scenarios='all'),
+            workers=32, on_error='record'))
+    solution.portfolio.write(results, 'portfolio_results')
+"""
+
+import concurrent.futures
+import dataclasses
+import os
+import pathlib
+import signal
+import threading
+import time
+import typing
+import warnings
+
+import pandas as pd
+
+import model.result_cache
+import solution.factory
+
+
+@dataclasses.dataclass
+class Job:
+    """A scenario of a solution to run.
+
+       Arguments:
+         solution: solution directory name, like 'solarpvutil'.
+         scenario: scenario name, None for the default scenario of the solution.
+         timeout: seconds the job may take before it fails, None for no limit.
+         retries: number of times to run the job again if it fails.
+    """
+    solution: str
+    scenario: typing.Optional[str] = None
+    timeout: typing.Optional[float] = None
+    retries: int = 0
+
+
+@dataclasses.dataclass
+class JobResult:
+    """Outcome of a Job.
+
+       status is 'ok', 'error' or 'timeout'. tables maps 'module.method' to the tables
+       computed, empty unless the job succeeded. error describes the failure.
+    """
+    job: Job
+    status: str
+    seconds: float
+    attempts: int
+    tables: dict = dataclasses.field(default_factory=dict)
+    error: typing.Optional[str] = None
+    pid: typing.Optional[int] = None
+
+
+class JobTimeout(BaseException):
+    """Raised in a job which exceeds its timeout. Not an Exception, so that the except
+       Exception handlers of the model do not catch it and carry on with the job."""
+
+
+class PortfolioError(Exception):
+    """Raised by run(on_error='raise') when a job fails, holding its JobResult."""
+    def __init__(self, result):
+        super().__init__(f"{result.job.solution} {result.job.scenario}: {result.error}")
+        self.result = result
+
+
+def jobs(solutions=None, scenarios='default', timeout=None, retries=0):
+    """List of Jobs for solutions, or for all solutions.
+
+       Arguments:
+         solutions: list of solution directory names, None for all solutions.
+         scenarios: 'default' for the default scenario of each solution, 'all' for
+           all of its scenarios.
+         timeout, retries: as in Job.
+    """
+    if solutions is None:
+        solutions = solution.factory.all_solutions()
+    result = []
+    for name in solutions:
+        if scenarios == 'all':
+            (_, names) = solution.factory.one_solution_scenarios(name)
+        else:
+            names = [None]
+        result.extend(Job(solution=name, scenario=s, timeout=timeout, retries=retries)
+                for s in names)
+    return result
+
+
+_cache = None
+
+
+def _init_worker(result_cache_path):
+    """Open the optional persistent ResultCache once per worker process."""
+    global _cache
+    _cache = (None if result_cache_path is None else
+            model.result_cache.ResultCache(path=result_cache_path))
+
+
+def _alarm(signum, frame):
+    raise JobTimeout()
+
+
+def _execute(job, tables):
+    """Run job in this process, returning its JobResult with attempts unset."""
+    start = time.perf_counter()
+    timer = (job.timeout is not None and hasattr(signal, 'SIGALRM') and
+            threading.current_thread() is threading.main_thread())
+    if timer:
+        previous = signal.signal(signal.SIGALRM, _alarm)
+        signal.setitimer(signal.ITIMER_REAL, job.timeout)
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            (constructor, _) = solution.factory.one_solution_scenarios(job.solution)
+            if _cache is not None:
+                computed = _cache.results(constructor, job.scenario)
+                if tables is not None:
+                    computed = {t: computed[t] for t in tables if t in computed}
+            else:
+                obj = constructor(scenario=job.scenario)
+                computed = model.result_cache.compute(obj, tables)
+        (status, error) = ('ok', None)
+    except JobTimeout:
+        (computed, status, error) = ({}, 'timeout', f'exceeded {job.timeout} seconds')
+    except Exception as e:  # pylint: disable=broad-except
+        # any failure of the job is recorded in its JobResult, for on_error to act on.
+        (computed, status, error) = ({}, 'error', f'{type(e).__name__}: {e}')
+    finally:
+        if timer:
+            signal.setitimer(signal.ITIMER_REAL, 0)
+            signal.signal(signal.SIGALRM, previous)
+    return JobResult(job=job, status=status, seconds=time.perf_counter() - start,
+            attempts=0, tables=computed, error=error, pid=os.getpid())
+
+
+def _ordered(joblist):
+    """joblist with the jobs of the solutions with the most jobs first."""
+    counts = {}
+    for job in joblist:
+        counts[job.solution] = counts.get(job.solution, 0) + 1
+    return sorted(joblist, key=lambda job: -counts[job.solution])
+
+
+def run(joblist, workers=None, tables=None, on_error='record', result_cache_path=None):
+    """Run joblist, yielding the JobResult of each job as it completes.
+
+       Arguments:
+         joblist: list of Jobs, from jobs().
+         workers: number of worker processes, default os.cpu_count(). With 1 the jobs
+           are run one after another in this process.
+         tables: list of 'module.method' tables to return, default all of
+           model.result_cache.RESULTS. Tables which do not apply to a solution are
+           left out of its results.
+         on_error: 'record' to yield failed jobs like the others, 'raise' to stop at the
+           first job which fails after its retries, raising PortfolioError.
+         result_cache_path: directory of a model.result_cache.ResultCache to load
+           results from and store them to, None to always compute them.
+    """
+    if on_error not in ('record', 'raise'):
+        raise ValueError(f"on_error must be 'record' or 'raise', not {on_error!r}")
+    workers = workers or os.cpu_count() or 1
+    joblist = _ordered(joblist)
+    attempts = {}
+
+    def finished(job, result, final=False):
+        attempts[id(job)] = attempts.get(id(job), 0) + 1
+        result.attempts = attempts[id(job)]
+        if result.status != 'ok' and result.attempts <= job.retries and not final:
+            return False
+        if result.status != 'ok' and on_error == 'raise':
+            raise PortfolioError(result)
+        return True
+
+    if workers == 1:
+        _init_worker(result_cache_path)
+        for job in joblist:
+            while True:
+                result = _execute(job, tables)
+                if finished(job, result):
+                    yield result
+                    break
+        return
+
+    with concurrent.futures.ProcessPoolExecutor(max_workers=workers,
+            initializer=_init_worker, initargs=(result_cache_path,)) as executor:
+        pending = {executor.submit(_execute, job, tables): job for job in joblist}
+        try:
+            while pending:
+                (done, _) = concurrent.futures.wait(pending,
+                        return_when=concurrent.futures.FIRST_COMPLETED)
+                for future in done:
+                    job = pending.pop(future)
+                    broken = False
+                    try:
+                        result = future.result()
+                    except concurrent.futures.process.BrokenProcessPool as e:
+                        # the pool cannot run any more jobs, each remaining job fails.
+                        result = JobResult(job=job, status='error', seconds=0.0, attempts=0,
+                                error=f'worker process failed: {e}')
+                        broken = True
+                    if finished(job, result, final=broken):
+                        yield result
+                    else:
+                        pending[executor.submit(_execute, job, tables)] = job
+        finally:
+            for future in pending:
+                future.cancel()
+
+
+def to_frame(results):
+    """Long DataFrame of every table of successful results, with columns Solution,
+       Scenario, Table, Year, Column and Value. Series are given the Column 'World'."""
+    frames = []
+    for result in results:
+        for (name, table) in result.tables.items():
+            df = table.to_frame(name='World') if isinstance(table, pd.Series) else table
+            df = df.rename_axis(index='Year', columns='Column').stack(dropna=False)
+            frames.append(pd.DataFrame({'Solution': result.job.solution,
+                'Scenario': result.job.scenario or '', 'Table': name,
+                'Year': df.index.get_level_values(0),
+                'Column': df.index.get_level_values(1).astype(str), 'Value': df.values}))
+    columns = ['Solution', 'Scenario', 'Table', 'Year', 'Column', 'Value']
+    return pd.concat(frames, ignore_index=True) if frames else pd.DataFrame(columns=columns)
+
+
+def status_frame(results):
+    """DataFrame of the status, time taken and error of each of results."""
+    return pd.DataFrame([[r.job.solution, r.job.scenario or '', r.status, r.seconds,
+        r.attempts, len(r.tables), r.error or '', r.pid] for r in results],
+        columns=['Solution', 'Scenario', 'Status', 'Seconds', 'Attempts', 'Tables',
+                 'Error', 'Pid'])
+
+
+def write(results, directory):
+    """Write the tables of results to directory/results.csv.gz and the status of each
+       job to directory/jobs.csv."""
+    directory = pathlib.Path(directory)
+    directory.mkdir(parents=True, exist_ok=True)
+    to_frame(results).to_csv(directory.joinpath('results.csv.gz'), index=False)
+    status_frame(results).to_csv(directory.joinpath('jobs.csv'), index=False)
@@ -0,0 +1,49 @@
+"""Tests for integration.py."""
+
+import pandas as pd
+import pytest
+
+from solution import integration
+import solution.nuclear
+import solution.onshorewind
+import solution.solarpvutil
+
+
+def test_electricity_solutions():
+    names = integration.electricity_solutions()
+    assert {'solarpvutil', 'onshorewind', 'nuclear', 'geothermal'} <= set(names)
+    assert 'afforestation' not in names
+
+
+def test_integrate():
+    scenarios = {'solarpvutil': solution.solarpvutil.Scenario(),
+                 'onshorewind': solution.onshorewind.Scenario(),
+                 'nuclear': solution.nuclear.Scenario()}
+    adoption = {n: obj.ht.soln_pds_funits_adopted() for (n, obj) in scenarios.items()}
+    before = integration.total_adoption(adoption)
+    demand = scenarios['solarpvutil'].tm.pds_tam_per_region() * 0.5
+    ref_adoption = scenarios['nuclear'].ht.soln_ref_funits_adopted()
+    tot_iunits = scenarios['nuclear'].ua.soln_pds_tot_iunits_reqd()
+
+    result = integration.integrate(scenarios, demand=demand)
+    assert result.converged
+    assert result.passes == 2
+    assert result.oversubscription[0] > 0.0 and result.oversubscription[-1] == 0.0
+    after = integration.total_adoption({n: obj.ht.soln_pds_funits_adopted()
+                                        for (n, obj) in scenarios.items()})
+    assert (after <= demand * (1.0 + 1e-9)).all().all()
+    over = before > demand
+    assert over.values.any()
+    pd.testing.assert_frame_equal(after[~over], before[~over])
+    factors = result.factors()
+    assert factors.loc[2050, 'World'] == pytest.approx(demand.loc[2050, 'World'] /
+            before.loc[2050, 'World'])
+
+    nuclear = scenarios['nuclear']
+    assert nuclear.ht.soln_ref_funits_adopted() is ref_adoption
+    pd.testing.assert_frame_equal(nuclear.ua.soln_pds_funits_adopted,
+            nuclear.ht.soln_pds_funits_adopted())
+    assert nuclear.ua.soln_pds_tot_iunits_reqd().loc[2050, 'World'] < tot_iunits.loc[2050, 'World']
+
+    again = integration.integrate(scenarios, demand=demand)
+    assert again.passes == 1
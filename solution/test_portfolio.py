@@ -0,0 +1,72 @@
+"""Tests for portfolio.py."""
+
+import time
+
+import pandas as pd
+import pytest
+
+from solution import portfolio
+
+
+def test_jobs():
+    result = portfolio.jobs(solutions=['solarpvutil', 'afforestation'], timeout=60.0)
+    assert [j.solution for j in result] == ['solarpvutil', 'afforestation']
+    assert all(j.scenario is None and j.timeout == 60.0 for j in result)
+    result = portfolio.jobs(solutions=['solarpvutil'], scenarios='all')
+    assert len(result) > 1
+    assert all(j.scenario is not None for j in result)
+
+
+def test_run(tmp_path):
+    joblist = [portfolio.Job(solution='solarpvutil'), portfolio.Job(solution='afforestation'),
+               portfolio.Job(solution='no_such_solution', retries=1)]
+    tables = ['c2.co2eq_mmt_reduced', 'fc.soln_pds_annual_world_first_cost']
+    results = {r.job.solution: r for r in portfolio.run(joblist, workers=2, tables=tables)}
+    assert results['solarpvutil'].status == 'ok'
+    assert set(results['solarpvutil'].tables) == set(tables)
+    assert results['afforestation'].status == 'ok'
+    assert results['no_such_solution'].status == 'error'
+    assert results['no_such_solution'].attempts == 2
+    assert 'ModuleNotFoundError' in results['no_such_solution'].error
+
+    serial = list(portfolio.run([portfolio.Job(solution='solarpvutil')], workers=1,
+        tables=tables))
+    pd.testing.assert_frame_equal(serial[0].tables['c2.co2eq_mmt_reduced'],
+            results['solarpvutil'].tables['c2.co2eq_mmt_reduced'])
+
+    portfolio.write(list(results.values()), tmp_path)
+    df = pd.read_csv(tmp_path.joinpath('results.csv.gz'))
+    assert set(df['Solution']) == {'solarpvutil', 'afforestation'}
+    world = df[(df['Solution'] == 'solarpvutil') & (df['Table'] == tables[0]) &
+               (df['Column'] == 'World')].set_index('Year')['Value']
+    expected = results['solarpvutil'].tables[tables[0]]['World']
+    assert world.loc[2050] == pytest.approx(expected.loc[2050])
+    jobs = pd.read_csv(tmp_path.joinpath('jobs.csv'))
+    assert sorted(jobs['Status']) == ['error', 'ok', 'ok']
+
+
+def test_on_error_and_timeout():
+    with pytest.raises(portfolio.PortfolioError):
+        list(portfolio.run([portfolio.Job(solution='no_such_solution')], workers=1,
+            on_error='raise'))
+    [result] = portfolio.run([portfolio.Job(solution='solarpvutil', timeout=0.001)],
+            workers=1)
+    assert result.status == 'timeout'
+
+
+def test_timeout_not_swallowed(monkeypatch):
+    def swallowing(obj, tables=None):
+        while True:
+            try:
+                time.sleep(0.01)
+            except Exception:  # pylint: disable=broad-except
+                # as model code catching every error would, which must not stop the timeout.
+                pass
+
+    monkeypatch.setattr(portfolio.model.result_cache, 'compute', swallowing)
+    [result] = portfolio.run([portfolio.Job(solution='solarpvutil', timeout=0.5, retries=1)],
+            workers=1)
+    assert (result.status, result.attempts) == ('timeout', 2)
+    with pytest.raises(portfolio.PortfolioError):
+        list(portfolio.run([portfolio.Job(solution='solarpvutil', timeout=0.5)], workers=1,
+            on_error='raise'))
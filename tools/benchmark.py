@@ -0,0 +1,1447 @@
+"""Benchmark vectorized model kernels against the row-by-row implementations they replaced.
+
+Each benchmark constructs the default scenario of every solution, checks that the current
+implementation produces exactly the same table as the legacy loop it replaced, and reports
+the time taken by each.
+
+    python tools/benchmark.py new_iunits
+    python tools/benchmark.py co2_ppm
+    python tools/benchmark.py breakout
+    python tools/benchmark.py npv
+    python tools/benchmark.py single_iunit
+    python tools/benchmark.py s_curve
+    python tools/benchmark.py degraded_land
+    python tools/benchmark.py land_lag --solutions afforestation bamboo tropicaltreestaples
+    python tools/benchmark.py trends
+    python tools/benchmark.py sources
+    python tools/benchmark.py compiled
+    python tools/benchmark.py aez
+    python tools/benchmark.py deferred
+    python tools/benchmark.py incremental
+    python tools/benchmark.py fingerprint
+    python tools/benchmark.py vma_stats
+    python tools/benchmark.py ensemble --solutions solarpvutil afforestation --number 1
+    python tools/benchmark.py fair
+    python tools/benchmark.py baseline
+    python tools/benchmark.py fair_ensemble --solutions solarpvutil
+    python tools/benchmark.py integration --number 1
+"""
+import argparse
+import dataclasses
+import json
+import math
+import pathlib
+import sys
+import timeit
+import warnings
+
+import fair
+import numpy as np
+import numpy_financial
+import pandas as pd
+
+sys.path.append(str(pathlib.Path(__file__).parents[1]))
+import model.advanced_controls
+import model.aez
+import model.co2calcs
+import model.dd
+import model.deferred
+import model.ensemble
+import model.fairutil
+import model.fingerprint
+import model.incremental
+import model.interpolation
+import model.metaclass_cache
+import model.operatingcost
+import model.s_curve
+import model.source_cache
+import model.source_store
+import model.unitadoption
+import solution.factory
+import solution.integration
+from model.advanced_controls import SOLUTION_CATEGORY
+
+
+def legacy_new_iunits_reqd(new_units, funits_adopted, lifetime):
+    """Replacement units added one (year, region) cell at a time, as UnitAdoption used to."""
+    result = new_units.copy()
+    for region, column in result.items():
+        for year in column.index:
+            replacement_year = int(year - (lifetime + 1))
+            if replacement_year in result.index:
+                if funits_adopted.loc[replacement_year, region] <= funits_adopted.loc[year, region]:
+                    result.at[year, region] += result.at[replacement_year, region]
+    return result
+
+
+def new_iunits_cases(ua):
+    """Yield (label, new_units, funits_adopted, lifetime) for each new iunits table of ua."""
+    if ua.repeated_cost_for_iunits:
+        return
+    ac = ua.ac
+    if ua.soln_pds_funits_adopted is not None:
+        new_units = ua.soln_pds_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]
+        yield ('pds', new_units, ua.soln_pds_funits_adopted, ac.soln_lifetime_replacement_rounded)
+    if ua.soln_ref_funits_adopted is not None:
+        if ac.solution_category in (SOLUTION_CATEGORY.LAND, SOLUTION_CATEGORY.OCEAN):
+            new_units = ua.soln_ref_funits_adopted.diff().clip(lower=0).iloc[1:]
+            lifetime = ac.conv_lifetime_replacement_rounded
+        else:
+            new_units = ua.soln_ref_tot_iunits_reqd().diff().clip(lower=0).iloc[1:]
+            lifetime = ac.soln_lifetime_replacement_rounded
+        yield ('ref', new_units, ua.soln_ref_funits_adopted, lifetime)
+
+
+def benchmark_new_iunits(solutions, number):
+    """Compare _add_replacement_units with the legacy loop for every solution."""
+    rows = []
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        for (label, new_units, funits_adopted, lifetime) in new_iunits_cases(obj.ua):
+            legacy = legacy_new_iunits_reqd(new_units, funits_adopted, lifetime)
+            current = model.unitadoption._add_replacement_units(new_units, funits_adopted, lifetime)
+            pd.testing.assert_frame_equal(current, legacy, check_exact=True, check_names=False)
+            t_legacy = timeit.timeit(
+                    lambda: legacy_new_iunits_reqd(new_units, funits_adopted, lifetime),
+                    number=number) / number
+            t_current = timeit.timeit(
+                    lambda: model.unitadoption._add_replacement_units(new_units, funits_adopted,
+                        lifetime), number=number) / number
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)', 'Current (s)'])
+
+
+def legacy_co2_ppm_calculator(co2_vals, skip_before):
+    """CO2 PPM table filled one cell at a time, as CO2Calcs.co2_ppm_calculator used to."""
+    columns = ['PPM', 'Total'] + list(range(2015, 2061))
+    ppm_calculator = pd.DataFrame(0, columns=columns, index=co2_vals.index.copy(),
+                                  dtype=np.float64)
+    ppm_calculator.index = ppm_calculator.index.astype(int)
+    ppm_calculator.index.name = 'Year'
+    first_year = ppm_calculator.first_valid_index()
+    last_year = ppm_calculator.last_valid_index()
+    for year in ppm_calculator.index:
+        if year < skip_before:
+            continue
+        b = co2_vals[year]
+        for delta in range(1, last_year - first_year + 2):
+            if (year + delta - 1) > last_year:
+                break
+            val = 0.217
+            val += 0.259 * math.exp(-delta / 172.9)
+            val += 0.338 * math.exp(-delta / 18.51)
+            val += 0.186 * math.exp(-delta / 1.186)
+            ppm_calculator.loc[year + delta - 1, year] = b * val
+    ppm_calculator.loc[:, 'Total'] = ppm_calculator.sum(axis=1)
+    for year in ppm_calculator.index:
+        ppm_calculator.at[year, 'PPM'] = ppm_calculator.at[year, 'Total'] / (44.01 * 1.8 * 100)
+    return ppm_calculator
+
+
+def benchmark_co2_ppm(solutions, number):
+    """Compare co2_ppm_calculators with the legacy loop, per solution and as one batch."""
+    rows = []
+    emissions = {}
+    expected = {}
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        try:
+            co2_vals = obj.c2.co2_ppm_emissions()
+        except ValueError as e:
+            # forestprotection, indigenouspeoplesland and peatlands fail to compute their
+            # sequestration with pandas 1.5, before reaching the PPM calculator.
+            print(f"Skipping {name}: {e!r}")
+            continue
+        if obj.ac.solution_category == SOLUTION_CATEGORY.LAND:
+            skip_before = 0
+        else:
+            skip_before = obj.ac.report_start_year
+        legacy = legacy_co2_ppm_calculator(co2_vals, skip_before)
+        current = model.co2calcs.CO2Calcs.co2_ppm_calculator.__wrapped__(obj.c2)
+        pd.testing.assert_frame_equal(current, legacy, check_exact=True)
+        t_legacy = timeit.timeit(lambda: legacy_co2_ppm_calculator(co2_vals, skip_before),
+                number=number) / number
+        t_current = timeit.timeit(
+                lambda: model.co2calcs.CO2Calcs.co2_ppm_calculator.__wrapped__(obj.c2),
+                number=number) / number
+        rows.append([name, obj.ac.solution_category.name, 'ppm', t_legacy, t_current])
+        emissions[name] = co2_vals
+        expected[name] = legacy
+
+    # whole portfolio, one co2_ppm_calculators call per distinct range of years.
+    groups = {}
+    for (name, co2_vals) in emissions.items():
+        groups.setdefault(tuple(co2_vals.index), []).append(name)
+    batches = [pd.DataFrame([emissions[n].values for n in names], index=names, columns=list(years))
+               for (years, names) in groups.items()]
+    for batch in batches:
+        results = model.co2calcs.co2_ppm_calculators(batch)
+        for name in batch.index:
+            pd.testing.assert_frame_equal(results[name], expected[name], check_exact=True)
+    t_batch = timeit.timeit(lambda: [model.co2calcs.co2_ppm_calculators(b) for b in batches],
+            number=number) / number
+    print(f"{len(emissions)} solutions in {len(batches)} co2_ppm_calculators calls: {t_batch:.4f}s\n")
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)', 'Current (s)'])
+
+
+def legacy_annual_breakout(oc, new_funits_per_year, new_annual_iunits_reqd,
+        lifetime_replacement, var_oper_cost_per_funit, fuel_cost_per_funit,
+        fixed_oper_cost_per_iunit):
+    """Operating cost breakout written one cell at a time, as OperatingCost used to."""
+    first_year = 2015
+    last_year = oc.ac.report_end_year
+    last_row = 2139
+    breakout = pd.DataFrame(0, index=np.arange(first_year, last_row + 1),
+                            columns=np.arange(first_year, 2060 + 1), dtype='float')
+    breakout.index.name = 'Year'
+    breakout.index = breakout.index.astype(int)
+    if not oc.ac.has_var_costs and not fixed_oper_cost_per_iunit:
+        return breakout
+    for year in range(first_year, last_year + 1):
+        lifetime = lifetime_replacement
+        while math.ceil(lifetime) < (last_year + 1 - year):
+            lifetime += lifetime_replacement
+        cost = var_oper_cost_per_funit + fuel_cost_per_funit if oc.ac.has_var_costs else 0
+        total = new_funits_per_year.loc[year] * cost * oc.conversion_factor_vom
+        cost = fixed_oper_cost_per_iunit
+        total += new_annual_iunits_reqd.loc[year] * cost * oc.conversion_factor_fom
+        for row in range(year, last_row + 1):
+            remaining_lifetime = np.clip(lifetime, 0, 1)
+            val = total * remaining_lifetime
+            breakout.loc[row, year] = val if math.fabs(val) > 0.01 else 0.0
+            lifetime -= 1
+            if lifetime <= 0:
+                break
+    return breakout
+
+
+def benchmark_breakout(solutions, number):
+    """Compare OperatingCost._annual_breakout with the legacy loop, full table and totals."""
+    rows = []
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        oc = obj.oc
+        for (label, kwargs) in [('soln_pds', oc._soln_pds_breakout_args()),
+                                ('conv_ref', oc._conv_ref_breakout_args())]:
+            legacy = legacy_annual_breakout(oc, **kwargs)
+            pd.testing.assert_frame_equal(oc._annual_breakout(**kwargs), legacy, check_exact=True)
+            pd.testing.assert_series_equal(oc._annual_breakout(**kwargs, sum_only=True),
+                    legacy.sum(axis=1), check_exact=True)
+            t_legacy = timeit.timeit(lambda: legacy_annual_breakout(oc, **kwargs),
+                    number=number) / number
+            t_current = timeit.timeit(lambda: oc._annual_breakout(**kwargs),
+                    number=number) / number
+            t_total = timeit.timeit(lambda: oc._annual_breakout(**kwargs, sum_only=True),
+                    number=number) / number
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current,
+                t_total])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)', 'Totals only (s)'])
+
+
+def legacy_npv(cashflow, rate, offset):
+    """NPV series built with one numpy_financial.npv call per year, as OperatingCost used to."""
+    npv = []
+    for n in range(len(cashflow.index)):
+        l = [0] * (n + offset) + [cashflow.iloc[n]]
+        npv.append(numpy_financial.npv(rate=rate, values=l))
+    return pd.Series(npv, index=cashflow.index.copy())
+
+
+def benchmark_npv(solutions, number):
+    """Compare npv_by_period with per-year numpy_financial.npv calls."""
+    rows = []
+    sweep = [0.02, 0.04, 0.06, 0.08, 0.1, 0.12]
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        oc = obj.oc
+        rate = obj.ac.npv_discount_rate
+        cases = [('soln_net_present_value', oc.soln_net_cash_flow(), 1)]
+        for (label, cashflow) in [
+                ('soln_vs_conv_single_iunit_npv', oc.soln_vs_conv_single_iunit_cashflow()),
+                ('soln_only_single_iunit_npv', oc.soln_only_single_iunit_cashflow())]:
+            offset = oc.single_iunit_purchase_year - cashflow.first_valid_index() + 1
+            cases.append((label, cashflow, offset))
+        for (label, cashflow, offset) in cases:
+            legacy = legacy_npv(cashflow, rate, offset)
+            current = model.operatingcost.npv_by_period(cashflow, rate=rate, offset=offset)
+            pd.testing.assert_series_equal(current, legacy, check_exact=True)
+            swept = model.operatingcost.npv_by_period(cashflow, rate=sweep, offset=offset)
+            for r in sweep:
+                pd.testing.assert_series_equal(swept[r], legacy_npv(cashflow, r, offset),
+                        check_exact=True, check_names=False)
+            t_legacy = timeit.timeit(lambda: legacy_npv(cashflow, rate, offset),
+                    number=number) / number
+            t_current = timeit.timeit(
+                    lambda: model.operatingcost.npv_by_period(cashflow, rate=rate, offset=offset),
+                    number=number) / number
+            t_sweep = timeit.timeit(
+                    lambda: model.operatingcost.npv_by_period(cashflow, rate=sweep, offset=offset),
+                    number=number) / number
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current,
+                t_sweep])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)', f'{len(sweep)} rates (s)'])
+
+
+def legacy_soln_vs_conv_single_iunit_cashflow(oc):
+    """soln_vs_conv_single_iunit_cashflow computed year by year, as OperatingCost used to."""
+    first_year = 2015
+    last_year = max(2060, 2015 + oc.ac.soln_lifetime_replacement_rounded)
+    result = pd.Series(0, index=np.arange(first_year, 2139 + 1), dtype='float')
+    result.index.name = 'Year'
+    result.index = result.index.astype(int)
+    result.name = 'soln_vs_conv_single_iunit_cashflow'
+    soln_lifetime = oc.ac.soln_lifetime_replacement
+    if oc.ac.soln_avg_annual_use is not None and oc.ac.conv_avg_annual_use is not None:
+        conv_usage_mult = oc.ac.soln_avg_annual_use / oc.ac.conv_avg_annual_use
+    else:
+        conv_usage_mult = 1
+    for year in range(first_year, last_year + 1):
+        cost = 0
+        if soln_lifetime <= 0:
+            break
+        if oc.ac.conv_lifetime_replacement is None or oc.ac.conv_lifetime_replacement == 0:
+            remainder = 0
+        else:
+            remainder = (year - (first_year - 1)) % oc.ac.conv_lifetime_replacement
+        if remainder <= 1 and remainder > 0:
+            soln_first_cost = (oc.ac.soln_lifetime_replacement - (year - first_year) + 0)
+            soln_first_cost /= oc.ac.conv_lifetime_replacement
+            cost_year = min(2060, year + (oc.single_iunit_purchase_year - 2015))
+            cost += (oc.conv_ref_install_cost_per_iunit[cost_year] * conv_usage_mult *
+                     min(1, soln_first_cost))
+        if year == first_year:
+            cost -= oc.soln_pds_install_cost_per_iunit.loc[oc.single_iunit_purchase_year]
+        cost += (oc.ac.conv_fixed_oper_cost_per_iunit * conv_usage_mult -
+                 oc.ac.soln_fixed_oper_cost_per_iunit) * oc.conversion_factor_fom
+        if oc.ac.has_var_costs:
+            conv_var_cost = oc.ac.conv_var_oper_cost_per_funit + oc.ac.conv_fuel_cost_per_funit
+            soln_var_cost = oc.ac.soln_var_oper_cost_per_funit + oc.ac.soln_fuel_cost_per_funit
+            cost += (oc.ac.soln_avg_annual_use * conv_var_cost - oc.ac.soln_avg_annual_use *
+                    soln_var_cost) * oc.conversion_factor_vom
+        cost *= min(1, soln_lifetime)
+        if oc.ac.conv_lifetime_replacement is None or oc.ac.conv_lifetime_replacement == 0:
+            result[year] = np.nan
+        elif math.fabs(cost) < 0.01:
+            result[year] = 0.0
+        else:
+            result[year] = cost
+        soln_lifetime -= 1
+    return result
+
+
+def legacy_soln_only_single_iunit_cashflow(oc):
+    """soln_only_single_iunit_cashflow computed year by year, as OperatingCost used to."""
+    first_year = 2015
+    last_year = max(2060, 2015 + oc.ac.soln_lifetime_replacement_rounded)
+    result = pd.Series(0, index=np.arange(first_year, 2139 + 1), dtype='float')
+    result.index.name = 'Year'
+    result.index = result.index.astype(int)
+    result.name = 'soln_only_single_iunit_cashflow'
+    soln_lifetime = oc.ac.soln_lifetime_replacement
+    if oc.ac.soln_avg_annual_use is not None and oc.ac.conv_avg_annual_use is not None:
+        conv_usage_mult = oc.ac.soln_avg_annual_use / oc.ac.conv_avg_annual_use
+    else:
+        conv_usage_mult = 1
+    for year in range(first_year, last_year + 1):
+        cost = 0
+        if soln_lifetime <= 0:
+            break
+        if year == first_year:
+            cost -= oc.soln_pds_install_cost_per_iunit.loc[oc.single_iunit_purchase_year]
+        cost += (oc.ac.conv_fixed_oper_cost_per_iunit * conv_usage_mult -
+                 oc.ac.soln_fixed_oper_cost_per_iunit) * oc.conversion_factor_fom
+        if oc.ac.has_var_costs:
+            conv_var_cost = oc.ac.conv_var_oper_cost_per_funit + oc.ac.conv_fuel_cost_per_funit
+            soln_var_cost = oc.ac.soln_var_oper_cost_per_funit + oc.ac.soln_fuel_cost_per_funit
+            cost += (oc.ac.soln_avg_annual_use * conv_var_cost -
+                     oc.ac.soln_avg_annual_use * soln_var_cost) * oc.conversion_factor_vom
+        cost *= min(1, soln_lifetime)
+        result[year] = cost if math.fabs(cost) > 0.01 else 0.0
+        soln_lifetime -= 1
+    return result
+
+
+def benchmark_single_iunit(solutions, number):
+    """Compare the single iunit cashflows and paybacks with the year by year loops."""
+    rows = []
+    legacy_payback = lambda s: s.cumsum().apply(lambda x: 1 if x >= 0 else 0)
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        oc = obj.oc
+        cls = model.operatingcost.OperatingCost
+        for (label, legacy_func, current_func) in [
+                ('soln_vs_conv_single_iunit_cashflow', legacy_soln_vs_conv_single_iunit_cashflow,
+                    cls.soln_vs_conv_single_iunit_cashflow.__wrapped__),
+                ('soln_only_single_iunit_cashflow', legacy_soln_only_single_iunit_cashflow,
+                    cls.soln_only_single_iunit_cashflow.__wrapped__)]:
+            legacy = legacy_func(oc)
+            current = current_func(oc)
+            pd.testing.assert_series_equal(current, legacy, check_exact=True)
+            pd.testing.assert_series_equal(model.operatingcost.payback(current),
+                    legacy_payback(legacy), check_exact=True, check_names=False)
+            t_legacy = timeit.timeit(lambda: legacy_payback(legacy_func(oc)),
+                    number=number) / number
+            t_current = timeit.timeit(lambda: model.operatingcost.payback(current_func(oc)),
+                    number=number) / number
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)', 'Current (s)'])
+
+
+def legacy_sigmoid_logistic(base_year, last_year, base_percent, last_percent,
+                            base_adoption, pds_tam_2050):
+    """First and second halves of the logistic sigmoid grown one year at a time, as SCurve
+       used to."""
+    result = pd.DataFrame(dtype=np.float64)
+    for year in range(base_year, model.dd.CORE_END_YEAR + 1):
+        magic = -34.65735902799730
+        np_err_settings = np.seterr(divide='raise')
+        try:
+            last_percent_log_term = magic if last_percent >= 0.999999 else math.log(
+                1.0 / last_percent - 1.0)
+            lcot = ((math.log(1.0 / base_percent - 1.0) - last_percent_log_term) /
+                (last_year - base_year))
+            term1a = ((1.0 - base_percent) / (1.0 + math.exp(-lcot * (year - (math.log(
+                1.0 / base_percent - 1.0) / lcot + base_year)))) * pds_tam_2050)
+            term1b = last_percent * base_percent * pds_tam_2050
+            term2 = ((last_year - base_year) - (last_year - year)) / (last_year - base_year)
+            term3 = ((last_year - year) / (last_year - base_year)) * base_adoption
+            firstHalf = (term1a + term1b) * term2 + term3
+            secondHalf = term1a + (base_adoption / last_percent)
+        except (ZeroDivisionError, FloatingPointError):
+            firstHalf = np.nan
+            secondHalf = np.nan
+        np.seterr(**np_err_settings)
+        result.loc[year, 'first_half'] = firstHalf
+        result.loc[year, 'second_half'] = secondHalf
+    result.index.name = 'Year'
+    return result
+
+
+def legacy_logistic_adoption(sconfig, transition_period):
+    """Logistic S-Curve blended one (year, region) cell at a time."""
+    result = pd.DataFrame()
+    for region in sconfig.index:
+        last_year = sconfig.loc[region, 'last_year']
+        last_percent = sconfig.loc[region, 'last_percent']
+        df = legacy_sigmoid_logistic(base_year=sconfig.loc[region, 'base_year'],
+                last_year=last_year, base_percent=sconfig.loc[region, 'base_percent'],
+                last_percent=last_percent, base_adoption=sconfig.loc[region, 'base_adoption'],
+                pds_tam_2050=sconfig.loc[region, 'pds_tam_2050'])
+        for year, row in df.iterrows():
+            if last_percent == 0.0:
+                result.loc[year, region] = np.nan
+            elif (year <= (last_year - (transition_period / 2))):
+                result.loc[year, region] = row['first_half']
+            elif (year < (last_year + (transition_period / 2))):
+                a = ((last_year + transition_period / 2 - year) /
+                     transition_period) * row['first_half']
+                b = ((year - (last_year - transition_period / 2)) /
+                     transition_period) * row['second_half']
+                result.loc[year, region] = a + b
+            else:
+                result.loc[year, region] = row['second_half']
+    result.name = 'logistic_adoption'
+    result.index.name = 'Year'
+    return result
+
+
+def legacy_bass_diffusion_adoption(sconfig):
+    """Bass Diffusion S-Curve grown one (year, region) cell at a time."""
+    result = pd.DataFrame()
+    for region in sconfig.index:
+        M = sconfig.loc[region, 'pds_tam_2050']
+        P = sconfig.loc[region, 'innovation']
+        Q = sconfig.loc[region, 'imitation']
+        base_year = sconfig.loc[region, 'base_year']
+        result.loc[base_year, region] = prev = sconfig.loc[region, 'base_adoption']
+        for year in range(base_year + 1, model.dd.CORE_END_YEAR + 1):
+            b = prev + (P + (Q * prev / M)) * (M - prev)
+            result.loc[year, region] = b
+            prev = b
+    result.name = 'bass_diffusion_adoption'
+    result.index.name = 'Year'
+    return result
+
+
+# numpy's vectorized exp and log may differ from the math module in the last bit.
+S_CURVE_RTOL = 1e-12
+
+
+def benchmark_s_curve(solutions, number, batch_size=100):
+    """Compare the S-Curves of each solution with the year by year loops, then evaluate
+       batch_size variations of the final adoption percentage in one call."""
+    rows = []
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        sc = getattr(obj, 'sc', None)
+        if sc is None:
+            continue
+        sconfig = sc.sconfig
+        cases = [('logistic_adoption', lambda: legacy_logistic_adoption(sconfig, 16),
+                  lambda: model.s_curve.logistic_curves(sconfig, 16))]
+        if 'innovation' in sconfig.columns and 'imitation' in sconfig.columns:
+            cases.append(('bass_diffusion_adoption',
+                          lambda: legacy_bass_diffusion_adoption(sconfig),
+                          lambda: model.s_curve.bass_diffusion_curves(sconfig)))
+        for (_, legacy_func, current_func) in cases:
+            pd.testing.assert_frame_equal(current_func(), legacy_func(), rtol=S_CURVE_RTOL)
+
+        variations = {}
+        for (i, scale) in enumerate(np.linspace(0.5, 1.0, batch_size)):
+            varied = sconfig.copy()
+            varied['last_percent'] = (varied['last_percent'] * scale).where(
+                    varied['last_percent'] < 0.999999, varied['last_percent'])
+            variations[i] = varied
+        batch = pd.concat(variations)
+        def legacy_batch():
+            return {k: legacy_logistic_adoption(v, 16) for (k, v) in variations.items()}
+        def current_batch():
+            return model.s_curve.logistic_curves(batch, 16)
+        legacy = legacy_batch()
+        current = current_batch()
+        for (k, v) in legacy.items():
+            pd.testing.assert_frame_equal(current[k], v, rtol=S_CURVE_RTOL, check_names=False)
+        cases.append((f'logistic_adoption x{batch_size}', legacy_batch, current_batch))
+
+        for (label, legacy_func, current_func) in cases:
+            t_legacy = timeit.timeit(legacy_func, number=number) / number
+            t_current = timeit.timeit(current_func, number=number) / number
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = f'equal within rtol={S_CURVE_RTOL}'
+    return results
+
+
+def legacy_cumulative_degraded_land(ua, ref_or_pds, protected_or_unprotected):
+    """Cumulative degraded land built one year at a time, as UnitAdoption used to."""
+    if ref_or_pds == 'PDS':
+        units_adopted = ua.soln_pds_funits_adopted
+    else:
+        units_adopted = ua.soln_ref_funits_adopted
+    df = pd.DataFrame(0., columns=units_adopted.columns.copy(), index=range(2014, 2061))
+    df.index.name = 'Year'
+    delay = 1 if ua.ac.delay_protection_1yr else 0
+    if protected_or_unprotected == 'protected':
+        df.loc[2014, :] = units_adopted.loc[2014, :] * ua.ac.disturbance_rate
+    for y in list(df.index)[1:]:
+        protected_land = units_adopted.loc[y - delay, :]
+        degraded_land = df.loc[y - 1, :]
+        if protected_or_unprotected == 'protected':
+            row = degraded_land + (protected_land - degraded_land) * ua.ac.disturbance_rate
+            row = pd.DataFrame([row, protected_land]).min()
+        elif protected_or_unprotected == 'unprotected':
+            tot_area = ua.total_area_per_region.loc[y, :]
+            row = degraded_land + (tot_area - protected_land - degraded_land) * ua.ac.degradation_rate
+            row = pd.DataFrame([row, tot_area]).min()
+        df.loc[y, :] = row
+    return df
+
+
+def benchmark_degraded_land(solutions, number):
+    """Compare the four cumulative degraded land tables of each protection solution with
+       the year by year loop."""
+    rows = []
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        ua = obj.ua
+        ac = ua.ac
+        if None in [ac.delay_protection_1yr, ac.disturbance_rate, ac.degradation_rate]:
+            continue
+        for ref_or_pds in ['PDS', 'REF']:
+            for protected_or_unprotected in ['protected', 'unprotected']:
+                legacy_func = lambda: legacy_cumulative_degraded_land(ua, ref_or_pds,
+                        protected_or_unprotected)
+                current_func = lambda: ua._cumulative_degraded_land(ref_or_pds,
+                        protected_or_unprotected)
+                pd.testing.assert_frame_equal(current_func(), legacy_func(), check_exact=True)
+                t_legacy = timeit.timeit(legacy_func, number=number) / number
+                t_current = timeit.timeit(current_func, number=number) / number
+                rows.append([name, ac.solution_category.name,
+                    f'{ref_or_pds} {protected_or_unprotected}', t_legacy, t_current])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)', 'Current (s)'])
+
+
+def legacy_net_land_units_after_emissions_lifetime(ua):
+    """Lagged land units copied one row at a time, as UnitAdoption used to."""
+    if ua.ac.delay_protection_1yr is not None:
+        funits = ua.cumulative_reduction_in_total_degraded_land()
+    else:
+        funits = ua.net_annual_land_units_adopted()
+    result = pd.DataFrame(0, index=funits.index.copy(), columns=funits.columns.copy())
+    first_year = result.first_valid_index() + 1
+    for year in result.index:
+        if (year - first_year) > ua.ac.land_annual_emissons_lifetime:
+            result.loc[year] = funits.loc[year - ua.ac.land_annual_emissons_lifetime - 1]
+    result.name = 'net_land_units_after_emissions_lifetime'
+    return result
+
+
+def legacy_soln_pds_annual_land_area_harvested(ua):
+    """Harvested land summed over earlier harvest years in a nested loop."""
+    funits = ua.soln_pds_new_iunits_reqd()
+    result = pd.DataFrame(0, index=funits.index.copy(), columns=funits.columns.copy())
+    if ua.ac.harvest_frequency is None:
+        return result
+    first_year = result.first_valid_index()
+    for year in result.index:
+        if (year - first_year) >= ua.ac.harvest_frequency:
+            year_last_harvested = year - 1
+            total_amount_harvested = 0
+            for _ in range(100):
+                year_last_harvested -= ua.ac.harvest_frequency
+                if year_last_harvested < first_year:
+                    break
+                total_amount_harvested += funits.loc[year_last_harvested]
+            else:
+                raise ValueError('Check value for harvest frequency')
+            result.loc[year] = total_amount_harvested
+    result.name = 'soln_pds_annual_land_area_harvested'
+    return result
+
+
+def benchmark_land_lag(solutions, number):
+    """Compare the emissions lifetime and harvest tables of every scenario of each LAND
+       solution with the row by row loops."""
+    rows = []
+    cls = model.unitadoption.UnitAdoption
+    for name in solutions:
+        (constructor, scenarios) = solution.factory.one_solution_scenarios(name)
+        for scenario in scenarios:
+            obj = constructor(scenario=scenario)
+            if obj.ac.solution_category != SOLUTION_CATEGORY.LAND:
+                break
+            ua = obj.ua
+            for (label, legacy_func, current_func) in [
+                    ('net_land_units_after_emissions_lifetime',
+                        legacy_net_land_units_after_emissions_lifetime,
+                        cls.net_land_units_after_emissions_lifetime.__wrapped__),
+                    ('soln_pds_annual_land_area_harvested',
+                        legacy_soln_pds_annual_land_area_harvested,
+                        cls.soln_pds_annual_land_area_harvested.__wrapped__)]:
+                # row assignment left whole-number columns of the legacy tables as int64.
+                pd.testing.assert_frame_equal(current_func(ua), legacy_func(ua), check_exact=True,
+                        check_dtype=False)
+                t_legacy = timeit.timeit(lambda: legacy_func(ua), number=number) / number
+                t_current = timeit.timeit(lambda: current_func(ua), number=number) / number
+                rows.append([f'{name}: {scenario}', obj.ac.solution_category.name, label,
+                    t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = 'identical in value'
+    return results
+
+
+def legacy_trend(data, trend):
+    """One trend fitted to one pd.Series with np.polyfit, as model.interpolation used to."""
+    years_idx = pd.Index(np.arange(2014, 2061), name="Year")
+    columns = model.interpolation.TREND_COLUMNS[trend]
+    data_clean = data.dropna()
+    if data_clean.empty:
+        return pd.DataFrame(np.nan, columns=columns, dtype=np.float64, index=years_idx)
+    x = data_clean.index - 2014
+    offsets = np.arange(len(years_idx))
+    if trend == 'linear':
+        (slope, intercept) = np.polyfit(x, data_clean.values, 1)
+        x = offsets * slope
+        constant = np.full(len(offsets), intercept)
+        curves = [x, constant, x + constant]
+    elif trend == 'degree2':
+        (c2, c1, intercept) = np.polyfit(x, data_clean.values, 2)
+        x2 = (offsets ** 2) * c2
+        x = offsets * c1
+        constant = np.full(len(offsets), intercept)
+        curves = [x2, x, constant, x + x2 + constant]
+    elif trend == 'degree3':
+        (c3, c2, c1, intercept) = np.polyfit(x, data_clean.values, 3)
+        x3 = (offsets ** 3) * c3
+        x2 = (offsets ** 2) * c2
+        x = offsets * c1
+        constant = np.full(len(offsets), intercept)
+        curves = [x3, x2, x, constant, x + x2 + x3 + constant]
+    else:
+        (ce, coeff) = np.polyfit(x, np.log(data_clean.values), 1)
+        ex = np.exp(offsets * ce)
+        coeff = np.full(len(offsets), np.exp(coeff))
+        curves = [coeff, ex, ex * coeff]
+    return pd.DataFrame(np.column_stack(curves), columns=columns, dtype=np.float64,
+                        index=years_idx)
+
+
+# series fitted together may differ from np.polyfit on its own in the last bits.
+TRENDS_RTOL = 1e-9
+
+
+def benchmark_trends(solutions, number):
+    """Fit all four trends to every TAM and adoption data series of each solution, one
+       series and one trend at a time as before, then all together with fit_trends."""
+    rows = []
+    trends = list(model.interpolation.TREND_DEGREES.keys())
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        series = {}
+        tm = getattr(obj, 'tm', None)
+        ad = getattr(obj, 'ad', None)
+        sources = []
+        if tm is not None:
+            sources += [(('TAM', region), lambda r: tm.forecast_low_med_high(r).loc[:,
+                tm.tamconfig.loc['growth', r]]) for region in tm.tamconfig.columns]
+        if ad is not None and ad.data_sources:
+            sources += [(('Adoption', region), lambda r: ad.adoption_low_med_high(r).loc[:,
+                ad._adoption_growth(r)]) for region in model.dd.REGIONS]
+        for (key, func) in sources:
+            try:
+                series[key] = func(key[1])
+            except (KeyError, ValueError) as e:
+                print(f"Skipping {name} {key}: {e!r}")
+        if not series:
+            continue
+        data = pd.concat(series, axis=1)
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for (key, s) in series.items():
+                for trend in trends:
+                    pd.testing.assert_frame_equal(
+                            model.interpolation.trend_algorithm(data=s, trend=trend),
+                            legacy_trend(s, trend), check_exact=True)
+            current = model.interpolation.fit_trends(data, trends)
+            for trend in trends:
+                for (key, s) in series.items():
+                    pd.testing.assert_frame_equal(
+                            model.interpolation.series_trend(current, trend, key),
+                            legacy_trend(s, trend), rtol=TRENDS_RTOL)
+            legacy_func = lambda: [legacy_trend(s, t) for s in series.values() for t in trends]
+            current_func = lambda: model.interpolation.fit_trends(data, trends)
+            t_legacy = timeit.timeit(legacy_func, number=number) / number
+            t_current = timeit.timeit(current_func, number=number) / number
+        rows.append([name, obj.ac.solution_category.name, f'{len(series)} series x 4 trends',
+            t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = f'equal within rtol={TRENDS_RTOL}, identical one series at a time'
+    return results
+
+
+def legacy_forecast_data(tm):
+    """TAM forecast data read straight from the CSV files, as TAM used to."""
+    main_region = model.dd.REGIONS[0]
+    main_region_pds = 'PDS ' + main_region
+    df_per_region = {region: pd.DataFrame() for region in model.dd.REGIONS + [main_region_pds]}
+    for (groupname, group) in tm.tam_ref_data_sources.items():
+        regions = (model.dd.REGIONS if not groupname.startswith("Region: ") else
+                   [groupname.replace("Region: ", "")])
+        for (name, value) in group.items():
+            sources = {name: value} if tm._is_path(value) else value
+            for name, filename in sources.items():
+                df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                        skip_blank_lines=True, comment='#', usecols=["Year"] + regions)
+                for region in regions:
+                    df_per_region[region][name] = df[region]
+    for (groupname, group) in tm.tam_pds_data_sources.items():
+        for (name, value) in group.items():
+            sources = {name: value} if tm._is_path(value) else value
+            for name, filename in sources.items():
+                df = pd.read_csv(filename, header=0, index_col="Year", skipinitialspace=True,
+                        skip_blank_lines=True, comment='#', usecols=["Year", main_region])
+                df_per_region[main_region_pds][name] = df[main_region]
+    return df_per_region
+
+
+def legacy_adoption_data(ad):
+    """Adoption data read straight from the CSV files, as AdoptionData used to."""
+    df_per_region = {region: pd.DataFrame() for region in model.dd.REGIONS}
+    for group in ad.data_sources.values():
+        for (name, value) in group.items():
+            sources = {name: value} if isinstance(value, (str, pathlib.PurePath)) else value
+            for name, filename in sources.items():
+                df = pd.read_csv(filename, header=0, index_col=0, skipinitialspace=True,
+                        skip_blank_lines=True, comment='#')
+                for region in model.dd.REGIONS:
+                    df_per_region[region].loc[:, name] = df.loc[:, region]
+    return df_per_region
+
+
+def benchmark_sources(solutions, number):
+    """Read the TAM and adoption data sources of each solution straight from CSV, then via
+       the shared source cache, which is warm for files an earlier solution already read."""
+    rows = []
+    model.source_cache.sources.clear()
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        obj = constructor(scenario=None)
+        for (label, attr, legacy_func, populate, result_attr) in [
+                ('TAM', 'tm', legacy_forecast_data, '_populate_forecast_data', '_forecast_data'),
+                ('AdoptionData', 'ad', legacy_adoption_data, '_populate_adoption_data',
+                    '_adoption_data')]:
+            module = getattr(obj, attr, None)
+            if module is None:
+                continue
+            # constructing obj warmed the cache, as for every later solution using these sources.
+            t_current = timeit.timeit(getattr(module, populate), number=1)
+            t_legacy = timeit.timeit(lambda: legacy_func(module), number=number) / number
+            legacy = legacy_func(module)
+            for (region, frame) in getattr(module, result_attr).items():
+                if region in legacy:
+                    pd.testing.assert_frame_equal(frame, legacy[region], check_exact=True)
+            rows.append([name, obj.ac.solution_category.name, label, t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Category', 'Table', 'Legacy (s)',
+        'Current (s)'])
+    stats = model.source_cache.sources.stats()
+    results.attrs['match'] = (f"identical ({stats['misses']} files parsed, "
+            f"{stats['hits']} cache hits)")
+    return results
+
+
+def benchmark_compiled(solutions, number):
+    """Load every data source file read by the solutions from the compiled store of
+       tools/compile_sources.py rather than parsing the CSV, grouped by directory."""
+    cache = model.source_cache.sources
+    cache.clear()
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            constructor(scenario=None)
+    store = model.source_store.SourceStore()
+    root = store.root
+    groups = {}
+    for (path, kwargs, _) in cache.parsed():
+        relpath = path.relative_to(root) if root in path.parents else path
+        parts = list(relpath.parts[:-1])
+        if parts[:1] == ['solution'] and len(parts) > 1:
+            parts[1] = '*'
+        group = groups.setdefault('/'.join(parts), [0, 0, 0.0, 0.0])
+        compiled = store.load(path, kwargs)
+        group[0] += 1
+        if compiled is None:
+            continue
+        pd.testing.assert_frame_equal(compiled, pd.read_csv(path, **dict(kwargs)),
+                check_exact=True)
+        group[1] += 1
+        group[2] += timeit.timeit(lambda: pd.read_csv(path, **dict(kwargs)),
+                number=number) / number
+        group[3] += timeit.timeit(lambda: store.load(path, kwargs), number=number) / number
+    rows = [[directory, files, compiled, t_legacy, t_current] for
+            (directory, (files, compiled, t_legacy, t_current)) in sorted(groups.items())
+            if compiled]
+    results = pd.DataFrame(rows, columns=['Directory', 'Files', 'Compiled', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = (f"identical ({results['Compiled'].sum()} of "
+            f"{sum(g[0] for g in groups.values())} files compiled)")
+    return results
+
+
+# The land distribution is a matrix product over the applicable AEZs, which adds the zones
+# in a different order than the pandas sum it replaced.
+AEZ_RTOL = 1e-12
+
+
+def legacy_aez(ae):
+    """Land allocation and distribution read file by file, as AEZ used to.
+
+       Returns (soln_land_alloc_df, applicable_zones, world_land_alloc_dict, soln_land_dist_df).
+    """
+    land_path = model.aez.LAND_CSV_PATH
+    alloc_df = pd.DataFrame(np.nan, columns=model.dd.AEZS, index=ae.regimes)
+    if ae.ignore_allocation:
+        alloc_df = alloc_df.fillna(1)
+    else:
+        alloc_df = alloc_df.fillna(0)
+        for tmr in ae.regimes:
+            tmr_path = land_path.joinpath(f'allocation{ae.cohort}', ae._to_filename(tmr))
+            for col in alloc_df:
+                if col.startswith('AEZ29'):
+                    continue
+                la_df = pd.read_csv(tmr_path.joinpath(ae._to_filename(col) + '.csv'),
+                        index_col=0)
+                total_perc_allocated = la_df.loc[ae.solution_name]['Total % allocated']
+                if total_perc_allocated > 0:
+                    alloc_df.at[tmr, col] = total_perc_allocated
+
+    row = pd.read_csv(land_path.joinpath('aez', 'solution_aez_matrix.csv'),
+            index_col=0).loc[ae.solution_name]
+    applicable_zones = row[row].index.tolist()
+
+    world_dict = {}
+    subdir = '2020' if len(ae.regimes) == 8 else '2018'
+    for tmr in ae.regimes:
+        df = pd.read_csv(land_path.joinpath('world', subdir, ae._to_filename(tmr) + '.csv'),
+                index_col=0).drop('Total Area (km2)', 1)
+        world_dict[tmr] = df.mul(alloc_df.loc[tmr], axis=1) / 10000
+
+    soln_df = pd.DataFrame(columns=ae.regimes, index=ae.regions).fillna(0.)
+    for reg in ae.regions:
+        for tmr, df in world_dict.items():
+            if reg == 'Global':
+                soln_df.at[reg, tmr] = soln_df.loc[model.dd.MAIN_REGIONS, tmr].sum()
+            else:
+                soln_df.at[reg, tmr] = df.loc[reg, applicable_zones].sum()
+    soln_df['All'] = soln_df.sum(axis=1)
+    soln_df.index.name = 'Region'
+    return (alloc_df, applicable_zones, world_dict, soln_df)
+
+
+def benchmark_aez(solutions, number):
+    """Build the AEZ land tables of each land solution file by file, then by slicing the
+       land allocation of its cohort, which is loaded by the first solution of the cohort."""
+    rows = []
+    model.aez.cohort_land.cache_clear()
+
+    def populate(ae):
+        ae._populate_solution_land_allocation()
+        ae._get_applicable_zones()
+        ae._populate_world_land_allocation()
+        ae._populate_solution_land_distribution()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            obj = constructor(scenario=None)
+            ae = getattr(obj, 'ae', None)
+            if ae is None:
+                continue
+            t_current = timeit.timeit(lambda: populate(ae), number=number) / number
+            t_legacy = timeit.timeit(lambda: legacy_aez(ae), number=number) / number
+            (alloc_df, applicable_zones, world_dict, soln_df) = legacy_aez(ae)
+            pd.testing.assert_frame_equal(ae.soln_land_alloc_df, alloc_df, check_exact=True)
+            assert ae.applicable_zones == applicable_zones
+            for (tmr, df) in world_dict.items():
+                pd.testing.assert_frame_equal(ae.world_land_alloc_dict[tmr], df,
+                        check_exact=True)
+            pd.testing.assert_frame_equal(ae.get_land_distribution(), soln_df,
+                    check_exact=False, rtol=AEZ_RTOL, atol=0)
+            rows.append([name, obj.ac.solution_category.name, t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Category', 'Legacy (s)', 'Current (s)'])
+    results.attrs['match'] = f"identical (land distribution within rtol={AEZ_RTOL})"
+    return results
+
+
+def force_deferred(obj):
+    """Compute every deferred table argument of the modules of obj, as Scenario
+       construction did before the tables were passed as bound methods."""
+    for module in list(vars(obj).values()):
+        for (name, attr) in vars(type(module)).items():
+            if isinstance(attr, model.deferred.Deferred):
+                getattr(module, name)
+
+
+def benchmark_deferred(solutions, number):
+    """Construct the default scenario of each solution and compute co2eq_mmt_reduced, first
+       computing all tables passed between modules as construction used to, then only
+       the tables co2eq_mmt_reduced depends on."""
+    rows = []
+
+    def eager(constructor):
+        obj = constructor(scenario=None)
+        force_deferred(obj)
+        return obj.c2.co2eq_mmt_reduced()
+
+    def lazy(constructor):
+        obj = constructor(scenario=None)
+        return obj.c2.co2eq_mmt_reduced()
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            lazy(constructor)
+            t_legacy = timeit.timeit(lambda: eager(constructor), number=number) / number
+            t_current = timeit.timeit(lambda: lazy(constructor), number=number) / number
+            pd.testing.assert_frame_equal(lazy(constructor), eager(constructor),
+                    check_exact=True)
+            obj = constructor(scenario=None)
+            rows.append([name, obj.ac.solution_category.name, t_legacy, t_current])
+    return pd.DataFrame(rows, columns=['Solution', 'Category', 'Legacy (s)', 'Current (s)'])
+
+
+def incremental_results(obj):
+    return [obj.c2.co2eq_mmt_reduced(), obj.fc.soln_pds_annual_world_first_cost().to_frame(),
+            obj.oc.soln_net_present_value().to_frame()]
+
+
+def benchmark_incremental(solutions, number):
+    """Change npv_discount_rate, then conv_2014_cost, of the default scenario of each
+       solution and compute the results of incremental_results(), constructing a new
+       Scenario with the changed AdvancedControls then updating the Scenario in place."""
+    rows = []
+
+    def rebuild(constructor, scenario, ac):
+        return incremental_results(constructor(scenario=scenario, ac=ac))
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            obj = constructor(scenario=None)
+            for field in ['npv_discount_rate', 'conv_2014_cost']:
+                value = getattr(obj.ac, field)
+                if not isinstance(value, float):
+                    continue
+                values = [value * 1.1, value]
+                ac = dataclasses.replace(obj.ac, **{field: values[0]})
+                t_legacy = timeit.timeit(lambda: rebuild(constructor, obj.scenario, ac),
+                        number=number) / number
+                incremental_results(model.incremental.track(obj))
+                t_current = 0.0
+                for i in range(number):
+                    start = timeit.default_timer()
+                    updated = model.incremental.update_ac(obj, **{field: values[i % 2]})
+                    incremental_results(updated)
+                    t_current += (timeit.default_timer() - start) / number
+                updated = model.incremental.update_ac(obj, **{field: values[0]})
+                for (a, b) in zip(incremental_results(updated), rebuild(constructor, obj.scenario, ac)):
+                    pd.testing.assert_frame_equal(a, b, check_exact=True)
+                rows.append([name, field, updated is obj, t_legacy, t_current])
+                obj = constructor(scenario=None)
+    return pd.DataFrame(rows, columns=['Solution', 'Field', 'In place', 'Legacy (s)',
+        'Current (s)'])
+
+
+def legacy_hash_item(item):
+    if isinstance(item, model.advanced_controls.AdvancedControls):
+        key = 0x811c9dc5 ^ id(item)
+        for field in dataclasses.fields(item):
+            key = key ^ hash(field)
+        return key
+    if isinstance(item, pd.DataFrame) or isinstance(item, pd.Series):
+        item = tuple(pd.util.hash_pandas_object(item))
+    try:
+        return hash(item)
+    except TypeError:
+        pass
+    try:
+        return hash(json.dumps(item, separators=(',', ':')))
+    except TypeError:
+        pass
+    try:
+        return(hash(str(item)))
+    except TypeError:
+        pass
+    return hash(tuple(item))
+
+
+def legacy_metaclass_key(cls, args, kwargs):
+    key = legacy_hash_item(cls)
+    for arg in args:
+        key = (key << 64) ^ legacy_hash_item(arg)
+    for arg in sorted(kwargs.keys()):
+        key = (key << 64) ^ legacy_hash_item(arg)
+        key = (key << 64) ^ legacy_hash_item(kwargs[arg])
+    return key
+
+
+def benchmark_fingerprint(solutions, number):
+    """Key the arguments of every MetaclassCache constructor call made constructing the
+       default scenario of each solution, grouped by class. The keys group the calls into
+       the same instances, except where arguments only differ past the rows shown by
+       str() of a DataFrame, which the legacy key could not tell apart."""
+    calls = []
+    call = model.metaclass_cache.MetaclassCache.__call__
+
+    def record(cls, *args, **kwargs):
+        calls.append((cls, args, kwargs))
+        return call(cls, *args, **kwargs)
+
+    model.metaclass_cache.MetaclassCache.__call__ = record
+    try:
+        with warnings.catch_warnings():
+            warnings.simplefilter('ignore')
+            for name in solutions:
+                (constructor, _) = solution.factory.one_solution_scenarios(name)
+                constructor(scenario=None)
+    finally:
+        model.metaclass_cache.MetaclassCache.__call__ = call
+
+    def fingerprint(cls, args, kwargs):
+        return model.fingerprint.fingerprint([cls, list(args), kwargs])
+
+    rows = []
+    merged = 0
+    for cls in sorted(set(c[0] for c in calls), key=lambda c: c.__name__):
+        group = [c for c in calls if c[0] is cls]
+        legacy = [legacy_metaclass_key(*c) for c in group]
+        current = [fingerprint(*c) for c in group]
+        for i in range(len(group)):
+            for j in range(i):
+                if (legacy[i] == legacy[j]) != (current[i] == current[j]):
+                    # a legacy collision: the same str() for different content.
+                    assert legacy[i] == legacy[j], f"{cls.__name__} calls {j}, {i}"
+                    merged += 1
+        t_legacy = timeit.timeit(lambda: [legacy_metaclass_key(*c) for c in group],
+                number=number) / number
+        t_current = timeit.timeit(lambda: [fingerprint(*c) for c in group],
+                number=number) / number
+        rows.append([cls.__name__, len(group), len(set(current)), t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Class', 'Calls', 'Instances', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = f"consistent ({merged} legacy collisions)"
+    return results
+
+
+def benchmark_vma_stats(solutions, number):
+    """Look up the statistics AdvancedControls substitutes for the VMAs of each solution:
+       the overall mean, high and low, and the statistics of each region. Legacy filters
+       the sources for every lookup, current looks them up in the statistics computed for
+       every regime and region in one pass, starting from an empty table each repetition."""
+    lookups = [(None, None)] + [(None, region) for region in model.dd.REGIONS]
+    rows = []
+    mismatched = 0
+    for name in solutions:
+        (constructor, _) = solution.factory.one_solution_scenarios(name)
+        vmas = [v for v in getattr(constructor, 'vmas', {}).values()
+                if v.fixed_summary is None and not v.df.empty]
+        if not vmas:
+            continue
+
+        def legacy():
+            return [v._filtered_mean_sd(regime=regime, region=region) for _ in range(3)
+                    for v in vmas for (regime, region) in lookups]
+
+        def current():
+            for v in vmas:
+                v._statistics = None
+            return [v._mean_sd(regime=regime, region=region) for _ in range(3)
+                    for v in vmas for (regime, region) in lookups]
+
+        for (a, b) in zip(legacy(), current()):
+            if not np.allclose(a, b, rtol=1e-12, atol=1e-12, equal_nan=True):
+                mismatched += 1
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        t_current = timeit.timeit(current, number=number) / number
+        rows.append([name, len(vmas), t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'VMAs', 'Legacy (s)', 'Current (s)'])
+    assert mismatched == 0, f"{mismatched} statistics differ"
+    results.attrs['match'] = 'equal to 1e-12'
+    return results
+
+
+def ensemble_results(obj):
+    npv = obj.oc.soln_net_present_value().loc[2020:2050].sum()
+    reduced = obj.c2.co2eq_mmt_reduced().loc[2020:2050, 'World'].sum()
+    paid = model.operatingcost.payback(obj.oc.soln_net_cash_flow())
+    return [npv, reduced, paid.idxmax() if paid.any() else np.nan]
+
+
+def benchmark_ensemble(solutions, number, num_draws=200):
+    """Evaluate num_draws draws of the costs, learning rates, lifetime and discount rate
+       of the default scenario of each solution, within 20% of their values. Legacy
+       applies each draw with model.incremental.update_ac() and computes the results of
+       ensemble_results(), current computes them for every draw with model.ensemble."""
+    rows = []
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            obj = constructor(scenario=None)
+            fields = model.ensemble.COST_FIELDS + model.ensemble.LIFETIME_FIELDS[:2]
+            ranges = {f: (getattr(obj.ac, f) * 0.8, getattr(obj.ac, f), getattr(obj.ac, f) * 1.2)
+                      for f in fields if isinstance(getattr(obj.ac, f), float) and
+                      getattr(obj.ac, f) != 0}
+            samples = model.ensemble.draws(obj, n=num_draws, parameters=list(ranges),
+                    ranges=ranges, seed=1)
+
+            def legacy():
+                return [ensemble_results(model.incremental.update_ac(obj, **row.to_dict()))
+                        for (_, row) in samples.iterrows()]
+
+            def current():
+                return model.ensemble.Ensemble(obj, samples).results().to_numpy()
+
+            assert np.allclose(np.array(legacy()), current(), rtol=1e-12, equal_nan=True)
+            obj = constructor(scenario=None)
+            t_legacy = timeit.timeit(legacy, number=number) / number
+            obj = constructor(scenario=None)
+            t_current = timeit.timeit(current, number=number) / number
+            rows.append([name, len(ranges), num_draws, t_legacy, t_current])
+    results = pd.DataFrame(rows, columns=['Solution', 'Parameters', 'Draws', 'Legacy (s)',
+        'Current (s)'])
+    results.attrs['match'] = 'equal to 1e-12'
+    return results
+
+
+def legacy_fair_cft(emissions):
+    (C, F, T) = fair.forward.fair_scm(emissions=emissions.values, useMultigas=False,
+            **model.fairutil.fair_scm_kwargs())
+    return pd.DataFrame({'C': C, 'F': F, 'T': T}, index=emissions.index)
+
+
+def fair_cft_emissions(c2):
+    """The emissions which CO2Calcs.FaIR_CFT() of c2 runs FaIR for."""
+    emissions = c2.baseline.copy()
+    for (table, column) in [(c2.co2eq_mmt_reduced(), 'World'),
+                            (c2.co2_sequestered_global(), 'All')]:
+        if table is not None:
+            gtonsC = (table[column] / 1000.0) / model.co2calcs.C_TO_CO2EQ
+            emissions = emissions.subtract(other=gtonsC, fill_value=0.0)
+    return emissions
+
+
+def benchmark_fair(solutions, number):
+    """Run FaIR for the baseline, RCP4.5 and the emissions of the default scenario of each
+       solution, as CO2Calcs.FaIR_CFT_baseline(), FaIR_CFT_RCP45() and FaIR_CFT() do.
+       Legacy runs all three for every solution, current runs them through
+       model.fairutil.fair_scm_batch() starting from an empty cache each repetition, which
+       runs the baseline and RCP4.5 once and the solutions across a pool of processes."""
+    trajectories = {}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, _) = solution.factory.one_solution_scenarios(name)
+            c2 = constructor(scenario=None).c2
+            trajectories[name] = (c2.baseline, model.fairutil.rcp45_co2_emissions(),
+                                  fair_cft_emissions(c2))
+
+    def legacy():
+        return {name: [legacy_fair_cft(e) for e in t] for (name, t) in trajectories.items()}
+
+    def current():
+        model.fairutil.cache.clear()
+        flat = {(name, i): e for (name, t) in trajectories.items() for (i, e) in enumerate(t)}
+        results = model.fairutil.fair_scm_batch(flat)
+        return {name: [results[(name, i)] for i in range(3)] for name in trajectories}
+
+    (expected, actual) = (legacy(), current())
+    for name in trajectories:
+        for (a, b) in zip(expected[name], actual[name]):
+            pd.testing.assert_frame_equal(a, b, check_exact=True)
+    t_legacy = timeit.timeit(legacy, number=number) / number
+    t_current = timeit.timeit(current, number=number) / number
+    return pd.DataFrame([['FaIR_CFT*', len(trajectories), t_legacy, t_current]],
+        columns=['Table', 'Solutions', 'Legacy (s)', 'Current (s)'])
+
+
+def legacy_baseline_emissions():
+    rcp = pd.DataFrame(fair.RCPs.rcp45.Emissions.emissions.copy(), columns=model.fairutil.ghg.keys(),
+            index=fair.RCPs.rcp45.Emissions.year)
+    baseline = (rcp['FossilCO2']  + rcp['OtherCO2'] +
+             # Global Warming Potential of individual GHGs in CO2 equivalence
+             # CH4 and N2O values from Project Drawdown, noted as "AR5 with feedback"
+            ((rcp['CH4']       * 34      / 1000.0) +
+             (rcp['N2O']       * 298     / 1000.0) +
+             # GHGs after this point are from IPCC AR5
+             # https://www.ghgprotocol.org/sites/default/files/ghgp/Global-Warming-Potential-Values%20%28Feb%2016%202016%29_1.pdf
+             (rcp['CF4']       * 6630    / 1000000.0) +
+             (rcp['C2F6']      * 11100   / 1000000.0) +
+             (rcp['C6F14']     * 7910    / 1000000.0) +
+             (rcp['HFC23']     * 12400   / 1000000.0) +
+             (rcp['HFC32']     * 677     / 1000000.0) +
+             (rcp['HFC43_10']  * 1650    / 1000000.0) +
+             (rcp['HFC125']    * 3170    / 1000000.0) +
+             (rcp['HFC134a']   * 1300    / 1000000.0) +
+             (rcp['HFC143a']   * 4800    / 1000000.0) +
+             (rcp['HFC227ea']  * 3350    / 1000000.0) +
+             (rcp['HFC245fa']  * 858     / 1000000.0) +
+             (rcp['SF6']       * 23500   / 1000000.0) +
+             (rcp['CFC11']     * 4660    / 1000000.0) +
+             (rcp['CFC12']     * 10200   / 1000000.0) +
+             (rcp['CFC113']    * 5820    / 1000000.0) +
+             (rcp['CFC114']    * 8590    / 1000000.0) +
+             (rcp['CFC115']    * 7670    / 1000000.0) +
+             (rcp['CARB_TET']  * 1730    / 1000000.0) +
+             (rcp['HCFC22']    * 1760    / 1000000.0) +
+             (rcp['HCFC141B']  * 782     / 1000000.0) +
+             (rcp['HCFC142B']  * 1980    / 1000000.0) +
+             (rcp['HALON1211'] * 1750    / 1000000.0) +
+             (rcp['HALON1301'] * 6290    / 1000000.0) +
+             (rcp['HALON2402'] * 1470    / 1000000.0) +
+             (rcp['CH3BR']     * 2       / 1000000.0) +
+             (rcp['CH3CL']     * 12      / 1000000.0) +
+             # Halon 1202 from https://en.wikipedia.org/wiki/Dibromodifluoromethane
+             (rcp['HALON1202'] * 231     / 1000000.0) +
+             # NOx https://www.ncbi.nlm.nih.gov/pubmed/24234471
+             (rcp['NOx']       * 7       / 1000.0) +
+             # gasses with a GWP of close to zero or with very short atmospheric lifetimes.
+             (rcp['CO']        * 0) +
+             (rcp['BC']        * 0) +
+             (rcp['NH3']       * 0) +
+             (rcp['NMVOC']     * 0) +
+             (rcp['OC']        * 0) +
+             (rcp['MCF']       * 0) +
+             (rcp['SOx']       * 0) +
+             0
+            ) / model.fairutil.CO2_MULT)
+    baseline.index = baseline.index.astype(int)
+    baseline.index.name = 'Year'
+    ddCO2 = pd.read_csv(str(model.fairutil.baselineCO2_path), header=0, index_col=0, skipinitialspace=True,
+            skip_blank_lines=True, comment='#', squeeze=True)
+    ddCO2.index = ddCO2.index.astype(int)
+    baseline.update(ddCO2 / model.fairutil.CO2_MULT)
+    return baseline
+
+
+def benchmark_baseline(solutions, number):
+    """Build the baseline emissions which CO2Calcs reads for each solution. Legacy sums
+       the GWP-weighted gases of RCP4.5 and reads data/baselineCO2.csv for every solution,
+       current builds them once per process from a product with the GWP vector."""
+    def legacy():
+        return [legacy_baseline_emissions() for _ in solutions]
+
+    def current():
+        model.fairutil._baseline_emissions.cache_clear()
+        model.fairutil._drawdown_co2.cache_clear()
+        return [model.fairutil.baseline_emissions() for _ in solutions]
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for (a, b) in zip(legacy(), current()):
+            pd.testing.assert_series_equal(a, b, check_exact=False, rtol=1e-15)
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        t_current = timeit.timeit(current, number=number) / number
+    results = pd.DataFrame([['baseline_emissions', len(solutions), t_legacy, t_current]],
+        columns=['Table', 'Solutions', 'Legacy (s)', 'Current (s)'])
+    results.attrs['match'] = 'equal to 1e-15'
+    return results
+
+
+def benchmark_fair_ensemble(solutions, number):
+    """Percentile bands of FaIR over 40 draws of the climate sensitivity parameters, for
+       the emissions of the default scenario of the first of solutions, as
+       CO2Calcs.FaIR_CFT() runs FaIR for. Legacy runs FaIR for each draw in turn, current
+       runs model.fairutil.fair_scm_ensemble() across a pool of processes, from an empty
+       cache and again with the runs already cached, as a second report over them would."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        (constructor, _) = solution.factory.one_solution_scenarios(solutions[0])
+        emissions = fair_cft_emissions(constructor(scenario=None).c2)
+    parameters = model.fairutil.parameter_samples(n=40, seed=0)
+    percentiles = (5, 50, 95)
+
+    def legacy():
+        runs = []
+        for p in parameters:
+            kwargs = dict(model.fairutil.fair_scm_kwargs(), **p)
+            runs.append(fair.forward.fair_scm(emissions=emissions.values, useMultigas=False,
+                **kwargs))
+        return np.percentile(np.stack(runs), percentiles, axis=0)
+
+    def cold():
+        model.fairutil.cache.clear()
+        return model.fairutil.fair_scm_ensemble(emissions, parameters, percentiles)
+
+    def warm():
+        return model.fairutil.fair_scm_ensemble(emissions, parameters, percentiles)
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        expected = legacy()
+        for actual in (cold(), warm()):
+            for (i, variable) in enumerate(['C', 'F', 'T']):
+                for (j, p) in enumerate(percentiles):
+                    np.testing.assert_array_equal(actual[(variable, p)].values,
+                            expected[j, i])
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        t_cold = timeit.timeit(cold, number=number) / number
+        t_warm = timeit.timeit(warm, number=number) / number
+    return pd.DataFrame([['fair_scm_ensemble, empty cache', len(parameters), t_legacy, t_cold],
+        ['fair_scm_ensemble, cached', len(parameters), t_legacy, t_warm]],
+        columns=['Table', 'Draws', 'Legacy (s)', 'Current (s)'])
+
+
+def benchmark_integration(solutions, number):
+    """Integrate the PDS adoption of the electricity generation solutions among solutions
+       with the demand, and compute co2eq_mmt_reduced() of each. Legacy constructs every
+       solution again for each pass, current constructs them once with
+       solution.integration.integrate() and recomputes only the tables using the adoption."""
+    names = [s for s in solution.integration.electricity_solutions() if s in solutions]
+    constructors = {name: solution.factory.one_solution_scenarios(name)[0] for name in names}
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        demand = solution.integration.default_demand(
+                {name: constructors[name](scenario=None) for name in names})
+
+    def legacy():
+        scaled = {}
+        while True:
+            scenarios = {}
+            for name in names:
+                obj = constructors[name](scenario=None)
+                if name in scaled:
+                    model.incremental.replace_table(obj.ht.soln_pds_funits_adopted,
+                            scaled[name])
+                scenarios[name] = obj
+            adoption = {name: obj.ht.soln_pds_funits_adopted()
+                        for (name, obj) in scenarios.items()}
+            total = solution.integration.total_adoption(adoption)
+            limit = demand.reindex(index=total.index, columns=total.columns)
+            over = total > limit * (1.0 + 1e-9)
+            if not over.values.any():
+                break
+            factor = (limit / total).where(over, 1.0)
+            scaled = {name: a * factor.reindex_like(a).fillna(1.0)
+                      for (name, a) in adoption.items()}
+        return {name: obj.c2.co2eq_mmt_reduced() for (name, obj) in scenarios.items()}
+
+    def current():
+        result = solution.integration.integrate(names, demand=demand)
+        return {name: obj.c2.co2eq_mmt_reduced() for (name, obj) in result.scenarios.items()}
+
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        (expected, actual) = (legacy(), current())
+        for name in names:
+            pd.testing.assert_frame_equal(expected[name], actual[name], check_exact=True)
+        t_legacy = timeit.timeit(legacy, number=number) / number
+        t_current = timeit.timeit(current, number=number) / number
+    return pd.DataFrame([['co2eq_mmt_reduced', len(names), t_legacy, t_current]],
+        columns=['Table', 'Solutions', 'Legacy (s)', 'Current (s)'])
+
+
+BENCHMARKS = {
+    'new_iunits': benchmark_new_iunits,
+    'co2_ppm': benchmark_co2_ppm,
+    'breakout': benchmark_breakout,
+    'npv': benchmark_npv,
+    'single_iunit': benchmark_single_iunit,
+    's_curve': benchmark_s_curve,
+    'degraded_land': benchmark_degraded_land,
+    'land_lag': benchmark_land_lag,
+    'trends': benchmark_trends,
+    'sources': benchmark_sources,
+    'compiled': benchmark_compiled,
+    'aez': benchmark_aez,
+    'deferred': benchmark_deferred,
+    'incremental': benchmark_incremental,
+    'fingerprint': benchmark_fingerprint,
+    'vma_stats': benchmark_vma_stats,
+    'ensemble': benchmark_ensemble,
+    'fair': benchmark_fair,
+    'baseline': benchmark_baseline,
+    'fair_ensemble': benchmark_fair_ensemble,
+    'integration': benchmark_integration,
+}
+
+
+def report(results):
+    """Print per-table timings and the overall speedup."""
+    results['Speedup'] = results['Legacy (s)'] / results['Current (s)']
+    with pd.option_context('display.max_rows', None, 'display.width', 120):
+        print(results.to_string(index=False))
+    legacy = results['Legacy (s)'].sum()
+    current = results['Current (s)'].sum()
+    match = results.attrs.get('match', 'identical')
+    print(f"\n{len(results)} tables, all {match}. Legacy total {legacy:.4f}s, "
+          f"current total {current:.4f}s, speedup {legacy / current:.1f}x")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Benchmark vectorized model kernels.')
+    parser.add_argument('benchmark', choices=sorted(BENCHMARKS.keys()))
+    parser.add_argument('--solutions', nargs='*', default=None,
+        help='Solution directory names to benchmark, default is all solutions')
+    parser.add_argument('--number', type=int, default=5,
+        help='Number of timed repetitions per table')
+    args = parser.parse_args(sys.argv[1:])
+
+    solutions = args.solutions if args.solutions else solution.factory.all_solutions()
+    report(BENCHMARKS[args.benchmark](solutions=solutions, number=args.number))
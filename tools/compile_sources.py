@@ -0,0 +1,55 @@
+"""Compile the data source CSV files into the binary store of model/source_store.py.
+
+Constructs every scenario of each solution, recording each file parsed along the way (TAM
+and adoption sources, VMA tables, custom adoption, land allocation) together with the
+read_csv arguments it was parsed with, then writes the parsed tables to the store.
+
+    python tools/compile_sources.py
+    python tools/compile_sources.py --solutions afforestation solarpvutil
+
+Files modified after compiling are parsed from CSV again until the next compile.
+"""
+import argparse
+import pathlib
+import sys
+import time
+import warnings
+
+sys.path.append(str(pathlib.Path(__file__).parents[1]))
+import model.source_cache
+import model.source_store
+import solution.factory
+
+
+def compile_sources(solutions, path=model.source_store.STORE_PATH):
+    """Parse the sources of solutions and compile them into a store at path."""
+    cache = model.source_cache.sources
+    cache.store = None
+    cache.clear()
+    for name in solutions:
+        (constructor, scenarios) = solution.factory.one_solution_scenarios(name)
+        for scenario in scenarios:
+            with warnings.catch_warnings():
+                warnings.simplefilter('ignore')
+                constructor(scenario=scenario)
+    store = model.source_store.SourceStore(path=path)
+    tables = cache.parsed()
+    skipped = store.write(tables)
+    return (len(tables), skipped)
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Compile data source CSV files.')
+    parser.add_argument('--solutions', nargs='*', default=None,
+        help='Solution directory names to compile the sources of, default is all solutions')
+    parser.add_argument('--store', default=str(model.source_store.STORE_PATH),
+        help='Directory to write the store to')
+    args = parser.parse_args(sys.argv[1:])
+
+    solutions = args.solutions if args.solutions else solution.factory.all_solutions()
+    start = time.perf_counter()
+    (parsed, skipped) = compile_sources(solutions=solutions, path=pathlib.Path(args.store))
+    for filename in skipped:
+        print(f"not compiled: {filename}")
+    print(f"{parsed - len(skipped)} of {parsed} tables compiled into {args.store} "
+          f"in {time.perf_counter() - start:.1f}s")
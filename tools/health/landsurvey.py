@@ -38,7 +38,7 @@ def land_alloc_sum(land_solutions_scenarios, solns=None, outfile=None):
         print('processing: {}'.format(name))
         s = constructor()
         if df is None:
-            df = s.ae.soln_land_alloc_df
+            df = s.ae.soln_land_alloc_df.copy()
         else:
             df += s.ae.soln_land_alloc_df
     df *= 100
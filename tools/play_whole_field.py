@@ -6,14 +6,12 @@ import sys
 
 import model.fairutil
 
-import fair
-import fair.RCPs
 import matplotlib
 import matplotlib.animation
 import matplotlib.pyplot as plt
 import matplotlib.style
 import pandas as pd
-import solution.factory
+import solution.portfolio
 import ui.color
 
 
@@ -31,12 +29,9 @@ def init():
     """Return emissions with data per sector."""
     mmt = pd.DataFrame()
 
-    solutions = solution.factory.all_solutions_scenarios()
-    for name in solutions.keys():
-        (constructor, _) = solutions[name]
-        obj = constructor(scenario=None)
-        m = obj.c2.co2eq_mmt_reduced()
-        mmt[name] = m['World']
+    for result in solution.portfolio.run(solution.portfolio.jobs(),
+            tables=['c2.co2eq_mmt_reduced'], on_error='raise'):
+        mmt[result.job.solution] = result.tables['c2.co2eq_mmt_reduced']['World']
 
     sector_gtons = pd.DataFrame()
     everything = pd.read_csv(os.path.join('data', 'overview', 'solutions.csv'),
@@ -50,27 +45,26 @@ def init():
     total = model.fairutil.baseline_emissions()
     remaining = total.copy()
     sectors = sector_gtons.sort_values(axis='columns', by=2050, ascending=False).columns
-    emissions = []
+    stacks = {}
     for sector in sectors:
         remaining = remaining.subtract(sector_gtons[sector], fill_value=0.0)
-        _,_,T = fair.forward.fair_scm(emissions=remaining.values, useMultigas=False,
-                r0=model.fairutil.r0, tcrecs=model.fairutil.tcrecs)
-        df_T = pd.Series(T, index=remaining.index)
-        emissions.append((sector, df_T))
+        stacks[sector] = remaining
+    # the baseline and the cumulative stack of each sector, run across a pool of processes.
+    stacks[None] = total
+    results = model.fairutil.fair_scm_batch(stacks)
+    emissions = [(sector, results[sector]['T']) for sector in sectors]
+    baseline_T = results[None]['T']
 
     fig = plt.figure()
     ax = fig.add_subplot()
     ax.set_ylabel(u'°C');
-    _,_,T = fair.forward.fair_scm(emissions=total.values, useMultigas=False, r0=model.fairutil.r0,
-            tcrecs=model.fairutil.tcrecs)
-    df_T = pd.Series(T, index=fair.RCPs.rcp45.Emissions.year)
-    ax.plot(df_T.loc[2005:2050].index.values, df_T.loc[2005:2050].values,
+    ax.plot(baseline_T.loc[2005:2050].index.values, baseline_T.loc[2005:2050].values,
             color='black', label='Baseline', zorder=50)
     legend_no_duplicates(ax)
-    return (fig, ax, total, emissions)
+    return (fig, ax, baseline_T, emissions)
 
 
-def animate(frame, ax, total, lines, emissions):
+def animate(frame, ax, baseline_T, lines, emissions):
     (sector_num, offset) = divmod(frame, 50)
     (sector, df_T) = emissions[sector_num]
     color = ui.color.get_sector_color(sector)
@@ -86,9 +80,7 @@ def animate(frame, ax, total, lines, emissions):
         end = 2020 + offset
         line.set_data(df_T.loc[2020:end].index.values, df_T.loc[2020:end].values)
         if sector_num == 0:
-            _,_,T = fair.forward.fair_scm(emissions=total.values, useMultigas=False,
-                    r0=model.fairutil.r0, tcrecs=model.fairutil.tcrecs)
-            prev = pd.Series(T, index=fair.RCPs.rcp45.Emissions.year)
+            prev = baseline_T
         else:
             (_, prev) = emissions[sector_num - 1]
         ax.fill_between(x=df_T.loc[2020:end].index.values, y1=prev.loc[2020:end].values,
@@ -96,11 +88,11 @@ def animate(frame, ax, total, lines, emissions):
 
 
 def main(filename, writer):
-    (fig, ax, total, emissions) = init()
+    (fig, ax, baseline_T, emissions) = init()
     lines = {}
     frames = len(emissions) * 50
     anim = matplotlib.animation.FuncAnimation(fig=fig, func=animate, interval=10, frames=frames,
-            fargs=(ax, total, lines, emissions), repeat=False)
+            fargs=(ax, baseline_T, lines, emissions), repeat=False)
     anim.save(filename, writer=writer)
 
 
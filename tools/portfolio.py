@@ -0,0 +1,54 @@
+"""Run the scenarios of many solutions in parallel, writing the consolidated results.
+
+    python tools/portfolio.py --output portfolio_results
+    python tools/portfolio.py --scenarios all --workers 32 --timeout 600 --retries 1
+    python tools/portfolio.py --solutions solarpvutil afforestation --on-error raise
+
+The tables of every job which succeeds are written to OUTPUT/results.csv.gz, and the
+status, time taken and error of every job to OUTPUT/jobs.csv.
+"""
+import argparse
+import pathlib
+import sys
+import time
+
+sys.path.append(str(pathlib.Path(__file__).parents[1]))
+import solution.portfolio
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Run solution scenarios in parallel.')
+    parser.add_argument('--solutions', nargs='*', default=None,
+        help='solution directory names, default is all solutions')
+    parser.add_argument('--scenarios', choices=['default', 'all'], default='default',
+        help='run the default scenario of each solution, or all of its scenarios')
+    parser.add_argument('--workers', type=int, default=None,
+        help='number of worker processes, default is the number of CPUs')
+    parser.add_argument('--timeout', type=float, default=None,
+        help='seconds each job may take before it fails')
+    parser.add_argument('--retries', type=int, default=0,
+        help='number of times to run a failed job again')
+    parser.add_argument('--on-error', choices=['record', 'raise'], default='record',
+        help='record failed jobs and carry on, or stop at the first failure')
+    parser.add_argument('--tables', nargs='*', default=None,
+        help='module.method tables to write, default is all of model.result_cache.RESULTS')
+    parser.add_argument('--result-cache', default=None,
+        help='directory of a persistent result cache to load and store results')
+    parser.add_argument('--output', default='portfolio_results',
+        help='directory to write results.csv.gz and jobs.csv to')
+    args = parser.parse_args(sys.argv[1:])
+
+    joblist = solution.portfolio.jobs(solutions=args.solutions, scenarios=args.scenarios,
+        timeout=args.timeout, retries=args.retries)
+    start = time.perf_counter()
+    results = []
+    for result in solution.portfolio.run(joblist, workers=args.workers, tables=args.tables,
+            on_error=args.on_error, result_cache_path=args.result_cache):
+        results.append(result)
+        print(f"[{len(results)}/{len(joblist)}] {result.job.solution} "
+              f"{result.job.scenario or '(default)'}: {result.status} "
+              f"{result.seconds:.1f}s {result.error or ''}", flush=True)
+    solution.portfolio.write(results, args.output)
+    failed = sum(r.status != 'ok' for r in results)
+    print(f"{len(results)} jobs in {time.perf_counter() - start:.1f}s, {failed} failed, "
+          f"written to {args.output}")
@@ -0,0 +1,86 @@
+"""Inspect and prune the persistent result cache of model/result_cache.py.
+
+    python tools/result_cache.py inspect
+    python tools/result_cache.py prune --stale
+    python tools/result_cache.py prune --older-than 30 --max-mb 500
+    python tools/result_cache.py fill --solutions solarpvutil afforestation
+
+fill computes and stores the results of every scenario of the solutions given, or of all
+solutions, so that later runs load them.
+"""
+import argparse
+import datetime
+import pathlib
+import sys
+import warnings
+
+import pandas as pd
+
+sys.path.append(str(pathlib.Path(__file__).parents[1]))
+import model.result_cache
+import solution.factory
+
+
+def inspect(cache):
+    """DataFrame describing each entry of cache."""
+    rows = []
+    for entry in cache.entries():
+        created = entry['created']
+        rows.append([entry['solution'], entry['scenario'], entry['tables'],
+            entry['bytes'] / 1024,
+            datetime.datetime.fromtimestamp(created).strftime('%Y-%m-%d %H:%M') if created else '',
+            datetime.datetime.fromtimestamp(entry['used']).strftime('%Y-%m-%d %H:%M'),
+            'stale' if cache.is_stale(entry) else 'current', entry['key']])
+    return pd.DataFrame(rows, columns=['Solution', 'Scenario', 'Tables', 'KiB', 'Created',
+        'Used', 'State', 'Key'])
+
+
+def fill(cache, solutions):
+    """Compute and store the results of every scenario of solutions, reporting the
+       scenarios which fail to compute and carrying on with the others."""
+    with warnings.catch_warnings():
+        warnings.simplefilter('ignore')
+        for name in solutions:
+            (constructor, scenarios) = solution.factory.one_solution_scenarios(name)
+            for scenario in scenarios:
+                try:
+                    cache.results(constructor, scenario)
+                except Exception as e:  # pylint: disable=broad-except
+                    # a scenario failing to compute, for whatever reason, is reported and skipped.
+                    print(f"{name} {scenario}: {type(e).__name__}: {e}")
+
+
+if __name__ == '__main__':
+    parser = argparse.ArgumentParser(description='Inspect and prune the result cache.')
+    parser.add_argument('command', choices=['inspect', 'prune', 'fill'])
+    parser.add_argument('--cache', default=str(model.result_cache.CACHE_PATH),
+        help='Directory of the result cache')
+    parser.add_argument('--stale', action='store_true',
+        help='prune: remove entries computed by other versions of the code or data')
+    parser.add_argument('--older-than', type=float, default=None,
+        help='prune: remove entries last used more than this many days ago')
+    parser.add_argument('--max-mb', type=float, default=None,
+        help='prune: then remove the least recently used entries down to this size')
+    parser.add_argument('--all', action='store_true', help='prune: remove every entry')
+    parser.add_argument('--solutions', nargs='*', default=None,
+        help='fill: solution directory names, default is all solutions')
+    args = parser.parse_args(sys.argv[1:])
+
+    cache = model.result_cache.ResultCache(path=pathlib.Path(args.cache))
+    if args.command == 'inspect':
+        results = inspect(cache)
+        with pd.option_context('display.max_rows', None, 'display.width', 200,
+                'display.max_colwidth', 60):
+            print(results.to_string(index=False))
+        print(f"\n{len(results)} entries, {results['KiB'].sum() / 1024:.1f} MiB, "
+              f"{(results['State'] == 'stale').sum()} stale")
+    elif args.command == 'prune':
+        removed = cache.prune(stale=args.stale,
+            older_than=None if args.older_than is None else args.older_than * 86400,
+            max_bytes=0 if args.all else (None if args.max_mb is None else
+                args.max_mb * 1024 * 1024))
+        print(f"removed {len(removed)} entries")
+    else:
+        solutions = args.solutions if args.solutions else solution.factory.all_solutions()
+        fill(cache, solutions)
+        print(f"{cache.misses} scenarios computed, {cache.hits} already stored")
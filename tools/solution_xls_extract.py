@@ -1101,8 +1101,8 @@ def write_ua(f, wb, is_rrs=True):
         f.write("            ref_total_adoption_units=self.tla_per_region,\n")
         f.write("            pds_total_adoption_units=self.tla_per_region,\n")
         f.write("            electricity_unit_factor=1000000.0,\n")
-    f.write("            soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted(),\n")
-    f.write("            soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted(),\n")
+    f.write("            soln_ref_funits_adopted=self.ht.soln_ref_funits_adopted,\n")
+    f.write("            soln_pds_funits_adopted=self.ht.soln_pds_funits_adopted,\n")
     if 'Repeated First Cost to Maintaining Implementation Units' in ac_tab.cell(42, 0).value:
         repeated_cost_for_iunits = convert_bool(ac_tab.cell(42, 2).value)
         f.write("            repeated_cost_for_iunits=" + str(repeated_cost_for_iunits) + ",\n")
@@ -1112,10 +1112,10 @@ def write_ua(f, wb, is_rrs=True):
         if ua_tab.cell(134, 18 + i).value != ua_tab.cell(134, 3 + i).value:
             bug_cfunits_double_count = True
     f.write("            bug_cfunits_double_count=" + str(bug_cfunits_double_count) + ")\n")
-    f.write("        soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd()\n")
-    f.write("        soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd()\n")
-    f.write("        conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits()\n")
-    f.write("        soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted()\n")
+    f.write("        soln_pds_tot_iunits_reqd = self.ua.soln_pds_tot_iunits_reqd\n")
+    f.write("        soln_ref_tot_iunits_reqd = self.ua.soln_ref_tot_iunits_reqd\n")
+    f.write("        conv_ref_tot_iunits = self.ua.conv_ref_tot_iunits\n")
+    f.write("        soln_net_annual_funits_adopted=self.ua.soln_net_annual_funits_adopted\n")
     f.write("\n")
 
 
@@ -1129,9 +1129,9 @@ def write_fc(f, wb):
     f.write("            soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,\n")
     f.write("            soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,\n")
     f.write("            conv_ref_tot_iunits=conv_ref_tot_iunits,\n")
-    f.write("            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),\n")
-    f.write("            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),\n")
-    f.write("            conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),\n")
+    f.write("            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,\n")
+    f.write("            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,\n")
+    f.write("            conv_ref_new_iunits=self.ua.conv_ref_new_iunits,\n")
     if fc_tab.cell(35, 15).value == 'Implementation Units Installed Each Yr (CONVENTIONAL-REF)':
         f.write("            conv_ref_first_cost_uses_tot_units=True,\n")
     if fc_tab.cell(14, 5).value == 1000000000 and fc_tab.cell(14, 6).value == '$/kW TO $/TW':
@@ -1150,13 +1150,13 @@ def write_oc(f, wb, is_land=False):
     f.write("            soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,\n")
     f.write("            soln_pds_tot_iunits_reqd=soln_pds_tot_iunits_reqd,\n")
     f.write("            soln_ref_tot_iunits_reqd=soln_ref_tot_iunits_reqd,\n")
-    f.write("            conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits(),\n")
-    f.write("            soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost(),\n")
-    f.write("            soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost(),\n")
-    f.write("            conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost(),\n")
+    f.write("            conv_ref_annual_tot_iunits=self.ua.conv_ref_annual_tot_iunits,\n")
+    f.write("            soln_pds_annual_world_first_cost=self.fc.soln_pds_annual_world_first_cost,\n")
+    f.write("            soln_ref_annual_world_first_cost=self.fc.soln_ref_annual_world_first_cost,\n")
+    f.write("            conv_ref_annual_world_first_cost=self.fc.conv_ref_annual_world_first_cost,\n")
     f.write("            single_iunit_purchase_year=" + xli(oc_tab, 120, 8) + ",\n")
-    f.write("            soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit(),\n")
-    f.write("            conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit(),\n")
+    f.write("            soln_pds_install_cost_per_iunit=self.fc.soln_pds_install_cost_per_iunit,\n")
+    f.write("            conv_ref_install_cost_per_iunit=self.fc.conv_ref_install_cost_per_iunit,\n")
 
     units = oc_tab.cell(12, 5).value
     is_energy_units = (units == '$/kW TO $/TW' or units == 'From US$2014 per kW to US$2014 per TW')
@@ -1185,37 +1185,37 @@ def write_c2_c4(f, is_rrs=True, is_protect=False, has_harvest=False):
     """Write out the CO2 Calcs and CH4 Calcs modules for this solution class."""
     f.write("        self.c4 = ch4calcs.CH4Calcs(ac=self.ac,\n")
     if not is_rrs:
-        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land(),\n")
+        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land,\n")
     f.write("            soln_net_annual_funits_adopted=soln_net_annual_funits_adopted)\n\n")
     f.write("        self.c2 = co2calcs.CO2Calcs(ac=self.ac,\n")
-    f.write("            ch4_ppb_calculator=self.c4.ch4_ppb_calculator(),\n")
-    f.write("            soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved(),\n")
-    f.write("            soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used(),\n")
+    f.write("            ch4_ppb_calculator=self.c4.ch4_ppb_calculator,\n")
+    f.write("            soln_pds_net_grid_electricity_units_saved=self.ua.soln_pds_net_grid_electricity_units_saved,\n")
+    f.write("            soln_pds_net_grid_electricity_units_used=self.ua.soln_pds_net_grid_electricity_units_used,\n")
     if is_rrs:
-        f.write("            soln_pds_direct_co2_emissions_saved=self.ua.soln_pds_direct_co2_emissions_saved(),\n")
-        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.soln_pds_direct_ch4_co2_emissions_saved(),\n")
-        f.write("            soln_pds_direct_n2o_co2_emissions_saved=self.ua.soln_pds_direct_n2o_co2_emissions_saved(),\n")
+        f.write("            soln_pds_direct_co2_emissions_saved=self.ua.soln_pds_direct_co2_emissions_saved,\n")
+        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.soln_pds_direct_ch4_co2_emissions_saved,\n")
+        f.write("            soln_pds_direct_n2o_co2_emissions_saved=self.ua.soln_pds_direct_n2o_co2_emissions_saved,\n")
     else:
-        f.write("            soln_pds_direct_co2eq_emissions_saved=self.ua.direct_co2eq_emissions_saved_land(),\n")
-        f.write("            soln_pds_direct_co2_emissions_saved=self.ua.direct_co2_emissions_saved_land(),\n")
-        f.write("            soln_pds_direct_n2o_co2_emissions_saved=self.ua.direct_n2o_co2_emissions_saved_land(),\n")
-        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land(),\n")
-    f.write("            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd(),\n")
-    f.write("            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd(),\n")
-    f.write("            conv_ref_new_iunits=self.ua.conv_ref_new_iunits(),\n")
-    f.write("            conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh(),\n")
-    f.write("            conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh(),\n")
+        f.write("            soln_pds_direct_co2eq_emissions_saved=self.ua.direct_co2eq_emissions_saved_land,\n")
+        f.write("            soln_pds_direct_co2_emissions_saved=self.ua.direct_co2_emissions_saved_land,\n")
+        f.write("            soln_pds_direct_n2o_co2_emissions_saved=self.ua.direct_n2o_co2_emissions_saved_land,\n")
+        f.write("            soln_pds_direct_ch4_co2_emissions_saved=self.ua.direct_ch4_co2_emissions_saved_land,\n")
+    f.write("            soln_pds_new_iunits_reqd=self.ua.soln_pds_new_iunits_reqd,\n")
+    f.write("            soln_ref_new_iunits_reqd=self.ua.soln_ref_new_iunits_reqd,\n")
+    f.write("            conv_ref_new_iunits=self.ua.conv_ref_new_iunits,\n")
+    f.write("            conv_ref_grid_CO2_per_KWh=self.ef.conv_ref_grid_CO2_per_KWh,\n")
+    f.write("            conv_ref_grid_CO2eq_per_KWh=self.ef.conv_ref_grid_CO2eq_per_KWh,\n")
     f.write("            soln_net_annual_funits_adopted=soln_net_annual_funits_adopted,\n")
     if is_rrs:
         f.write("            fuel_in_liters=False)\n")
     else:
         if is_protect:
-            f.write("            tot_red_in_deg_land=self.ua.cumulative_reduction_in_total_degraded_land(),\n")
-            f.write("            pds_protected_deg_land=self.ua.pds_cumulative_degraded_land_protected(),\n")
-            f.write("            ref_protected_deg_land=self.ua.ref_cumulative_degraded_land_protected(),\n")
+            f.write("            tot_red_in_deg_land=self.ua.cumulative_reduction_in_total_degraded_land,\n")
+            f.write("            pds_protected_deg_land=self.ua.pds_cumulative_degraded_land_protected,\n")
+            f.write("            ref_protected_deg_land=self.ua.ref_cumulative_degraded_land_protected,\n")
         if has_harvest:
-            f.write("            annual_land_area_harvested=self.ua.soln_pds_annual_land_area_harvested(),\n")
-        f.write("            regime_distribution=self.ae.get_land_distribution(),\n")
+            f.write("            annual_land_area_harvested=self.ua.soln_pds_annual_land_area_harvested,\n")
+        f.write("            regime_distribution=self.ae.get_land_distribution,\n")
         f.write("            regimes=dd.THERMAL_MOISTURE_REGIMES8)\n")
     f.write("\n")
 
@@ -1667,11 +1667,11 @@ def output_solution_python_file(outputdir, xl_filename):
     f.write("    vmas = VMAs\n")
     f.write("    solution_category = solution_category\n")
     f.write("\n")
-    f.write("    def __init__(self, scenario=None):\n")
+    f.write("    def __init__(self, scenario=None, ac=None):\n")
     f.write("        if scenario is None:\n")
     f.write("            scenario = list(scenarios.keys())[0]\n")
     f.write("        self.scenario = scenario\n")
-    f.write("        self.ac = scenarios[scenario]\n")
+    f.write("        self.ac = ac if ac is not None else scenarios[scenario]\n")
     f.write("\n")
     if has_tam:
         f.write("        # TAM\n")